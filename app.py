@@ -2,8 +2,15 @@ import streamlit as st
 import asyncio
 from dotenv import load_dotenv
 import os
+import uuid
 from src.multi_agent_system.orchestrator import OrchestratorAgent
 from src.multi_agent_system.utils.config import Config
+from src.multi_agent_system.agents.base_agent import BaseAgent
+from src.multi_agent_system.tools.agent_tools import agent_pool
+from src.multi_agent_system.utils.memory import get_memory_accountant
+from src.multi_agent_system.utils.profiling import get_profiler
+from src.multi_agent_system.utils.scheduler import get_scheduler
+from src.multi_agent_system.warmup import start_warmup
 
 # ページ設定
 st.set_page_config(
@@ -41,13 +48,27 @@ st.markdown("""
 - ✈️ **旅行計画アシスタント**: 旅行の計画やアドバイス
 """)
 
+# バックグラウンドのウォームアップ（プロセスごとに1回、初回描画をブロックしない）
+@st.cache_resource
+def get_warmup_manager():
+    return start_warmup()
+
+
+warmup = get_warmup_manager() if Config.WARMUP_ON_STARTUP else None
+
 # セッション状態の初期化
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 if "orchestrator" not in st.session_state:
     with st.spinner("エージェントを初期化中..."):
         st.session_state.orchestrator = OrchestratorAgent()
 
+# セッションごとのメモリ計測（オーケストレーターは弱参照で保持）
+memory = get_memory_accountant()
+memory.track(st.session_state.session_id, st.session_state.orchestrator)
+
 # チャット履歴の表示
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -66,11 +87,24 @@ if prompt := st.chat_input("質問を入力してください..."):
     with st.chat_message("assistant"):
         with st.spinner("考え中..."):
             try:
-                # 同期的に実行
-                response = st.session_state.orchestrator.process_query(prompt)
+                # 同期的に実行（スケジューラ上では対話優先・セッション単位で公平に処理）
+                context = {
+                    "session_id": st.session_state.session_id,
+                    "priority": "interactive"
+                }
+                response = st.session_state.orchestrator.process_query(prompt, context)
                 
                 # 応答を表示
-                st.markdown(response["response"])
+                if response.get("busy"):
+                    st.warning(response["response"])
+                else:
+                    answer = st.empty()
+                    answer.markdown(response["response"])
+                    # 期限までに終わらなかったセクションは完了後に差し替える
+                    if response.get("pending"):
+                        with st.spinner("残りのセクションを生成中..."):
+                            response = st.session_state.orchestrator.complete_pending(prompt, response, context=context)
+                        answer.markdown(response["response"])
                 agent_name = response.get("agent_used", "不明")
                 st.markdown(f"*応答元: {agent_name}*")
                 
@@ -96,8 +130,75 @@ with st.sidebar:
     
     if st.button("会話をクリア"):
         st.session_state.messages = []
+        st.session_state.orchestrator.reset_session(st.session_state.session_id)
         st.rerun()
     
+    st.header("🔥 ウォームアップ")
+    if warmup is None:
+        st.caption("ウォームアップは無効です")
+    else:
+        warmup_status = warmup.status()
+        if warmup_status["state"] == "ready":
+            st.success(f"✅ 準備完了 ({warmup_status['elapsed_s']:.1f}秒)")
+        elif warmup_status["state"] == "degraded":
+            st.warning("⚠️ 一部のウォームアップに失敗しました")
+        else:
+            st.info("⏳ ウォームアップ中...")
+            if st.button("状態を更新"):
+                st.rerun()
+        with st.expander("詳細"):
+            for step_name, step in warmup_status["steps"].items():
+                duration = f" ({step['duration_ms']:.0f}ms)" if "duration_ms" in step else ""
+                st.text(f"{step_name}: {step['status']}{duration}")
+                if "error" in step:
+                    st.caption(step["error"])
+    
+    if Config.SCHEDULER_ENABLED:
+        st.header("🚦 スケジューラ")
+        scheduler_stats = get_scheduler().stats()
+        st.text(f"実行中: {scheduler_stats['running']}")
+        for priority in ("interactive", "batch", "background"):
+            queue = scheduler_stats[priority]
+            st.text(
+                f"{priority}: 待機 {queue['depth']}/{queue['capacity']}, "
+                f"平均待ち {queue['mean_wait_ms']:.0f}ms, 拒否 {queue['rejected']:.0f}"
+            )
+    
+    st.header("🧠 メモリ")
+    session_memory = memory.session_report(st.session_state.session_id, st.session_state.messages)
+    st.text(f"このセッション: {session_memory['bytes'] / 1024:.1f} KB")
+    with st.expander("詳細"):
+        memory_report = memory.report(agent_pool.idle_agents(), agent_types=(BaseAgent,))
+        st.text(f"RSS: {memory_report['rss_bytes'] / 1024 / 1024:.1f} MB")
+        st.text(f"セッション数: {len(memory_report['sessions'])} ({memory_report['session_bytes'] / 1024:.1f} KB)")
+        st.text(f"プール中のエージェント: {len(memory_report['pooled_agents'])} ({memory_report['pooled_bytes'] / 1024:.1f} KB)")
+        for agent_class, count in sorted(memory_report["live_agents"].items()):
+            st.text(f"{agent_class}: {count}")
+        if "tracemalloc_current_bytes" in memory_report:
+            st.text(f"tracemalloc: {memory_report['tracemalloc_current_bytes'] / 1024 / 1024:.1f} MB")
+            for allocation in memory.top_allocations(5):
+                st.caption(f"{allocation['site']}: +{allocation['growth_bytes'] / 1024:.1f} KB")
+    
+    # 隠しコントロール: URLに ?debug=1 を付けた場合のみ表示
+    if st.query_params.get("debug") == "1":
+        st.header("🧪 プロファイリング")
+        profiler = get_profiler()
+        profile_status = profiler.status()
+        if profile_status["mode"]:
+            st.info(f"実行中: {profile_status['mode']} (残り {profile_status['remaining_requests'] or '-'} 件)")
+            if st.button("停止して書き出す"):
+                profiler.disable()
+                st.rerun()
+        else:
+            profile_mode = st.selectbox("モード", ["sampling", "deterministic"])
+            profile_requests = st.number_input("リクエスト数", min_value=0, value=5)
+            profile_seconds = st.number_input("秒数", min_value=0, value=0)
+            if st.button("開始"):
+                profiler.enable(profile_mode, requests=profile_requests or None, seconds=profile_seconds or None)
+                st.rerun()
+        for profile_file in profile_status["files"]:
+            st.caption(profile_file)
+    
     st.header("💡 使い方のヒント")
     st.markdown("""
     - **研究**: "〜について調べて"
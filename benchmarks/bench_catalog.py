@@ -0,0 +1,191 @@
+"""Benchmark for the product catalog's vectorized filtering.
+
+Builds a synthetic catalog of millions of rows (categories, brands,
+prices, ratings and attribute tags) and measures the per-query cost of
+constraint extraction plus the budget/category filter and top-N
+shortlist, as p50/p95/p99 latencies. ``--csv-rows`` also times loading
+a CSV file of that size. ``--baseline`` compares the run against an
+earlier JSON result and exits non-zero when the shortlist latency got
+worse than ``--threshold``.
+
+Usage:
+    uv run python benchmarks/bench_catalog.py --rows 2000000 --output results/catalog.json
+    uv run python benchmarks/bench_catalog.py --baseline results/catalog.json --threshold 0.2
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from bench_hotpaths import _git_commit
+from multi_agent_system.knowledge.catalog import ATTRIBUTE_SYNONYMS, CATEGORY_SYNONYMS, ProductCatalog, extract_constraints
+
+QUERIES = [
+    "プログラミング用の良いラップトップを推奨して",
+    "10万円以下の軽いノートパソコンを教えて",
+    "3万円台のノイズキャンセリング付きイヤホン",
+    "5万から8万円でゲーミングモニターを探しています",
+    "安いスマホでおすすめは？",
+    "防水のスマートウォッチ 2万円程度",
+    "laptop under $1000 with long battery life",
+    "15万円以上の高性能なデスクトップ",
+    "ワイヤレスキーボードとマウス",
+    "大画面のタブレットを予算6万円で",
+]
+
+
+def build_columns(rows: int, seed: int) -> Dict[str, Any]:
+    """Create synthetic catalog columns with ``rows`` products."""
+    rng = np.random.default_rng(seed)
+    categories = np.array([group[-1] for group in CATEGORY_SYNONYMS])
+    attributes = [group[0] for group in ATTRIBUTE_SYNONYMS]
+    brands = np.array([f"Brand{number:03d}" for number in range(300)])
+    tags = rng.integers(0, len(attributes), size=(rows, 3))
+    counts = rng.integers(0, 4, size=rows)
+    return {
+        "name": [f"Product {number}" for number in range(rows)],
+        "category": categories[rng.integers(0, len(categories), size=rows)],
+        "brand": brands[rng.integers(0, len(brands), size=rows)],
+        # Log-normal prices centred around ¥30,000
+        "price": np.round(rng.lognormal(10.3, 0.9, size=rows), -2),
+        "rating": np.round(rng.uniform(2.5, 5.0, size=rows), 1),
+        "attributes": [";".join(attributes[tag] for tag in row[:count]) for row, count in zip(tags.tolist(), counts.tolist())],
+    }
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": _percentile(samples, 0.50),
+        "p95": _percentile(samples, 0.95),
+        "p99": _percentile(samples, 0.99),
+        "max": max(samples),
+    }
+
+
+def time_csv_load(columns: Dict[str, Any], rows: int) -> Dict[str, float]:
+    """Write the first ``rows`` products to a CSV file and time loading it."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(columns))
+            writer.writerows(zip(*(list(values[:rows]) for values in columns.values())))
+        started = time.perf_counter()
+        ProductCatalog.from_csv(path)
+        seconds = time.perf_counter() - started
+        return {"rows": rows, "seconds": seconds, "rows_per_s": rows / seconds, "mb": os.path.getsize(path) / 1e6}
+
+
+def run(rows: int, repeat: int, top: int, seed: int, csv_rows: int) -> Dict[str, Any]:
+    """Build the catalog and time the query mix."""
+    started = time.perf_counter()
+    columns = build_columns(rows, seed)
+    generate_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    catalog = ProductCatalog(columns)
+    build_seconds = time.perf_counter() - started
+    print(f"generated {rows} rows in {generate_seconds:.1f}s, built catalog in {build_seconds:.1f}s")
+
+    # Warm the attribute masks so the timings show the steady state
+    for query in QUERIES:
+        constraints = extract_constraints(query, catalog)
+        catalog.shortlist(top, constraints["budget"], constraints["categories"], constraints["attributes"], constraints["sort"])
+
+    extract_ms, shortlist_ms, matches = [], [], []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            constraints = extract_constraints(query, catalog)
+            extracted = time.perf_counter()
+            result = catalog.shortlist(top, constraints["budget"], constraints["categories"], constraints["attributes"], constraints["sort"])
+            finished = time.perf_counter()
+            extract_ms.append((extracted - started) * 1000)
+            shortlist_ms.append((finished - extracted) * 1000)
+            matches.append(result.matches)
+
+    result = {
+        "rows": rows,
+        "build_seconds": build_seconds,
+        "queries": len(shortlist_ms),
+        "mean_matches": statistics.fmean(matches),
+        "extract_ms": _summary(extract_ms),
+        "shortlist_ms": _summary(shortlist_ms),
+        "total_ms": _summary([a + b for a, b in zip(extract_ms, shortlist_ms)]),
+    }
+    if csv_rows:
+        result["csv_load"] = time_csv_load(columns, min(csv_rows, rows))
+    return result
+
+
+def main() -> None:
+    """Run the benchmark and optionally compare it with a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000000, help="Products in the synthetic catalog")
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the query mix")
+    parser.add_argument("--top", type=int, default=5, help="Shortlist size")
+    parser.add_argument("--csv-rows", type=int, default=0, help="Also time loading a CSV file with this many rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Compare against an earlier --output file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    result = run(args.rows, args.repeat, args.top, args.seed, args.csv_rows)
+    result.update({
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    })
+    for name in ("extract_ms", "shortlist_ms", "total_ms"):
+        summary = result[name]
+        print(f"{name:13s} p50 {summary['p50']:8.2f}  p95 {summary['p95']:8.2f}  p99 {summary['p99']:8.2f}  max {summary['max']:8.2f}")
+    print(f"{result['queries']} queries, {result['mean_matches']:.0f} matching rows on average")
+    if "csv_load" in result:
+        load = result["csv_load"]
+        print(f"CSV load: {load['rows']} rows ({load['mb']:.1f} MB) in {load['seconds']:.1f}s, {load['rows_per_s']:.0f} rows/s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = []
+        print(f"{'measurement':16s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+        for name in ("p50", "p95"):
+            base, value = baseline["total_ms"][name], result["total_ms"][name]
+            change = value / base - 1 if base else 0.0
+            flag = ""
+            if change > args.threshold:
+                regressions.append(f"total {name}")
+                flag = "  REGRESSION"
+            print(f"{'total ' + name + ' ms':16s} {base:10.2f} {value:10.2f} {change:+8.1%}{flag}")
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Benchmark for the destination knowledge base.
+
+Offline (default): builds a synthetic store with thousands of
+destinations and measures build time, file size, open time, and the
+per-request cost of extracting the trip fields, looking the destination
+up and rendering the selected blocks (with a cold and a warm record
+cache), as p50/p95/p99 latencies.
+
+``--live`` additionally runs trip requests for the top destinations
+through ``TripPlanningAssistant`` with and without the knowledge base
+(``--store``, e.g. built from examples/destinations.json) and compares
+output tokens and latency. This makes real model calls, or replays
+recorded ones under ``LLM_REPLAY_MODE=replay``.
+
+Usage:
+    uv run python benchmarks/bench_destinations.py --destinations 10000 --output results/destinations.json
+    uv run python benchmarks/bench_destinations.py --live --store data/destinations.kb --repeat 3
+    uv run python benchmarks/bench_destinations.py --baseline results/destinations.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from bench_hotpaths import _git_commit
+from multi_agent_system.knowledge.destinations import (
+    INTEREST_KEYWORDS, SEASONS, DestinationStore, build_store, extract_trip_fields, format_blocks, select_blocks,
+)
+
+_KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモラリルレロワ"
+_LATIN = "abcdefghijklmnopqrstuvwxyz"
+LIVE_QUERIES = [
+    "東京への5日間の旅行を計画して",
+    "京都に3泊で、歴史と紅葉を楽しむ旅を夫婦で計画して",
+    "大阪で食べ歩き中心の2日間のプランを作って",
+    "Plan a trip to Kyoto",
+]
+
+
+def synthetic_destinations(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Create ``count`` destinations with realistic field sizes."""
+    rng = random.Random(seed)
+    tags = list(INTEREST_KEYWORDS)
+    destinations = []
+    names = set()
+    while len(destinations) < count:
+        name = "".join(rng.choice(_KANA) for _ in range(rng.randint(3, 6)))
+        latin = "".join(rng.choice(_LATIN) for _ in range(rng.randint(5, 10)))
+        if name in names or latin in names:
+            continue
+        names.update((name, latin))
+        areas = [f"{name}エリア{number}" for number in range(5)]
+        destinations.append({
+            "name": name,
+            "country": "日本",
+            "aliases": [latin, f"{name}市"],
+            "areas": areas,
+            "sights": [
+                {
+                    "name": f"{name}の名所{number}",
+                    "area": rng.choice(areas),
+                    "tags": rng.sample(tags, 2),
+                    "hours": rng.choice([1, 1.5, 2, 3]),
+                    "seasons": rng.sample(SEASONS, 2),
+                    "note": "見どころの説明と訪問のヒント。" * 2,
+                }
+                for number in range(30)
+            ],
+            "stays": [{"area": rng.choice(areas), "style": style, "note": "宿泊エリアの特徴の説明"} for style in ("budget", "standard", "luxury") * 2],
+            "transit": ["主要都市からのアクセスの説明", "市内の移動手段の説明", "お得な交通パスの説明", "空港からのアクセスの説明"],
+            "seasons": {season: "季節ごとの見どころと注意点の説明" for season in SEASONS},
+            "budget": {
+                "budget": {"lodging": 5000, "food": 3000, "transit": 1000, "activities": 1000},
+                "standard": {"lodging": 15000, "food": 6000, "transit": 1500, "activities": 3000},
+                "luxury": {"lodging": 50000, "food": 15000, "transit": 5000, "activities": 8000},
+            },
+            "tips": ["現地のマナーの説明", "混雑を避けるヒント", "持ち物のアドバイス"],
+        })
+    return destinations
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": _percentile(samples, 0.50),
+        "p95": _percentile(samples, 0.95),
+        "p99": _percentile(samples, 0.99),
+    }
+
+
+def _notes(store: DestinationStore, query: str) -> str:
+    fields = extract_trip_fields(query, store)
+    fields["days"] = 5
+    record = store.get(fields["destination"])
+    return format_blocks(select_blocks(record, fields)) if record else ""
+
+
+def run_offline(count: int, queries: int, seed: int) -> Dict[str, Any]:
+    """Build a synthetic store and time the lookup path."""
+    rng = random.Random(seed)
+    destinations = synthetic_destinations(count, seed)
+    raw_bytes = sum(len(json.dumps(destination, ensure_ascii=False).encode("utf-8")) for destination in destinations)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "destinations.kb")
+        started = time.perf_counter()
+        built = build_store(destinations, path)
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        warm_store = DestinationStore(path)
+        open_ms = (time.perf_counter() - started) * 1000
+        cold_store = DestinationStore(path, cache_size=0)
+
+        # Popular destinations dominate real traffic: Zipf over the destination list
+        weights = [1.0 / rank for rank in range(1, count + 1)]
+        picks = rng.choices(destinations, weights=weights, k=queries)
+        requests = [
+            f"{rng.choice([pick['name']] + pick['aliases'])}への5日間の旅行を計画して。{rng.choice(list(INTEREST_KEYWORDS.values()))[0]}中心で"
+            for pick in picks
+        ]
+        _notes(warm_store, requests[0])
+        results = {}
+        for name, store in (("cold", cold_store), ("warm", warm_store)):
+            latencies = []
+            sizes = []
+            for request in requests:
+                started = time.perf_counter()
+                notes = _notes(store, request)
+                latencies.append((time.perf_counter() - started) * 1000)
+                sizes.append(len(notes))
+            results[name] = _summary(latencies)
+        hits = sum(1 for size in sizes if size)
+        warm_store.close()
+        cold_store.close()
+    return {
+        "destinations": count,
+        "keys": built["keys"],
+        "bytes": built["bytes"],
+        "bytes_per_destination": built["bytes"] / count,
+        "compression": raw_bytes / built["bytes"],
+        "build_seconds": build_seconds,
+        "open_ms": open_ms,
+        "queries": queries,
+        "hit_rate": hits / queries,
+        "notes_chars": statistics.fmean(sizes),
+        "lookup_ms": results,
+    }
+
+
+def run_live(store_path: str, repeat: int) -> Dict[str, Any]:
+    """Compare output tokens and latency with and without the knowledge base."""
+    from multi_agent_system.agents.trip_planning_assistant import TripPlanningAssistant
+    from multi_agent_system.utils.config import Config
+
+    arms = {}
+    for arm, path in (("without", None), ("with", store_path)):
+        Config.DESTINATION_KB_PATH = path
+        agent = TripPlanningAssistant()
+        tokens, latencies = [], []
+        for _ in range(repeat):
+            for query in LIVE_QUERIES:
+                response = agent.respond(query)
+                agent.reset_conversation()
+                if response.ok:
+                    tokens.append(response.output_tokens)
+                    latencies.append(response.latency_ms)
+        arms[arm] = {
+            "calls": len(tokens),
+            "output_tokens": statistics.fmean(tokens) if tokens else 0.0,
+            "latency_ms": statistics.fmean(latencies) if latencies else 0.0,
+        }
+        print(f"{arm:8s} {arms[arm]['calls']:4d} calls  {arms[arm]['output_tokens']:8.0f} output tokens  {arms[arm]['latency_ms']:8.0f} ms")
+    for name in ("output_tokens", "latency_ms"):
+        base = arms["without"][name]
+        arms[f"{name}_change"] = arms["with"][name] / base - 1 if base else 0.0
+    return arms
+
+
+def main() -> None:
+    """Run the benchmark and optionally compare it with a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--destinations", type=int, default=10000, help="Destinations in the synthetic store")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--live", action="store_true", help="Also compare model output with and without the knowledge base")
+    parser.add_argument("--store", help="Store file for --live")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the live queries")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Compare against an earlier --output file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+    if args.live and not args.store:
+        parser.error("--live requires --store")
+
+    result = run_offline(args.destinations, args.queries, args.seed)
+    print(
+        f"{result['destinations']} destinations ({result['keys']} keys): {result['bytes'] / 1e6:.1f} MB "
+        f"({result['bytes_per_destination']:.0f} B each, {result['compression']:.1f}x smaller than JSON), "
+        f"built in {result['build_seconds']:.1f}s, opened in {result['open_ms']:.2f} ms"
+    )
+    for name, summary in result["lookup_ms"].items():
+        print(f"lookup ({name} cache) p50 {summary['p50']:.3f} ms  p95 {summary['p95']:.3f} ms  p99 {summary['p99']:.3f} ms")
+    print(f"hit rate {result['hit_rate']:.0%}, {result['notes_chars']:.0f} prompt characters per request")
+    if args.live:
+        result["live"] = run_live(args.store, args.repeat)
+    result.update({
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    })
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = []
+        print(f"{'measurement':20s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+        for cache in ("cold", "warm"):
+            base, value = baseline["lookup_ms"][cache]["p95"], result["lookup_ms"][cache]["p95"]
+            change = value / base - 1 if base else 0.0
+            flag = ""
+            if change > args.threshold:
+                regressions.append(f"{cache} p95")
+                flag = "  REGRESSION"
+            print(f"{cache + ' p95 ms':20s} {base:10.3f} {value:10.3f} {change:+8.1%}{flag}")
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
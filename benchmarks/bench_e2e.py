@@ -0,0 +1,177 @@
+"""End-to-end latency benchmark replaying recorded model responses.
+
+First record fixtures once against the live model (costs real API calls):
+
+    uv run python benchmarks/bench_e2e.py --record
+
+Then replay them through ``OrchestratorAgent.process_query`` (or through
+``app.py`` itself with Streamlit's ``AppTest``) as often as needed:
+
+    uv run python benchmarks/bench_e2e.py --speed 1.0 --output results/e2e.json
+    uv run python benchmarks/bench_e2e.py --path app --speed 0
+    uv run python benchmarks/bench_e2e.py --baseline results/e2e.json --threshold 0.1
+
+For every query the report splits wall time into ``model_ms`` (time
+covered by replayed model calls, overlapping calls counted once) and
+``overhead_ms`` (everything else: routing, pooling, scheduling,
+synthesis, and for ``--path app`` the Streamlit script run). Regression
+checks compare ``overhead_ms``, which does not depend on the model.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_hotpaths import _git_commit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+QUERIES = [
+    "東京への5日間の旅行を計画して",
+    "プログラミング用の良いラップトップを推奨して",
+    "機械学習アルゴリズムについて教えて",
+    "クラウドコンピューティングについて調べて、関連する良い書籍も推薦してください",
+    "Hello",
+]
+
+
+def covered_ms(intervals: List[Tuple[float, float]], start: float, end: float) -> float:
+    """Length of the union of intervals clipped to [start, end], in ms."""
+    total = 0.0
+    cursor = start
+    for begin, finish in sorted(intervals):
+        begin, finish = max(begin, cursor), min(finish, end)
+        if finish > begin:
+            total += finish - begin
+            cursor = finish
+    return total * 1000
+
+
+def orchestrator_runner() -> Tuple[Callable[[str], Any], Any]:
+    """Run queries the way ``app.py`` calls the orchestrator, without Streamlit."""
+    from multi_agent_system.agents.replay import get_replay_store
+    from multi_agent_system.orchestrator import OrchestratorAgent
+
+    orchestrator = OrchestratorAgent()
+
+    def run(query: str) -> Any:
+        result = orchestrator.process_query(query, {"session_id": "bench", "priority": "interactive"})
+        return orchestrator.complete_pending(query, result)
+
+    return run, get_replay_store()
+
+
+def app_runner() -> Tuple[Callable[[str], Any], Any]:
+    """Run queries through ``app.py`` with Streamlit's headless ``AppTest``."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=600)
+    app.run()
+
+    def run(query: str) -> Any:
+        app.chat_input[0].set_value(query).run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        return app
+
+    # app.py imports the package as ``src.multi_agent_system``, a separate module copy
+    sys.path.insert(0, ROOT)
+    from src.multi_agent_system.agents.replay import get_replay_store
+    return run, get_replay_store()
+
+
+def run(path: str, iterations: int, queries: List[str]) -> Dict[str, Any]:
+    """Replay every query ``iterations`` times and summarize the timings."""
+    runner, store = app_runner() if path == "app" else orchestrator_runner()
+    results: Dict[str, Any] = {}
+    for query in queries:
+        walls, models = [], []
+        for _ in range(iterations):
+            store.drain_intervals()
+            started = time.perf_counter()
+            runner(query)
+            finished = time.perf_counter()
+            walls.append((finished - started) * 1000)
+            models.append(covered_ms(store.drain_intervals(), started, finished))
+        overheads = [wall - model for wall, model in zip(walls, models)]
+        results[query] = {
+            "wall_ms": statistics.median(walls),
+            "model_ms": statistics.median(models),
+            "overhead_ms": statistics.median(overheads),
+            "overhead_min_ms": min(overheads),
+            "iterations": iterations,
+        }
+        print(f"wall={results[query]['wall_ms']:9.1f}ms  model={results[query]['model_ms']:9.1f}ms  "
+              f"overhead={results[query]['overhead_ms']:8.2f}ms  {query}")
+    return {
+        "meta": {"commit": _git_commit(), "path": path, "speed": store.speed, "replay": store.stats()},
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print overhead changes per query and return the regressed queries."""
+    regressions = []
+    for query, result in current["results"].items():
+        base = baseline["results"].get(query)
+        if base is None or not base["overhead_ms"]:
+            continue
+        change = result["overhead_ms"] / base["overhead_ms"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append(query)
+        print(f"{base['overhead_ms']:9.2f}ms -> {result['overhead_ms']:9.2f}ms {change:+8.1%}{flag}  {query}")
+    return regressions
+
+
+def main() -> None:
+    """Record fixtures or run the replay benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--record", action="store_true", help="call the live model once per query and save fixtures")
+    parser.add_argument("--fixtures", default=os.path.join(ROOT, "benchmarks", "fixtures", "llm"))
+    parser.add_argument("--path", choices=("orchestrator", "app"), default="orchestrator")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (0 = instant)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare overhead against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative overhead increase counted as a regression")
+    args = parser.parse_args()
+
+    # Configure through the environment before anything reads Config
+    # (app.py runs in this process and builds its own orchestrator)
+    os.environ["LLM_REPLAY_MODE"] = "record" if args.record else "replay"
+    os.environ["LLM_REPLAY_DIR"] = os.path.abspath(args.fixtures)
+    os.environ["LLM_REPLAY_SPEED"] = str(args.speed)
+    # Repeated queries must reach the model layer on every iteration
+    os.environ["RESPONSE_CACHE_PATH"] = ""
+
+    if args.record:
+        run("orchestrator", 1, QUERIES)
+        print(f"fixtures written to {args.fixtures}")
+        return
+
+    # Agents are only built when a backend is configured; replay never uses the key
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    report = run(args.path, args.iterations, QUERIES)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
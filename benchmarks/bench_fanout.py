@@ -0,0 +1,115 @@
+"""Report of the routing fan-out width before and after ranked routing.
+
+Replays the queries of the query log (``QUERY_LOG_PATH``, see
+``log_query``), weighted by how often they were asked, through the
+keyword router twice: sending each query to every matching specialist
+(before) and through the ranked routing with ``ROUTING_MAX_FANOUT`` and
+``ROUTING_MIN_MARGIN`` (after). Prints the fan-out width distribution of
+both and the specialist calls saved. Without a log, a built-in sample of
+queries is used.
+
+Usage:
+    uv run python benchmarks/bench_fanout.py --log queries.jsonl --output results/fanout.json
+    uv run python benchmarks/bench_fanout.py --max-fanout 1 --margin 0.5
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from bench_hotpaths import _git_commit
+from multi_agent_system.tools.routing import fanout_distribution, get_router
+from multi_agent_system.utils.answer_store import read_query_log
+from multi_agent_system.utils.config import Config
+
+SAMPLE_QUERIES = [
+    "京都に3日間の旅行を計画して",
+    "京都の観光情報について教えて",
+    "東京への旅行について",
+    "旅行用のおすすめのスーツケースを比較して",
+    "機械学習について教えて",
+    "量子コンピュータとは",
+    "ノートパソコンのおすすめは？",
+    "ワイヤレスイヤホンを比較して購入したい",
+    "北海道の観光スポットの情報を調べて",
+    "plan a trip to Paris and compare hotel prices",
+    "research on renewable energy",
+    "information about travel insurance products",
+    "5万円以下のおすすめのカメラについて",
+    "沖縄旅行の計画と予算について",
+    "電気自動車の比較と分析",
+]
+
+
+def _load(path: str) -> List[Tuple[str, int]]:
+    if path and os.path.exists(path):
+        return [(entry["query"], entry["count"]) for entry in read_query_log(path).values()]
+    return [(query, 1) for query in SAMPLE_QUERIES]
+
+
+def _calls(widths: Dict[int, int]) -> int:
+    return sum(width * count for width, count in widths.items())
+
+
+def run(queries: List[Tuple[str, int]], max_width: int, min_margin: float) -> Dict[str, Any]:
+    """Compare fan-out widths and specialist calls without and with ranking."""
+    distribution = fanout_distribution(queries, get_router(), max_width, min_margin)
+    routed = sum(count for width, count in distribution["before"].items() if width)
+    result: Dict[str, Any] = {
+        "queries": sum(count for _, count in queries),
+        "routed": routed,
+        "max_fanout": max_width,
+        "min_margin": min_margin,
+        "before": distribution["before"],
+        "after": distribution["after"],
+    }
+    for arm in ("before", "after"):
+        calls = _calls(distribution[arm])
+        result[f"calls_{arm}"] = calls
+        result[f"mean_width_{arm}"] = calls / routed if routed else 0.0
+    result["calls_saved"] = 1 - result["calls_after"] / result["calls_before"] if result["calls_before"] else 0.0
+    return result
+
+
+def main() -> None:
+    """Run the report and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--log", default=Config.QUERY_LOG_PATH, help="query log (JSON lines); the built-in sample when unset")
+    parser.add_argument("--max-fanout", type=int, default=Config.ROUTING_MAX_FANOUT, help="maximum fan-out width (0 = no limit)")
+    parser.add_argument("--margin", type=float, default=Config.ROUTING_MIN_MARGIN, help="score margin for further specialists")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    queries = _load(args.log)
+    result = run(queries, args.max_fanout, args.margin)
+    print(f"{result['queries']} queries ({result['routed']} routed), max fan-out {args.max_fanout}, margin {args.margin}")
+    print("width   before    after")
+    for width in sorted(set(result["before"]) | set(result["after"])):
+        print(f"{width:5d} {result['before'].get(width, 0):8d} {result['after'].get(width, 0):8d}")
+    print(
+        f"mean width {result['mean_width_before']:.2f} -> {result['mean_width_after']:.2f}, "
+        f"specialist calls {result['calls_before']} -> {result['calls_after']} ({result['calls_saved']:.0%} saved)"
+    )
+    result.update({
+        "source": args.log if args.log and os.path.exists(args.log) else "sample",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    })
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
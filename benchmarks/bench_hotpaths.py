@@ -0,0 +1,216 @@
+"""Micro-benchmarks for the orchestrator's non-LLM hot paths.
+
+Measures routing, direct replies, synthesis of large multi-section
+answers, ``call_llm`` result extraction (with a canned model result),
+specialist construction and pooling, and ``Config`` loading. Results are
+written as JSON; ``--baseline`` compares the run against an earlier file
+and exits non-zero when a case got slower than ``--threshold``.
+
+Usage:
+    uv run python benchmarks/bench_hotpaths.py --output results/hotpaths.json
+    uv run python benchmarks/bench_hotpaths.py --baseline results/hotpaths.json --threshold 0.1
+    uv run python benchmarks/bench_hotpaths.py --compare old.json new.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+QUERIES = [
+    "東京への5日間の旅行を計画して",
+    "プログラミング用の良いラップトップを推奨して",
+    "機械学習アルゴリズムについて教えて",
+    "クラウドコンピューティングについて調べて、関連する良い書籍も推薦してください",
+    "Plan a trip to Kyoto",
+    "Hello",
+]
+
+
+class _CannedResult:
+    """Stand-in for a Strands ``AgentResult`` with a large multi-block answer."""
+
+    def __init__(self, blocks: int, block_chars: int):
+        text = ("- 項目の説明テキスト\n" * (block_chars // 12 + 1))[:block_chars]
+        self.message = {"role": "assistant", "content": [{"text": text} for _ in range(blocks)]}
+        self.stop_reason = "end_turn"
+        self.metrics = type("Metrics", (), {"accumulated_usage": {"inputTokens": 900, "outputTokens": 8000}})()
+
+
+def _large_answer(sections: int, chars_per_section: int) -> str:
+    body = ("- 項目の説明テキスト\n" * (chars_per_section // 12 + 1))[:chars_per_section]
+    return "".join(f"### {index}. セクション\n{body}\n" for index in range(1, sections + 1))
+
+
+def build_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    """Create the benchmark cases (name, zero-argument callable)."""
+    from multi_agent_system.agents.llm_response import LLMResponse
+    from multi_agent_system.agents.research_assistant import ResearchAssistant
+    from multi_agent_system.orchestrator import OrchestratorAgent
+    from multi_agent_system.tools.agent_pool import AgentPool
+    from multi_agent_system.tools.agent_tools import _agent_options
+
+    orchestrator = OrchestratorAgent()
+    responses = {
+        tool_name: LLMResponse(blocks=(_large_answer(7, 2000),))
+        for tool_name in ("research_assistant", "product_recommendation", "trip_planning")
+    }
+    specialist = ResearchAssistant()
+    canned = _CannedResult(blocks=4, block_chars=4000)
+    # Replace only the model call; everything call_llm does around it is measured
+    specialist.agent = lambda prompt: canned
+    pool = AgentPool(max_idle=2)
+    options = _agent_options()
+
+    def pooled_acquire():
+        with pool.acquire(ResearchAssistant, **options):
+            pass
+
+    def route_all():
+        for query in QUERIES:
+            orchestrator._analyze_query_and_select_tools(query)
+
+    config_module = importlib.import_module("multi_agent_system.utils.config")
+
+    return [
+        ("route_queries", route_all),
+        ("direct_greeting", lambda: orchestrator._handle_direct_query("Hello")),
+        ("direct_help", lambda: orchestrator._handle_direct_query("what can you do")),
+        ("direct_fallback", lambda: orchestrator._handle_direct_query("量子の天気は？")),
+        ("synthesize_single", lambda: orchestrator._synthesize_responses("q", {"trip_planning": responses["trip_planning"]})),
+        ("synthesize_multi_3x14k", lambda: orchestrator._synthesize_responses("q", responses)),
+        ("extract_agent_result", lambda: LLMResponse.from_agent_result(canned, model_id="m").text),
+        ("call_llm_canned", lambda: specialist.call_llm("機械学習について教えて")),
+        ("construct_specialist", lambda: ResearchAssistant(**options)),
+        ("pool_acquire_release", pooled_acquire),
+        # Reloading rebinds Config in this module only, so it runs last
+        ("config_load", lambda: importlib.reload(config_module)),
+    ]
+
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    """Time a callable: calibrate loops to ``min_time`` seconds, then repeat."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops * 1e6)
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "max_us": max(samples),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(repeat: int, min_time: float, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run every (or the selected) case and return the JSON report."""
+    results = {}
+    for name, fn in build_cases():
+        if only and name not in only:
+            continue
+        results[name] = measure(fn, repeat, min_time)
+        print(f"{name:26s} {results[name]['median_us']:12.2f} us  (min {results[name]['min_us']:.2f}, loops {results[name]['loops']})")
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed cases.
+
+    A case regresses when its median is more than ``threshold`` (relative)
+    slower than the baseline median.
+    """
+    regressions = []
+    print(f"{'case':26s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:26s} {'-':>12s} {result['median_us']:12.2f}      new")
+            continue
+        change = result["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:26s} {base['median_us']:12.2f} {result['median_us']:12.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmarks and/or compare result files."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing sample")
+    parser.add_argument("--case", action="append", help="run only this case (repeatable)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare this run against an earlier results file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files without running")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            current = json.load(f)
+        sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+    # Agents are only built when a backend is configured; no request is ever sent
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    report = run(args.repeat, args.min_time, args.case)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Benchmark for the local BM25 document index.
+
+Builds an index from a synthetic corpus (Markdown files with a Zipf-
+distributed vocabulary of Japanese and English terms) or from a real
+document directory, then measures ingestion throughput, incremental
+re-ingestion of changed files, index size on disk, and query latency
+percentiles. ``--baseline`` compares the run against an earlier JSON
+result and exits non-zero when query latency or ingestion throughput
+got worse than ``--threshold``.
+
+Usage:
+    uv run python benchmarks/bench_retrieval.py --passages 100000 --output results/retrieval.json
+    uv run python benchmarks/bench_retrieval.py --corpus docs/ --queries 500
+    uv run python benchmarks/bench_retrieval.py --baseline results/retrieval.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from bench_hotpaths import _git_commit
+from multi_agent_system.knowledge.bm25 import DocumentIndex
+
+_KANJI = "機械学習深層強化教師自然言語処理画像認識音声合成計算資源分散並列最適化統計推定確率分布情報検索索引評価指標"
+_KATAKANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモラリルレロ"
+_PARTICLES = ["の", "は", "を", "に", "で", "と", "が", "について", "による", "として"]
+
+
+def _vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Create ``size`` distinct synthetic terms (kanji compounds, katakana words, latin words)."""
+    words = set()
+    while len(words) < size:
+        kind = rng.random()
+        if kind < 0.5:
+            words.add("".join(rng.choice(_KANJI) for _ in range(rng.randint(2, 4))))
+        elif kind < 0.8:
+            words.add("".join(rng.choice(_KATAKANA) for _ in range(rng.randint(3, 6))))
+        else:
+            words.add("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+class _Zipf:
+    """Samples vocabulary terms with probability proportional to 1 / rank."""
+
+    def __init__(self, words: List[str], rng: random.Random):
+        self.words = words
+        self.rng = rng
+        self.cumulative = []
+        total = 0.0
+        for rank in range(1, len(words) + 1):
+            total += 1.0 / rank
+            self.cumulative.append(total)
+
+    def sample(self, count: int) -> List[str]:
+        return self.rng.choices(self.words, cum_weights=self.cumulative, k=count)
+
+
+def _passage(zipf: _Zipf, rng: random.Random) -> str:
+    sentences = []
+    for _ in range(rng.randint(3, 6)):
+        terms = zipf.sample(rng.randint(6, 12))
+        sentences.append("".join(term + rng.choice(_PARTICLES) for term in terms) + "。")
+    return "".join(sentences)
+
+
+def generate_corpus(directory: str, passages: int, per_file: int, vocabulary: int, seed: int) -> List[str]:
+    """Write a synthetic Markdown corpus and return the vocabulary used.
+
+    Each file has ``per_file`` sections of one passage each, so the index
+    holds roughly ``passages`` passages.
+    """
+    rng = random.Random(seed)
+    words = _vocabulary(vocabulary, rng)
+    zipf = _Zipf(words, rng)
+    files = max(1, passages // per_file)
+    for number in range(files):
+        folder = os.path.join(directory, f"{number // 100:03d}")
+        os.makedirs(folder, exist_ok=True)
+        sections = [f"# 文書{number}\n"]
+        for section in range(per_file):
+            sections.append(f"## 節{section} {' '.join(zipf.sample(2))}\n\n{_passage(zipf, rng)}\n")
+        with open(os.path.join(folder, f"doc-{number:06d}.md"), "w", encoding="utf-8") as f:
+            f.write("\n".join(sections))
+    return words
+
+
+def _directory_bytes(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(folder, filename))
+        for folder, _, filenames in os.walk(directory)
+        for filename in filenames
+    )
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _touch_files(corpus: str, fraction: float, rng: random.Random) -> int:
+    """Append a paragraph to a share of the corpus files (simulating edits)."""
+    paths = [
+        os.path.join(folder, filename)
+        for folder, _, filenames in os.walk(corpus)
+        for filename in filenames
+        if filename.endswith(".md")
+    ]
+    changed = rng.sample(paths, max(1, int(len(paths) * fraction)))
+    for path in changed:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n## 追記\n\n更新された段落です。\n")
+    return len(changed)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build the index, run the queries and return the measurements."""
+    rng = random.Random(args.seed)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-retrieval-")
+    corpus = args.corpus or os.path.join(workdir, "corpus")
+    index_dir = os.path.join(workdir, "index")
+    shutil.rmtree(index_dir, ignore_errors=True)
+    try:
+        if args.corpus:
+            words = None
+        else:
+            started = time.perf_counter()
+            shutil.rmtree(corpus, ignore_errors=True)
+            words = generate_corpus(corpus, args.passages, args.per_file, args.vocabulary, args.seed)
+            print(f"generated corpus in {time.perf_counter() - started:.1f}s")
+
+        index = DocumentIndex(index_dir, passage_chars=args.passage_chars, segment_passages=args.segment_passages)
+        ingest = index.ingest([corpus])
+        stats = index.stats()
+        print(
+            f"ingested {ingest['passages']} passages ({ingest['bytes'] / 1e6:.1f} MB) in {ingest['seconds']:.1f}s: "
+            f"{ingest['passages'] / ingest['seconds']:.0f} passages/s, {ingest['bytes'] / 1e6 / ingest['seconds']:.2f} MB/s"
+        )
+
+        # Cold open: a fresh instance maps the segments without reading them
+        started = time.perf_counter()
+        reopened = DocumentIndex(index_dir)
+        open_ms = (time.perf_counter() - started) * 1000
+
+        if words is None:
+            sample = [passage.text for _, passage in zip(range(args.queries), reopened._segments[0].live_passages())]
+            queries = [text[:rng.randint(8, 30)] for text in sample] or ["検索"]
+        else:
+            zipf = _Zipf(words, rng)
+            queries = [
+                rng.choice(_PARTICLES).join(zipf.sample(rng.randint(2, 4))) + "について教えて"
+                for _ in range(args.queries)
+            ]
+        for query in queries[:10]:
+            reopened.search(query, args.k)
+        latencies = []
+        hits = 0
+        for query in queries:
+            started = time.perf_counter()
+            results = reopened.search(query, args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += bool(results)
+
+        changed = _touch_files(corpus, args.update_fraction, rng) if words is not None else 0
+        update = reopened.ingest([corpus]) if changed else None
+        reopened.close()
+        index.close()
+
+        result = {
+            "passages": stats["passages"],
+            "files": stats["files"],
+            "segments": stats["segments"],
+            "terms": stats["terms"],
+            "index_mb": _directory_bytes(index_dir) / 1e6,
+            "ingest_seconds": ingest["seconds"],
+            "ingest_passages_per_s": ingest["passages"] / ingest["seconds"],
+            "ingest_mb_per_s": ingest["bytes"] / 1e6 / ingest["seconds"],
+            "open_ms": open_ms,
+            "queries": len(queries),
+            "hit_rate": hits / len(queries),
+            "query_ms": {
+                "mean": statistics.fmean(latencies),
+                "p50": _percentile(latencies, 0.50),
+                "p95": _percentile(latencies, 0.95),
+                "p99": _percentile(latencies, 0.99),
+                "max": max(latencies),
+            },
+        }
+        if update is not None:
+            result["update"] = {"files": changed, "passages": update["passages"], "seconds": update["seconds"]}
+        return result
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison and return the names of regressed measurements."""
+    checks = [
+        ("query p50 ms", baseline["query_ms"]["p50"], current["query_ms"]["p50"], False),
+        ("query p95 ms", baseline["query_ms"]["p95"], current["query_ms"]["p95"], False),
+        ("ingest passages/s", baseline["ingest_passages_per_s"], current["ingest_passages_per_s"], True),
+    ]
+    regressions = []
+    print(f"{'measurement':20s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, base, value, higher_is_better in checks:
+        change = value / base - 1 if base else 0.0
+        flag = ""
+        if (-change if higher_is_better else change) > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:20s} {base:12.2f} {value:12.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmark and optionally compare it with a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--passages", type=int, default=100000, help="Passages in the synthetic corpus")
+    parser.add_argument("--per-file", type=int, default=50, help="Passages per synthetic file")
+    parser.add_argument("--vocabulary", type=int, default=50000, help="Distinct synthetic terms")
+    parser.add_argument("--corpus", help="Index this directory instead of a synthetic corpus")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=4, help="Passages returned per query")
+    parser.add_argument("--passage-chars", type=int, default=600)
+    parser.add_argument("--segment-passages", type=int, default=20000)
+    parser.add_argument("--update-fraction", type=float, default=0.01, help="Share of files changed before re-ingestion")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", help="Keep the corpus and index in this directory")
+    parser.add_argument("--keep", action="store_true", help="Do not delete the temporary directory")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Compare against an earlier --output file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    result = run(args)
+    result.update({
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    })
+    query_ms = result["query_ms"]
+    print(
+        f"{result['passages']} passages, {result['segments']} segments, {result['terms']} terms, "
+        f"{result['index_mb']:.1f} MB on disk, open {result['open_ms']:.1f} ms"
+    )
+    print(
+        f"query latency over {result['queries']} queries: p50 {query_ms['p50']:.2f} ms, p95 {query_ms['p95']:.2f} ms, "
+        f"p99 {query_ms['p99']:.2f} ms (hit rate {result['hit_rate']:.0%})"
+    )
+    if "update" in result:
+        update = result["update"]
+        print(f"re-ingested {update['files']} changed files ({update['passages']} passages) in {update['seconds']:.2f}s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(json.load(f), result, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Benchmark for section reuse across trip planning queries.
+
+Offline (default): replays a synthetic stream of trip requests (Zipf
+over destinations, random interests, seasons, styles and lengths)
+through ``TripPlanningAssistant`` with a simulated model that writes
+each requested section at a typical length, and reports the section hit
+rate, the share of output tokens saved against the same stream without
+the section cache, and the time spent per request outside the model
+(prompt rendering, cache lookups, stitching and storing).
+
+``--live`` runs ``LIVE_QUERIES`` (different queries about the same
+destinations) with and without the section cache and compares output
+tokens and latency. This makes real model calls, or replays recorded
+ones under ``LLM_REPLAY_MODE=replay``.
+
+Usage:
+    uv run python benchmarks/bench_section_cache.py --requests 2000 --output results/section_cache.json
+    uv run python benchmarks/bench_section_cache.py --live --repeat 2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from bench_hotpaths import _git_commit
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.agents.sections import section_cache_report
+from multi_agent_system.agents.trip_planning_assistant import TripPlanningAssistant
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+
+# Typical characters per section of a trip plan
+SECTION_CHARS = {
+    "旅行概要": 200,
+    "日程案": 1500,
+    "宿泊施設の推薦": 500,
+    "交通手段と移動方法": 450,
+    "観光スポット": 600,
+    "予算の目安": 300,
+    "注意事項": 350,
+}
+DESTINATIONS = ["京都", "東京", "大阪", "札幌", "福岡", "那覇", "金沢", "広島", "仙台", "名古屋", "神戸", "長崎", "函館", "松本", "高山", "別府"]
+INTERESTS = ["", "グルメ中心で", "歴史を巡る", "温泉でゆっくり", "自然を楽しむ", "子連れで"]
+STYLES = ["", "節約して", "高級な宿で"]
+MONTHS = ["", "4月に", "8月に", "11月に"]
+LIVE_QUERIES = [
+    "京都に3泊で行く旅行を計画して",
+    "4日間で京都に行く一人旅",
+    "京都へ子連れで2泊3日",
+    "東京に5日間の旅行を計画して",
+    "東京へ3日間、グルメ中心で",
+]
+
+
+def synthetic_requests(count: int, seed: int) -> List[str]:
+    """Create ``count`` trip requests with Zipf-distributed destinations."""
+    rng = random.Random(seed)
+    weights = [1.0 / rank for rank in range(1, len(DESTINATIONS) + 1)]
+    requests = []
+    for destination in rng.choices(DESTINATIONS, weights=weights, k=count):
+        requests.append(f"{rng.choice(MONTHS)}{destination}に{rng.randint(2, 7)}日間の旅行。{rng.choice(STYLES)}{rng.choice(INTERESTS)}")
+    return requests
+
+
+def simulated_generate(prompt: str, sections=None) -> LLMResponse:
+    """Write the sections a prompt asks for at their typical length (2 characters per token)."""
+    titles = sections or TripPlanningAssistant.REQUIRED_SECTIONS
+    parts = []
+    for number, title in enumerate(TripPlanningAssistant.REQUIRED_SECTIONS, 1):
+        if title in titles:
+            parts.append(f"### {number}. {title}\n" + "内容" * (SECTION_CHARS[title] // 2))
+    text = "\n\n".join(parts)
+    return LLMResponse(blocks=(text,), output_tokens=len(text) // 2)
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": _percentile(samples, 0.50),
+        "p95": _percentile(samples, 0.95),
+        "p99": _percentile(samples, 0.99),
+    }
+
+
+def run_offline(count: int, seed: int) -> Dict[str, Any]:
+    """Replay the synthetic stream with and without the section cache."""
+    requests = synthetic_requests(count, seed)
+    agent = TripPlanningAssistant(cascade=False)
+    agent._generate = simulated_generate
+    Config.DESTINATION_KB_PATH = None
+    Config.TRIP_SEGMENTED_ENABLED = False
+
+    Config.SECTION_CACHE_PATH = None
+    baseline_tokens = sum(agent.respond(request).output_tokens for request in requests)
+
+    METRICS.reset()
+    with tempfile.TemporaryDirectory() as directory:
+        Config.SECTION_CACHE_PATH = os.path.join(directory, "sections.sqlite3")
+        tokens, overhead = 0, []
+        for request in requests:
+            started = time.perf_counter()
+            response = agent.respond(request)
+            overhead.append((time.perf_counter() - started) * 1000)
+            tokens += response.output_tokens
+        Config.SECTION_CACHE_PATH = None
+    report = section_cache_report()["TripPlanningAssistant"]
+    return {
+        "requests": count,
+        "destinations": len(DESTINATIONS),
+        "hit_rate": report["hit_rate"],
+        "reused_answers": report["reused_answers"] / count,
+        "output_tokens_without": baseline_tokens / count,
+        "output_tokens_with": tokens / count,
+        "tokens_saved": 1 - tokens / baseline_tokens,
+        "overhead_ms": _summary(overhead),
+    }
+
+
+def run_live(repeat: int) -> Dict[str, Any]:
+    """Compare output tokens and latency with and without the section cache."""
+    arms = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for arm, path in (("without", None), ("with", os.path.join(directory, "sections.sqlite3"))):
+            Config.SECTION_CACHE_PATH = path
+            agent = TripPlanningAssistant()
+            tokens, latencies = [], []
+            for _ in range(repeat):
+                for query in LIVE_QUERIES:
+                    response = agent.respond(query)
+                    agent.reset_conversation()
+                    if response.ok:
+                        tokens.append(response.output_tokens)
+                        latencies.append(response.latency_ms)
+            arms[arm] = {
+                "calls": len(tokens),
+                "output_tokens": statistics.fmean(tokens) if tokens else 0.0,
+                "latency_ms": statistics.fmean(latencies) if latencies else 0.0,
+            }
+            print(f"{arm:8s} {arms[arm]['calls']:4d} calls  {arms[arm]['output_tokens']:8.0f} output tokens  {arms[arm]['latency_ms']:8.0f} ms")
+        Config.SECTION_CACHE_PATH = None
+    for name in ("output_tokens", "latency_ms"):
+        base = arms["without"][name]
+        arms[f"{name}_change"] = arms["with"][name] / base - 1 if base else 0.0
+    return arms
+
+
+def main() -> None:
+    """Run the benchmark and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests in the synthetic stream")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--live", action="store_true", help="Also compare model output with and without the section cache")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the live queries")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    result = run_offline(args.requests, args.seed)
+    overhead = result["overhead_ms"]
+    print(
+        f"{result['requests']} requests over {result['destinations']} destinations: section hit rate {result['hit_rate']:.0%}, "
+        f"{result['reused_answers']:.0%} of answers reused sections"
+    )
+    print(
+        f"output tokens per request {result['output_tokens_without']:.0f} -> {result['output_tokens_with']:.0f} "
+        f"({result['tokens_saved']:.0%} saved); time outside the model p50 {overhead['p50']:.2f} ms  p95 {overhead['p95']:.2f} ms"
+    )
+    if args.live:
+        result["live"] = run_live(args.repeat)
+    result.update({
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    })
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
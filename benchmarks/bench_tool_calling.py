@@ -0,0 +1,153 @@
+"""Benchmark of tool-calling routing against the keyword router.
+
+Runs ``LABELED_QUERIES`` (queries with the specialists that should answer
+them, including ones without routing keywords) through the orchestrator
+with ``ROUTING_MODE=keywords`` and ``ROUTING_MODE=llm`` and compares
+end-to-end latency (p50/p95) and routing accuracy: the share of queries
+answered by exactly the expected specialists, and the recall and
+precision of the specialists used.
+
+The keyword arm alone is scored offline (routing only, no model calls).
+``--live`` runs both arms end to end, which makes real model calls (the
+orchestrator's own model decides on tool calls in the llm arm).
+
+Usage:
+    uv run python benchmarks/bench_tool_calling.py
+    uv run python benchmarks/bench_tool_calling.py --live --repeat 2 --output results/tool_calling.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from bench_hotpaths import _git_commit
+from multi_agent_system.orchestrator import OrchestratorAgent
+from multi_agent_system.tools.routing import get_router
+from multi_agent_system.tools.tool_calling import tool_calling_report
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+
+RESEARCH, PRODUCT, TRIP = "research_assistant", "product_recommendation", "trip_planning"
+LABELED_QUERIES: List[Tuple[str, Set[str]]] = [
+    ("機械学習アルゴリズムについて教えて", {RESEARCH}),
+    ("プログラミング用の良いラップトップを推奨して", {PRODUCT}),
+    ("東京への5日間の旅行を計画して", {TRIP}),
+    ("京都の観光情報について教えて", {TRIP}),
+    ("旅行用のおすすめのスーツケースを比較して", {PRODUCT, TRIP}),
+    ("沖縄旅行の計画と、持っていくカメラのおすすめを教えて", {PRODUCT, TRIP}),
+    ("電気自動車の比較と分析", {RESEARCH}),
+    # No routing keywords
+    ("光合成の仕組みを説明して", {RESEARCH}),
+    ("ノイズキャンセリングのヘッドホンでいいのある？", {PRODUCT}),
+    ("来月パリに行くんだけど、何を見ればいい？", {TRIP}),
+    ("How does a heat pump work?", {RESEARCH}),
+    ("Which running shoes should I get for a marathon?", {PRODUCT}),
+    ("こんにちは", set()),
+    ("ありがとう、助かりました", set()),
+]
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": _percentile(samples, 0.50),
+        "p95": _percentile(samples, 0.95),
+        "p99": _percentile(samples, 0.99),
+    }
+
+
+def _accuracy(picked: List[Tuple[Set[str], Set[str]]]) -> Dict[str, float]:
+    """Score (used, expected) pairs of specialist sets."""
+    used = sum(len(tools) for tools, _ in picked)
+    expected = sum(len(labels) for _, labels in picked)
+    correct = sum(len(tools & labels) for tools, labels in picked)
+    return {
+        "exact": sum(tools == labels for tools, labels in picked) / len(picked) if picked else 0.0,
+        "recall": correct / expected if expected else 0.0,
+        "precision": correct / used if used else 1.0,
+        "calls_per_query": used / len(picked) if picked else 0.0,
+    }
+
+
+def run_offline() -> Dict[str, Any]:
+    """Score the keyword router's choices against the labels."""
+    router = get_router()
+    picked = [
+        (set(router.rank(query, Config.ROUTING_MAX_FANOUT, Config.ROUTING_MIN_MARGIN)), labels)
+        for query, labels in LABELED_QUERIES
+    ]
+    return _accuracy(picked)
+
+
+def run_live(repeat: int) -> Dict[str, Any]:
+    """Run both routing modes end to end and compare latency and accuracy."""
+    arms = {}
+    for mode in ("keywords", "llm"):
+        Config.ROUTING_MODE = mode
+        METRICS.reset()
+        orchestrator = OrchestratorAgent()
+        latencies, picked = [], []
+        for _ in range(repeat):
+            for query, labels in LABELED_QUERIES:
+                started = time.perf_counter()
+                result = orchestrator.process_query(query, {"precomputed": False})
+                latencies.append((time.perf_counter() - started) * 1000)
+                picked.append((set(result.get("llm_responses") or ()), labels))
+        arms[mode] = {"latency_ms": _summary(latencies), **_accuracy(picked)}
+        if mode == "llm":
+            arms[mode]["tool_calling"] = tool_calling_report()
+        latency = arms[mode]["latency_ms"]
+        print(
+            f"{mode:8s} exact {arms[mode]['exact']:5.0%}  recall {arms[mode]['recall']:5.0%}  precision {arms[mode]['precision']:5.0%}  "
+            f"{arms[mode]['calls_per_query']:.2f} calls/query  p50 {latency['p50']:7.0f} ms  p95 {latency['p95']:7.0f} ms"
+        )
+    Config.ROUTING_MODE = "keywords"
+    base = arms["keywords"]["latency_ms"]["p50"]
+    arms["p50_change"] = arms["llm"]["latency_ms"]["p50"] / base - 1 if base else 0.0
+    return arms
+
+
+def main() -> None:
+    """Run the benchmark and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="Run both routing modes end to end (real model calls)")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the labeled queries")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    result: Dict[str, Any] = {"queries": len(LABELED_QUERIES), "keyword_routing": run_offline()}
+    keywords = result["keyword_routing"]
+    print(
+        f"keyword routing over {len(LABELED_QUERIES)} labeled queries: exact {keywords['exact']:.0%}, "
+        f"recall {keywords['recall']:.0%}, precision {keywords['precision']:.0%}, {keywords['calls_per_query']:.2f} calls/query"
+    )
+    if args.live:
+        result["live"] = run_live(args.repeat)
+    result.update({
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    })
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Throughput benchmark for the multi-process worker pool.
+
+Runs the same query mix through ``WorkerPool`` with 1..N worker processes
+and reports queries per second. Model calls are simulated with a fixed
+latency and a large multi-section answer so the benchmark measures the
+orchestrator's own work (routing, synthesis, result transfer) and the
+dispatcher, not the model provider.
+
+Usage:
+    uv run python benchmarks/bench_workers.py --max-workers 8 --queries 200 --llm-ms 50
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.workers import WorkerPool
+
+QUERIES = [
+    "東京への5日間の旅行を計画して",
+    "プログラミング用の良いラップトップを推奨して",
+    "機械学習アルゴリズムについて教えて",
+    "クラウドコンピューティングについて調べて、関連する良い書籍も推薦してください",
+    "Plan a trip to Kyoto",
+    "Hello",
+]
+
+
+def simulate_llm(latency_ms: float, answer_chars: int) -> None:
+    """Replace model calls in this worker with a fixed-latency canned answer."""
+    from multi_agent_system.agents.base_agent import BaseAgent
+    from multi_agent_system.agents.llm_response import LLMResponse
+
+    section = "### セクション\n" + "- 項目の説明テキスト\n" * 20
+    answer = (section * (answer_chars // len(section) + 1))[:answer_chars]
+
+    def invoke_llm(self, user_query):
+        time.sleep(latency_ms / 1000)
+        return LLMResponse(blocks=(answer,), input_tokens=len(user_query), output_tokens=answer_chars // 2,
+                           latency_ms=latency_ms, model_id=self.model_id, tier=self.tier)
+
+    BaseAgent.invoke_llm = invoke_llm
+
+
+def run(workers: int, queries: int, latency_ms: float, answer_chars: int, cache_path: str = None) -> dict:
+    """Measure throughput for one pool size."""
+    initializer = functools.partial(simulate_llm, latency_ms, answer_chars)
+    if cache_path and os.path.exists(cache_path):
+        os.remove(cache_path)
+    with WorkerPool(processes=workers, cache_path=cache_path, initializer=initializer) as pool:
+        pool.wait_ready()
+        started = time.perf_counter()
+        futures = [pool.submit(QUERIES[i % len(QUERIES)]) for i in range(queries)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+    return {"workers": workers, "queries": queries, "elapsed_s": elapsed, "qps": queries / elapsed}
+
+
+def main() -> None:
+    """Run the benchmark for 1..N workers."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--llm-ms", type=float, default=50.0, help="simulated model latency per call")
+    parser.add_argument("--answer-chars", type=int, default=8000, help="simulated answer length")
+    parser.add_argument("--cache", help="share responses through this SQLite cache file (reset per run)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    # Agents are only built when a backend is configured; simulated calls never use the key
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    results = []
+    counts = sorted({1, *[n for n in (2, 4, 8, 16, 32) if n < args.max_workers], args.max_workers})
+    for workers in counts:
+        result = run(workers, args.queries, args.llm_ms, args.answer_chars, args.cache)
+        results.append(result)
+        speedup = result["qps"] / results[0]["qps"]
+        print(f"workers={workers:3d}  qps={result['qps']:8.1f}  elapsed={result['elapsed_s']:6.2f}s  speedup={speedup:4.2f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
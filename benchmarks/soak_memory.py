@@ -0,0 +1,130 @@
+"""Memory soak test: thousands of simulated chat turns, checking for leaks.
+
+Simulates Streamlit sessions the way ``app.py`` uses them (one
+``OrchestratorAgent`` and a chat history per session). Sessions are
+closed after ``--turns-per-session`` turns and replaced, so a healthy
+process reaches a steady state. Memory is sampled with tracemalloc; after
+the warm-up fraction, the growth rate per 1000 turns must stay below
+``--tolerance-kb``, otherwise the largest growing allocation sites are
+printed and the script exits with status 1.
+
+Usage:
+    uv run python benchmarks/soak_memory.py --turns 5000 --sessions 20
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_workers import QUERIES, simulate_llm
+
+
+def growth_per_1k(samples, key: str) -> float:
+    """Least-squares slope of ``key`` over turns, in bytes per 1000 turns."""
+    xs = [sample["turn"] for sample in samples]
+    ys = [sample[key] for sample in samples]
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance * 1000
+
+
+def main() -> None:
+    """Run the soak test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=20, help="concurrently open sessions")
+    parser.add_argument("--turns-per-session", type=int, default=20)
+    parser.add_argument("--sample-every", type=int, default=250)
+    parser.add_argument("--llm-ms", type=float, default=0.0, help="simulated model latency per call")
+    parser.add_argument("--answer-chars", type=int, default=4000)
+    parser.add_argument("--warmup", type=float, default=0.2, help="fraction of samples ignored for the growth check")
+    parser.add_argument("--tolerance-kb", type=float, default=512.0, help="allowed growth per 1000 turns")
+    parser.add_argument("--output", help="write samples as JSON to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "soak")
+    simulate_llm(args.llm_ms, args.answer_chars)
+
+    from multi_agent_system.agents.base_agent import BaseAgent
+    from multi_agent_system.orchestrator import OrchestratorAgent
+    from multi_agent_system.tools.agent_tools import agent_pool
+    from multi_agent_system.utils.memory import get_memory_accountant
+
+    memory = get_memory_accountant()
+    memory.start_tracing()
+    session_ids = itertools.count()
+    sessions = {}
+
+    def open_session():
+        session_id = f"soak-{next(session_ids)}"
+        sessions[session_id] = {"orchestrator": OrchestratorAgent(), "messages": [], "turns": 0}
+        memory.track(session_id, sessions[session_id]["orchestrator"])
+
+    for _ in range(args.sessions):
+        open_session()
+
+    samples = []
+    started = time.perf_counter()
+    for turn in range(1, args.turns + 1):
+        session_id = list(sessions)[turn % len(sessions)]
+        session = sessions[session_id]
+        query = QUERIES[turn % len(QUERIES)]
+        # Same calls and history handling as app.py
+        session["messages"].append({"role": "user", "content": query})
+        result = session["orchestrator"].process_query(query, {"session_id": session_id, "priority": "interactive"})
+        result = session["orchestrator"].complete_pending(query, result)
+        session["messages"].append({"role": "assistant", "content": result["response"], "agent": result.get("agent_used")})
+        session["turns"] += 1
+        if session["turns"] >= args.turns_per_session:
+            del sessions[session_id]
+            open_session()
+
+        if turn % args.sample_every == 0:
+            gc.collect()
+            report = memory.report(agent_pool.idle_agents(), agent_types=(BaseAgent,))
+            sample = {
+                "turn": turn,
+                "elapsed_s": time.perf_counter() - started,
+                "rss_bytes": report["rss_bytes"],
+                "traced_bytes": report["tracemalloc_current_bytes"],
+                "session_bytes": report["session_bytes"],
+                "live_sessions": len(report["sessions"]),
+                "live_agents": sum(report["live_agents"].values()),
+            }
+            samples.append(sample)
+            print(f"turn={turn:6d}  rss={sample['rss_bytes'] / 1048576:7.1f}MB  traced={sample['traced_bytes'] / 1048576:7.2f}MB  "
+                  f"sessions={sample['live_sessions']:3d}  agents={sample['live_agents']:4d}")
+
+    steady = samples[int(len(samples) * args.warmup):]
+    traced_growth = growth_per_1k(steady, "traced_bytes")
+    rss_growth = growth_per_1k(steady, "rss_bytes")
+    print(f"\ngrowth per 1000 turns: traced={traced_growth / 1024:.1f}KB  rss={rss_growth / 1024:.1f}KB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"samples": samples, "traced_growth_per_1k": traced_growth, "rss_growth_per_1k": rss_growth}, f, indent=2)
+
+    if traced_growth > args.tolerance_kb * 1024:
+        print("possible leak; largest growing allocation sites:")
+        for allocation in memory.top_allocations(15):
+            print(f"  {allocation['growth_bytes'] / 1024:+10.1f}KB  {allocation['site']}")
+        tracemalloc.stop()
+        sys.exit(1)
+    print("no leak detected")
+
+
+if __name__ == "__main__":
+    main()
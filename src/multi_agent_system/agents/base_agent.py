@@ -1,15 +1,43 @@
 """Base agent class for the multi-agent system."""
 
+import asyncio
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from strands import Agent
-from strands.models.openai import OpenAIModel
+from ..models.backends import backend_available, create_model, get_tier, record_tier_usage
 from ..utils.config import Config
+from ..utils.section_cache import SectionCache, get_section_cache
+from .cascade import check_response, record_cascade
+from .edits import PatchStream, apply_patch
+from .early_stop import OutlineTracker, estimate_tokens, record_overrun, record_stop
+from .llm_response import LLMResponse
+from .replay import get_replay_store
+from .sections import lookup_sections, omit_instruction, record_reuse, section_keys, split_sections, stitch, store_sections, with_text
 
 
 class BaseAgent(ABC):
     """Base class for all agents in the multi-agent system."""
     
+    # Default model tier; overridable per class via Config.AGENT_MODEL_TIERS
+    # or per instance via the ``tier`` keyword argument
+    MODEL_TIER = "large"
+    
+    # Outline section titles the agent's prompt asks for, and the minimum
+    # acceptable answer length; used by the cascade self-check
+    REQUIRED_SECTIONS: tuple = ()
+    MIN_RESPONSE_CHARS = 0
+    
+    # Required sections that depend on a few request entities only, mapped
+    # to those entities (see ``section_entities``); they are shared across
+    # queries through the section cache
+    CACHEABLE_SECTIONS: Dict[str, tuple] = {}
+    
+    # Sections each kind of follow-up edit (see tools/followups.py) most
+    # likely changes; named as a hint in the edit prompt
+    EDIT_SECTIONS: Dict[str, tuple] = {}
+    
     def __init__(self, name: str, system_prompt: str, **kwargs):
         """Initialize the base agent.
         
@@ -27,12 +55,19 @@ class BaseAgent(ABC):
         if self.language == 'ja':
             self.system_prompt += "\n\n重要: 全ての応答は必ず日本語で行ってください。英語での応答は絶対に避けてください。"
         
-        # Initialize Strands Agent with OpenAI model
-        if Config.OPENAI_API_KEY:
-            model_name = kwargs.get('model', Config.DEFAULT_MODEL)
-            self.model = OpenAIModel(
-                api_key=Config.OPENAI_API_KEY,
-                model_id=model_name,
+        # Resolve the model tier and backend for this agent
+        self.tier = kwargs.get('tier') or Config.AGENT_MODEL_TIERS.get(self.__class__.__name__, self.MODEL_TIER)
+        model_tier = get_tier(self.tier)
+        self.backend = kwargs.get('backend', model_tier.backend)
+        self.model_id = kwargs.get('model', model_tier.model_id)
+        self.cascade = kwargs.get('cascade', Config.CASCADE_ENABLED)
+        self._small_agent: Optional["BaseAgent"] = None
+        
+        # Initialize Strands Agent with the configured backend
+        if backend_available(self.backend):
+            self.model = create_model(
+                self.backend,
+                self.model_id,
                 temperature=kwargs.get('temperature', Config.DEFAULT_TEMPERATURE),
                 max_tokens=kwargs.get('max_tokens', Config.DEFAULT_MAX_TOKENS)
             )
@@ -57,43 +92,462 @@ class BaseAgent(ABC):
         """
         pass
     
-    def call_llm(self, user_query: str) -> str:
-        """Call the LLM with the given query.
+    def build_prompt(self, query: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Render the prompt sent to the LLM for a query.
+        
+        Specialized agents override this to wrap the query in their
+        answer format instructions.
+        
+        Args:
+            query: The input query
+            context: Optional context information
+            
+        Returns:
+            The rendered prompt
+        """
+        return query
+    
+    def respond(self, query: str, context: Optional[Dict[str, Any]] = None, prompt: Optional[str] = None) -> LLMResponse:
+        """Render the prompt for a query and call the LLM with it.
+        
+        Uses cascade execution when the agent was created with cascade
+        enabled.
+        
+        Args:
+            query: The input query
+            context: Optional context information
+            prompt: The prompt already rendered by ``build_prompt``, if the
+                caller has it
+            
+        Returns:
+            The structured LLM response
+        """
+        if prompt is None:
+            prompt = self.build_prompt(query, context)
+        cache = get_section_cache() if self.CACHEABLE_SECTIONS else None
+        if cache is not None:
+            return self.respond_with_sections(cache, query, context, prompt)
+        return self._generate(prompt)
+    
+    def _generate(self, prompt: str, sections: Optional[tuple] = None) -> LLMResponse:
+        """Call the LLM directly or through the cascade, checking ``sections`` if given."""
+        if self.cascade:
+            return self.invoke_cascade(prompt, sections)
+        return self.invoke_llm(prompt)
+    
+    def section_entities(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Return the request entities ``CACHEABLE_SECTIONS`` are keyed by.
+        
+        Specialized agents with cacheable sections override this with the
+        result of their request analysis.
+        
+        Args:
+            query: The input query
+            context: Optional context information
+            
+        Returns:
+            Entity name -> extracted value
+        """
+        return {}
+    
+    def respond_with_sections(self, cache: SectionCache, query: str, context: Optional[Dict[str, Any]], prompt: str) -> LLMResponse:
+        """Answer reusing cached sections and cache the sections generated.
+        
+        Cached sections are left out of the prompt and stitched into the
+        generated answer in outline order. The cacheable sections the
+        model did generate are stored for later queries.
+        
+        Args:
+            cache: The section cache
+            query: The input query
+            context: Optional context information
+            prompt: The rendered prompt
+            
+        Returns:
+            The complete answer; its usage covers the generated part only
+        """
+        name = self.__class__.__name__
+        keys = section_keys(self.CACHEABLE_SECTIONS, self.section_entities(query, context))
+        cached = lookup_sections(cache, name, self.language, keys) if keys else {}
+        if not cached:
+            response = self._generate(prompt)
+        else:
+            remaining = tuple(title for title in self.REQUIRED_SECTIONS if title not in cached)
+            response = self._generate(prompt + omit_instruction(self.REQUIRED_SECTIONS, cached), remaining)
+        generated_chars = len(response.text)
+        if response.ok and cached:
+            record_reuse(name, cached)
+            response = with_text(response, stitch(response.text, self.REQUIRED_SECTIONS, {title: entry["text"] for title, entry in cached.items()}))
+        if response.ok:
+            bodies = {title: body for title, body in split_sections(response.text, self.REQUIRED_SECTIONS).items() if title not in cached}
+            tokens = {title: estimate_tokens(len(body), generated_chars, response.output_tokens) for title, body in bodies.items()}
+            store_sections(cache, name, self.language, keys, bodies, tokens, Config.SECTION_CACHE_MIN_CHARS)
+        return response
+    
+    def build_edit_prompt(self, request: str, previous: str, instruction: str, kind: Optional[str] = None) -> str:
+        """Render the prompt asking for a section patch of a previous answer.
+        
+        Args:
+            request: The request the previous answer was written for
+            previous: The previous answer
+            instruction: The follow-up asking for the change
+            kind: Kind of edit, used to name the sections it likely affects
+            
+        Returns:
+            The prompt sent to the LLM
+        """
+        hint = ""
+        if self.EDIT_SECTIONS.get(kind):
+            hint = f"（特に「{'」「'.join(self.EDIT_SECTIONS[kind])}」は見直しが必要な可能性が高いセクションです）"
+        return f"""以下は「{request}」に対するあなたの前回の回答です。
+
+--- 前回の回答 ---
+{previous}
+--- ここまで ---
+
+ユーザーからの変更依頼: {instruction}
+
+変更依頼を反映するために内容が変わるセクションだけを、前回と同じ番号と見出しで、セクション全体を書き直して出力してください{hint}。
+変更のないセクション、前置き、まとめは出力しないでください。必ず日本語で回答してください。"""
+    
+    def respond_edit(self, request: str, previous: str, instruction: str, kind: Optional[str] = None) -> Optional[LLMResponse]:
+        """Apply a follow-up edit to a previous answer with a section patch.
+        
+        Only the changed sections are generated; they replace their
+        counterparts in ``previous`` and the rest is kept as is.
+        
+        Args:
+            request: The request the previous answer was written for
+            previous: The previous answer
+            instruction: The follow-up asking for the change
+            kind: Kind of edit (see ``EDIT_SECTIONS``)
+            
+        Returns:
+            The updated answer (usage covers the patch only), the error
+            response of a failed call, or ``None`` when the model did not
+            return any recognizable section
+        """
+        response = self.invoke_llm(self.build_edit_prompt(request, previous, instruction, kind))
+        if not response.ok:
+            return response
+        text, changed = apply_patch(previous, response.text, self.REQUIRED_SECTIONS)
+        if not changed:
+            return None
+        return with_text(response, text)
+    
+    async def stream_edit_async(self, request: str, previous: str, instruction: str, kind: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream the updated answer of a follow-up edit.
+        
+        Unchanged sections are passed on as soon as the patch moves past
+        them, patched sections as they are generated.
+        
+        Yields:
+            Text deltas of the full updated answer; nothing when the model
+            did not return any recognizable section
+        """
+        patch = PatchStream(previous, self.REQUIRED_SECTIONS)
+        async for chunk in self.stream_llm_async(self.build_edit_prompt(request, previous, instruction, kind)):
+            text = patch.feed(chunk)
+            if text:
+                yield text
+        tail = patch.flush()
+        if tail and patch.changed:
+            yield tail
+    
+    def build_lookup_prompt(self, previous: str, question: str) -> str:
+        """Render the prompt answering a question about a previous answer.
+        
+        Args:
+            previous: The previous answer
+            question: The follow-up question about it
+            
+        Returns:
+            The prompt sent to the LLM
+        """
+        return f"""以下はあなたの前回の回答です。
+
+--- 前回の回答 ---
+{previous}
+--- ここまで ---
+
+この回答の内容に基づいて、次の質問に簡潔に答えてください: {question}
+回答にない情報を付け加えないでください。必ず日本語で回答してください。"""
+    
+    def restore_conversation(self, history: List[Tuple[str, str]]) -> None:
+        """Replace the Strands conversation with earlier exchanges of a session.
+        
+        Pooled agents start every request with an empty conversation; a
+        follow-up restores the session's recent (request, answer) pairs
+        first so it is answered in context.
+        
+        Args:
+            history: (request, answer) pairs, oldest first
+        """
+        if self.agent is None:
+            return
+        messages = []
+        for request, answer in history:
+            messages.append({"role": "user", "content": [{"text": request}]})
+            messages.append({"role": "assistant", "content": [{"text": answer}]})
+        self.agent.messages[:] = messages
+    
+    def respond_followup(self, query: str, history: List[Tuple[str, str]]) -> LLMResponse:
+        """Answer a follow-up in the conversation of its session.
+        
+        Args:
+            query: The follow-up query, sent as is
+            history: (request, answer) pairs of the session, oldest first
+            
+        Returns:
+            The structured LLM response
+        """
+        self.restore_conversation(history)
+        return self.invoke_llm(query)
+    
+    async def stream_followup_async(self, query: str, history: List[Tuple[str, str]]) -> AsyncIterator[str]:
+        """Streaming variant of :meth:`respond_followup`."""
+        self.restore_conversation(history)
+        async for chunk in self.stream_llm_async(query):
+            yield chunk
+    
+    def self_check(self, text: str, sections: Optional[tuple] = None) -> Optional[str]:
+        """Check a draft answer for length, required sections and refusals.
+        
+        Args:
+            text: The draft answer
+            sections: Sections the draft was asked for, when it is not the
+                full outline (the minimum length is scaled down to match)
+            
+        Returns:
+            ``None`` if the answer is acceptable, otherwise the failure reason
+        """
+        min_chars = self.MIN_RESPONSE_CHARS
+        if sections is not None and self.REQUIRED_SECTIONS:
+            min_chars = min_chars * len(sections) // len(self.REQUIRED_SECTIONS)
+        return check_response(
+            text,
+            required_sections=self.REQUIRED_SECTIONS if sections is None else sections,
+            min_chars=min_chars,
+            min_section_ratio=Config.CASCADE_MIN_SECTION_RATIO
+        )
+    
+    def invoke_cascade(self, user_query: str, sections: Optional[tuple] = None) -> LLMResponse:
+        """Answer with the small tier first and escalate on a failed self-check.
+        
+        Args:
+            user_query: The rendered prompt
+            sections: Sections the prompt asks for, when it is not the full
+                outline (see ``self_check``)
+            
+        Returns:
+            The small-tier response if it passes the self-check, otherwise
+            this agent's own (large-tier) response
+        """
+        if self.tier == "small":
+            return self.invoke_llm(user_query)
+        
+        small_agent = self._get_small_agent()
+        if not small_agent.agent:
+            return self.invoke_llm(user_query)
+        
+        draft = small_agent.invoke_llm(user_query)
+        reason = self.self_check(draft.text, sections) if draft.ok else "error"
+        if reason is None:
+            record_cascade(self.__class__.__name__, draft)
+            return draft
+        
+        response = self.invoke_llm(user_query)
+        record_cascade(self.__class__.__name__, draft, response, reason)
+        return response
+    
+    def invoke_llm(self, user_query: str) -> LLMResponse:
+        """Call the LLM and return a structured response.
         
         Args:
             user_query: The user's query
             
         Returns:
-            The LLM's response
+            An ``LLMResponse`` with all text blocks, usage, latency,
+            model id and finish reason
         """
+        replay = get_replay_store()
+        if replay is not None and replay.replaying:
+            response = replay.replay(self.__class__.__name__, self.tier, user_query)
+            response.tier = self.tier
+            record_tier_usage(self.tier, response)
+            return response
+        
         if not self.agent:
-            return "Error: OpenAI API key not configured"
+            return LLMResponse.from_error(self._not_configured_message())
         
+        started = time.perf_counter()
         try:
-            # Use Strands Agent to process the query
-            result = self.agent(user_query)
-            
-            # Extract text from AgentResult
-            if hasattr(result, 'message') and isinstance(result.message, dict):
-                # Handle Strands AgentResult format
-                message = result.message
-                if 'content' in message and isinstance(message['content'], list):
-                    # Extract text from content list
-                    for content_item in message['content']:
-                        if isinstance(content_item, dict) and 'text' in content_item:
-                            return content_item['text']
-                elif 'content' in message:
-                    return message['content']
-            elif hasattr(result, 'content'):
-                return result.content
-            elif hasattr(result, 'text'):
-                return result.text
-            elif isinstance(result, str):
-                return result
+            if self._stops_early(in_event_loop=self._in_event_loop()):
+                response = self._invoke_until_outline(user_query, started)
             else:
-                return str(result)
+                # Use Strands Agent to process the query
+                result = self.agent(user_query)
+                response = LLMResponse.from_agent_result(
+                    result,
+                    model_id=self.model_id,
+                    latency_ms=(time.perf_counter() - started) * 1000,
+                )
+                if self.REQUIRED_SECTIONS:
+                    record_overrun(self.__class__.__name__, response.text, response.output_tokens, self.REQUIRED_SECTIONS)
         except Exception as e:
-            return f"Error calling LLM: {str(e)}"
+            response = LLMResponse.from_error(
+                f"Error calling LLM: {str(e)}",
+                model_id=self.model_id,
+                latency_ms=(time.perf_counter() - started) * 1000,
+            )
+        response.tier = self.tier
+        record_tier_usage(self.tier, response)
+        if replay is not None and replay.recording and response.ok:
+            replay.record(self.__class__.__name__, self.tier, user_query, response)
+        return response
+    
+    async def stream_llm_async(self, user_query: str) -> AsyncIterator[str]:
+        """Stream the LLM's response text as it is generated.
+        
+        Args:
+            user_query: The user's query
+            
+        Yields:
+            Text deltas in generation order
+        """
+        replay = get_replay_store()
+        if replay is not None and replay.replaying:
+            async for chunk in replay.replay_stream(self.__class__.__name__, self.tier, user_query):
+                yield chunk
+            return
+        
+        if not self.agent:
+            yield self._not_configured_message()
+            return
+        
+        recorded = [] if replay is not None and replay.recording else None
+        tracker = OutlineTracker(self.REQUIRED_SECTIONS) if self._stops_early() else None
+        streamed = [] if tracker is None and self.REQUIRED_SECTIONS else None
+        started = time.perf_counter()
+        try:
+            stream = self.agent.stream_async(user_query)
+            try:
+                async for event in stream:
+                    if isinstance(event, dict) and isinstance(event.get("data"), str):
+                        chunk = event["data"] if tracker is None else tracker.feed(event["data"])
+                        if streamed is not None:
+                            streamed.append(chunk)
+                        if recorded is not None and chunk:
+                            recorded.append(((time.perf_counter() - started) * 1000, chunk))
+                        if chunk:
+                            yield chunk
+                        if tracker is not None and tracker.done:
+                            # Outline complete: stop generating
+                            record_stop(self.__class__.__name__)
+                            break
+            finally:
+                if hasattr(stream, "aclose"):
+                    await stream.aclose()
+            if tracker is not None and not tracker.done:
+                tail = tracker.flush()
+                if tail:
+                    yield tail
+        except Exception as e:
+            recorded = None
+            yield f"Error calling LLM: {str(e)}"
+        if streamed:
+            record_overrun(self.__class__.__name__, "".join(streamed), 0, self.REQUIRED_SECTIONS)
+        if recorded:
+            replay.record_stream(self.__class__.__name__, self.tier, user_query, recorded)
+    
+    @staticmethod
+    def _in_event_loop() -> bool:
+        """Whether the calling thread is running an asyncio event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+    
+    def _stops_early(self, in_event_loop: bool = False) -> bool:
+        """Whether this call should stop once the required outline is complete.
+        
+        A share of calls (``EARLY_STOP_SHADOW_RATE``) runs to completion so
+        the overrun past the outline, and thus the savings, stays measured.
+        """
+        if not Config.EARLY_STOP_ENABLED or not self.REQUIRED_SECTIONS or in_event_loop:
+            return False
+        return random.random() >= Config.EARLY_STOP_SHADOW_RATE
+    
+    def _invoke_until_outline(self, user_query: str, started: float) -> LLMResponse:
+        """Stream a call and stop as soon as the required outline is complete.
+        
+        Usage is not reported for stopped calls, since the provider only
+        sends it at the end of a full generation.
+        """
+        tracker = OutlineTracker(self.REQUIRED_SECTIONS)
+        
+        async def collect():
+            parts = []
+            result = None
+            stream = self.agent.stream_async(user_query)
+            try:
+                async for event in stream:
+                    if not isinstance(event, dict):
+                        continue
+                    if isinstance(event.get("data"), str):
+                        parts.append(tracker.feed(event["data"]))
+                        if tracker.done:
+                            break
+                    elif "result" in event:
+                        result = event["result"]
+            finally:
+                if hasattr(stream, "aclose"):
+                    await stream.aclose()
+            return parts, result
+        
+        parts, result = asyncio.run(collect())
+        latency_ms = (time.perf_counter() - started) * 1000
+        if tracker.done:
+            record_stop(self.__class__.__name__)
+            return LLMResponse(blocks=("".join(parts),), latency_ms=latency_ms, model_id=self.model_id, finish_reason="outline_complete")
+        if result is not None:
+            response = LLMResponse.from_agent_result(result, model_id=self.model_id, latency_ms=latency_ms)
+        else:
+            response = LLMResponse(blocks=("".join(parts) + tracker.flush(),), latency_ms=latency_ms, model_id=self.model_id)
+        record_overrun(self.__class__.__name__, response.text, response.output_tokens, self.REQUIRED_SECTIONS)
+        return response
+    
+    def _get_small_agent(self) -> "BaseAgent":
+        """Return the small-tier twin of this agent used for cascade drafts."""
+        if self._small_agent is None:
+            options = {key: value for key, value in self.config.items() if key not in ("tier", "model", "backend", "cascade")}
+            self._small_agent = self.__class__(tier="small", cascade=False, **options)
+        return self._small_agent
+    
+    def reset_conversation(self) -> None:
+        """Clear the Strands conversation history so the agent can be reused."""
+        if self.agent is not None:
+            self.agent.messages.clear()
+        if self._small_agent is not None:
+            self._small_agent.reset_conversation()
+    
+    def _not_configured_message(self) -> str:
+        """Return the error text used when the model backend is not configured."""
+        if self.backend == "openai":
+            return "Error: OpenAI API key not configured"
+        return f"Error: model backend '{self.backend}' not configured"
+    
+    def call_llm(self, user_query: str) -> str:
+        """Call the LLM with the given query.
+        
+        Args:
+            user_query: The user's query
+            
+        Returns:
+            The LLM's response text
+        """
+        return self.invoke_llm(user_query).text
     
     def __str__(self) -> str:
         """String representation of the agent."""
@@ -0,0 +1,153 @@
+"""Self-check and statistics for small-model-first cascade execution."""
+
+import re
+import unicodedata
+from typing import Dict, Optional, Sequence
+
+from ..models.backends import estimate_cost
+from ..utils.metrics import METRICS
+
+# Refusal phrases checked near the start of a response
+REFUSAL_PATTERNS = (
+    "申し訳ありませんが、",
+    "申し訳ございませんが、",
+    "お答えできません",
+    "お手伝いできません",
+    "対応できません",
+    "i'm sorry, but",
+    "i am sorry, but",
+    "i cannot help",
+    "i can't help",
+    "i can't assist",
+    "i cannot assist",
+    "as an ai language model",
+)
+
+# Only the opening of a response is scanned for refusals
+REFUSAL_WINDOW_CHARS = 200
+
+_NUMBERED_LINE = re.compile(r"^\s*(?:#+\s*)?(?:\*\*)?\s*(\d+)\s*[.．)）:]", re.MULTILINE)
+
+
+def find_missing_sections(text: str, required_sections: Sequence[str]) -> list:
+    """Return the required sections that do not appear in a response.
+
+    A section counts as present when its title appears in the text or a
+    line starts with its outline number (e.g. ``"3."`` or ``"## 3."``).
+
+    Args:
+        text: Response text
+        required_sections: Section titles in outline order
+
+    Returns:
+        Titles of the missing sections
+    """
+    normalized = unicodedata.normalize("NFKC", text)
+    numbers = {int(n) for n in _NUMBERED_LINE.findall(normalized)}
+    return [
+        title for index, title in enumerate(required_sections, 1)
+        if title not in normalized and index not in numbers
+    ]
+
+
+def check_response(
+    text: str,
+    required_sections: Sequence[str] = (),
+    min_chars: int = 0,
+    min_section_ratio: float = 1.0,
+) -> Optional[str]:
+    """Run the lightweight self-check on a draft response.
+
+    Args:
+        text: Response text to check
+        required_sections: Section titles the prompt asks for
+        min_chars: Minimum acceptable length in characters
+        min_section_ratio: Fraction of required sections that must be present
+
+    Returns:
+        ``None`` if the response passes, otherwise the failure reason
+        ("empty", "too_short", "refusal" or "missing_sections")
+    """
+    stripped = text.strip()
+    if not stripped:
+        return "empty"
+    if len(stripped) < min_chars:
+        return "too_short"
+    opening = stripped[:REFUSAL_WINDOW_CHARS].casefold()
+    if any(pattern in opening for pattern in REFUSAL_PATTERNS):
+        return "refusal"
+    if required_sections:
+        missing = find_missing_sections(stripped, required_sections)
+        present_ratio = 1 - len(missing) / len(required_sections)
+        if present_ratio < min_section_ratio:
+            return "missing_sections"
+    return None
+
+
+def record_cascade(agent_name: str, small, large=None, reason: Optional[str] = None) -> None:
+    """Record the outcome of one cascade execution.
+
+    Args:
+        agent_name: Name of the specialist (used as the metric label)
+        small: ``LLMResponse`` from the small model
+        large: ``LLMResponse`` from the large model when escalated
+        reason: Self-check failure reason that caused the escalation
+    """
+    prefix = f"cascade.{agent_name}"
+    METRICS.incr(f"{prefix}.attempts")
+    if large is None:
+        METRICS.incr(f"{prefix}.accepted")
+        METRICS.incr(f"{prefix}.small_input_tokens", small.input_tokens)
+        METRICS.incr(f"{prefix}.small_output_tokens", small.output_tokens)
+        METRICS.observe(f"{prefix}.small_latency_ms", small.latency_ms)
+        METRICS.incr(f"{prefix}.small_cost_usd", estimate_cost(small.model_id, small.input_tokens, small.output_tokens))
+        return
+    METRICS.incr(f"{prefix}.escalations")
+    METRICS.incr(f"{prefix}.escalations.{reason or 'error'}")
+    METRICS.incr(f"{prefix}.wasted_tokens", small.total_tokens)
+    METRICS.incr(f"{prefix}.wasted_latency_ms", small.latency_ms)
+    METRICS.observe(f"{prefix}.large_latency_ms", large.latency_ms)
+    METRICS.incr(f"{prefix}.large_output_tokens", large.output_tokens)
+    METRICS.incr(f"{prefix}.large_calls")
+
+
+def cascade_report(large_model_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Report escalation rate, latency saved and token savings per specialist.
+
+    Savings are estimated against the large model: each accepted small
+    answer is assumed to have cost one mean large-model latency (taken
+    from escalated calls, or the large tier overall when none escalated).
+    Time spent on small-model drafts that were escalated is subtracted,
+    so the net saving can be negative.
+
+    Args:
+        large_model_id: Model id used to price avoided large-model tokens
+
+    Returns:
+        Dictionary keyed by specialist name
+    """
+    counters = METRICS.snapshot("cascade.")["counters"]
+    agents = sorted({name.split(".")[1] for name in counters})
+    tier_large = METRICS.summary("tiers.large.latency_ms")
+    report = {}
+    for agent in agents:
+        prefix = f"cascade.{agent}"
+        attempts = METRICS.counter(f"{prefix}.attempts")
+        escalations = METRICS.counter(f"{prefix}.escalations")
+        accepted = METRICS.counter(f"{prefix}.accepted")
+        small_latency = METRICS.summary(f"{prefix}.small_latency_ms")
+        large_latency = METRICS.summary(f"{prefix}.large_latency_ms")
+        baseline_ms = large_latency["mean"] or tier_large["mean"]
+        small_input = METRICS.counter(f"{prefix}.small_input_tokens")
+        small_output = METRICS.counter(f"{prefix}.small_output_tokens")
+        avoided_cost = estimate_cost(large_model_id, int(small_input), int(small_output))
+        report[agent] = {
+            "attempts": attempts,
+            "escalations": escalations,
+            "escalation_rate": escalations / attempts if attempts else 0.0,
+            "latency_saved_ms": (baseline_ms - small_latency["mean"]) * accepted - METRICS.counter(f"{prefix}.wasted_latency_ms") if baseline_ms else 0.0,
+            "large_tokens_avoided": small_input + small_output,
+            "wasted_small_tokens": METRICS.counter(f"{prefix}.wasted_tokens"),
+            "cost_saved_usd": avoided_cost - METRICS.counter(f"{prefix}.small_cost_usd"),
+        }
+    return report
@@ -0,0 +1,166 @@
+"""Output-format-aware early termination of generation.
+
+The specialist prompts ask for a fixed numbered outline. ``OutlineTracker``
+follows a streamed answer line by line, notices when the last required
+section has started, and reports completion at the first line that ends
+it: the header of the next outline number (one past the last section),
+written in the same style as the outline's own headers. Everything from
+that line on is the model "keeping going" and is not generated. Lists,
+sub-headings and rules inside the final section are kept.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Optional, Sequence, Tuple
+
+from ..utils.metrics import METRICS
+
+_NUMBERED = re.compile(r"^(?:(#{1,6})\s*)?(?:(\*\*)\s*)?(\d+)\s*[.．)）]")
+# Horizontal rule; closing remarks after one are split off the last section
+RULE = re.compile(r"^\s*(?:[-*_]\s*){3,}$")
+
+
+class OutlineTracker:
+    """Tracks required outline sections in a streamed response."""
+
+    def __init__(self, sections: Sequence[str]):
+        """Initialize the tracker.
+
+        Args:
+            sections: Required section titles in outline order
+        """
+        self.sections = tuple(sections)
+        self.next_section = 0
+        self.done = False
+        self._line = ""
+        self._in_final = False
+        # Marker of the outline's numbered headers: ('#' count, bold)
+        self._style: Optional[Tuple[int, bool]] = None
+
+    def _is_header(self, line: str, title: str) -> bool:
+        stripped = unicodedata.normalize("NFKC", line).strip()
+        if title not in stripped:
+            return False
+        return stripped.startswith(("#", "**")) or bool(_NUMBERED.match(stripped))
+
+    def _observe(self, line: str) -> None:
+        """Advance through the outline when a complete line is a section header."""
+        for index in range(self.next_section, len(self.sections)):
+            if self._is_header(line, self.sections[index]):
+                self.next_section = index + 1
+                if self.next_section == len(self.sections):
+                    self._in_final = True
+                    numbered = _NUMBERED.match(unicodedata.normalize("NFKC", line).strip())
+                    if numbered:
+                        self._style = (len(numbered.group(1) or ""), bool(numbered.group(2)))
+                return
+
+    def _is_boundary(self, line: str) -> bool:
+        """Whether a complete line inside the final section ends the outline.
+
+        Only the next outline number in the headers' own style counts, so
+        numbered lists and sub-headings inside the section are kept. An
+        outline without numbered headers is never cut.
+        """
+        if self._style is None:
+            return False
+        # Indented numbers belong to lists, not to the outline
+        numbered = _NUMBERED.match(unicodedata.normalize("NFKC", line))
+        if not numbered or int(numbered.group(3)) != len(self.sections) + 1:
+            return False
+        return (len(numbered.group(1) or ""), bool(numbered.group(2))) == self._style
+
+    def feed(self, chunk: str) -> str:
+        """Consume a streamed chunk and return the text to pass on.
+
+        Text is passed through immediately until the final section starts;
+        from then on it is released a line at a time so the line that ends
+        the outline can be dropped.
+        """
+        if self.done:
+            return ""
+        out = []
+        for piece in chunk.splitlines(keepends=True):
+            self._line += piece
+            complete = piece.endswith("\n")
+            if not self._in_final:
+                out.append(piece)
+                if complete:
+                    self._observe(self._line)
+                    self._line = ""
+                continue
+            if not complete:
+                continue
+            line, self._line = self._line, ""
+            if self._is_boundary(line):
+                self.done = True
+                break
+            out.append(line)
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Return any withheld partial line at the end of the stream."""
+        if self.done or not self._in_final:
+            return ""
+        line, self._line = self._line, ""
+        return line
+
+
+def outline_end(text: str, sections: Sequence[str]) -> Optional[int]:
+    """Return where the outline of a complete response ends, or None if it never completes."""
+    tracker = OutlineTracker(sections)
+    kept = tracker.feed(text)
+    return len(kept) if tracker.done else None
+
+
+def estimate_tokens(chars: int, text_chars: int, output_tokens: int) -> float:
+    """Scale a character count to tokens using the call's own ratio when known."""
+    if output_tokens and text_chars:
+        return chars * output_tokens / text_chars
+    # Rough fallback for Japanese-heavy text
+    return chars / 2
+
+
+def record_overrun(agent_name: str, text: str, output_tokens: int, sections: Sequence[str]) -> None:
+    """Measure how far a complete response ran past its outline.
+
+    These observations calibrate the savings estimate for stopped calls.
+    """
+    end = outline_end(text, sections)
+    if end is None:
+        METRICS.incr(f"early_stop.{agent_name}.incomplete")
+        return
+    overrun = estimate_tokens(len(text) - end, len(text), output_tokens)
+    METRICS.observe(f"early_stop.{agent_name}.overrun_tokens", overrun)
+
+
+def record_stop(agent_name: str) -> float:
+    """Record a call stopped at the end of its outline.
+
+    The tokens saved are estimated as the mean overrun observed on calls
+    that ran to completion (see ``EARLY_STOP_SHADOW_RATE``).
+
+    Returns:
+        The estimated tokens saved
+    """
+    saved = METRICS.summary(f"early_stop.{agent_name}.overrun_tokens")["mean"]
+    METRICS.incr(f"early_stop.{agent_name}.stops")
+    METRICS.incr(f"early_stop.{agent_name}.tokens_saved", saved)
+    return saved
+
+
+def early_stop_report() -> Dict[str, Dict[str, float]]:
+    """Return per-agent stops, observed overrun and estimated tokens saved."""
+    snapshot = METRICS.snapshot("early_stop.")
+    agents = sorted({name.split(".")[1] for kind in ("counters", "summaries") for name in snapshot[kind]})
+    report = {}
+    for agent_name in agents:
+        overrun = METRICS.summary(f"early_stop.{agent_name}.overrun_tokens")
+        report[agent_name] = {
+            "stops": METRICS.counter(f"early_stop.{agent_name}.stops"),
+            "tokens_saved": METRICS.counter(f"early_stop.{agent_name}.tokens_saved"),
+            "observed_calls": overrun["count"],
+            "mean_overrun_tokens": overrun["mean"],
+            "incomplete": METRICS.counter(f"early_stop.{agent_name}.incomplete"),
+        }
+    return report
@@ -0,0 +1,127 @@
+"""Follow-up edits applied to a previous answer as section patches.
+
+For a follow-up such as "make it 3 days" the specialist does not write
+the whole answer again: it returns only the outline sections that change
+(with their usual numbers and headings), and ``PatchStream`` merges them
+into the previous answer in outline order. The merge works on a stream,
+so unchanged sections before the first patched one are released as soon
+as the patch reaches it and the full updated answer can be streamed.
+"""
+
+from typing import List, Sequence, Tuple
+
+from .early_stop import RULE
+from .sections import header_index, parse_sections, split_closing
+
+
+class PatchStream:
+    """Merges a streamed section patch into a previous answer."""
+
+    def __init__(self, previous: str, sections: Sequence[str]):
+        """Initialize the merge.
+
+        Args:
+            previous: The previous complete answer
+            sections: Required section titles in outline order
+        """
+        self.sections = tuple(sections)
+        self._preamble, self._previous = parse_sections(previous, self.sections)
+        self._closing = split_closing(self._previous)
+        # Patched section indices, in patch order
+        self.patched: List[int] = []
+        self._current = -1
+        self._emitted = -1
+        self._line = ""
+        self._buffered: List[str] = []
+        self._closed = False
+        self._end = ""
+
+    @property
+    def changed(self) -> List[str]:
+        """Titles of the sections the patch replaced."""
+        return [self.sections[index] for index in self.patched]
+
+    def _out(self, parts: List[str], text: str) -> None:
+        if text:
+            parts.append(text)
+            self._end = (self._end + text)[-2:]
+
+    def _separate(self, parts: List[str]) -> None:
+        """Make the output end with a blank line before the next section."""
+        if self._end and not self._end.endswith("\n\n"):
+            self._out(parts, "\n" if self._end.endswith("\n") else "\n\n")
+
+    def _previous_sections(self, parts: List[str], until: int) -> None:
+        """Release the unchanged previous sections before ``until``."""
+        for index in range(self._emitted + 1, until):
+            if index in self._previous:
+                header, body = self._previous[index]
+                self._separate(parts)
+                self._out(parts, f"{header}\n\n{body}" if body else header)
+        self._emitted = max(self._emitted, until)
+
+    def _line_out(self, parts: List[str], line: str) -> None:
+        if self._closed:
+            return
+        index = header_index(line, self.sections, self._current)
+        if index is not None:
+            if not self.patched and self._preamble:
+                self._out(parts, self._preamble)
+            self._previous_sections(parts, index)
+            self._separate(parts)
+            self._current = index
+            self.patched.append(index)
+            self._out(parts, line)
+        elif not self.patched:
+            # Text before the first patched section ("修正版です" etc.) is dropped
+            self._buffered.append(line)
+        elif RULE.match(line.strip()):
+            # Closing remarks of the patch; the previous answer's are kept
+            self._closed = True
+        else:
+            self._out(parts, line)
+
+    def feed(self, chunk: str) -> str:
+        """Consume a streamed patch chunk and return the merged text to pass on."""
+        parts: List[str] = []
+        for piece in chunk.splitlines(keepends=True):
+            self._line += piece
+            if piece.endswith("\n"):
+                line, self._line = self._line, ""
+                self._line_out(parts, line)
+        return "".join(parts)
+
+    def flush(self) -> str:
+        """Return the rest of the merged answer at the end of the patch.
+
+        When the patch contained no recognizable section it is returned
+        unchanged (``changed`` is then empty).
+        """
+        parts: List[str] = []
+        if self._line:
+            line, self._line = self._line, ""
+            self._line_out(parts, line)
+        if not self.patched:
+            return "".join(self._buffered)
+        self._previous_sections(parts, len(self.sections))
+        if self._closing:
+            self._separate(parts)
+            self._out(parts, self._closing)
+        return "".join(parts)
+
+
+def apply_patch(previous: str, patch: str, sections: Sequence[str]) -> Tuple[str, List[str]]:
+    """Merge a complete section patch into a previous answer.
+
+    Args:
+        previous: The previous complete answer
+        patch: Replacement sections with their headers
+        sections: Required section titles in outline order
+
+    Returns:
+        Tuple of (updated answer, titles of the replaced sections); the
+        list is empty when the patch contained no recognizable section
+    """
+    stream = PatchStream(previous, sections)
+    text = stream.feed(patch) + stream.flush()
+    return text.strip(), stream.changed
@@ -0,0 +1,176 @@
+"""Structured LLM response type for the multi-agent system."""
+
+from typing import Any, Dict, Optional, Tuple
+
+
+class LLMResponse:
+    """Compact result of a single LLM call.
+
+    Holds every text block returned by the model together with token usage,
+    latency, model id and finish reason. The joined text is built lazily on
+    first access and cached.
+    """
+
+    __slots__ = (
+        "blocks",
+        "input_tokens",
+        "output_tokens",
+        "latency_ms",
+        "model_id",
+        "finish_reason",
+        "error",
+        "tier",
+        "_text",
+    )
+
+    def __init__(
+        self,
+        blocks: Tuple[str, ...] = (),
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        latency_ms: float = 0.0,
+        model_id: Optional[str] = None,
+        finish_reason: Optional[str] = None,
+        error: Optional[str] = None,
+        tier: Optional[str] = None,
+    ):
+        """Initialize the response.
+
+        Args:
+            blocks: Text blocks in the order the model emitted them
+            input_tokens: Prompt tokens consumed by the call
+            output_tokens: Completion tokens produced by the call
+            latency_ms: Wall-clock latency of the call in milliseconds
+            model_id: Identifier of the model that produced the response
+            finish_reason: Why generation stopped (e.g. "end_turn", "max_tokens")
+            error: Error message when the call failed
+            tier: Model tier the call was made on ("small" or "large")
+        """
+        self.blocks = blocks
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.latency_ms = latency_ms
+        self.model_id = model_id
+        self.finish_reason = finish_reason
+        self.error = error
+        self.tier = tier
+        self._text: Optional[str] = None
+
+    @classmethod
+    def from_error(cls, message: str, model_id: Optional[str] = None, latency_ms: float = 0.0) -> "LLMResponse":
+        """Build a response representing a failed call.
+
+        The error message doubles as the response text so callers that only
+        look at ``text`` keep showing it to the user.
+        """
+        return cls(
+            blocks=(message,),
+            latency_ms=latency_ms,
+            model_id=model_id,
+            finish_reason="error",
+            error=message,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LLMResponse":
+        """Rebuild a response from :meth:`to_dict` output."""
+        return cls(
+            blocks=(data.get("text", ""),),
+            input_tokens=data.get("input_tokens", 0),
+            output_tokens=data.get("output_tokens", 0),
+            latency_ms=data.get("latency_ms", 0.0),
+            model_id=data.get("model_id"),
+            finish_reason=data.get("finish_reason"),
+            error=data.get("error"),
+            tier=data.get("tier"),
+        )
+
+    @classmethod
+    def from_agent_result(cls, result: Any, model_id: Optional[str] = None, latency_ms: float = 0.0) -> "LLMResponse":
+        """Build a response from a Strands ``AgentResult``.
+
+        Args:
+            result: The object returned by calling a Strands ``Agent``
+            model_id: Identifier of the model used for the call
+            latency_ms: Measured wall-clock latency in milliseconds
+
+        Returns:
+            The structured response
+        """
+        if isinstance(result, str):
+            return cls(blocks=(result,), model_id=model_id, latency_ms=latency_ms)
+
+        message = getattr(result, "message", None)
+        blocks: Tuple[str, ...] = ()
+        if isinstance(message, dict):
+            content = message.get("content")
+            if isinstance(content, list):
+                blocks = tuple(
+                    item["text"] for item in content
+                    if isinstance(item, dict) and isinstance(item.get("text"), str)
+                )
+            elif isinstance(content, str):
+                blocks = (content,)
+        elif hasattr(result, "content"):
+            blocks = (str(result.content),)
+        elif hasattr(result, "text"):
+            blocks = (str(result.text),)
+        else:
+            blocks = (str(result),)
+
+        usage: Dict[str, Any] = {}
+        metrics = getattr(result, "metrics", None)
+        if metrics is not None:
+            usage = getattr(metrics, "accumulated_usage", None) or {}
+
+        stop_reason = getattr(result, "stop_reason", None)
+        return cls(
+            blocks=blocks,
+            input_tokens=int(usage.get("inputTokens", 0)),
+            output_tokens=int(usage.get("outputTokens", 0)),
+            latency_ms=latency_ms,
+            model_id=model_id,
+            finish_reason=str(stop_reason) if stop_reason is not None else None,
+        )
+
+    @property
+    def text(self) -> str:
+        """All text blocks joined together (computed once)."""
+        if self._text is None:
+            self._text = "\n".join(self.blocks) if len(self.blocks) != 1 else self.blocks[0]
+        return self._text
+
+    @property
+    def total_tokens(self) -> int:
+        """Sum of input and output tokens."""
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def ok(self) -> bool:
+        """Whether the call completed without error."""
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the response."""
+        return {
+            "text": self.text,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_ms": self.latency_ms,
+            "model_id": self.model_id,
+            "finish_reason": self.finish_reason,
+            "error": self.error,
+            "tier": self.tier,
+        }
+
+    def __str__(self) -> str:
+        """Return the response text."""
+        return self.text
+
+    def __repr__(self) -> str:
+        """Detailed string representation of the response."""
+        return (
+            f"LLMResponse(model_id={self.model_id!r}, finish_reason={self.finish_reason!r}, "
+            f"blocks={len(self.blocks)}, tokens={self.input_tokens}+{self.output_tokens}, "
+            f"latency_ms={self.latency_ms:.0f})"
+        )
@@ -1,6 +1,9 @@
 """Product Recommendation Assistant Agent implementation."""
 
 from typing import Any, Dict, Optional, List
+from ..knowledge.catalog import Budget, ProductCatalog, Shortlist, extract_constraints, format_shortlist, get_product_catalog, parse_budget
+from ..utils.config import Config
+from ..utils.metrics import METRICS
 from .base_agent import BaseAgent
 
 
@@ -19,6 +22,17 @@ class ProductRecommendationAssistant(BaseAgent):
 
 常にユーザーの特定のニーズに基づいて、情報に基づいた購入決定を支援することに焦点を当ててください。"""
     
+    # Outline sections requested by build_prompt (checked by the cascade self-check)
+    REQUIRED_SECTIONS = ("ニーズの理解", "おすすめ製品", "購入時の注意点", "代替案")
+    MIN_RESPONSE_CHARS = 400
+    
+    # Buying advice is shared by requests for the same category and use (see base_agent)
+    CACHEABLE_SECTIONS = {"購入時の注意点": ("category", "use_case")}
+    EDIT_SECTIONS = {
+        "budget": ("おすすめ製品", "代替案"),
+        "filter": ("おすすめ製品", "代替案"),
+    }
+    
     def __init__(self, **kwargs):
         """Initialize the Product Recommendation Assistant."""
         super().__init__(
@@ -38,8 +52,66 @@ class ProductRecommendationAssistant(BaseAgent):
             Detailed product recommendations with analysis
         """
         try:
-            # Use LLM to process the product query
-            product_prompt = f"""あなたは製品推薦アシスタントとして、以下のクエリについて有益な製品推薦を提供してください：
+            return self.respond(query, context).text
+        except Exception as e:
+            return f"Error in product recommendation assistant: {str(e)}"
+    
+    def _catalog(self) -> Optional[ProductCatalog]:
+        """Return the product catalog (``None`` when unconfigured or unreadable)."""
+        try:
+            return get_product_catalog()
+        except Exception:
+            METRICS.incr("catalog.errors")
+            return None
+    
+    def shortlist(self, product_info: Dict[str, Any]) -> Optional[Shortlist]:
+        """Filter the product catalog by the analyzed constraints.
+        
+        Args:
+            product_info: Result of ``_analyze_product_request``
+            
+        Returns:
+            The top ``PRODUCT_SHORTLIST_SIZE`` products, or ``None`` when
+            no catalog is configured or the query names none of its categories
+        """
+        catalog = self._catalog()
+        if catalog is None:
+            return None
+        # 複数カテゴリーのカタログでは、カテゴリー不明のまま無関係な製品を候補にしない
+        if not product_info["categories"] and len(catalog.categories) > 1:
+            METRICS.incr("catalog.no_category")
+            return None
+        result = catalog.shortlist(
+            Config.PRODUCT_SHORTLIST_SIZE,
+            budget=product_info["budget_range"],
+            categories=product_info["categories"],
+            attributes=product_info["attributes"],
+            sort=product_info["sort"],
+        )
+        METRICS.observe("catalog.filter_ms", result.elapsed_ms)
+        METRICS.incr("catalog.shortlists" if result.products else "catalog.no_match")
+        return result
+    
+    def build_prompt(self, query: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Render the product recommendation prompt for a query.
+        
+        When a product catalog (``PRODUCT_CATALOG_PATH``) has products
+        matching the query's constraints, the model chooses from that
+        shortlist instead of inventing products and price ranges, and is
+        asked for a shorter answer.
+        
+        Args:
+            query: The user's query
+            context: Optional context information
+            
+        Returns:
+            The prompt sent to the LLM
+        """
+        product_info = self._analyze_product_request(query, context)
+        shortlist = self.shortlist(product_info)
+        if shortlist is not None and shortlist.products:
+            return self._shortlist_prompt(query, product_info, shortlist)
+        return f"""あなたは製品推薦アシスタントとして、以下のクエリについて有益な製品推薦を提供してください：
 
 クエリ: {query}
 
@@ -54,15 +126,49 @@ class ProductRecommendationAssistant(BaseAgent):
 4. 代替案や追加の提案
 
 必ず日本語で回答してください。"""
-            
-            return self.call_llm(product_prompt)
-            
-        except Exception as e:
-            return f"Error in product recommendation assistant: {str(e)}"
+    
+    def _shortlist_prompt(self, query: str, product_info: Dict[str, Any], shortlist: Shortlist) -> str:
+        """Render the prompt that recommends from a catalog shortlist."""
+        conditions = [f"カテゴリー: {product_info['category']}", f"予算: {product_info['budget']}"]
+        if product_info["attributes"]:
+            conditions.append("重視する特徴: " + "、".join(product_info["attributes"]))
+        if product_info["use_case"] != "general purpose":
+            conditions.append(f"用途: {product_info['use_case']}")
+        note = ""
+        if product_info["attributes"] and shortlist.complete < len(shortlist.products):
+            note = f"（重視する特徴をすべて満たす製品は{shortlist.complete}件です）\n"
+        currency = product_info["budget_range"].currency if product_info["budget_range"] else Config.PRODUCT_CATALOG_CURRENCY
+        return f"""あなたは製品推薦アシスタントとして、以下のクエリについて有益な製品推薦を提供してください：
+
+クエリ: {query}
+
+抽出した条件: {"／".join(conditions)}
+候補製品（ローカルカタログで条件に合う{shortlist.matches}件のうち上位{len(shortlist.products)}件）：
+{note}{format_shortlist(shortlist, currency)}
+
+以下の形式で、候補製品の中から簡潔に回答してください：
+1. ニーズの理解（1-2文）
+2. おすすめ製品（候補から最大3個）
+   - 製品名と価格（候補の価格をそのまま記載）
+   - 選んだ理由
+   - メリット・デメリット
+3. 購入時の注意点（3点以内）
+4. 代替案（候補の残りから）
+
+候補にない製品や価格を挙げないでください。必ず日本語で回答してください。"""
+    
+    def section_entities(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Return the request fields cacheable sections are keyed by."""
+        return self._analyze_product_request(query, context)
     
     def _analyze_product_request(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze the product request to extract key information.
         
+        Budget, category, attribute and use-case constraints are extracted
+        from the query; ``context`` may add ``budget`` (an amount or text
+        like "10万円以下"), ``category`` and ``preferences``. With a catalog
+        loaded, categories and attributes are matched against its labels.
+        
         Args:
             query: The user's product request
             context: Additional context
@@ -70,13 +176,25 @@ class ProductRecommendationAssistant(BaseAgent):
         Returns:
             Dictionary with analyzed request information
         """
-        # Mock analysis - in real implementation, this would use NLP
+        context = context or {}
+        catalog = self._catalog()
+        preferences = list(context.get("preferences", []))
+        constraints = extract_constraints(" ".join([query, str(context.get("category", ""))] + [str(item) for item in preferences]), catalog)
+        budget = constraints["budget"]
+        if context.get("budget") is not None:
+            value = context["budget"]
+            budget = Budget(None, float(value), Config.PRODUCT_CATALOG_CURRENCY) if isinstance(value, (int, float)) else parse_budget(str(value)) or budget
+        categories = constraints["categories"]
         return {
             "query": query,
-            "category": "general",
-            "budget": context.get("budget") if context else "not specified",
-            "preferences": context.get("preferences", []) if context else [],
-            "use_case": "general purpose"
+            "category": categories[0] if categories else "general",
+            "categories": categories,
+            "budget": budget.describe() if budget else "not specified",
+            "budget_range": budget,
+            "attributes": constraints["attributes"],
+            "preferences": preferences,
+            "use_case": constraints["use_case"] or "general purpose",
+            "sort": constraints["sort"],
         }
     
     def _generate_product_recommendations(self, product_info: Dict[str, Any]) -> str:
@@ -0,0 +1,185 @@
+"""Record and replay of model calls for offline end-to-end benchmarks."""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ..utils.coalescing import normalize_prompt
+from ..utils.config import Config
+from ..utils.metrics import METRICS
+from .llm_response import LLMResponse
+
+
+class ReplayStore:
+    """Fixture directory of recorded model responses.
+
+    In ``record`` mode every successful live call is written to
+    ``<directory>/<key>.json`` together with its timing profile (total
+    latency and, for streamed calls, the offset of each chunk). In
+    ``replay`` mode calls are answered from the fixtures instead of the
+    model, sleeping for the recorded time scaled by ``speed`` (1.0 = real
+    speed, 0 = instant). Fixtures are keyed by agent class, model tier and
+    the normalized prompt.
+    """
+
+    def __init__(self, directory: str, mode: str = "replay", speed: float = 1.0):
+        """Open a fixture directory.
+
+        Args:
+            directory: Directory holding the JSON fixtures
+            mode: "record" or "replay"
+            speed: Multiplier applied to recorded timings when replaying
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.speed = speed
+        self._fixtures: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._intervals: List[Tuple[float, float]] = []
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def make_key(agent_name: str, tier: Optional[str], prompt: str) -> str:
+        """Return the fixture key for a call."""
+        raw = f"{agent_name}\0{tier}\0{normalize_prompt(prompt)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key not in self._fixtures:
+                try:
+                    with open(self._path(key), encoding="utf-8") as f:
+                        self._fixtures[key] = json.load(f)
+                except FileNotFoundError:
+                    self._fixtures[key] = None
+            return self._fixtures[key]
+
+    def _save(self, key: str, fixture: Dict[str, Any]) -> None:
+        with self._lock:
+            merged = dict(self._fixtures.get(key) or {})
+            merged.update(fixture)
+            self._fixtures[key] = merged
+            with open(self._path(key), "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+        METRICS.incr("replay.recorded")
+
+    def record(self, agent_name: str, tier: Optional[str], prompt: str, response: LLMResponse) -> None:
+        """Store a live response as a fixture."""
+        self._save(self.make_key(agent_name, tier, prompt), {
+            "agent": agent_name,
+            "tier": tier,
+            "prompt": prompt,
+            **response.to_dict(),
+        })
+
+    def record_stream(self, agent_name: str, tier: Optional[str], prompt: str, chunks: List[Tuple[float, str]]) -> None:
+        """Store a streamed response as (offset_ms, text) chunks."""
+        fixture: Dict[str, Any] = {"agent": agent_name, "tier": tier, "prompt": prompt, "chunks": chunks}
+        if self._load(self.make_key(agent_name, tier, prompt)) is None:
+            # Streamed-only fixtures can still answer non-streamed replays
+            fixture.update({"text": "".join(text for _, text in chunks), "latency_ms": chunks[-1][0] if chunks else 0.0})
+        self._save(self.make_key(agent_name, tier, prompt), fixture)
+
+    def _miss(self, agent_name: str) -> LLMResponse:
+        METRICS.incr("replay.misses")
+        return LLMResponse.from_error(f"Error calling LLM: no recorded response for {agent_name} in {self.directory}")
+
+    def _track(self, started: float) -> None:
+        with self._lock:
+            self._intervals.append((started, time.perf_counter()))
+
+    def replay(self, agent_name: str, tier: Optional[str], prompt: str) -> LLMResponse:
+        """Answer a call from its fixture, sleeping for the scaled recorded latency."""
+        fixture = self._load(self.make_key(agent_name, tier, prompt))
+        if fixture is None:
+            return self._miss(agent_name)
+        METRICS.incr("replay.hits")
+        started = time.perf_counter()
+        delay_ms = fixture.get("latency_ms", 0.0) * self.speed
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        self._track(started)
+        response = LLMResponse.from_dict(fixture)
+        response.latency_ms = delay_ms
+        return response
+
+    async def replay_stream(self, agent_name: str, tier: Optional[str], prompt: str) -> AsyncIterator[str]:
+        """Yield a fixture's chunks at their scaled recorded offsets."""
+        fixture = self._load(self.make_key(agent_name, tier, prompt))
+        if fixture is None:
+            yield self._miss(agent_name).text
+            return
+        METRICS.incr("replay.hits")
+        chunks = fixture.get("chunks") or [(fixture.get("latency_ms", 0.0), fixture.get("text", ""))]
+        started = time.perf_counter()
+        try:
+            for offset_ms, text in chunks:
+                delay = started + offset_ms * self.speed / 1000 - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                yield text
+        finally:
+            self._track(started)
+
+    def drain_intervals(self) -> List[Tuple[float, float]]:
+        """Return and clear the (start, end) times of replayed calls.
+
+        Benchmarks use these to separate time spent "in the model" from
+        time spent in our own code.
+        """
+        with self._lock:
+            intervals, self._intervals = self._intervals, []
+        return intervals
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/record counters."""
+        return {
+            "mode": self.mode,
+            "directory": self.directory,
+            "hits": METRICS.counter("replay.hits"),
+            "misses": METRICS.counter("replay.misses"),
+            "recorded": METRICS.counter("replay.recorded"),
+        }
+
+
+_store: Optional[ReplayStore] = None
+_store_configured = False
+_store_lock = threading.Lock()
+
+
+def get_replay_store() -> Optional[ReplayStore]:
+    """Return the process-wide store configured by ``LLM_REPLAY_MODE`` (None when off)."""
+    global _store, _store_configured
+    if _store_configured:
+        return _store
+    with _store_lock:
+        if not _store_configured:
+            if Config.LLM_REPLAY_MODE in ("record", "replay"):
+                _store = ReplayStore(Config.LLM_REPLAY_DIR, Config.LLM_REPLAY_MODE, Config.LLM_REPLAY_SPEED)
+            _store_configured = True
+    return _store
+
+
+def set_replay_store(store: Optional[ReplayStore]) -> None:
+    """Install (or remove, with None) the process-wide store."""
+    global _store, _store_configured
+    with _store_lock:
+        _store = store
+        _store_configured = True
@@ -1,6 +1,9 @@
 """Research Assistant Agent implementation."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+from ..knowledge.bm25 import Passage, format_passages, get_document_index
+from ..utils.config import Config
+from ..utils.metrics import METRICS
 from .base_agent import BaseAgent
 
 
@@ -18,6 +21,10 @@ class ResearchAssistant(BaseAgent):
 
 常にプロフェッショナルで情報豊富なトーンを維持してください。"""
     
+    # Outline sections requested by build_prompt (checked by the cascade self-check)
+    REQUIRED_SECTIONS = ("概要", "主要なポイント", "詳細情報", "関連情報")
+    MIN_RESPONSE_CHARS = 300
+    
     def __init__(self, **kwargs):
         """Initialize the Research Assistant."""
         super().__init__(
@@ -37,11 +44,52 @@ class ResearchAssistant(BaseAgent):
             A detailed research answer with citations
         """
         try:
-            # Use LLM to process the research query
-            research_prompt = f"""あなたは研究アシスタントとして、以下のクエリについて詳細で正確な情報を提供してください：
+            return self.respond(query, context).text
+        except Exception as e:
+            return f"Error in research assistant: {str(e)}"
+    
+    def retrieve(self, query: str) -> List[Passage]:
+        """Retrieve passages for a query from the local document index.
+        
+        Returns an empty list when no index is configured or the search
+        fails, so the prompt falls back to the model's own knowledge.
+        """
+        try:
+            index = get_document_index()
+            passages = index.search(query, Config.RESEARCH_TOP_K) if index is not None else []
+        except Exception:
+            METRICS.incr("retrieval.errors")
+            return []
+        METRICS.incr("retrieval.queries" if passages else "retrieval.no_results")
+        return passages
+    
+    def build_prompt(self, query: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Render the research prompt for a query.
+        
+        When the local document index (``RESEARCH_INDEX_DIR``) returns
+        passages, they are quoted as numbered references the answer cites.
+        
+        Args:
+            query: The user's query
+            context: Optional context information
+            
+        Returns:
+            The prompt sent to the LLM
+        """
+        passages = self.retrieve(query)
+        references = ""
+        if passages:
+            references = f"""
+参考資料（ローカル文書から検索した抜粋）：
 
-クエリ: {query}
+{format_passages(passages, Config.RESEARCH_CITATION_CHARS)}
+
+参考資料に基づく記述には文末に[1]のように番号で出典を示し、「関連情報や追加の考察」の最後に参照した資料の番号と出典を列挙してください。参考資料にない内容は一般的な知識として区別してください。
+"""
+        return f"""あなたは研究アシスタントとして、以下のクエリについて詳細で正確な情報を提供してください：
 
+クエリ: {query}
+{references}
 以下の形式で回答してください：
 1. 概要
 2. 主要なポイント（箇条書き）
@@ -49,11 +97,6 @@ class ResearchAssistant(BaseAgent):
 4. 関連情報や追加の考察
 
 必ず日本語で回答してください。"""
-            
-            return self.call_llm(research_prompt)
-            
-        except Exception as e:
-            return f"Error in research assistant: {str(e)}"
     
     def _generate_research_response(self, query: str, context: Optional[Dict[str, Any]] = None) -> str:
         """Generate a research response (mock implementation).
@@ -0,0 +1,270 @@
+"""Reuse of outline sections across different queries.
+
+Some sections of a specialist answer depend on only a few request
+entities: a trip plan's accommodation and transport sections depend on
+the destination (and travel style), not on the number of days or who is
+travelling. Agents declare those sections in ``CACHEABLE_SECTIONS``;
+after an answer is generated they are split out and stored in the
+section cache (``utils/section_cache.py``) under the agent, the section
+and the entities. A later query with the same entities asks the model for
+the remaining (personalized) sections only, and the cached ones are
+stitched back in outline order, so the answer passes the same section
+checks as a full one.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+from ..utils.metrics import METRICS
+from .early_stop import RULE, outline_end
+from .llm_response import LLMResponse
+
+_HEADER = re.compile(r"^(#{1,6}\s*)?(\*\*)?\s*(\d+)\s*[.．)）]")
+
+# Entity values that mean "not extracted"
+_UNSET = ("", "not specified", "general", "general purpose")
+
+
+def _entity(value: Any) -> Any:
+    """Normalize an entity value for use in a cache key (None when unset)."""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(str(_entity(item)) for item in value if _entity(item) is not None))
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = unicodedata.normalize("NFKC", value).strip().casefold()
+        return None if value in _UNSET else value
+    return value
+
+
+def section_keys(cacheable: Mapping[str, Sequence[str]], entities: Mapping[str, Any]) -> Dict[str, Tuple]:
+    """Build the cache key of each cacheable section for a request.
+
+    A section is only cacheable when the first entity it depends on was
+    extracted (e.g. a trip's destination); the others may be unset and
+    then key the "no preference" variant.
+
+    Args:
+        cacheable: Section title -> entity fields it depends on
+        entities: Entities extracted from the request
+
+    Returns:
+        Section title -> key, for the sections that can be cached
+    """
+    keys = {}
+    for title, fields in cacheable.items():
+        values = tuple((field, _entity(entities.get(field))) for field in fields)
+        if values and values[0][1] is not None:
+            keys[title] = values
+    return keys
+
+
+def header_index(line: str, sections: Sequence[str], current: int) -> Optional[int]:
+    """Return the index of the section a line is the header of, or None.
+
+    A line is a section header when it contains the title of a section
+    after ``current`` and starts with ``#``, ``**`` or an outline number,
+    or when it is a ``#``/``**`` heading numbered like the next section.
+    Sections are matched in outline order, so numbered list items inside
+    a section are not taken for headers.
+    """
+    stripped = unicodedata.normalize("NFKC", line).strip()
+    numbered = _HEADER.match(unicodedata.normalize("NFKC", line))
+    if stripped.startswith(("#", "**")) or numbered:
+        index = next((i for i in range(current + 1, len(sections)) if sections[i] in stripped), None)
+        if index is not None:
+            return index
+    if numbered and (numbered.group(1) or numbered.group(2)) and int(numbered.group(3)) == current + 2 <= len(sections):
+        return current + 1
+    return None
+
+
+def parse_sections(text: str, sections: Sequence[str]) -> Tuple[str, Dict[int, Tuple[str, str]]]:
+    """Split text into the preamble and ``{index: (header line, body)}`` of the sections found."""
+    found: Dict[int, list] = {}
+    preamble = []
+    current = -1
+    for line in text.splitlines():
+        index = header_index(line, sections, current)
+        if index is not None:
+            current = index
+            found[index] = [line.strip(), []]
+        elif current < 0:
+            preamble.append(line)
+        else:
+            found[current][1].append(line)
+    return "\n".join(preamble).strip(), {index: (header, "\n".join(body).strip()) for index, (header, body) in found.items()}
+
+
+def split_closing(found: Dict[int, Tuple[str, str]]) -> str:
+    """Remove and return closing remarks after a horizontal rule in the last section found."""
+    if not found:
+        return ""
+    last = max(found)
+    header, body = found[last]
+    lines = body.splitlines()
+    rule = next((number for number, line in enumerate(lines) if RULE.match(line.strip())), None)
+    if rule is None:
+        return ""
+    found[last] = (header, "\n".join(lines[:rule]).strip())
+    return "\n".join(lines[rule:]).strip()
+
+
+def split_sections(text: str, sections: Sequence[str]) -> Dict[str, str]:
+    """Return the body of each outline section found in a complete answer.
+
+    Anything after the end of the outline (see ``outline_end``) and
+    closing remarks after a horizontal rule in the last section are
+    dropped, so they are not stored with the last section.
+
+    Args:
+        text: A complete answer
+        sections: Section titles in outline order
+
+    Returns:
+        Section title -> body text (without its header line)
+    """
+    end = outline_end(text, sections)
+    _, found = parse_sections(text[:end] if end is not None else text, sections)
+    split_closing(found)
+    return {sections[index]: body for index, (_, body) in found.items() if body}
+
+
+def omit_instruction(sections: Sequence[str], omitted: Sequence[str]) -> str:
+    """Prompt suffix asking the model to skip sections that are filled in from the cache."""
+    listed = "、".join(f"{number}. {title}" for number, title in enumerate(sections, 1) if title in omitted)
+    return f"""
+
+なお、次のセクションは別途用意済みのため出力しないでください：{listed}
+それ以外のセクションだけを、上記の番号と見出しのまま作成してください。"""
+
+
+def _header(sample: Optional[str], number: int, title: str) -> str:
+    """Render a section header in the style of a generated one."""
+    if sample:
+        match = _HEADER.match(sample)
+        if match and match.group(2) and not match.group(1):
+            return f"**{number}. {title}**"
+        if match and match.group(1):
+            return f"{match.group(1).strip()} {number}. {title}"
+    return f"### {number}. {title}"
+
+
+def stitch(text: str, sections: Sequence[str], cached: Mapping[str, str]) -> str:
+    """Insert cached section bodies into a partial answer in outline order.
+
+    Cached sections take precedence over anything the model generated
+    for them anyway; the generated sections keep their own headers.
+    Closing remarks after a horizontal rule in the last generated section
+    stay at the end of the answer.
+
+    Args:
+        text: Answer generated without the cached sections
+        sections: Section titles in outline order
+        cached: Section title -> cached body
+
+    Returns:
+        The complete answer
+    """
+    preamble, found = parse_sections(text, sections)
+    sample = next((header for header, _ in found.values()), None)
+    parts = [preamble] if preamble else []
+    closing = split_closing(found)
+    for index, title in enumerate(sections):
+        if title in cached:
+            parts.append(f"{_header(sample, index + 1, title)}\n\n{cached[title]}")
+        elif index in found:
+            header, body = found[index]
+            parts.append(f"{header}\n\n{body}" if body else header)
+    if closing:
+        parts.append(closing)
+    return "\n\n".join(parts)
+
+
+def with_text(response: LLMResponse, text: str) -> LLMResponse:
+    """Copy a response with its text replaced (usage and latency are kept)."""
+    return LLMResponse(
+        blocks=(text,),
+        input_tokens=response.input_tokens,
+        output_tokens=response.output_tokens,
+        latency_ms=response.latency_ms,
+        model_id=response.model_id,
+        finish_reason=response.finish_reason,
+        error=response.error,
+        tier=response.tier,
+    )
+
+
+def lookup_sections(cache, agent_name: str, language: str, keys: Mapping[str, Tuple]) -> Dict[str, Dict[str, Any]]:
+    """Return the cached entries (``{"text", "tokens"}``) found for a request's section keys."""
+    entries = {}
+    for title, key in keys.items():
+        entry = cache.get((agent_name, language, title, key))
+        if entry is not None:
+            entries[title] = entry
+    METRICS.incr(f"section_cache.{agent_name}.lookups", len(keys))
+    METRICS.incr(f"section_cache.{agent_name}.hits", len(entries))
+    return entries
+
+
+def store_sections(
+    cache,
+    agent_name: str,
+    language: str,
+    keys: Mapping[str, Tuple],
+    bodies: Mapping[str, str],
+    tokens: Mapping[str, float],
+    min_chars: int = 0,
+) -> int:
+    """Store generated section bodies under their keys.
+
+    Args:
+        cache: The section cache
+        agent_name: Name of the specialist
+        language: Answer language
+        keys: Section title -> key (see :func:`section_keys`)
+        bodies: Section title -> generated body
+        tokens: Section title -> estimated output tokens of the body
+        min_chars: Bodies shorter than this are not stored
+
+    Returns:
+        Number of sections stored
+    """
+    stored = 0
+    for title, key in keys.items():
+        body = bodies.get(title, "")
+        if len(body) >= max(1, min_chars):
+            cache.set((agent_name, language, title, key), {"text": body, "tokens": tokens.get(title, 0.0)})
+            stored += 1
+    METRICS.incr(f"section_cache.{agent_name}.stored", stored)
+    return stored
+
+
+def record_reuse(agent_name: str, entries: Mapping[str, Dict[str, Any]]) -> float:
+    """Record an answer that reused cached sections and return the estimated output tokens saved."""
+    saved = sum(float(entry.get("tokens", 0.0)) for entry in entries.values())
+    METRICS.incr(f"section_cache.{agent_name}.reused")
+    METRICS.incr(f"section_cache.{agent_name}.tokens_saved", saved)
+    METRICS.incr("section_cache.tokens_saved", saved)
+    return saved
+
+
+def section_cache_report() -> Dict[str, Dict[str, float]]:
+    """Return per-agent section lookups, hit rate, answers that reused sections and estimated tokens saved."""
+    counters = METRICS.snapshot("section_cache.")["counters"]
+    agents = sorted({name.split(".")[1] for name in counters if name.count(".") == 2})
+    report = {}
+    for agent_name in agents:
+        prefix = f"section_cache.{agent_name}"
+        lookups = METRICS.counter(f"{prefix}.lookups")
+        hits = METRICS.counter(f"{prefix}.hits")
+        report[agent_name] = {
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "reused_answers": METRICS.counter(f"{prefix}.reused"),
+            "stored": METRICS.counter(f"{prefix}.stored"),
+            "tokens_saved": METRICS.counter(f"{prefix}.tokens_saved"),
+        }
+    return report
@@ -0,0 +1,115 @@
+"""Segmented generation of long answers.
+
+A long answer is produced as a short outline call followed by
+independent segment calls that run in parallel; the segments are then
+stitched together in outline order. Wall-clock time follows the slowest
+segment instead of the full answer length.
+"""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..utils.metrics import METRICS
+from .llm_response import LLMResponse
+
+# A bare "N日" is a duration unless it is part of a date ("5月10日", "5/10日")
+# or an ordinal ("2日目")
+_DAYS = re.compile(r"(?<![\d月/])(\d+)\s*(?:日間|日(?!目)|days?\b)", re.IGNORECASE)
+_NIGHTS = re.compile(r"(\d+)\s*泊")
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def requested_days(query: str) -> Optional[int]:
+    """Return the trip length a query asks for, in days (None if not stated).
+
+    "5日間", "10 days" and "3泊" (nights, i.e. 4 days, checked first) are
+    recognized. Calendar dates such as "5月10日" are not durations.
+    """
+    match = _NIGHTS.search(query)
+    if match:
+        return int(match.group(1)) + 1
+    match = _DAYS.search(query)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def parse_outline(text: str, days: int) -> Optional[Dict[str, Any]]:
+    """Parse the JSON outline returned by an outline call.
+
+    Args:
+        text: Model output containing one JSON object
+        days: Number of days the outline must cover
+
+    Returns:
+        The outline with exactly ``days`` entries in ``days``, or ``None``
+        if the output is not a usable outline
+    """
+    match = _JSON_OBJECT.search(text)
+    if not match:
+        return None
+    try:
+        outline = json.loads(match.group(0))
+    except ValueError:
+        return None
+    entries = outline.get("days") if isinstance(outline, dict) else None
+    if not isinstance(entries, list) or len(entries) < days:
+        return None
+    outline["days"] = [entry if isinstance(entry, dict) else {"title": str(entry)} for entry in entries[:days]]
+    return outline
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the shared segment thread pool (sized by ``SEGMENT_CONCURRENCY``).
+
+    Segments run on their own pool rather than the job scheduler: they are
+    started from inside a scheduler job, and waiting on jobs of the same
+    scheduler could exhaust its workers.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from ..utils.config import Config
+            _executor = ThreadPoolExecutor(max_workers=max(1, Config.SEGMENT_CONCURRENCY), thread_name_prefix="segment")
+    return _executor
+
+
+def run_segments(name: str, calls: Sequence[Callable[[], LLMResponse]]) -> List[LLMResponse]:
+    """Run segment calls in parallel and return their responses in order.
+
+    Records ``segmented.<name>.wall_ms`` and ``.serial_ms`` (the sum of
+    the segment latencies, i.e. what one sequential call would roughly
+    have taken), so the speedup can be read from the metrics.
+    """
+    started = time.perf_counter()
+    futures = [_get_executor().submit(call) for call in calls]
+    responses = []
+    for future in futures:
+        try:
+            responses.append(future.result())
+        except Exception as e:
+            responses.append(LLMResponse.from_error(f"Error generating segment: {str(e)}"))
+    METRICS.observe(f"segmented.{name}.wall_ms", (time.perf_counter() - started) * 1000)
+    METRICS.observe(f"segmented.{name}.serial_ms", sum(response.latency_ms for response in responses))
+    METRICS.incr(f"segmented.{name}.segments", len(responses))
+    return responses
+
+
+def combine(text: str, responses: Sequence[LLMResponse], latency_ms: float, model_id: Optional[str]) -> LLMResponse:
+    """Build one response for a stitched answer, summing the usage of its calls."""
+    return LLMResponse(
+        blocks=(text,),
+        input_tokens=sum(response.input_tokens for response in responses),
+        output_tokens=sum(response.output_tokens for response in responses),
+        latency_ms=latency_ms,
+        model_id=model_id,
+        finish_reason="segmented",
+    )
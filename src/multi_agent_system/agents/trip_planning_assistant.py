@@ -1,7 +1,19 @@
 """Trip Planning Assistant Agent implementation."""
 
-from typing import Any, Dict, Optional, List
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, List
+from ..knowledge.catalog import parse_budget
+from ..knowledge.destinations import DestinationStore, extract_trip_fields, format_blocks, get_destination_store, select_blocks
+from ..utils.config import Config
+from ..utils.metrics import METRICS
+from ..utils.section_cache import get_section_cache
 from .base_agent import BaseAgent
+from .llm_response import LLMResponse
+from .sections import lookup_sections, record_reuse, section_keys, store_sections
+from .segmented import combine, parse_outline, requested_days, run_segments
 
 
 class TripPlanningAssistant(BaseAgent):
@@ -20,6 +32,36 @@ class TripPlanningAssistant(BaseAgent):
 
 常にユーザーのニーズに合わせた、思い出に残るよく組織化された旅行体験を作ることに焦点を当ててください。"""
     
+    # Outline sections requested by build_prompt (checked by the cascade self-check)
+    REQUIRED_SECTIONS = (
+        "旅行概要", "日程案", "宿泊施設の推薦", "交通手段と移動方法",
+        "観光スポット", "予算の目安", "注意事項",
+    )
+    MIN_RESPONSE_CHARS = 800
+    
+    # Sections shared by trips to the same destination (see base_agent)
+    CACHEABLE_SECTIONS = {
+        "宿泊施設の推薦": ("destination", "travel_style"),
+        "交通手段と移動方法": ("destination",),
+        "観光スポット": ("destination", "interests", "season"),
+        "注意事項": ("destination", "season"),
+    }
+    EDIT_SECTIONS = {
+        "duration": ("旅行概要", "日程案", "予算の目安"),
+        "budget": ("宿泊施設の推薦", "交通手段と移動方法", "予算の目安"),
+        "filter": ("日程案", "観光スポット"),
+    }
+    
+    # Sections generated independently of the daily schedule in segmented
+    # mode: (outline title, what the section covers)
+    SEGMENT_SECTIONS = (
+        ("宿泊施設の推薦", "滞在エリアごとのおすすめ宿泊施設（価格帯と特徴）"),
+        ("交通手段と移動方法", "目的地までのアクセス、都市間・市内の移動手段と交通パス"),
+        ("観光スポット・アクティビティ", "日程に含まれる主要スポットの見どころと追加のおすすめ"),
+        ("予算の目安", "宿泊・食事・交通・アクティビティ別の概算と合計"),
+        ("注意事項・持ち物リスト", "現地のマナーや注意事項、季節に合った持ち物"),
+    )
+    
     def __init__(self, **kwargs):
         """Initialize the Trip Planning Assistant."""
         super().__init__(
@@ -27,6 +69,9 @@ class TripPlanningAssistant(BaseAgent):
             system_prompt=self.SYSTEM_PROMPT,
             **kwargs
         )
+        # Idle twins used for parallel segment calls, keyed by tier
+        self._segment_agents: Dict[str, List["TripPlanningAssistant"]] = {}
+        self._segment_lock = threading.Lock()
     
     def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> str:
         """Process a trip planning query.
@@ -39,11 +84,244 @@ class TripPlanningAssistant(BaseAgent):
             Detailed trip planning recommendations and itinerary
         """
         try:
-            # Use LLM to process the travel query
-            travel_prompt = f"""あなたは旅行計画アシスタントとして、以下のクエリについて詳細な旅行プランを提供してください：
+            return self.respond(query, context).text
+        except Exception as e:
+            return f"Error in trip planning assistant: {str(e)}"
+    
+    def respond(self, query: str, context: Optional[Dict[str, Any]] = None, prompt: Optional[str] = None) -> LLMResponse:
+        """Answer a trip planning query, in segments for long trips.
+        
+        With ``Config.TRIP_SEGMENTED_ENABLED``, trips of at least
+        ``TRIP_SEGMENTED_MIN_DAYS`` days are generated by
+        :meth:`respond_segmented`; everything else (and any segmented
+        attempt that fails) uses the single-call path.
+        
+        Args:
+            query: The user's query
+            context: Optional context information
+            prompt: The prompt already rendered by ``build_prompt``
+            
+        Returns:
+            The structured LLM response
+        """
+        days = self._segmented_days(query)
+        if days:
+            response = self.respond_segmented(query, days)
+            if response is not None:
+                return response
+        return super().respond(query, context, prompt)
+    
+    def _segmented_days(self, query: str) -> Optional[int]:
+        """Return the number of days to generate in segments, or None for a single call."""
+        if not Config.TRIP_SEGMENTED_ENABLED or not self.agent:
+            return None
+        days = requested_days(query)
+        if days is None or not Config.TRIP_SEGMENTED_MIN_DAYS <= days <= Config.TRIP_SEGMENTED_MAX_DAYS:
+            return None
+        return days
+    
+    def respond_segmented(self, query: str, days: int) -> Optional[LLMResponse]:
+        """Generate the plan as an outline call plus parallel segment calls.
+        
+        The small tier first fixes the destination and a one-line theme per
+        day. Each day's schedule and each section in ``SEGMENT_SECTIONS``
+        is then generated in parallel on this agent's tier against that
+        skeleton, and the pieces are stitched in the order of the usual
+        outline (so the result passes the same section checks).
+        
+        Args:
+            query: The user's query
+            days: Number of days in the trip
+            
+        Returns:
+            The stitched response, or ``None`` if the outline could not be
+            parsed or a segment failed
+        """
+        started = time.perf_counter()
+        METRICS.incr("segmented.trip.requests")
+        notes = self.destination_notes(self._analyze_trip_request(query))
+        outline_response = self._segment_call(self._outline_prompt(query, days, notes), small=True)
+        outline = parse_outline(outline_response.text, days) if outline_response.ok else None
+        if outline is None:
+            METRICS.incr("segmented.trip.fallbacks")
+            return None
+        
+        # Sections cached from earlier trips to the same destination are not regenerated
+        cache = get_section_cache()
+        keys = section_keys(self.CACHEABLE_SECTIONS, self.section_entities(query)) if cache is not None else {}
+        cached = lookup_sections(cache, self.__class__.__name__, self.language, keys) if keys else {}
+        sections = [(self._outline_title(title), title, scope) for title, scope in self.SEGMENT_SECTIONS]
+        generate = [(key, title, scope) for key, title, scope in sections if key not in cached]
+        
+        skeleton = json.dumps(outline, ensure_ascii=False)
+        prompts = [self._day_prompt(query, skeleton, number, entry) for number, entry in enumerate(outline["days"], 1)]
+        prompts += [self._section_prompt(query, skeleton, title, scope, notes) for _, title, scope in generate]
+        responses = run_segments("trip", [lambda prompt=prompt: self._segment_call(prompt) for prompt in prompts])
+        if not all(response.ok for response in responses):
+            METRICS.incr("segmented.trip.fallbacks")
+            return None
+        
+        day_texts = [response.text.strip() for response in responses[:days]]
+        generated = {key: response for (key, _, _), response in zip(generate, responses[days:])}
+        if cached:
+            record_reuse(self.__class__.__name__, cached)
+        if keys:
+            store_sections(
+                cache, self.__class__.__name__, self.language, keys,
+                {key: response.text.strip() for key, response in generated.items()},
+                {key: response.output_tokens for key, response in generated.items()},
+                Config.SECTION_CACHE_MIN_CHARS,
+            )
+        overview = str(outline.get("overview", "")).strip()
+        parts = [f"### 1. 旅行概要\n\n{overview}", "### 2. 日程案\n\n" + "\n\n".join(day_texts)]
+        for number, (key, title, _) in enumerate(sections, 3):
+            text = cached[key]["text"] if key in cached else generated[key].text.strip()
+            parts.append(f"### {number}. {title}\n\n{text}")
+        return combine(
+            "\n\n".join(parts),
+            [outline_response, *responses],
+            (time.perf_counter() - started) * 1000,
+            self.model_id
+        )
+    
+    def _outline_title(self, title: str) -> str:
+        """Return the ``REQUIRED_SECTIONS`` entry a segment title starts with."""
+        return next((required for required in self.REQUIRED_SECTIONS if title.startswith(required)), title)
+    
+    @contextmanager
+    def _segment_agent(self, small: bool = False) -> Iterator["TripPlanningAssistant"]:
+        """Borrow a twin of this agent for one segment call."""
+        tier = "small" if small else self.tier
+        with self._segment_lock:
+            idle = self._segment_agents.setdefault(tier, [])
+            agent = idle.pop() if idle else None
+        if agent is None:
+            options = {key: value for key, value in self.config.items() if key not in ("tier", "cascade")}
+            if small:
+                options = {key: value for key, value in options.items() if key not in ("model", "backend")}
+            agent = self.__class__(tier=tier, cascade=False, **options)
+            # A segment is not the full outline: no outline tracking or early stop
+            agent.REQUIRED_SECTIONS = ()
+        try:
+            yield agent
+        finally:
+            agent.reset_conversation()
+            with self._segment_lock:
+                idle.append(agent)
+    
+    def _segment_call(self, prompt: str, small: bool = False) -> LLMResponse:
+        """Run one outline or segment call on a borrowed twin."""
+        with self._segment_agent(small) as agent:
+            return agent.invoke_llm(prompt)
+    
+    @staticmethod
+    def _notes_block(notes: Optional[str]) -> str:
+        """Knowledge base excerpt for a prompt ("" without one)."""
+        return f"\n目的地の基本情報（ナレッジベースより）：\n{notes}\n" if notes else ""
+    
+    def _outline_prompt(self, query: str, days: int, notes: Optional[str] = None) -> str:
+        """Prompt for the outline call that fixes the destination and day skeleton."""
+        return f"""以下の旅行リクエストについて、旅程の骨子だけをJSONで作成してください。
 
-クエリ: {query}
+リクエスト: {query}
+{self._notes_block(notes)}
+次の形式のJSONのみを出力してください（説明文は不要）：
+{{"destination": "目的地", "overview": "旅行概要（目的地、期間、ハイライトを2〜3文で）", "days": [{{"day": 1, "area": "滞在エリア", "title": "その日のテーマ"}}]}}
 
+daysは必ず{days}日分作成し、同じ観光地が複数の日で重複しないようにしてください。"""
+    
+    def _day_prompt(self, query: str, skeleton: str, number: int, entry: Dict[str, Any]) -> str:
+        """Prompt for one day of the itinerary."""
+        title = entry.get("title", "")
+        return f"""旅行リクエスト: {query}
+
+旅程の骨子:
+{skeleton}
+
+この旅程の{number}日目（{entry.get("area", "")}: {title}）の詳細スケジュールだけを作成してください。
+午前・午後・夕方の行動、食事、移動を含め、見出し「#### {number}日目: {title}」から始めてください。
+他の日の内容や前置き・まとめは書かないでください。必ず日本語で回答してください。"""
+    
+    def _section_prompt(self, query: str, skeleton: str, title: str, scope: str, notes: Optional[str] = None) -> str:
+        """Prompt for one independent section of the plan."""
+        return f"""旅行リクエスト: {query}
+
+旅程の骨子:
+{skeleton}
+{self._notes_block(notes)}
+この旅行プランの「{title}」セクションだけを作成してください。
+内容: {scope}
+セクションの見出しは書かず、本文のみを箇条書き中心で作成してください。必ず日本語で回答してください。"""
+    
+    def _destination_store(self) -> Optional[DestinationStore]:
+        """Return the destination knowledge base (``None`` when unconfigured or unreadable)."""
+        try:
+            return get_destination_store()
+        except Exception:
+            METRICS.incr("destinations.errors")
+            return None
+    
+    def destination_notes(self, trip_info: Dict[str, Any]) -> Optional[str]:
+        """Look the destination up in the knowledge base and render the blocks that fit the request.
+        
+        Args:
+            trip_info: Result of ``_analyze_trip_request``
+            
+        Returns:
+            Reference text for the prompt, or ``None`` when no knowledge
+            base is configured or the destination is not in it
+        """
+        store = self._destination_store()
+        if store is None:
+            return None
+        destination = store.get(trip_info["destination"]) if trip_info["destination"] != "not specified" else None
+        if destination is None:
+            METRICS.incr("destinations.misses")
+            return None
+        METRICS.incr("destinations.hits")
+        return format_blocks(select_blocks(destination, trip_info, Config.DESTINATION_MAX_SIGHTS))
+    
+    def section_entities(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Return the trip fields cacheable sections are keyed by.
+        
+        Destinations found in the knowledge base are keyed by their
+        canonical name, so aliases (e.g. "Kyoto" and "京都") share sections.
+        Other destinations are only trusted when given in ``context``; a
+        destination guessed from the query's wording may be wrong, so it
+        leaves the destination unset and the sections uncached.
+        """
+        trip_info = self._analyze_trip_request(query, context)
+        if (context or {}).get("destination"):
+            return trip_info
+        store = self._destination_store()
+        record = store.get(trip_info["destination"]) if store is not None and trip_info["destination"] != "not specified" else None
+        trip_info["destination"] = record["name"] if record is not None else "not specified"
+        return trip_info
+    
+    def build_prompt(self, query: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Render the trip planning prompt for a query.
+        
+        When the destination is in the knowledge base
+        (``DESTINATION_KB_PATH``), its facts are included and the model is
+        asked to compose and personalize them rather than restate them.
+        
+        Args:
+            query: The user's query
+            context: Optional context information
+            
+        Returns:
+            The prompt sent to the LLM
+        """
+        notes = self.destination_notes(self._analyze_trip_request(query, context))
+        guidance = ""
+        if notes:
+            guidance = f"""{self._notes_block(notes)}
+上記の基本情報にある事実（スポット、交通、宿泊エリア、季節、予算）はそのまま使い、同じ説明を繰り返さずに、リクエストに合わせた組み立てとパーソナライズに集中してください。各セクションは簡潔な箇条書きにしてください。
+"""
+        return f"""あなたは旅行計画アシスタントとして、以下のクエリについて詳細な旅行プランを提供してください：
+
+クエリ: {query}
+{guidance}
 以下の形式で回答してください：
 1. 旅行概要（目的地、期間、ハイライト）
 2. 日程案（日別のスケジュール）
@@ -54,15 +332,15 @@ class TripPlanningAssistant(BaseAgent):
 7. 注意事項・持ち物リスト
 
 必ず日本語で回答してください。"""
-            
-            return self.call_llm(travel_prompt)
-            
-        except Exception as e:
-            return f"Error in trip planning assistant: {str(e)}"
     
     def _analyze_trip_request(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze the trip request to extract key information.
         
+        Destination, duration, budget, travel style, interests, season and
+        group size are extracted from the query; values in ``context``
+        take precedence. The destination is matched against the knowledge
+        base's names and aliases when one is configured.
+        
         Args:
             query: The user's trip planning request
             context: Additional context
@@ -70,15 +348,22 @@ class TripPlanningAssistant(BaseAgent):
         Returns:
             Dictionary with analyzed trip information
         """
-        # Mock analysis - in real implementation, this would use NLP
+        context = context or {}
+        interests = [str(interest) for interest in context.get("interests", [])]
+        fields = extract_trip_fields(" ".join([query] + interests), self._destination_store())
+        days = requested_days(query) or (requested_days(str(context["duration"])) if context.get("duration") else None)
+        budget = parse_budget(query)
         return {
             "query": query,
-            "destination": "not specified",
-            "duration": context.get("duration", "not specified") if context else "not specified",
-            "budget": context.get("budget", "not specified") if context else "not specified",
-            "travel_style": context.get("travel_style", "general") if context else "general",
-            "interests": context.get("interests", []) if context else [],
-            "group_size": context.get("group_size", 1) if context else 1
+            "destination": context.get("destination") or fields["destination"] or "not specified",
+            "duration": context.get("duration") or (f"{days}日間" if days else "not specified"),
+            "days": days,
+            "budget": context.get("budget") or (budget.describe() if budget else "not specified"),
+            "travel_style": context.get("travel_style") or fields["travel_style"],
+            "interests": fields["interests"],
+            "season": fields["season"],
+            "month": fields["month"],
+            "group_size": context.get("group_size") or fields["group_size"] or 1,
         }
     
     def _generate_trip_plan(self, trip_info: Dict[str, Any]) -> str:
@@ -0,0 +1 @@
+"""Knowledge package initialization."""
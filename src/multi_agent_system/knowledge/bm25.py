@@ -0,0 +1,585 @@
+"""Local BM25 passage index with a memory-mapped on-disk format.
+
+The index is a directory of immutable segments plus ``manifest.json``.
+Each ingestion run writes new segments; a changed or removed file marks
+its old passages deleted in the manifest, and ``compact`` rewrites
+everything into one segment without them. Searches memory-map the
+segment files and read postings in place, so opening a large index is
+cheap and the pages are shared between worker processes.
+
+Segment files (native byte order, recorded in the manifest):
+
+    lexicon.bin    sorted terms, UTF-8, concatenated
+    lexicon.off    uint64[terms + 1]    byte offset of each term
+    postings.off   uint64[terms + 1]    first posting of each term
+    postings.doc   uint32[postings]     passage ids, ascending per term
+    postings.tf    uint16[postings]     term frequencies
+    passages.len   uint32[passages]     passage lengths in tokens
+    passages.src   uint32[passages]     index into sources.json
+    passages.off   uint64[passages + 1] byte offset into passages.txt
+    passages.txt   "title\\x1ftext" per passage, UTF-8
+    sources.json   source names
+
+Usage:
+    uv run python -m src.multi_agent_system.knowledge.bm25 ingest docs/ --index data/index
+    uv run python -m src.multi_agent_system.knowledge.bm25 search "機械学習" --index data/index
+"""
+
+import heapq
+import json
+import math
+import mmap
+import os
+import shutil
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..utils.metrics import METRICS
+from .text import HTML_EXTENSIONS, PDF_EXTENSIONS, TEXT_EXTENSIONS, read_document, split_passages, tokenize
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+SUPPORTED_EXTENSIONS = TEXT_EXTENSIONS + HTML_EXTENSIONS + PDF_EXTENSIONS
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+class Passage:
+    """A retrieved passage and its BM25 score."""
+
+    __slots__ = ("source", "title", "text", "score")
+
+    def __init__(self, source: str, title: str, text: str, score: float = 0.0):
+        """Initialize the passage.
+
+        Args:
+            source: Source name (path relative to the ingested root)
+            title: Nearest heading above the passage
+            text: Passage text
+            score: BM25 score for the query
+        """
+        self.source = source
+        self.title = title
+        self.text = text
+        self.score = score
+
+    @property
+    def citation(self) -> str:
+        """Source and heading, as shown in prompts."""
+        return f"{self.source} — {self.title}" if self.title else self.source
+
+    def __repr__(self) -> str:
+        """Detailed string representation of the passage."""
+        return f"Passage(citation='{self.citation}', score={self.score:.3f})"
+
+
+class _SegmentBuilder:
+    """Accumulates passages in memory and writes them as one segment."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.lengths = array("I")
+        self.sources = array("I")
+        self.source_names: List[str] = []
+        self._source_ids: Dict[str, int] = {}
+        self.texts: List[bytes] = []
+        self.tokens = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.lengths)
+
+    def add(self, source: str, title: str, text: str) -> int:
+        """Add a passage and return its id within the segment."""
+        doc = len(self.lengths)
+        terms = Counter(tokenize(f"{title}\n{text}"))
+        for term, tf in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array("I"), array("H"))
+            postings[0].append(doc)
+            postings[1].append(min(tf, 0xFFFF))
+        length = sum(terms.values())
+        self.lengths.append(length)
+        self.tokens += length
+        source_id = self._source_ids.get(source)
+        if source_id is None:
+            source_id = self._source_ids[source] = len(self.source_names)
+            self.source_names.append(source)
+        self.sources.append(source_id)
+        self.texts.append(f"{title}\x1f{text}".encode("utf-8"))
+        return doc
+
+    def write(self, directory: str) -> Dict[str, Any]:
+        """Write the segment (atomically, via a temporary directory) and return its manifest entry."""
+        final = os.path.join(directory, self.name)
+        staging = final + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        terms = sorted(self.postings, key=lambda term: term.encode("utf-8"))
+        lexicon = bytearray()
+        term_offsets = array("Q", [0])
+        posting_offsets = array("Q", [0])
+        docs = array("I")
+        tfs = array("H")
+        for term in terms:
+            lexicon += term.encode("utf-8")
+            term_offsets.append(len(lexicon))
+            term_docs, term_tfs = self.postings[term]
+            docs.extend(term_docs)
+            tfs.extend(term_tfs)
+            posting_offsets.append(len(docs))
+        text_offsets = array("Q", [0])
+        for text in self.texts:
+            text_offsets.append(text_offsets[-1] + len(text))
+
+        files = {
+            "lexicon.bin": bytes(lexicon),
+            "lexicon.off": term_offsets,
+            "postings.off": posting_offsets,
+            "postings.doc": docs,
+            "postings.tf": tfs,
+            "passages.len": self.lengths,
+            "passages.src": self.sources,
+            "passages.off": text_offsets,
+            "passages.txt": b"".join(self.texts),
+        }
+        for filename, data in files.items():
+            with open(os.path.join(staging, filename), "wb") as f:
+                f.write(data if isinstance(data, bytes) else data.tobytes())
+        with open(os.path.join(staging, "sources.json"), "w", encoding="utf-8") as f:
+            json.dump(self.source_names, f, ensure_ascii=False)
+        os.replace(staging, final)
+        return {"name": self.name, "passages": self.count, "tokens": self.tokens, "deleted": []}
+
+
+class _Segment:
+    """Read-only view of a segment's memory-mapped files."""
+
+    def __init__(self, directory: str, entry: Dict[str, Any]):
+        self.name = entry["name"]
+        self.path = os.path.join(directory, self.name)
+        self._maps: List[mmap.mmap] = []
+        self._views: List[memoryview] = []
+        self.lexicon = self._map("lexicon.bin")
+        self.term_offsets = self._map("lexicon.off", "Q")
+        self.posting_offsets = self._map("postings.off", "Q")
+        self.docs = self._map("postings.doc", "I")
+        self.tfs = self._map("postings.tf", "H")
+        self.lengths = self._map("passages.len", "I")
+        self.sources = self._map("passages.src", "I")
+        self.text_offsets = self._map("passages.off", "Q")
+        self.texts = self._map("passages.txt")
+        with open(os.path.join(self.path, "sources.json"), encoding="utf-8") as f:
+            self.source_names: List[str] = json.load(f)
+        self.terms = len(self.term_offsets) - 1
+        self.deleted: Set[int] = {doc for first, count in entry["deleted"] for doc in range(first, first + count)}
+        self._norms: Tuple[float, List[float]] = (0.0, [])
+
+    def _map(self, filename: str, fmt: Optional[str] = None) -> memoryview:
+        with open(os.path.join(self.path, filename), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                view = memoryview(b"")
+            else:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps.append(mapped)
+                view = memoryview(mapped)
+        if fmt is not None:
+            view = view.cast(fmt)
+        self._views.append(view)
+        return view
+
+    def find(self, term: bytes) -> Optional[Tuple[int, int]]:
+        """Binary-search the lexicon; return the term's postings range."""
+        low, high = 0, self.terms
+        offsets, lexicon = self.term_offsets, self.lexicon
+        while low < high:
+            middle = (low + high) // 2
+            candidate = lexicon[offsets[middle]:offsets[middle + 1]]
+            if candidate == term:
+                return self.posting_offsets[middle], self.posting_offsets[middle + 1]
+            if candidate.tobytes() < term:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def norms(self, average_length: float) -> List[float]:
+        """Per-passage BM25 length normalization for the current average length."""
+        if self._norms[0] != average_length:
+            scale = K1 * B / average_length if average_length else 0.0
+            base = K1 * (1 - B)
+            self._norms = (average_length, [base + scale * length for length in self.lengths])
+        return self._norms[1]
+
+    def passage(self, doc: int, score: float = 0.0) -> Passage:
+        """Read one passage."""
+        raw = self.texts[self.text_offsets[doc]:self.text_offsets[doc + 1]].tobytes().decode("utf-8")
+        title, _, text = raw.partition("\x1f")
+        return Passage(self.source_names[self.sources[doc]], title, text, score)
+
+    def live_passages(self) -> Iterator[Tuple[int, Passage]]:
+        """Yield every passage that is not deleted."""
+        for doc in range(len(self.lengths)):
+            if doc not in self.deleted:
+                yield doc, self.passage(doc)
+
+    def close(self) -> None:
+        for view in self._views:
+            view.release()
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                # A caller still holds a view; the map is freed with it
+                pass
+
+
+class DocumentIndex:
+    """BM25 index over passages of local Markdown, text, HTML and PDF files."""
+
+    def __init__(self, directory: str, passage_chars: int = 600, segment_passages: int = 20000, max_df_ratio: float = 0.3):
+        """Open (or create) an index directory.
+
+        Args:
+            directory: Index directory
+            passage_chars: Maximum passage length when ingesting
+            segment_passages: Passages per segment when ingesting
+            max_df_ratio: Query terms found in more than this share of
+                passages are ignored (unless no other term matches)
+        """
+        self.directory = directory
+        self.passage_chars = passage_chars
+        self.segment_passages = segment_passages
+        self.max_df_ratio = max_df_ratio
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._manifest: Dict[str, Any] = self._empty_manifest()
+        self._manifest_mtime = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def _empty_manifest() -> Dict[str, Any]:
+        return {"format": FORMAT_VERSION, "byteorder": sys.byteorder, "next_segment": 0, "segments": [], "files": {}}
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST)
+
+    def _load(self) -> None:
+        """(Re)open the segments listed in the manifest."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        if manifest.get("format") != FORMAT_VERSION or manifest.get("byteorder") != sys.byteorder:
+            raise ValueError(f"Unsupported index format in {self.directory}; rebuild the index")
+        # Replaced segments are unmapped once in-flight searches drop them
+        self._segments = [_Segment(self.directory, entry) for entry in manifest["segments"]]
+        self._manifest, self._manifest_mtime = manifest, mtime
+
+    def _refresh(self) -> None:
+        """Pick up segments written by another process."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._manifest_mtime:
+            with self._lock:
+                if mtime != self._manifest_mtime:
+                    self._load()
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        staging = self.manifest_path + ".tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(staging, self.manifest_path)
+
+    @property
+    def passages(self) -> int:
+        """Number of live (not deleted) passages."""
+        return sum(len(segment.lengths) - len(segment.deleted) for segment in self._segments)
+
+    def _average_length(self) -> float:
+        entries = self._manifest["segments"]
+        total = sum(entry["passages"] for entry in entries)
+        return sum(entry["tokens"] for entry in entries) / total if total else 0.0
+
+    def search(self, query: str, k: int = 5) -> List[Passage]:
+        """Return the top-k passages for a query by BM25 score.
+
+        Args:
+            query: Free-text query
+            k: Number of passages to return
+
+        Returns:
+            Passages in descending score order
+        """
+        started = time.perf_counter()
+        self._refresh()
+        segments = self._segments
+        if not segments or not self.passages:
+            return []
+        average_length = self._average_length()
+        # Document frequencies include deleted passages, so idf uses the same population
+        total = sum(len(segment.lengths) for segment in segments)
+
+        matched = []
+        for term in dict.fromkeys(tokenize(query)):
+            encoded = term.encode("utf-8")
+            ranges = []
+            df = 0
+            for index, segment in enumerate(segments):
+                found = segment.find(encoded)
+                if found is not None:
+                    ranges.append((index, found))
+                    df += found[1] - found[0]
+            if df:
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                matched.append((df, idf, ranges))
+        # Very common terms add little to the ranking but dominate the cost
+        selective = [term for term in matched if term[0] <= self.max_df_ratio * total] or matched
+
+        scores: List[Dict[int, float]] = [{} for _ in segments]
+        for _, idf, ranges in selective:
+            weight = idf * (K1 + 1)
+            for index, (start, end) in ranges:
+                segment = segments[index]
+                norms = segment.norms(average_length)
+                accumulated = scores[index]
+                for doc, tf in zip(segment.docs[start:end], segment.tfs[start:end]):
+                    accumulated[doc] = accumulated.get(doc, 0.0) + weight * tf / (tf + norms[doc])
+
+        candidates = (
+            (score, index, doc)
+            for index, accumulated in enumerate(scores)
+            for doc, score in accumulated.items()
+            if doc not in segments[index].deleted
+        )
+        results = [segments[index].passage(doc, score) for score, index, doc in heapq.nlargest(k, candidates)]
+        METRICS.observe("retrieval.search_ms", (time.perf_counter() - started) * 1000)
+        return results
+
+    def _files(self, paths: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """Yield (absolute path, source name) for every supported file under the paths."""
+        for root in paths:
+            root = os.path.abspath(root)
+            base = os.path.dirname(root)
+            if os.path.isfile(root):
+                yield root, os.path.relpath(root, base)
+                continue
+            for folder, _, filenames in os.walk(root):
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                        path = os.path.join(folder, filename)
+                        yield path, os.path.relpath(path, base)
+
+    @staticmethod
+    def _delete(manifest: Dict[str, Any], record: Dict[str, Any]) -> None:
+        for entry in manifest["segments"]:
+            if entry["name"] == record["segment"]:
+                entry["deleted"].append([record["first"], record["count"]])
+                return
+
+    def _new_builder(self, manifest: Dict[str, Any]) -> _SegmentBuilder:
+        name = f"seg-{manifest['next_segment']:06d}"
+        manifest["next_segment"] += 1
+        return _SegmentBuilder(name)
+
+    def ingest(self, paths: Iterable[str], prune: bool = False) -> Dict[str, Any]:
+        """Add new and changed files under the given paths to the index.
+
+        Unchanged files (same size and modification time) are skipped;
+        the old passages of a changed file are marked deleted.
+
+        Args:
+            paths: Files or directories to ingest
+            prune: Also delete files under these paths that no longer exist
+
+        Returns:
+            Counts of added/updated/unchanged/skipped/removed files,
+            passages written and the elapsed time
+        """
+        started = time.perf_counter()
+        paths = list(paths)
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "skipped": 0, "removed": 0, "passages": 0, "bytes": 0}
+        with self._lock:
+            manifest = json.loads(json.dumps(self._manifest))
+            builder = self._new_builder(manifest)
+            seen = set()
+            for path, source in self._files(paths):
+                seen.add(path)
+                stat = os.stat(path)
+                record = manifest["files"].get(path)
+                if record and record["mtime"] == stat.st_mtime and record["size"] == stat.st_size:
+                    stats["unchanged"] += 1
+                    continue
+                text = read_document(path)
+                if text is None:
+                    stats["skipped"] += 1
+                    continue
+                if record:
+                    self._delete(manifest, record)
+                    stats["updated"] += 1
+                else:
+                    stats["added"] += 1
+                first = builder.count
+                for title, passage in split_passages(text, self.passage_chars):
+                    builder.add(source, title, passage)
+                manifest["files"][path] = {
+                    "mtime": stat.st_mtime, "size": stat.st_size,
+                    "segment": builder.name, "first": first, "count": builder.count - first,
+                }
+                stats["passages"] += builder.count - first
+                stats["bytes"] += stat.st_size
+                if builder.count >= self.segment_passages:
+                    manifest["segments"].append(builder.write(self.directory))
+                    builder = self._new_builder(manifest)
+            if builder.count:
+                manifest["segments"].append(builder.write(self.directory))
+
+            if prune:
+                roots = [os.path.abspath(root) for root in paths]
+                for path in list(manifest["files"]):
+                    if path not in seen and any(path == root or path.startswith(root + os.sep) for root in roots):
+                        self._delete(manifest, manifest["files"].pop(path))
+                        stats["removed"] += 1
+
+            self._write_manifest(manifest)
+            self._load()
+        stats["seconds"] = time.perf_counter() - started
+        return stats
+
+    def compact(self) -> Dict[str, Any]:
+        """Rewrite all live passages into new segments, dropping deleted ones."""
+        started = time.perf_counter()
+        with self._lock:
+            old = self._manifest
+            manifest = dict(old, segments=[], files={})
+            segments = {segment.name: segment for segment in self._segments}
+            builder = self._new_builder(manifest)
+            for path, record in old["files"].items():
+                segment = segments[record["segment"]]
+                first = builder.count
+                for doc in range(record["first"], record["first"] + record["count"]):
+                    passage = segment.passage(doc)
+                    builder.add(passage.source, passage.title, passage.text)
+                manifest["files"][path] = dict(record, segment=builder.name, first=first, count=builder.count - first)
+                if builder.count >= self.segment_passages:
+                    manifest["segments"].append(builder.write(self.directory))
+                    builder = self._new_builder(manifest)
+            if builder.count:
+                manifest["segments"].append(builder.write(self.directory))
+            self._write_manifest(manifest)
+            self._load()
+            for entry in old["segments"]:
+                shutil.rmtree(os.path.join(self.directory, entry["name"]), ignore_errors=True)
+        return {"segments": len(manifest["segments"]), "passages": self.passages, "seconds": time.perf_counter() - started}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return segment, file and passage counts."""
+        self._refresh()
+        return {
+            "segments": len(self._segments),
+            "files": len(self._manifest["files"]),
+            "passages": self.passages,
+            "deleted": sum(len(segment.deleted) for segment in self._segments),
+            "terms": sum(segment.terms for segment in self._segments),
+            "average_length": self._average_length(),
+        }
+
+    def close(self) -> None:
+        """Unmap all segment files."""
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+
+
+def format_passages(passages: List[Passage], max_chars: int = 300) -> str:
+    """Render passages as a numbered reference list for a prompt.
+
+    Args:
+        passages: Retrieved passages
+        max_chars: Maximum characters quoted per passage
+
+    Returns:
+        Lines like ``[1] docs/ml.md — 概要`` followed by the excerpt
+    """
+    blocks = []
+    for number, passage in enumerate(passages, 1):
+        excerpt = " ".join(passage.text.split())
+        if len(excerpt) > max_chars:
+            excerpt = excerpt[:max_chars].rstrip() + "…"
+        blocks.append(f"[{number}] {passage.citation}\n{excerpt}")
+    return "\n\n".join(blocks)
+
+
+_index: Optional[DocumentIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_document_index() -> Optional[DocumentIndex]:
+    """Return the shared index, or ``None`` when ``RESEARCH_INDEX_DIR`` is unset or empty."""
+    global _index
+    from ..utils.config import Config
+    directory = Config.RESEARCH_INDEX_DIR
+    if not directory:
+        return None
+    if _index is None or _index.directory != directory:
+        if not os.path.exists(os.path.join(directory, MANIFEST)):
+            return None
+        with _index_lock:
+            if _index is None or _index.directory != directory:
+                _index = DocumentIndex(directory, Config.RESEARCH_PASSAGE_CHARS)
+    return _index
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Ingest documents into, search, or compact an index."""
+    import argparse
+    from ..utils.config import Config
+
+    parser = argparse.ArgumentParser(description="Local BM25 document index for the research assistant")
+    parser.add_argument("--index", default=Config.RESEARCH_INDEX_DIR, help="index directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="add new and changed files")
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--prune", action="store_true", help="delete files that no longer exist under the paths")
+    search = commands.add_parser("search", help="run a query")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=Config.RESEARCH_TOP_K)
+    commands.add_parser("compact", help="rewrite segments without deleted passages")
+    commands.add_parser("stats", help="show index statistics")
+    args = parser.parse_args(argv)
+    if not args.index:
+        parser.error("--index or RESEARCH_INDEX_DIR is required")
+
+    index = DocumentIndex(args.index, Config.RESEARCH_PASSAGE_CHARS)
+    if args.command == "ingest":
+        print(json.dumps(index.ingest(args.paths, prune=args.prune), indent=2))
+    elif args.command == "search":
+        started = time.perf_counter()
+        passages = index.search(args.query, args.k)
+        print(f"{len(passages)} passages in {(time.perf_counter() - started) * 1000:.1f}ms\n")
+        print(format_passages(passages))
+    elif args.command == "compact":
+        print(json.dumps(index.compact(), indent=2))
+    else:
+        print(json.dumps(index.stats(), indent=2))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""Columnar product catalog with vectorized constraint filtering.
+
+The catalog is loaded once from CSV or Parquet into NumPy columns
+(prices, ratings, integer-coded categories and brands, and attribute
+tags in CSR form). A query's budget and category become boolean masks
+over the price and category columns; requested attributes rank the
+remaining rows, so products that have all of them come first. Only the
+top-N rows are materialized as ``Product`` objects for the prompt.
+
+Columns (header row; only ``name`` and ``price`` are required):
+
+    name, category, brand, price, rating, attributes, description, url
+
+``attributes`` is a ``;``-separated list in CSV ("軽量;長時間バッテリー")
+or a list column in Parquet. Parquet files need the optional
+``pyarrow`` package.
+"""
+
+import csv
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.metrics import METRICS
+
+# Query terms for common categories; a catalog category matches a query
+# when its own name or any term of its group appears in the query
+CATEGORY_SYNONYMS: Tuple[Tuple[str, ...], ...] = (
+    ("ノートパソコン", "ラップトップ", "ノートpc", "laptop", "laptops", "notebook"),
+    ("デスクトップ", "デスクトップpc", "desktop"),
+    ("スマートフォン", "スマホ", "smartphone", "phone"),
+    ("タブレット", "tablet", "ipad"),
+    ("ヘッドホン", "ヘッドフォン", "イヤホン", "headphones", "earbuds"),
+    ("スピーカー", "speaker", "speakers"),
+    ("カメラ", "デジカメ", "camera"),
+    ("モニター", "ディスプレイ", "monitor", "display"),
+    ("キーボード", "keyboard"),
+    ("マウス", "mouse"),
+    ("スマートウォッチ", "腕時計", "smartwatch", "watch"),
+    ("書籍", "参考書", "book", "books"),
+)
+
+ATTRIBUTE_SYNONYMS: Tuple[Tuple[str, ...], ...] = (
+    ("軽量", "軽い", "lightweight"),
+    ("長時間バッテリー", "バッテリー持ち", "battery life"),
+    ("高性能", "ハイスペック", "high performance", "powerful"),
+    ("防水", "waterproof"),
+    ("ノイズキャンセリング", "ノイキャン", "noise cancelling", "anc"),
+    ("ワイヤレス", "無線", "wireless", "bluetooth"),
+    ("ゲーミング", "ゲーム", "gaming"),
+    ("静音", "quiet"),
+    ("大画面", "large screen"),
+    ("4k",),
+)
+
+_CHEAP = re.compile(r"安[いくめ]|安価|格安|最安|コスパ|節約|cheap|affordable|inexpensive", re.IGNORECASE)
+_USE_CASE = re.compile(r"([^\s、。,.!?！？をのにはでとが]{2,12})(?:用|向け)|\bfor ([a-z]+)", re.IGNORECASE)
+
+# Budget amounts: "10万円", "¥50,000", "3千円", "$1000", "800ドル"
+_AMOUNT = re.compile(r"([¥$]\s*)?(\d+(?:\.\d+)?)\s*(万|千|k\b)?\s*(円|ドル|dollars?\b|usd\b|yen\b)?", re.IGNORECASE)
+_RANGE_BEFORE = re.compile(r"(\d+(?:\.\d+)?)\s*(万|千|k)?\s*(?:円|ドル)?\s*(?:〜|~|-|–|から|to)\s*[¥$]?\s*$", re.IGNORECASE)
+_MIN_AFTER = re.compile(r"^\s*(?:以上|超|から)")
+_AROUND_AFTER = re.compile(r"^\s*(?:程度|くらい|ぐらい|前後)")
+_MIN_BEFORE = re.compile(r"(?:over|above|more than|at least)\s*$", re.IGNORECASE)
+_AROUND_BEFORE = re.compile(r"(?:around|about|approximately)\s*$", re.IGNORECASE)
+_SCALES = {"万": 10000.0, "千": 1000.0, "k": 1000.0}
+
+
+def normalize(text: str) -> str:
+    """NFKC-normalize and lowercase text for matching."""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+class Budget:
+    """A price range in one currency (either bound may be open)."""
+
+    __slots__ = ("minimum", "maximum", "currency")
+
+    def __init__(self, minimum: Optional[float] = None, maximum: Optional[float] = None, currency: str = "JPY"):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.currency = currency
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Budget) and (self.minimum, self.maximum, self.currency) == (other.minimum, other.maximum, other.currency)
+
+    def __repr__(self) -> str:
+        return f"Budget({self.minimum!r}, {self.maximum!r}, {self.currency!r})"
+
+    def describe(self) -> str:
+        """Human-readable range, e.g. ``¥50,000〜¥100,000``."""
+        symbol = "$" if self.currency == "USD" else "¥"
+        low = f"{symbol}{self.minimum:,.0f}" if self.minimum is not None else ""
+        high = f"{symbol}{self.maximum:,.0f}" if self.maximum is not None else ""
+        if low and high:
+            return f"{low}〜{high}"
+        return f"{high}以下" if high else f"{low}以上"
+
+
+def _amount_value(number: str, scale: Optional[str]) -> float:
+    return float(number) * _SCALES.get((scale or "").lower(), 1.0)
+
+
+def parse_budget(text: str) -> Optional[Budget]:
+    """Extract a budget from free text.
+
+    Recognizes amounts with a currency or scale ("10万円", "¥50,000",
+    "$1000", "800ドル") and the qualifiers around them: ranges
+    ("5万〜10万円", "5から10万円"), upper and lower bounds ("以下", "まで",
+    "以上", "under", "over"), price bands ("3万円台") and approximate
+    amounts ("程度", "around"). A bare amount is taken as the upper bound.
+    The "k" scale counts only with a currency ("$1.5k"), so specs such as
+    "4k monitor" are not prices, and amounts with a currency are preferred
+    over those with only a scale.
+
+    Returns:
+        The budget, or ``None`` if the text states no amount
+    """
+    text = re.sub(r"(?<=\d),(?=\d{3})", "", normalize(text))
+    amounts = []
+    for match in _AMOUNT.finditer(text):
+        prefix, number, scale, unit = match.groups()
+        if not (prefix or unit) and (scale or "k").lower() == "k":
+            continue
+        usd = "$" in (prefix or "") or (unit or "").lower() in ("ドル", "dollar", "dollars", "usd")
+        amounts.append((match, _amount_value(number, scale), "USD" if usd else "JPY"))
+    if not amounts:
+        return None
+    amounts.sort(key=lambda amount: not (amount[0].group(1) or amount[0].group(4)))
+
+    # A range's lower end may omit the unit ("5から10万円")
+    for match, value, currency in amounts:
+        joined = _RANGE_BEFORE.search(text[:match.start()])
+        if joined:
+            low = _amount_value(joined.group(1), joined.group(2) or match.group(3))
+            return Budget(min(low, value), max(low, value), currency)
+
+    match, value, currency = amounts[0]
+    before, after = text[:match.start()], text[match.end():]
+    if after.startswith("台"):
+        digits = len(match.group(2).split(".")[0])
+        return Budget(value, value + 10 ** (digits - 1) * _SCALES.get((match.group(3) or "").lower(), 1.0), currency)
+    if _MIN_AFTER.match(after) or _MIN_BEFORE.search(before):
+        return Budget(value, None, currency)
+    if _AROUND_AFTER.match(after) or _AROUND_BEFORE.search(before):
+        return Budget(value * 0.8, value * 1.2, currency)
+    return Budget(None, value, currency)
+
+
+class _TermMatcher:
+    """Finds which labels a text mentions, by label name or synonym."""
+
+    def __init__(self, labels: Sequence[str], synonyms: Sequence[Tuple[str, ...]]):
+        self.labels = list(labels)
+        terms: Dict[str, List[int]] = {}
+        for code, label in enumerate(self.labels):
+            key = normalize(label)
+            group = next((group for group in synonyms if key in group), (key,))
+            for term in dict.fromkeys((key,) + tuple(group)):
+                if term:
+                    terms.setdefault(term, []).append(code)
+        self.terms = terms
+        patterns = []
+        for term in sorted(terms, key=len, reverse=True):
+            escaped = re.escape(term)
+            # Latin terms must be whole words ("anc" is not in "balance")
+            patterns.append(rf"(?<![a-z0-9]){escaped}(?![a-z0-9])" if term.isascii() else escaped)
+        self.pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def match(self, text: str) -> List[int]:
+        """Return the codes of the labels mentioned, in order of first mention."""
+        if self.pattern is None:
+            return []
+        codes: Dict[int, None] = {}
+        for found in self.pattern.finditer(normalize(text)):
+            for code in self.terms[found.group(0)]:
+                codes.setdefault(code)
+        return list(codes)
+
+
+_DEFAULT_CATEGORIES = _TermMatcher([group[0] for group in CATEGORY_SYNONYMS], CATEGORY_SYNONYMS)
+_DEFAULT_ATTRIBUTES = _TermMatcher([group[0] for group in ATTRIBUTE_SYNONYMS], ATTRIBUTE_SYNONYMS)
+
+
+def extract_constraints(text: str, catalog: Optional["ProductCatalog"] = None) -> Dict[str, Any]:
+    """Extract budget, categories, attributes, use case and sort order from text.
+
+    With a catalog, categories and attributes are matched against the
+    catalog's own labels (plus synonyms); without one, against the
+    built-in synonym groups.
+
+    Returns:
+        Dictionary with ``budget`` (Budget or None), ``categories`` and
+        ``attributes`` (label lists), ``use_case`` (str or None) and
+        ``sort`` ("price" when the query asks for cheap products, else "rating")
+    """
+    categories = catalog.category_matcher if catalog is not None else _DEFAULT_CATEGORIES
+    attributes = catalog.attribute_matcher if catalog is not None else _DEFAULT_ATTRIBUTES
+    use_case = _USE_CASE.search(normalize(text))
+    return {
+        "budget": parse_budget(text),
+        "categories": [categories.labels[code] for code in categories.match(text)],
+        "attributes": [attributes.labels[code] for code in attributes.match(text)],
+        "use_case": (use_case.group(1) or use_case.group(2)) if use_case else None,
+        "sort": "price" if _CHEAP.search(text) else "rating",
+    }
+
+
+class Product:
+    """One catalog row."""
+
+    __slots__ = ("name", "category", "brand", "price", "rating", "attributes", "description", "url")
+
+    def __init__(self, name: str, category: str, brand: str, price: float, rating: float,
+                 attributes: List[str], description: str = "", url: str = ""):
+        self.name = name
+        self.category = category
+        self.brand = brand
+        self.price = price
+        self.rating = rating
+        self.attributes = attributes
+        self.description = description
+        self.url = url
+
+    def describe(self, currency: str = "JPY") -> str:
+        """One prompt line: name, brand, price, rating, attributes and description."""
+        symbol = "$" if currency == "USD" else "¥"
+        parts = [self.name + (f"（{self.brand}）" if self.brand else ""), f"{symbol}{self.price:,.0f}"]
+        if self.rating:
+            parts.append(f"評価{self.rating:.1f}")
+        if self.attributes:
+            parts.append("特徴: " + "、".join(self.attributes))
+        if self.description:
+            parts.append(self.description)
+        return "／".join(parts)
+
+    def __repr__(self) -> str:
+        return f"Product({self.name!r}, {self.price!r})"
+
+
+class Shortlist:
+    """Result of a catalog query."""
+
+    __slots__ = ("products", "matches", "complete", "elapsed_ms")
+
+    def __init__(self, products: List[Product], matches: int, complete: int, elapsed_ms: float):
+        self.products = products
+        # Rows within the budget and categories
+        self.matches = matches
+        # ...of which have every requested attribute
+        self.complete = complete
+        self.elapsed_ms = elapsed_ms
+
+
+def _column(columns: Dict[str, Sequence[Any]], name: str, rows: int, default: Any = "") -> Sequence[Any]:
+    values = columns.get(name)
+    return [default] * rows if values is None else values
+
+
+def _encode(values: Sequence[Any]) -> Tuple[List[str], np.ndarray]:
+    """Dictionary-encode a string column into (labels, int32 codes)."""
+    array = np.asarray(values)
+    if array.dtype == object:
+        array = np.asarray(["" if value is None else str(value) for value in array], dtype=str)
+    labels, codes = np.unique(array.astype(str), return_inverse=True)
+    return [str(label) for label in labels], codes.astype(np.int32).ravel()
+
+
+def _split_attributes(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(";") if part.strip()]
+    return [str(part) for part in value]
+
+
+def _numbers(values: Sequence[Any]) -> np.ndarray:
+    """Convert a column to float64; empty cells become NaN, "¥1,200" becomes 1200."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+    numbers = np.empty(len(values), dtype=np.float64)
+    for row, value in enumerate(values):
+        if isinstance(value, str):
+            value = value.replace(",", "").lstrip("¥$").strip()
+        numbers[row] = np.nan if value is None or value == "" else float(value)
+    return numbers
+
+
+class ProductCatalog:
+    """Products held as NumPy columns for vectorized filtering."""
+
+    def __init__(self, columns: Dict[str, Sequence[Any]], currency: str = "JPY"):
+        """Build a catalog from column sequences.
+
+        Args:
+            columns: ``name`` and ``price`` plus any of ``category``,
+                ``brand``, ``rating``, ``attributes``, ``description``, ``url``
+            currency: Currency of the prices; budgets in another currency
+                are not applied
+        """
+        rows = len(columns["name"])
+        self.currency = currency
+        self.names = np.asarray(columns["name"], dtype=object)
+        self.prices = _numbers(columns["price"])
+        self.ratings = np.nan_to_num(_numbers(_column(columns, "rating", rows, 0.0))).astype(np.float32)
+        self.categories, self.category_codes = _encode(_column(columns, "category", rows))
+        self.brands, self.brand_codes = _encode(_column(columns, "brand", rows))
+        self.descriptions = np.asarray(_column(columns, "description", rows), dtype=object)
+        self.urls = np.asarray(_column(columns, "url", rows), dtype=object)
+
+        # Attributes in CSR form: row i has attribute_codes[offsets[i]:offsets[i + 1]]
+        vocabulary: Dict[str, int] = {}
+        codes: List[int] = []
+        offsets = np.zeros(rows + 1, dtype=np.int64)
+        for row, value in enumerate(_column(columns, "attributes", rows, None)):
+            for attribute in _split_attributes(value):
+                codes.append(vocabulary.setdefault(attribute, len(vocabulary)))
+            offsets[row + 1] = len(codes)
+        self.attributes = list(vocabulary)
+        self.attribute_codes = np.asarray(codes, dtype=np.int32)
+        self.attribute_offsets = offsets
+        self._attribute_rows: Optional[np.ndarray] = None
+        self._attribute_masks: Dict[int, np.ndarray] = {}
+        self._mask_lock = threading.Lock()
+
+        self.category_matcher = _TermMatcher(self.categories, CATEGORY_SYNONYMS)
+        self.attribute_matcher = _TermMatcher(self.attributes, ATTRIBUTE_SYNONYMS)
+        finite = self.prices[np.isfinite(self.prices)]
+        self._price_scale = float(finite.max()) + 1.0 if len(finite) else 1.0
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @classmethod
+    def from_csv(cls, path: str, currency: str = "JPY") -> "ProductCatalog":
+        """Load a catalog from a CSV file with a header row."""
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = [normalize(column).strip() for column in next(reader)]
+            values: List[List[str]] = [[] for _ in header]
+            for record in reader:
+                for column, value in zip(values, record):
+                    column.append(value)
+                for column in values[len(record):]:
+                    column.append("")
+        return cls(dict(zip(header, values)), currency)
+
+    @classmethod
+    def from_parquet(cls, path: str, currency: str = "JPY") -> "ProductCatalog":
+        """Load a catalog from a Parquet file (requires ``pyarrow``)."""
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        return cls({normalize(name): table.column(name).to_pylist() for name in table.column_names}, currency)
+
+    def product(self, row: int) -> Product:
+        """Materialize one row."""
+        start, end = self.attribute_offsets[row], self.attribute_offsets[row + 1]
+        return Product(
+            name=str(self.names[row]),
+            category=self.categories[self.category_codes[row]],
+            brand=self.brands[self.brand_codes[row]],
+            price=float(self.prices[row]),
+            rating=float(self.ratings[row]),
+            attributes=[self.attributes[code] for code in self.attribute_codes[start:end]],
+            description=str(self.descriptions[row] or ""),
+            url=str(self.urls[row] or ""),
+        )
+
+    def _attribute_mask(self, code: int) -> np.ndarray:
+        """Boolean column of the rows that have an attribute (cached)."""
+        mask = self._attribute_masks.get(code)
+        if mask is None:
+            with self._mask_lock:
+                if self._attribute_rows is None:
+                    self._attribute_rows = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.attribute_offsets))
+                mask = np.zeros(len(self), dtype=bool)
+                mask[self._attribute_rows[self.attribute_codes == code]] = True
+                self._attribute_masks[code] = mask
+        return mask
+
+    def filter(self, budget: Optional[Budget] = None, categories: Sequence[str] = ()) -> np.ndarray:
+        """Boolean mask of the rows within the budget and categories.
+
+        Rows without a price never match a budget.
+        """
+        mask = np.isfinite(self.prices)
+        if budget is not None and budget.currency == self.currency:
+            if budget.minimum is not None:
+                mask &= self.prices >= budget.minimum
+            if budget.maximum is not None:
+                mask &= self.prices <= budget.maximum
+        codes = [self.categories.index(category) for category in categories if category in self.categories]
+        if codes:
+            mask &= np.isin(self.category_codes, codes)
+        return mask
+
+    def shortlist(self, n: int = 5, budget: Optional[Budget] = None, categories: Sequence[str] = (),
+                  attributes: Sequence[str] = (), sort: str = "rating") -> Shortlist:
+        """Return the top-n products within the budget and categories.
+
+        Rows are ranked by how many of the requested attributes they have,
+        then by rating (or by price, lowest first, when ``sort="price"``),
+        with the lower price breaking rating ties.
+        """
+        started = time.perf_counter()
+        rows = np.flatnonzero(self.filter(budget, categories))
+        if not len(rows):
+            return Shortlist([], 0, 0, (time.perf_counter() - started) * 1000)
+        prices = self.prices[rows] / self._price_scale
+        key = -prices if sort == "price" else self.ratings[rows] - 0.05 * prices
+        codes = [self.attributes.index(attribute) for attribute in attributes if attribute in self.attributes]
+        complete = len(rows)
+        if codes:
+            matched = np.zeros(len(rows), dtype=np.int32)
+            for code in codes:
+                matched += self._attribute_mask(code)[rows]
+            key = key + 10.0 * matched
+            complete = int(np.count_nonzero(matched == len(codes)))
+        if len(rows) > n:
+            top = np.argpartition(-key, n - 1)[:n]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-key[top], kind="stable")]
+        products = [self.product(int(rows[index])) for index in top]
+        return Shortlist(products, len(rows), complete, (time.perf_counter() - started) * 1000)
+
+
+def load_catalog(path: str, currency: str = "JPY") -> ProductCatalog:
+    """Load a catalog from a ``.csv`` or ``.parquet`` file."""
+    if path.lower().endswith((".parquet", ".pq")):
+        return ProductCatalog.from_parquet(path, currency)
+    return ProductCatalog.from_csv(path, currency)
+
+
+def format_shortlist(shortlist: Shortlist, currency: str = "JPY") -> str:
+    """Render a shortlist as numbered prompt lines."""
+    return "\n".join(f"{number}. {product.describe(currency)}" for number, product in enumerate(shortlist.products, 1))
+
+
+_catalog: Optional[ProductCatalog] = None
+_catalog_key: Optional[Tuple[str, float]] = None
+_catalog_lock = threading.Lock()
+
+
+def get_product_catalog() -> Optional[ProductCatalog]:
+    """Return the shared catalog, or ``None`` when ``PRODUCT_CATALOG_PATH`` is unset or missing.
+
+    The file is reloaded when its modification time changes.
+    """
+    global _catalog, _catalog_key
+    from ..utils.config import Config
+    path = Config.PRODUCT_CATALOG_PATH
+    if not path:
+        return None
+    try:
+        key = (path, os.stat(path).st_mtime)
+    except OSError:
+        return None
+    if key != _catalog_key:
+        with _catalog_lock:
+            if key != _catalog_key:
+                started = time.perf_counter()
+                _catalog = load_catalog(path, Config.PRODUCT_CATALOG_CURRENCY)
+                _catalog_key = key
+                METRICS.observe("catalog.load_ms", (time.perf_counter() - started) * 1000)
+                METRICS.set_gauge("catalog.rows", len(_catalog))
+    return _catalog
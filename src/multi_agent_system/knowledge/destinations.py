@@ -0,0 +1,513 @@
+"""Destination knowledge base for the trip planning assistant.
+
+Facts about popular destinations (sights, transit, lodging areas,
+seasonal notes, daily budget ranges) are authored as JSON and built
+offline into one compact file. The trip assistant looks a destination
+up by normalized name or alias, selects the building blocks that fit the
+request (interests, season, travel style, trip length, group size) and
+passes them to the model, which then only composes and personalizes the
+itinerary instead of regenerating the same facts on every request.
+
+Store file (little-endian):
+
+    header   "DKB1", uint32 version, uint32 entries
+    table    entries x (uint32 key offset, uint16 key length,
+                        uint64 record offset, uint32 record length),
+             sorted by key
+    keys     normalized names and aliases, UTF-8, concatenated
+    records  zlib-compressed JSON, one per destination (aliases share it)
+
+Source JSON (a list of destinations, or one per file):
+
+    {"name": "京都", "country": "日本", "aliases": ["kyoto", "京都府"],
+     "areas": ["東山", "嵐山"],
+     "sights": [{"name": "清水寺", "area": "東山", "tags": ["history"],
+                 "hours": 1.5, "seasons": ["spring", "autumn"], "note": "..."}],
+     "stays": [{"area": "京都駅周辺", "style": "standard", "note": "..."}],
+     "transit": ["..."],
+     "seasons": {"spring": "...", "summer": "...", "autumn": "...", "winter": "..."},
+     "budget": {"budget": {"lodging": 5000, "food": 3000, "transit": 1000},
+                "standard": {...}, "luxury": {...}},
+     "tips": ["..."]}
+
+Budget amounts are per person per day.
+
+Usage:
+    uv run python -m src.multi_agent_system.knowledge.destinations build examples/destinations.json --output data/destinations.kb
+    uv run python -m src.multi_agent_system.knowledge.destinations show 京都 --store data/destinations.kb
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"DKB1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_ENTRY = struct.Struct("<IHQI")
+
+SEASONS = ("spring", "summer", "autumn", "winter")
+SEASON_NAMES = {"spring": "春", "summer": "夏", "autumn": "秋", "winter": "冬"}
+STYLE_NAMES = {"budget": "節約", "standard": "標準", "luxury": "高級"}
+
+# Request keywords for the interest tags used in the source data
+INTEREST_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "food": ("グルメ", "食べ歩き", "料理", "食事", "food"),
+    "history": ("歴史", "寺", "神社", "城", "史跡", "history", "temple"),
+    "nature": ("自然", "ハイキング", "公園", "景色", "nature", "hiking"),
+    "shopping": ("買い物", "ショッピング", "お土産", "shopping"),
+    "art": ("アート", "美術館", "博物館", "museum", "art"),
+    "onsen": ("温泉", "onsen", "hot spring"),
+    "nightlife": ("夜景", "ナイトライフ", "バー", "nightlife"),
+    "family": ("子供", "子連れ", "家族", "family", "kids"),
+}
+STYLE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "budget": ("格安", "節約", "安く", "安い", "低予算", "バックパッカー", "budget", "cheap"),
+    "luxury": ("高級", "贅沢", "ラグジュアリー", "luxury"),
+}
+# Single-kanji season terms only count on their own ("秋に", not "秋田" or "秋葉原")
+SEASON_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "spring": ("春", "桜", "花見", "春休み", "初春", "spring"),
+    "summer": ("夏", "夏休み", "初夏", "真夏", "summer"),
+    "autumn": ("秋", "紅葉", "晩秋", "autumn", "fall"),
+    "winter": ("冬", "雪", "冬休み", "真冬", "winter"),
+}
+
+_MONTH = re.compile(r"(\d{1,2})\s*月")
+_GROUP = re.compile(r"(\d+)\s*(?:人|名|people|persons|travelers)", re.IGNORECASE)
+_PAIR = re.compile(r"夫婦|カップル|二人|ふたり|couple", re.IGNORECASE)
+_SOLO = re.compile(r"一人旅|ひとり旅|一人で|solo", re.IGNORECASE)
+# Fallbacks when the destination is not in the store: "東京への", "京都に行く",
+# "北海道で一人旅", "to Kyoto"
+_DESTINATION_JA = re.compile(r"([^\s、。,のでとをはが]{2,10}?)(?:への|に行|へ行|旅行|観光|に\d|で(?=[^\s、。,]{0,6}?(?:旅|観光)))")
+_DESTINATION_EN = re.compile(r"\b(?:to|in|visit)\s+([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)?)")
+# Words that the fallbacks catch in front of 旅行/観光 but that are not places
+_NOT_PLACES = frozenset((
+    "家族", "一人", "二人", "三人", "夫婦", "友達", "友人", "子連れ", "親子", "新婚", "卒業", "社員", "修学",
+    "女子", "男子", "学生", "国内", "海外", "週末", "日帰り", "連休", "格安", "弾丸", "贅沢", "高級",
+    "温泉", "グルメ", "観光", "旅行", "個人", "団体", "長期", "短期", "次回", "今度", "初めて",
+))
+_NOT_PLACES_EN = frozenset((
+    "spring", "summer", "autumn", "fall", "winter", "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december", "the", "a", "my", "our",
+))
+_HIRAGANA = re.compile(r"[ぁ-ゖ]")
+_KANJI = "\u4e00-\u9fff々"
+
+
+def normalize_destination(name: str) -> str:
+    """Normalize a destination name for lookup (NFKC, lowercase, single spaces)."""
+    return " ".join(unicodedata.normalize("NFKC", name).lower().split())
+
+
+def _keywords_pattern(keywords: Dict[str, Tuple[str, ...]], standalone_kanji: bool = False) -> "re.Pattern[str]":
+    """Alternation of the keywords, longest first; latin terms match whole words.
+
+    With ``standalone_kanji`` single-kanji terms must not touch another
+    kanji, so they are not found inside longer words.
+    """
+    def pattern(term: str) -> str:
+        if term.isascii():
+            return rf"(?<![a-z]){re.escape(term)}(?![a-z])"
+        if standalone_kanji and len(term) == 1:
+            return rf"(?<![{_KANJI}]){re.escape(term)}(?![{_KANJI}])"
+        return re.escape(term)
+
+    terms = sorted({term for group in keywords.values() for term in group}, key=len, reverse=True)
+    return re.compile("|".join(pattern(term) for term in terms))
+
+
+_INTERESTS = _keywords_pattern(INTEREST_KEYWORDS)
+_STYLES = _keywords_pattern(STYLE_KEYWORDS)
+_SEASONS = _keywords_pattern(SEASON_KEYWORDS, standalone_kanji=True)
+
+
+def _place_ja(candidate: str) -> Optional[str]:
+    """Trim a Japanese fallback candidate to a place-like name, or reject it."""
+    # Verb and adjective endings ("回る", "行きたい") and durations are not places
+    if _HIRAGANA.search(candidate[-1]) or any(character.isdigit() for character in candidate):
+        return None
+    # Keep the name after any leading particles ("夏休みに京都" -> "京都")
+    candidate = _HIRAGANA.split(candidate)[-1]
+    if len(candidate) < 2 or candidate in _NOT_PLACES:
+        return None
+    return candidate
+
+
+def _guess_destination(text: str) -> Optional[str]:
+    """Guess a destination from phrasing when the store does not know it."""
+    for match in _DESTINATION_JA.finditer(normalize_destination(text)):
+        place = _place_ja(match.group(1))
+        if place:
+            return place
+    for match in _DESTINATION_EN.finditer(unicodedata.normalize("NFKC", text)):
+        if not set(match.group(1).lower().split()) & _NOT_PLACES_EN:
+            return match.group(1)
+    return None
+
+
+def _tag(keywords: Dict[str, Tuple[str, ...]], term: str) -> str:
+    return next(tag for tag, group in keywords.items() if term in group)
+
+
+def _latin(character: str) -> bool:
+    return character.isascii() and character.isalnum()
+
+
+def season_of_month(month: int) -> str:
+    """Map a month (1-12) to a season."""
+    return SEASONS[((month - 3) % 12) // 3]
+
+
+def extract_trip_fields(text: str, store: Optional["DestinationStore"] = None) -> Dict[str, Any]:
+    """Extract destination, interests, travel style, season and group size.
+
+    The destination is matched against the store's names and aliases
+    first, then guessed from phrasing like "東京への" or "to Kyoto";
+    guesses that are not place-like (家族, 一人, verbs, seasons) are
+    dropped.
+
+    Returns:
+        Dictionary with ``destination`` (str or None), ``interests`` (tag
+        list), ``travel_style`` ("budget", "standard" or "luxury"),
+        ``season`` (str or None), ``month`` (int or None) and
+        ``group_size`` (int or None)
+    """
+    normalized = normalize_destination(text)
+    destination = store.match(normalized) if store is not None else None
+    if destination is None:
+        destination = _guess_destination(text)
+
+    interests = list(dict.fromkeys(_tag(INTEREST_KEYWORDS, found.group(0)) for found in _INTERESTS.finditer(normalized)))
+    styles = [_tag(STYLE_KEYWORDS, found.group(0)) for found in _STYLES.finditer(normalized)]
+    month_match = _MONTH.search(normalized)
+    month = int(month_match.group(1)) if month_match and 1 <= int(month_match.group(1)) <= 12 else None
+    season_match = _SEASONS.search(normalized)
+    season = season_of_month(month) if month else (_tag(SEASON_KEYWORDS, season_match.group(0)) if season_match else None)
+
+    group_size = None
+    group_match = _GROUP.search(normalized)
+    if group_match:
+        group_size = int(group_match.group(1))
+    elif _PAIR.search(normalized):
+        group_size = 2
+    elif _SOLO.search(normalized):
+        group_size = 1
+    return {
+        "destination": destination,
+        "interests": interests,
+        "travel_style": styles[0] if styles else "standard",
+        "season": season,
+        "month": month,
+        "group_size": group_size,
+    }
+
+
+def build_store(destinations: Iterable[Dict[str, Any]], path: str) -> Dict[str, Any]:
+    """Write destinations to a store file (atomically replacing ``path``).
+
+    Args:
+        destinations: Destination records (see the module docstring)
+        path: Output file
+
+    Returns:
+        Counts of destinations and keys, and the file size in bytes
+    """
+    records: List[bytes] = []
+    keys: Dict[str, int] = {}
+    for destination in destinations:
+        if not destination.get("name"):
+            raise ValueError("Every destination needs a name")
+        index = len(records)
+        records.append(zlib.compress(json.dumps(destination, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9))
+        for name in [destination["name"], *destination.get("aliases", [])]:
+            key = normalize_destination(name)
+            if key and keys.setdefault(key, index) != index:
+                raise ValueError(f"Duplicate destination name or alias: {name}")
+
+    ordered = sorted((key.encode("utf-8"), index) for key, index in keys.items())
+    key_blob = b"".join(key for key, _ in ordered)
+    records_start = _HEADER.size + _ENTRY.size * len(ordered) + len(key_blob)
+    offsets = []
+    position = records_start
+    for record in records:
+        offsets.append(position)
+        position += len(record)
+
+    staging = path + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(staging, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(ordered)))
+        key_offset = 0
+        for key, index in ordered:
+            f.write(_ENTRY.pack(key_offset, len(key), offsets[index], len(records[index])))
+            key_offset += len(key)
+        f.write(key_blob)
+        for record in records:
+            f.write(record)
+    os.replace(staging, path)
+    return {"destinations": len(records), "keys": len(ordered), "bytes": position}
+
+
+def load_sources(paths: Iterable[str]) -> List[Dict[str, Any]]:
+    """Read destination records from JSON files and directories of JSON files."""
+    destinations: List[Dict[str, Any]] = []
+    for root in paths:
+        files = [root] if os.path.isfile(root) else sorted(
+            os.path.join(folder, name) for folder, _, names in os.walk(root) for name in names if name.endswith(".json")
+        )
+        for path in files:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            destinations.extend(data if isinstance(data, list) else [data])
+    return destinations
+
+
+class DestinationStore:
+    """Read-only, memory-mapped destination store."""
+
+    def __init__(self, path: str, cache_size: int = 64):
+        """Open a store file built by :func:`build_store`.
+
+        Args:
+            path: Store file
+            cache_size: Decoded destinations kept in memory
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.entries = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported destination store: {path}; rebuild it")
+        self._keys_start = _HEADER.size + _ENTRY.size * self.entries
+        self._cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._matcher: Optional[Tuple[set, List[int]]] = None
+
+    def _entry(self, position: int) -> Tuple[bytes, int, int]:
+        key_offset, key_length, record_offset, record_length = _ENTRY.unpack_from(self._map, _HEADER.size + _ENTRY.size * position)
+        start = self._keys_start + key_offset
+        return self._map[start:start + key_length], record_offset, record_length
+
+    def keys(self) -> List[str]:
+        """All normalized names and aliases, sorted."""
+        return [self._entry(position)[0].decode("utf-8") for position in range(self.entries)]
+
+    def _find(self, key: bytes) -> Optional[Tuple[int, int]]:
+        low, high = 0, self.entries
+        while low < high:
+            middle = (low + high) // 2
+            found, offset, length = self._entry(middle)
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                return offset, length
+        return None
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return a destination by name or alias (``None`` if unknown)."""
+        located = self._find(normalize_destination(name).encode("utf-8"))
+        if located is None:
+            return None
+        offset, length = located
+        with self._lock:
+            record = self._cache.get(offset)
+            if record is not None:
+                self._cache.move_to_end(offset)
+                return record
+        record = json.loads(zlib.decompress(self._map[offset:offset + length]))
+        with self._lock:
+            self._cache[offset] = record
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def match(self, text: str) -> Optional[str]:
+        """Return the leftmost (then longest) name or alias mentioned in normalized text."""
+        if self._matcher is None:
+            keys = set(self.keys())
+            self._matcher = (keys, sorted({len(key) for key in keys}, reverse=True))
+        keys, lengths = self._matcher
+        for start in range(len(text)):
+            for length in lengths:
+                candidate = text[start:start + length]
+                if len(candidate) == length and candidate in keys:
+                    # Latin names must be whole words ("nara" is not in "narabi")
+                    if candidate.isascii() and (_latin(text[start - 1:start]) or _latin(text[start + length:start + length + 1])):
+                        continue
+                    return candidate
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return key and size counts."""
+        return {"keys": self.entries, "bytes": len(self._map), "cached": len(self._cache)}
+
+    def close(self) -> None:
+        """Unmap the store file."""
+        self._map.close()
+
+
+def select_blocks(destination: Dict[str, Any], trip: Dict[str, Any], max_sights: int = 8) -> Dict[str, Any]:
+    """Select the building blocks of a destination that fit a request.
+
+    Sights are ranked by how many requested interests they cover, then by
+    whether they suit the season, keeping the source order (popularity)
+    for ties. Lodging follows the travel style; the budget estimate is
+    scaled by trip length and group size when known.
+
+    Args:
+        destination: Record returned by :meth:`DestinationStore.get`
+        trip: Fields from ``extract_trip_fields`` plus ``days``
+        max_sights: Maximum sights to include
+
+    Returns:
+        Dictionary of the selected blocks
+    """
+    interests = set(trip.get("interests") or ())
+    season = trip.get("season")
+    style = trip.get("travel_style") or "standard"
+
+    def rank(item: Tuple[int, Dict[str, Any]]) -> Tuple[int, int, int]:
+        position, sight = item
+        return (-len(interests & set(sight.get("tags", ()))), 0 if not season or season in sight.get("seasons", SEASONS) else 1, position)
+
+    sights = [sight for _, sight in sorted(enumerate(destination.get("sights", [])), key=rank)[:max_sights]]
+    stays = [stay for stay in destination.get("stays", []) if stay.get("style", style) == style] or destination.get("stays", [])
+    seasons = destination.get("seasons", {})
+    notes = {season: seasons[season]} if season in seasons else seasons
+
+    budget = None
+    daily = destination.get("budget", {}).get(style)
+    if daily:
+        per_day = sum(daily.values())
+        days = trip.get("days")
+        people = trip.get("group_size") or 1
+        budget = {"style": style, "items": daily, "per_day": per_day, "days": days, "people": people,
+                  "total": per_day * days * people if days else None}
+    return {
+        "name": destination["name"],
+        "country": destination.get("country", ""),
+        "areas": destination.get("areas", []),
+        "sights": sights,
+        "stays": stays[:3],
+        "transit": destination.get("transit", []),
+        "seasons": notes,
+        "month": trip.get("month"),
+        "budget": budget,
+        "tips": destination.get("tips", []),
+    }
+
+
+_BUDGET_ITEMS = {"lodging": "宿泊", "food": "食事", "transit": "交通", "activities": "観光"}
+
+
+def format_blocks(blocks: Dict[str, Any]) -> str:
+    """Render selected blocks as compact reference text for the prompt."""
+    lines = [f"目的地: {blocks['name']}" + (f"（{blocks['country']}）" if blocks["country"] else "")]
+    if blocks["areas"]:
+        lines.append("主なエリア: " + "、".join(blocks["areas"]))
+    if blocks["sights"]:
+        lines.append("観光スポット:")
+        for sight in blocks["sights"]:
+            details = "、".join(part for part in (sight.get("area", ""), f"約{sight['hours']:g}時間" if sight.get("hours") else "") if part)
+            lines.append(f"- {sight['name']}" + (f"（{details}）" if details else "") + (f": {sight['note']}" if sight.get("note") else ""))
+    if blocks["transit"]:
+        lines.append("交通:")
+        lines.extend(f"- {item}" for item in blocks["transit"])
+    if blocks["stays"]:
+        lines.append("宿泊エリア:")
+        lines.extend(f"- {stay['area']}（{STYLE_NAMES.get(stay.get('style', ''), stay.get('style', ''))}）: {stay.get('note', '')}".rstrip(": ") for stay in blocks["stays"])
+    if blocks["seasons"]:
+        month = f"（{blocks['month']}月）" if blocks["month"] else ""
+        lines.append("季節:")
+        lines.extend(f"- {SEASON_NAMES.get(season, season)}{month if len(blocks['seasons']) == 1 else ''}: {note}" for season, note in blocks["seasons"].items())
+    budget = blocks["budget"]
+    if budget:
+        items = "／".join(f"{_BUDGET_ITEMS.get(name, name)}¥{amount:,.0f}" for name, amount in budget["items"].items())
+        line = f"予算の目安（1人1日・{STYLE_NAMES.get(budget['style'], budget['style'])}）: {items}、計¥{budget['per_day']:,.0f}"
+        if budget["total"]:
+            line += f"（{budget['days']}日間・{budget['people']}人で約¥{budget['total']:,.0f}）"
+        lines.append(line)
+    if blocks["tips"]:
+        lines.append("注意事項:")
+        lines.extend(f"- {tip}" for tip in blocks["tips"])
+    return "\n".join(lines)
+
+
+_store: Optional[DestinationStore] = None
+_store_key: Optional[Tuple[str, float]] = None
+_store_lock = threading.Lock()
+
+
+def get_destination_store() -> Optional[DestinationStore]:
+    """Return the shared store, or ``None`` when ``DESTINATION_KB_PATH`` is unset or missing.
+
+    A rebuilt store file is picked up when its modification time changes.
+    """
+    global _store, _store_key
+    from ..utils.config import Config
+    path = Config.DESTINATION_KB_PATH
+    if not path:
+        return None
+    try:
+        key = (path, os.stat(path).st_mtime)
+    except OSError:
+        return None
+    if key != _store_key:
+        with _store_lock:
+            if key != _store_key:
+                # The replaced map is released once in-flight lookups drop it
+                _store = DestinationStore(path)
+                _store_key = key
+    return _store
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Build a store from JSON sources or look a destination up."""
+    import argparse
+    from ..utils.config import Config
+
+    parser = argparse.ArgumentParser(description="Destination knowledge base for the trip planning assistant")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a store from JSON files or directories")
+    build.add_argument("sources", nargs="+")
+    build.add_argument("--output", default=Config.DESTINATION_KB_PATH, help="store file")
+    show = commands.add_parser("show", help="show the blocks selected for a request")
+    show.add_argument("request", help="destination name or a full trip request")
+    show.add_argument("--store", default=Config.DESTINATION_KB_PATH, help="store file")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if not args.output:
+            parser.error("--output or DESTINATION_KB_PATH is required")
+        started = time.perf_counter()
+        result = build_store(load_sources(args.sources), args.output)
+        result["seconds"] = time.perf_counter() - started
+        print(json.dumps(result, indent=2))
+        return
+    if not args.store:
+        parser.error("--store or DESTINATION_KB_PATH is required")
+    store = DestinationStore(args.store)
+    fields = extract_trip_fields(args.request, store)
+    destination = store.get(fields["destination"] or args.request)
+    if destination is None:
+        print(f"Unknown destination: {fields['destination'] or args.request}")
+        return
+    print(format_blocks(select_blocks(destination, fields, Config.DESTINATION_MAX_SIGHTS)))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
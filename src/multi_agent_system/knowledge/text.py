@@ -0,0 +1,177 @@
+"""Document loading, passage splitting and tokenization for the local index."""
+
+import html.parser
+import os
+import re
+import unicodedata
+from typing import Iterator, List, Optional, Tuple
+
+# Latin words and numbers, and runs of Japanese script
+_TOKEN = re.compile(r"[a-z0-9]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+")
+_HIRAGANA = re.compile(r"^[\u3040-\u309f]+$")
+_HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+_SENTENCE_END = re.compile(r"(?<=[。．！？!?])|(?<=[.])\s")
+
+TEXT_EXTENSIONS = (".md", ".markdown", ".txt")
+HTML_EXTENSIONS = (".html", ".htm")
+PDF_EXTENSIONS = (".pdf",)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into index terms.
+
+    Latin words are lowercased (after NFKC normalization); runs of
+    Japanese script become overlapping character bigrams, since there is
+    no word segmenter. Bigrams made only of hiragana are dropped: they are
+    mostly particles and inflections ("につ", "いて") and would produce
+    the longest postings lists for the least signal.
+    """
+    tokens = []
+    for match in _TOKEN.finditer(unicodedata.normalize("NFKC", text).lower()):
+        run = match.group(0)
+        if run[0] < "\u3040":
+            tokens.append(run)
+        elif len(run) == 1:
+            if not _HIRAGANA.match(run):
+                tokens.append(run)
+        else:
+            for i in range(len(run) - 1):
+                bigram = run[i:i + 2]
+                if not _HIRAGANA.match(bigram):
+                    tokens.append(bigram)
+    return tokens
+
+
+class _HTMLText(html.parser.HTMLParser):
+    """Extracts readable text from HTML, turning headings into Markdown headings."""
+
+    _SKIP = {"script", "style", "noscript", "template", "svg"}
+    _BLOCK = {"p", "div", "li", "tr", "br", "section", "article", "table", "pre", "blockquote", "ul", "ol"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.title = ""
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif len(tag) == 2 and tag[0] == "h" and tag[1].isdigit():
+            self.parts.append("\n\n" + "#" * int(tag[1]) + " ")
+        elif tag in self._BLOCK:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif (len(tag) == 2 and tag[0] == "h" and tag[1].isdigit()) or tag in self._BLOCK:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._in_title:
+            self.title += data.strip()
+        else:
+            self.parts.append(re.sub(r"\s+", " ", data))
+
+
+def html_to_text(markup: str) -> str:
+    """Convert HTML to Markdown-like plain text (headings kept as ``#``)."""
+    parser = _HTMLText()
+    parser.feed(markup)
+    parser.close()
+    text = "".join(parser.parts)
+    if parser.title:
+        text = f"# {parser.title}\n\n{text}"
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+
+def read_document(path: str) -> Optional[str]:
+    """Read a supported file as text (``None`` for unsupported files).
+
+    PDF files need the optional ``pypdf`` package; without it they are
+    skipped (extract them to ``.txt`` instead).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in TEXT_EXTENSIONS:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    if extension in HTML_EXTENSIONS:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return html_to_text(f.read())
+    if extension in PDF_EXTENSIONS:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            return None
+        return "\n\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    return None
+
+
+def _split_long(paragraph: str, max_chars: int) -> Iterator[str]:
+    """Split an oversized paragraph at sentence ends (hard-cut as a last resort)."""
+    chunk = ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            if chunk:
+                yield chunk
+                chunk = ""
+            yield sentence[:max_chars]
+            sentence = sentence[max_chars:]
+        if len(chunk) + len(sentence) > max_chars and chunk:
+            yield chunk
+            chunk = ""
+        chunk += sentence
+    if chunk.strip():
+        yield chunk
+
+
+def split_passages(text: str, max_chars: int = 600) -> List[Tuple[str, str]]:
+    """Split a document into passages of at most ``max_chars`` characters.
+
+    Paragraphs are packed together until the limit is reached; a heading
+    always starts a new passage and becomes its title.
+
+    Returns:
+        List of (heading, passage text) pairs
+    """
+    passages: List[Tuple[str, str]] = []
+    heading = ""
+    current: List[str] = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        body = "\n\n".join(current).strip()
+        if body:
+            passages.append((heading, body))
+        current, size = [], 0
+
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        match = _HEADING.match(block.splitlines()[0])
+        if match:
+            flush()
+            heading = match.group(2)
+            block = "\n".join(block.splitlines()[1:]).strip()
+            if not block:
+                continue
+        pieces = [block] if len(block) <= max_chars else list(_split_long(block, max_chars))
+        for piece in pieces:
+            if size + len(piece) > max_chars and current:
+                flush()
+            current.append(piece)
+            size += len(piece)
+    flush()
+    return passages
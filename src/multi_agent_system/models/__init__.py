@@ -0,0 +1 @@
+"""Model backends package initialization."""
@@ -0,0 +1,180 @@
+"""Pluggable model backends and model tiers for the multi-agent system."""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+from ..utils.config import Config
+from ..utils.metrics import METRICS
+
+
+# USD per 1M tokens (input, output); unknown models are reported at zero cost
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "anthropic.claude-3-5-haiku-20241022-v1:0": (0.80, 4.00),
+    "anthropic.claude-3-5-sonnet-20241022-v2:0": (3.00, 15.00),
+}
+
+# Backend name -> (factory, availability check)
+_BACKENDS: Dict[str, Tuple[Callable[..., Any], Callable[[], bool]]] = {}
+
+
+class ModelTier:
+    """A named model tier resolved to a backend and model id."""
+
+    __slots__ = ("name", "backend", "model_id")
+
+    def __init__(self, name: str, backend: str, model_id: str):
+        """Initialize the tier.
+
+        Args:
+            name: Tier name ("small" or "large")
+            backend: Registered backend name
+            model_id: Model identifier passed to the backend
+        """
+        self.name = name
+        self.backend = backend
+        self.model_id = model_id
+
+    def __repr__(self) -> str:
+        """Detailed string representation of the tier."""
+        return f"ModelTier(name='{self.name}', backend='{self.backend}', model_id='{self.model_id}')"
+
+
+def register_backend(name: str, available: Callable[[], bool] = lambda: True):
+    """Register a model backend factory.
+
+    The factory receives ``model_id``, ``temperature`` and ``max_tokens``
+    and returns a Strands model instance.
+
+    Args:
+        name: Backend name used in configuration
+        available: Callable reporting whether the backend is configured
+    """
+    def decorator(factory: Callable[..., Any]) -> Callable[..., Any]:
+        _BACKENDS[name] = (factory, available)
+        return factory
+    return decorator
+
+
+def backend_available(name: str) -> bool:
+    """Return whether a backend is registered and configured."""
+    entry = _BACKENDS.get(name)
+    return entry is not None and entry[1]()
+
+
+def create_model(backend: str, model_id: str, temperature: float, max_tokens: int) -> Any:
+    """Create a Strands model using a registered backend.
+
+    Args:
+        backend: Registered backend name
+        model_id: Model identifier
+        temperature: Sampling temperature
+        max_tokens: Maximum output tokens
+
+    Returns:
+        The Strands model instance
+    """
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown model backend: {backend}")
+    factory, _ = _BACKENDS[backend]
+    return factory(model_id=model_id, temperature=temperature, max_tokens=max_tokens)
+
+
+def get_tier(name: str) -> ModelTier:
+    """Resolve a tier name to its configured backend and model.
+
+    Args:
+        name: Tier name ("small" or "large"); unknown names resolve to "large"
+
+    Returns:
+        The resolved ``ModelTier``
+    """
+    if name == "small":
+        return ModelTier("small", Config.SMALL_MODEL_BACKEND, Config.SMALL_MODEL)
+    return ModelTier("large", Config.LARGE_MODEL_BACKEND, Config.LARGE_MODEL)
+
+
+def estimate_cost(model_id: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    """Estimate the USD cost of a call from the price table."""
+    input_price, output_price = MODEL_PRICES.get(model_id or "", (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def record_tier_usage(tier: str, response: Any) -> None:
+    """Record latency, tokens and cost of an ``LLMResponse`` under its tier.
+
+    Args:
+        tier: Tier name the call was made on
+        response: The ``LLMResponse`` of the call
+    """
+    prefix = f"tiers.{tier}"
+    METRICS.incr(f"{prefix}.calls")
+    if not response.ok:
+        METRICS.incr(f"{prefix}.errors")
+    METRICS.observe(f"{prefix}.latency_ms", response.latency_ms)
+    METRICS.incr(f"{prefix}.input_tokens", response.input_tokens)
+    METRICS.incr(f"{prefix}.output_tokens", response.output_tokens)
+    METRICS.incr(f"{prefix}.cost_usd", estimate_cost(response.model_id, response.input_tokens, response.output_tokens))
+
+
+def tier_report() -> Dict[str, Dict[str, float]]:
+    """Return per-tier call counts, latency, token and cost totals."""
+    report = {}
+    for tier in ("small", "large"):
+        prefix = f"tiers.{tier}"
+        latency = METRICS.summary(f"{prefix}.latency_ms")
+        report[tier] = {
+            "calls": METRICS.counter(f"{prefix}.calls"),
+            "errors": METRICS.counter(f"{prefix}.errors"),
+            "mean_latency_ms": latency["mean"],
+            "max_latency_ms": latency["max"],
+            "input_tokens": METRICS.counter(f"{prefix}.input_tokens"),
+            "output_tokens": METRICS.counter(f"{prefix}.output_tokens"),
+            "cost_usd": METRICS.counter(f"{prefix}.cost_usd"),
+        }
+    report["escalations"] = {"count": METRICS.counter("tiers.escalations")}
+    return report
+
+
+@register_backend("openai", available=lambda: bool(Config.OPENAI_API_KEY))
+def _openai_backend(model_id: str, temperature: float, max_tokens: int) -> Any:
+    from strands.models.openai import OpenAIModel
+    return OpenAIModel(
+        api_key=Config.OPENAI_API_KEY,
+        model_id=model_id,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+
+
+@register_backend("bedrock", available=lambda: bool(Config.AWS_ACCESS_KEY_ID and Config.AWS_SECRET_ACCESS_KEY))
+def _bedrock_backend(model_id: str, temperature: float, max_tokens: int) -> Any:
+    import boto3
+    from strands.models import BedrockModel
+    session = boto3.Session(
+        aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
+        region_name=Config.AWS_DEFAULT_REGION
+    )
+    return BedrockModel(
+        model_id=model_id,
+        boto_session=session,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+
+
+@register_backend("local", available=lambda: bool(Config.LOCAL_MODEL_BASE_URL))
+def _local_backend(model_id: str, temperature: float, max_tokens: int) -> Any:
+    from strands.models.openai import OpenAIModel
+    return OpenAIModel(
+        client_args={
+            "api_key": Config.LOCAL_MODEL_API_KEY,
+            "base_url": Config.LOCAL_MODEL_BASE_URL,
+        },
+        model_id=model_id,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
@@ -1,8 +1,52 @@
 """Orchestrator Agent implementation."""
 
-from typing import Any, Dict, Optional, List
+import asyncio
+import functools
+import hashlib
+import re
+import time
+from concurrent.futures import Future, wait
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
+from strands import Agent
 from .agents.base_agent import BaseAgent
-from .tools.agent_tools import AVAILABLE_TOOLS
+from .agents.llm_response import LLMResponse
+from .tools.agent_tools import (
+    AVAILABLE_TOOLS, prompt_version, run_edit, run_followup, run_lookup, run_tool, run_tool_async,
+    stream_edit_async, stream_followup_async, stream_lookup_async, stream_tool_async
+)
+from .tools.followups import detect_edit, record_edit
+from .tools.lookups import Question, lookup, parse_lookup, turn_indexes
+from .tools.routing import get_router, record_fanout
+from .tools.tool_calling import SpecialistToolset, record_tool_calling
+from .utils.answer_store import get_answer_store, log_query
+from .utils.config import Config
+from .utils.metrics import METRICS
+from .utils.profiling import get_profiler, request_id_for
+from .utils.scheduler import SchedulerBusyError, get_scheduler
+from .utils.sessions import SessionStore, Turn
+
+# Returned instead of an answer when the scheduler queue is full
+BUSY_MESSAGE = "申し訳ございません。現在リクエストが集中しています。しばらくしてから再度お試しください。"
+
+# Shown in place of a specialist section that missed the fan-out deadline
+PENDING_MESSAGE = "⏳ このセクションは生成中です。完了次第、回答が更新されます。"
+
+# Conversational queries the orchestrator answers itself
+GREETING_WORDS = ("hello", "hi", "hey", "good morning", "good afternoon", "こんにちは", "おはよう", "こんばんは")
+HELP_WORDS = ("help", "what can you do", "capabilities", "ヘルプ", "できること", "機能")
+# Closing remarks that are not follow-ups for the current specialist
+CLOSING_WORDS = ("thanks", "thank you", "bye", "ありがとう", "了解", "さようなら", "またね")
+_CONVERSATIONAL = re.compile("|".join(
+    rf"\b{re.escape(word)}\b" if word.isascii() else re.escape(word)
+    for word in GREETING_WORDS + HELP_WORDS + CLOSING_WORDS
+))
+
+# Example queries suggested by the help text (always precomputed by the precompute job)
+EXAMPLE_QUERIES = (
+    ("機械学習アルゴリズムについて教えて", "研究"),
+    ("プログラミング用の良いラップトップを推奨して", "製品"),
+    ("東京への5日間の旅行を計画して", "旅行"),
+)
 
 
 class OrchestratorAgent(BaseAgent):
@@ -29,6 +73,18 @@ class OrchestratorAgent(BaseAgent):
 - 常に役立つ、正確、そしてよく構造化された応答を提供する
 - 情報が専門エージェントから来る場合は明確に示す"""
     
+    # Appended to the system prompt in tool-calling mode (ROUTING_MODE=llm)
+    TOOL_CALLING_PROMPT = """専門エージェントはツールとして呼び出せます（research_assistant、product_recommendation、trip_planning）。
+
+ツールの使い方:
+- クエリに必要な専門エージェントだけを呼び出す。挨拶や簡単な質問にはツールを使わずに直接答える
+- 複数の専門分野にまたがるクエリでは、必要なツールを同じターンでまとめて呼び出す（同時に実行される）
+- 各ツールには、ユーザーの依頼のうちその専門分野に関係する部分を渡す
+- ツールの結果を統合し、重複を除いた一貫性のある回答を作成する。専門エージェントの具体的な内容は省略しない"""
+    
+    # Routing and coordination do not need the largest model
+    MODEL_TIER = "small"
+    
     def __init__(self, **kwargs):
         """Initialize the Orchestrator Agent."""
         super().__init__(
@@ -37,30 +93,103 @@ class OrchestratorAgent(BaseAgent):
             **kwargs
         )
         self.tools = AVAILABLE_TOOLS
+        self.router = get_router()
+        self.sessions = SessionStore(Config.SESSION_MAX_SESSIONS, Config.SESSION_MAX_TURNS, Config.SESSION_TTL_SECONDS)
     
     def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Process a user query by coordinating appropriate specialized agents.
         
+        The request id (``context["request_id"]`` if it is a valid id, see
+        ``request_id_for``, or a new one) is returned in the result and
+        names the profile files when profiling is on.
+        
         Args:
             query: The user's query
             context: Optional context information
             
         Returns:
-            A dictionary containing the response and metadata
+            See :meth:`_process_query`
+        """
+        request_id = request_id_for(context)
+        with get_profiler().profile_request(request_id):
+            result = self._process_query(query, context)
+        result["request_id"] = request_id
+        if Config.QUERY_LOG_PATH:
+            log_query(Config.QUERY_LOG_PATH, query, result)
+        return result
+    
+    def _process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Process a user query by coordinating appropriate specialized agents.
+        
+        Args:
+            query: The user's query
+            context: Optional context information
+            
+        Returns:
+            A dictionary containing the response and metadata. When
+            specialists were used, ``llm_responses`` maps each tool name
+            to its ``LLMResponse``. If ``Config.FANOUT_DEADLINE_SECONDS``
+            expired before every specialist finished, the response holds
+            placeholders and ``pending`` maps the late tools to futures;
+            pass the result to :meth:`complete_pending` for the full answer.
+            Answers served from the precomputed store have ``precomputed``
+            set and no ``llm_responses``. A follow-up that edits the
+            previous answer of the session has ``edit`` set to the kind of
+            edit (see :meth:`_followup_edit`); a question about earlier
+            answers has ``lookup`` set to "index" when it was answered from
+            them without an LLM call, or to "llm" (see :meth:`_process_lookup`).
+            A follow-up without keywords answered by the session's
+            specialist has ``sticky`` set (see :meth:`_sticky_tool`).
+            In tool-calling mode the result has ``tool_calling`` set (see
+            :meth:`_process_tool_calling`).
         """
         try:
+            # Frequent queries may have a precomputed answer
+            precomputed = self._precomputed_answer(query, context)
+            if precomputed is not None:
+                return precomputed
+            
             # Analyze the query to determine which tools to use
             selected_tools = self._analyze_query_and_select_tools(query)
             
+            # "2日目は何だっけ？" etc. is answered from the session's earlier answers
+            found = self._followup_lookup(query, context, selected_tools)
+            if found is not None:
+                return self._process_lookup(query, context, *found)
+            
+            # "3日間にして" etc. patches the previous answer instead of starting over
+            followup = self._followup_edit(query, context, selected_tools)
+            if followup is not None:
+                return self._process_edit(query, context, *followup)
+            
+            if Config.ROUTING_MODE == "llm":
+                # The orchestrator's model picks the specialists (tool calling)
+                result = self._process_tool_calling(query, context)
+                if result is not None:
+                    return result
+            
             if not selected_tools:
+                # "ホテルは？" etc. continues the conversation with the session's specialist
+                sticky = self._sticky_tool(query, context)
+                if sticky is not None:
+                    return self._process_followup(query, context, sticky)
+                
                 # Handle simple queries directly
                 return {
                     "response": self._handle_direct_query(query),
                     "agent_used": "Orchestrator"
                 }
             
-            # Process with selected tools
-            responses = self._process_with_tools(query, selected_tools, context)
+            # Pick the model tier for this class of query
+            query_class = self._classify_query(query, selected_tools)
+            tier = Config.QUERY_CLASS_TIERS.get(query_class)
+            
+            # Process with selected tools (stopping at the fan-out deadline if one applies)
+            deadline = self._fanout_deadline(selected_tools)
+            if deadline:
+                responses, pending = self._process_with_deadline(query, selected_tools, context, tier, deadline)
+            else:
+                responses, pending = self._process_with_tools(query, selected_tools, context, tier), {}
             
             # Synthesize the final response
             final_response = self._synthesize_responses(query, responses)
@@ -68,62 +197,999 @@ class OrchestratorAgent(BaseAgent):
             # Determine which agent was used
             agent_used = "Multiple Agents" if len(selected_tools) > 1 else selected_tools[0].replace("_", " ").title()
             
+            result = {
+                "response": final_response,
+                "agent_used": agent_used,
+                "query_class": query_class,
+                "llm_responses": responses
+            }
+            if pending:
+                # Late sections: call complete_pending() to fill them in
+                result["pending"] = pending
+            else:
+                self._record_turn(context, query, responses)
+            return result
+            
+        except SchedulerBusyError as e:
+            return self._busy_response(e)
+        except Exception as e:
+            return {
+                "response": f"Error in orchestrator agent: {str(e)}",
+                "agent_used": "Orchestrator"
+            }
+    
+    async def process_query_async(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of :meth:`process_query`."""
+        request_id = request_id_for(context)
+        with get_profiler().profile_request(request_id):
+            result = await self._process_query_async(query, context)
+        result["request_id"] = request_id
+        if Config.QUERY_LOG_PATH:
+            log_query(Config.QUERY_LOG_PATH, query, result)
+        return result
+    
+    async def _process_query_async(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of :meth:`_process_query`.
+        
+        Selected specialists run concurrently, and identical in-flight
+        specialist calls from other sessions are coalesced.
+        
+        Args:
+            query: The user's query
+            context: Optional context information
+            
+        Returns:
+            A dictionary containing the response and metadata
+        """
+        try:
+            precomputed = self._precomputed_answer(query, context)
+            if precomputed is not None:
+                return precomputed
+            
+            selected_tools = self._analyze_query_and_select_tools(query)
+            
+            found = self._followup_lookup(query, context, selected_tools)
+            if found is not None:
+                return await asyncio.to_thread(self._process_lookup, query, context, *found)
+            
+            followup = self._followup_edit(query, context, selected_tools)
+            if followup is not None:
+                return await self._process_edit_async(query, context, *followup)
+            
+            if Config.ROUTING_MODE == "llm":
+                result = await asyncio.to_thread(self._process_tool_calling, query, context)
+                if result is not None:
+                    return result
+            
+            if not selected_tools:
+                sticky = self._sticky_tool(query, context)
+                if sticky is not None:
+                    return await asyncio.to_thread(self._process_followup, query, context, sticky)
+                return {
+                    "response": self._handle_direct_query(query),
+                    "agent_used": "Orchestrator"
+                }
+            
+            query_class = self._classify_query(query, selected_tools)
+            tier = Config.QUERY_CLASS_TIERS.get(query_class)
+            
+            responses = await self._process_with_tools_async(query, selected_tools, context, tier)
+            self._record_turn(context, query, responses)
+            final_response = self._synthesize_responses(query, responses)
+            agent_used = "Multiple Agents" if len(selected_tools) > 1 else selected_tools[0].replace("_", " ").title()
+            
             return {
                 "response": final_response,
-                "agent_used": agent_used
+                "agent_used": agent_used,
+                "query_class": query_class,
+                "llm_responses": responses
             }
             
+        except SchedulerBusyError as e:
+            return self._busy_response(e)
         except Exception as e:
             return {
                 "response": f"Error in orchestrator agent: {str(e)}",
                 "agent_used": "Orchestrator"
             }
     
-    def _analyze_query_and_select_tools(self, query: str) -> List[str]:
+    async def stream_query_async(self, query: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the processing of a query as events.
+        
+        Specialists stream concurrently; their deltas are interleaved as
+        they arrive and the synthesized answer is sent last.
+        
+        Args:
+            query: The user's query
+            context: Optional context information
+            
+        Yields:
+            Event dictionaries: ``{"event": "route", "tools": [...]}``,
+            ``{"event": "delta", "tool": name, "text": chunk}`` and finally
+            ``{"event": "done", "response": ..., "agent_used": ...}``. When
+            the fan-out deadline expires first, a ``partial`` event carries
+            the synthesized answer with placeholders, and each late tool
+            then sends a ``section`` event with the updated answer.
+            A precomputed answer is sent as a single ``done`` event.
+            For a follow-up edit the ``route`` and ``done`` events carry
+            ``edit`` and the deltas are those of the full updated answer;
+            for a follow-up sent to the session's specialist they carry
+            ``sticky``.
+            A lookup answered from earlier answers is sent as ``route`` and
+            ``done`` events with ``lookup`` set.
+            In tool-calling mode (``ROUTING_MODE=llm``) the ``route`` event
+            has no tools, a ``tool_call`` event is sent for each specialist
+            the model calls and the deltas (tool "orchestrator") are the
+            model's text, ending with its synthesized answer (see
+            :meth:`_stream_tool_calling`).
+        """
+        precomputed = self._precomputed_answer(query, context)
+        if precomputed is not None:
+            yield {"event": "done", **precomputed}
+            return
+        
+        selected_tools = self._analyze_query_and_select_tools(query)
+        found = self._followup_lookup(query, context, selected_tools)
+        if found is not None:
+            async for event in self._stream_lookup(query, *found):
+                yield event
+            return
+        
+        followup = self._followup_edit(query, context, selected_tools)
+        if followup is None and Config.ROUTING_MODE == "llm":
+            toolset = self._toolset(context)
+            agent = self._tool_calling_agent(toolset)
+            if agent is not None:
+                async for event in self._stream_tool_calling(query, context, toolset, agent):
+                    yield event
+                return
+        sticky = self._sticky_tool(query, context) if followup is None and not selected_tools else None
+        if followup is not None:
+            turn, kind, selected_tools = followup
+            yield {"event": "route", "tools": selected_tools, "edit": kind}
+        elif sticky is not None:
+            selected_tools, history = [sticky], self._history(context, sticky)
+            yield {"event": "route", "tools": selected_tools, "sticky": True}
+        else:
+            yield {"event": "route", "tools": selected_tools}
+        
+        if not selected_tools:
+            yield {"event": "done", "response": self._handle_direct_query(query), "agent_used": "Orchestrator"}
+            return
+        
+        query_class = self._classify_query(turn.query if followup else query, selected_tools)
+        tier = Config.QUERY_CLASS_TIERS.get(query_class)
+        queue: asyncio.Queue = asyncio.Queue()
+        chunks: Dict[str, List[str]] = {tool_name: [] for tool_name in selected_tools}
+        finished: List[str] = []
+        started = time.perf_counter()
+        deadline = Config.FANOUT_DEADLINE_SECONDS if len(selected_tools) > 1 else 0
+        partial_sent = False
+        
+        async def pump(tool_name: str) -> None:
+            try:
+                if followup is not None:
+                    stream = self._stream_edit(turn, kind, tool_name, query, context, tier)
+                elif sticky is not None:
+                    stream = stream_followup_async(tool_name, query, history, tier)
+                else:
+                    stream = stream_tool_async(tool_name, query, context, tier)
+                async for chunk in stream:
+                    await queue.put((tool_name, chunk))
+            except Exception as e:
+                await queue.put((tool_name, f"Error using {tool_name}: {str(e)}"))
+            finally:
+                await queue.put((tool_name, None))
+        
+        tasks = [asyncio.ensure_future(pump(tool_name)) for tool_name in selected_tools]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                timeout = None
+                if deadline and not partial_sent:
+                    timeout = max(0.0, started + deadline - time.perf_counter())
+                try:
+                    tool_name, chunk = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    partial_sent = True
+                    pending = [name for name in selected_tools if name not in finished]
+                    METRICS.incr("fanout.partial_answers")
+                    METRICS.incr("fanout.pending_sections", len(pending))
+                    yield {
+                        "event": "partial",
+                        "response": self._synthesize_responses(query, self._streamed_responses(chunks, finished, started, tier)),
+                        "pending": pending
+                    }
+                    continue
+                if chunk is None:
+                    remaining -= 1
+                    finished.append(tool_name)
+                    if partial_sent:
+                        yield {
+                            "event": "section",
+                            "tool": tool_name,
+                            "response": self._synthesize_responses(query, self._streamed_responses(chunks, finished, started, tier)),
+                            "pending": [name for name in selected_tools if name not in finished]
+                        }
+                    continue
+                chunks[tool_name].append(chunk)
+                yield {"event": "delta", "tool": tool_name, "text": chunk}
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        responses = self._streamed_responses(chunks, finished, started, tier)
+        done = {
+            "event": "done",
+            "response": self._synthesize_responses(query, responses),
+            "agent_used": "Multiple Agents" if len(selected_tools) > 1 else selected_tools[0].replace("_", " ").title(),
+            "query_class": query_class
+        }
+        if followup is not None:
+            done["edit"] = kind
+            self._record_turn(context, query, responses, turn)
+        else:
+            if sticky is not None:
+                done["sticky"] = True
+            self._record_turn(context, query, responses)
+        yield done
+    
+    def _streamed_responses(self, chunks: Dict[str, List[str]], finished: List[str], started: float, tier: Optional[str]) -> Dict[str, LLMResponse]:
+        """Build responses from streamed chunks, with placeholders for unfinished tools."""
+        latency_ms = (time.perf_counter() - started) * 1000
+        return {
+            tool_name: LLMResponse(blocks=("".join(parts),), latency_ms=latency_ms, tier=tier)
+            if tool_name in finished else self._pending_response()
+            for tool_name, parts in chunks.items()
+        }
+    
+    def answer_version(self, query: str, tool_names: List[str]) -> Tuple[str, List[str]]:
+        """Return the version an answer to this query would be generated with.
+        
+        The version hashes the routed tools and, for each, the model id
+        and the system and rendered prompts on the tier the query class
+        selects. Precomputed answers are only served while it matches.
+        
+        Args:
+            query: The user's query
+            tool_names: Tools that answer the query
+            
+        Returns:
+            Tuple of (version hash, model ids)
+        """
+        tier = Config.QUERY_CLASS_TIERS.get(self._classify_query(query, tool_names))
+        parts, models = [], []
+        for tool_name in tool_names:
+            model_id, digest = prompt_version(tool_name, query, None, tier, self.cascade)
+            parts.append(f"{tool_name}:{model_id}:{digest}")
+            models.append(model_id)
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16], models
+    
+    def _precomputed_answer(self, query: str, context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Look the query up in the precomputed answer store.
+        
+        Skipped when ``context["precomputed"]`` is False (the precompute
+        job itself). An entry only counts while the router still picks
+        the same tools and :meth:`answer_version` still matches. A hit is
+        remembered as the session's turn like a generated answer, so
+        follow-up edits, lookups and sticky routing work after it.
+        """
+        if (context or {}).get("precomputed") is False:
+            return None
+        store = get_answer_store()
+        if store is None:
+            return None
+        
+        def current_version(stored_query: str, tool_names: List[str]) -> str:
+            if self._analyze_query_and_select_tools(stored_query, record=False) != tool_names:
+                return ""
+            return self.answer_version(stored_query, tool_names)[0]
+        
+        result = store.lookup(query, current_version)
+        if result is None:
+            return None
+        texts = result.pop("texts", None) or {}
+        output_tokens = result.pop("output_tokens", None) or {}
+        self._record_turn(context, query, {
+            tool_name: LLMResponse(blocks=(text,), output_tokens=output_tokens.get(tool_name, 0))
+            for tool_name, text in texts.items()
+        })
+        result["precomputed"] = True
+        return result
+    
+    def _analyze_query_and_select_tools(self, query: str, record: bool = True) -> List[str]:
         """Analyze the query and select appropriate tools.
         
+        Matching tools are ranked by keyword score; only the best one and
+        those within ``ROUTING_MIN_MARGIN`` of it are used, at most
+        ``ROUTING_MAX_FANOUT`` of them.
+        
         Args:
             query: The user's query
+            record: Whether to record the fan-out width (off for lookups
+                of stored queries)
             
         Returns:
-            List of tool names to use
+            List of tool names to use, best match first
         """
-        query_lower = query.lower()
-        selected_tools = []
+        # Keyword-based tool selection (precompiled per tool), ranked by score
+        selected = self.router.rank(query, Config.ROUTING_MAX_FANOUT, Config.ROUTING_MIN_MARGIN)
+        if record and selected:
+            record_fanout(len(self.router.match(query)), len(selected))
+        return selected
+    
+    def _classify_query(self, query: str, tool_names: List[str]) -> str:
+        """Classify a routed query for model tier selection.
+        
+        Args:
+            query: The user's query
+            tool_names: Tools selected for the query
+            
+        Returns:
+            The query class ("multi", "short_research" or the tool name)
+        """
+        if len(tool_names) > 1:
+            return "multi"
+        if tool_names[0] == "research_assistant" and len(query) <= Config.SHORT_QUERY_CHARS:
+            return "short_research"
+        return tool_names[0]
+    
+    def _needs_escalation(self, response: LLMResponse) -> bool:
+        """Return whether a lower-tier response should be retried on the large tier."""
+        return not response.ok or not response.text.strip()
+    
+    def _run_tool_tiered(self, tool_name: str, query: str, context: Optional[Dict[str, Any]], tier: Optional[str]) -> LLMResponse:
+        """Run a tool on the given tier, escalating to the large tier if needed."""
+        response = run_tool(tool_name, query, context, tier, self.cascade)
+        if tier and tier != "large" and self._needs_escalation(response):
+            METRICS.incr("tiers.escalations")
+            response = run_tool(tool_name, query, context, "large", self.cascade)
+        return response
+    
+    async def _run_tool_tiered_async(self, tool_name: str, query: str, context: Optional[Dict[str, Any]], tier: Optional[str]) -> LLMResponse:
+        """Async variant of :meth:`_run_tool_tiered`."""
+        response = await run_tool_async(tool_name, query, context, tier, self.cascade)
+        if tier and tier != "large" and self._needs_escalation(response):
+            METRICS.incr("tiers.escalations")
+            response = await run_tool_async(tool_name, query, context, "large", self.cascade)
+        return response
+    
+    def _busy_response(self, error: SchedulerBusyError) -> Dict[str, Any]:
+        """Build the result returned when the scheduler rejects a query."""
+        return {
+            "response": BUSY_MESSAGE,
+            "agent_used": "Orchestrator",
+            "busy": True,
+            "priority": error.priority
+        }
+    
+    def _schedule_tools(self, query: str, tool_names: List[str], context: Optional[Dict[str, Any]], tier: Optional[str], run=None) -> Dict[str, Future]:
+        """Submit one scheduler job per tool.
         
-        # Simple keyword-based tool selection
-        for tool_name, tool_info in self.tools.items():
-            keywords = tool_info["keywords"]
-            if any(keyword in query_lower for keyword in keywords):
-                selected_tools.append(tool_name)
+        The priority class and session come from ``context["priority"]``
+        (default "interactive") and ``context["session_id"]``. If any job
+        is rejected, the already queued ones are cancelled so a query is
+        either scheduled completely or not at all. Jobs call
+        ``run(tool_name, query, context, tier)``, by default
+        :meth:`_run_tool_tiered`.
         
-        return selected_tools
+        Raises:
+            SchedulerBusyError: If the priority class queue is full
+        """
+        context = context or {}
+        priority = context.get("priority", "interactive")
+        session_id = context.get("session_id")
+        scheduler = get_scheduler()
+        run = run or self._run_tool_tiered
+        futures: Dict[str, Future] = {}
+        try:
+            for tool_name in tool_names:
+                if tool_name in self.tools:
+                    job = functools.partial(run, tool_name, query, context, tier)
+                    futures[tool_name] = scheduler.submit(job, priority, session_id)
+        except SchedulerBusyError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        return futures
     
-    def _process_with_tools(self, query: str, tool_names: List[str], context: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    def _process_with_tools(self, query: str, tool_names: List[str], context: Optional[Dict[str, Any]] = None, tier: Optional[str] = None) -> Dict[str, LLMResponse]:
         """Process the query with selected tools.
         
+        With ``Config.SCHEDULER_ENABLED`` the tools run as jobs on the
+        shared scheduler (concurrently, in the query's priority class);
+        otherwise they run one after another on the calling thread.
+        
         Args:
             query: The user's query
             tool_names: List of tool names to use
             context: Optional context information
+            tier: Optional model tier to try first
             
         Returns:
-            Dictionary mapping tool names to their responses
+            Dictionary mapping tool names to their structured responses
+            
+        Raises:
+            SchedulerBusyError: If the scheduler queue is full
         """
         responses = {}
         
+        if Config.SCHEDULER_ENABLED:
+            for tool_name, future in self._schedule_tools(query, tool_names, context, tier).items():
+                responses[tool_name] = self._future_response(tool_name, future)
+            return responses
+        
         for tool_name in tool_names:
             if tool_name in self.tools:
-                tool_function = self.tools[tool_name]["function"]
                 try:
-                    response = tool_function(query, context)
-                    responses[tool_name] = response
+                    responses[tool_name] = self._run_tool_tiered(tool_name, query, context, tier)
                 except Exception as e:
-                    responses[tool_name] = f"Error using {tool_name}: {str(e)}"
+                    responses[tool_name] = LLMResponse.from_error(f"Error using {tool_name}: {str(e)}")
         
         return responses
     
-    def _synthesize_responses(self, query: str, responses: Dict[str, str]) -> str:
+    def _fanout_deadline(self, tool_names: List[str]) -> float:
+        """Return the fan-out deadline in seconds for these tools (0 = wait for all).
+        
+        The deadline only applies to multi-tool queries on the scheduler,
+        where finished sections can be shown while others still run.
+        """
+        if len(tool_names) < 2 or not Config.SCHEDULER_ENABLED:
+            return 0
+        return Config.FANOUT_DEADLINE_SECONDS
+    
+    def _pending_response(self) -> LLMResponse:
+        """Placeholder response for a section that is still being generated."""
+        return LLMResponse(blocks=(PENDING_MESSAGE,), finish_reason="pending")
+    
+    def _future_response(self, tool_name: str, future: Future, timeout: Optional[float] = None) -> LLMResponse:
+        """Wait for a scheduled tool and convert failures into error responses."""
+        try:
+            return future.result(timeout)
+        except Exception as e:
+            return LLMResponse.from_error(f"Error using {tool_name}: {str(e)}")
+    
+    def _process_with_deadline(self, query: str, tool_names: List[str], context: Optional[Dict[str, Any]], tier: Optional[str], deadline: float) -> Tuple[Dict[str, LLMResponse], Dict[str, Future]]:
+        """Run tools on the scheduler and stop waiting at the deadline.
+        
+        Args:
+            query: The user's query
+            tool_names: List of tool names to use
+            context: Optional context information
+            tier: Optional model tier to try first
+            deadline: Seconds to wait before answering with what is done
+            
+        Returns:
+            Tuple of responses (placeholders for late tools, in tool order)
+            and the futures of the tools that are still running
+            
+        Raises:
+            SchedulerBusyError: If the scheduler queue is full
+        """
+        futures = self._schedule_tools(query, tool_names, context, tier)
+        wait(futures.values(), timeout=deadline)
+        
+        responses: Dict[str, LLMResponse] = {}
+        pending: Dict[str, Future] = {}
+        for tool_name, future in futures.items():
+            if future.done():
+                responses[tool_name] = self._future_response(tool_name, future)
+            else:
+                responses[tool_name] = self._pending_response()
+                pending[tool_name] = future
+        if pending:
+            METRICS.incr("fanout.partial_answers")
+            METRICS.incr("fanout.pending_sections", len(pending))
+        return responses, pending
+    
+    def complete_pending(self, query: str, result: Dict[str, Any], timeout: Optional[float] = None, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Wait for the late sections of a partial result and re-synthesize.
+        
+        Args:
+            query: The query the result was produced for
+            result: A result returned by :meth:`process_query`
+            timeout: Optional per-section wait limit in seconds
+            context: The context the query was processed with; the
+                completed answer is remembered for follow-ups of its session
+            
+        Returns:
+            The result with every section filled in and no ``pending`` key
+            (unchanged if nothing was pending)
+        """
+        pending = result.get("pending")
+        if not pending:
+            return result
+        responses = dict(result["llm_responses"])
+        for tool_name, future in pending.items():
+            responses[tool_name] = self._future_response(tool_name, future, timeout)
+        completed = {key: value for key, value in result.items() if key != "pending"}
+        completed["response"] = self._synthesize_responses(query, responses)
+        completed["llm_responses"] = responses
+        self._record_turn(context, query, responses)
+        return completed
+    
+    async def _process_with_tools_async(self, query: str, tool_names: List[str], context: Optional[Dict[str, Any]] = None, tier: Optional[str] = None) -> Dict[str, LLMResponse]:
+        """Async variant of :meth:`_process_with_tools` running tools concurrently.
+        
+        Args:
+            query: The user's query
+            tool_names: List of tool names to use
+            context: Optional context information
+            tier: Optional model tier to try first
+            
+        Returns:
+            Dictionary mapping tool names to their structured responses
+            
+        Raises:
+            SchedulerBusyError: If the scheduler queue is full
+        """
+        if Config.SCHEDULER_ENABLED:
+            futures = self._schedule_tools(query, tool_names, context, tier)
+            names = list(futures)
+            results = await asyncio.gather(
+                *(asyncio.wrap_future(futures[tool_name]) for tool_name in names),
+                return_exceptions=True
+            )
+        else:
+            names = [tool_name for tool_name in tool_names if tool_name in self.tools]
+            results = await asyncio.gather(
+                *(self._run_tool_tiered_async(tool_name, query, context, tier) for tool_name in names),
+                return_exceptions=True
+            )
+        
+        responses = {}
+        for tool_name, result in zip(names, results):
+            if isinstance(result, Exception):
+                responses[tool_name] = LLMResponse.from_error(f"Error using {tool_name}: {str(result)}")
+            else:
+                responses[tool_name] = result
+        return responses
+    
+    def reset_session(self, session_id: Optional[str]) -> None:
+        """Forget the previous answers of a session (e.g. when its conversation is cleared)."""
+        self.sessions.reset(session_id)
+    
+    def _record_turn(self, context: Optional[Dict[str, Any]], query: str, responses: Dict[str, LLMResponse], edited: Optional[Turn] = None) -> None:
+        """Remember the answer of a session's query for follow-ups.
+        
+        Only queries with a ``context["session_id"]`` are remembered, and
+        only when every specialist answered.
+        
+        Args:
+            context: Optional context information
+            query: The query answered
+            responses: The specialists' responses
+            edited: For a follow-up edit, the turn it edited; the updated
+                answers replace its texts and ``query`` is added to its edits
+        """
+        session_id = (context or {}).get("session_id")
+        if not session_id or not responses or not all(response.ok and response.text for response in responses.values()):
+            return
+        texts = {tool_name: response.text for tool_name, response in responses.items()}
+        if edited is None:
+            turn = Turn(query, list(responses), texts, {tool_name: response.output_tokens for tool_name, response in responses.items()})
+        else:
+            # Output tokens stay those of the full answers, the baseline of later edits
+            turn = Turn(edited.query, edited.tools, {**edited.texts, **texts}, edited.output_tokens, edited.edits + [query])
+        self.sessions.record(session_id, turn)
+    
+    def _sticky_tool(self, query: str, context: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Pick the specialist a follow-up without keywords continues with.
+        
+        The session's routing affinity (:meth:`SessionStore.affinity`)
+        decays by ``Config.STICKY_DECAY`` per turn; the specialist with
+        the highest affinity is picked when it reaches
+        ``Config.STICKY_MIN_AFFINITY``. Greetings, help requests and
+        closing remarks stay with the orchestrator.
+        
+        Returns:
+            The tool name, or None to answer directly
+        """
+        session_id = (context or {}).get("session_id")
+        if not Config.STICKY_ROUTING_ENABLED or not session_id or _CONVERSATIONAL.search(query.lower()):
+            METRICS.incr("routing.direct")
+            return None
+        affinity = self.sessions.affinity(session_id, Config.STICKY_DECAY)
+        tool_name = max(affinity, key=affinity.get, default=None)
+        if tool_name is None or affinity[tool_name] < Config.STICKY_MIN_AFFINITY:
+            METRICS.incr("routing.direct")
+            return None
+        METRICS.incr("routing.sticky")
+        return tool_name
+    
+    def _history(self, context: Optional[Dict[str, Any]], tool_name: str) -> List[Tuple[str, str]]:
+        """Return the session's last ``Config.SESSION_HISTORY_TURNS`` (request, answer) pairs with a specialist."""
+        turns = self.sessions.turns((context or {}).get("session_id"))
+        history = [(turn.request, turn.texts[tool_name]) for turn in turns if tool_name in turn.texts]
+        return history[-Config.SESSION_HISTORY_TURNS:] if Config.SESSION_HISTORY_TURNS > 0 else []
+    
+    def _followup_tool(self, history: List[Tuple[str, str]], tool_name: str, query: str, context: Optional[Dict[str, Any]], tier: Optional[str]) -> LLMResponse:
+        """Answer a follow-up in the session's conversation (scheduler job signature)."""
+        return run_followup(tool_name, query, history, tier)
+    
+    def _process_followup(self, query: str, context: Optional[Dict[str, Any]], tool_name: str) -> Dict[str, Any]:
+        """Answer a follow-up without keywords with the session's specialist.
+        
+        The specialist gets the session's recent exchanges with it as its
+        conversation and the query as is, so "ホテルは？" is understood in
+        context instead of falling through to :meth:`_handle_direct_query`.
+        
+        Raises:
+            SchedulerBusyError: If the scheduler queue is full
+        """
+        query_class = self._classify_query(query, [tool_name])
+        tier = Config.QUERY_CLASS_TIERS.get(query_class)
+        run = functools.partial(self._followup_tool, self._history(context, tool_name))
+        if Config.SCHEDULER_ENABLED:
+            response = self._future_response(tool_name, self._schedule_tools(query, [tool_name], context, tier, run)[tool_name])
+        else:
+            try:
+                response = run(tool_name, query, context, tier)
+            except Exception as e:
+                response = LLMResponse.from_error(f"Error using {tool_name}: {str(e)}")
+        responses = {tool_name: response}
+        self._record_turn(context, query, responses)
+        return {
+            "response": self._synthesize_responses(query, responses),
+            "agent_used": tool_name.replace("_", " ").title(),
+            "query_class": query_class,
+            "llm_responses": responses,
+            "sticky": True
+        }
+    
+    def _tool_call(self, context: Optional[Dict[str, Any]], tool_name: str, query: str) -> LLMResponse:
+        """Answer a tool use of the orchestrator's model with a specialist.
+        
+        The specialist runs like a keyword-routed one: as a scheduler job
+        when the scheduler is enabled, on the tier of its query class.
+        
+        Raises:
+            SchedulerBusyError: If the scheduler queue is full
+        """
+        tier = Config.QUERY_CLASS_TIERS.get(self._classify_query(query, [tool_name]))
+        if Config.SCHEDULER_ENABLED:
+            return self._future_response(tool_name, self._schedule_tools(query, [tool_name], context, tier)[tool_name])
+        return self._run_tool_tiered(tool_name, query, context, tier)
+    
+    def _toolset(self, context: Optional[Dict[str, Any]]) -> SpecialistToolset:
+        """Return the specialist tools for one query."""
+        return SpecialistToolset(functools.partial(self._tool_call, context), self.tools)
+    
+    def _tool_calling_agent(self, toolset: SpecialistToolset) -> Optional[Agent]:
+        """Create a Strands agent with the specialists registered as tools.
+        
+        A new agent is created per query so concurrent queries keep their
+        own conversation and tool responses; the model client is shared.
+        
+        Returns:
+            The agent, or None when the orchestrator's backend is not configured
+        """
+        if self.model is None:
+            return None
+        return Agent(
+            model=self.model,
+            system_prompt=f"{self.system_prompt}\n\n{self.TOOL_CALLING_PROMPT}",
+            tools=toolset.tools
+        )
+    
+    def _tool_calling_result(self, query: str, context: Optional[Dict[str, Any]], toolset: SpecialistToolset, response: LLMResponse) -> Dict[str, Any]:
+        """Build the result of a query answered in tool-calling mode."""
+        responses = toolset.responses
+        if not responses:
+            return {"response": response.text, "agent_used": "Orchestrator", "tool_calling": True}
+        self._record_turn(context, query, responses)
+        tool_names = list(responses)
+        return {
+            # Without a usable synthesis the specialists' answers are combined as usual
+            "response": response.text if response.ok and response.text.strip() else self._synthesize_responses(query, responses),
+            "agent_used": "Multiple Agents" if len(tool_names) > 1 else tool_names[0].replace("_", " ").title(),
+            "query_class": "tool_calling",
+            "llm_responses": responses,
+            "tool_calling": True
+        }
+    
+    def _process_tool_calling(self, query: str, context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Let the orchestrator's model decide which specialists to call.
+        
+        The specialists are registered as Strands tools; the model calls
+        the ones it needs (tool uses of one turn run concurrently) and
+        writes the final answer from their results.
+        
+        Returns:
+            The result, with ``tool_calling`` set, or None when the
+            orchestrator's backend is not configured (the keyword path is
+            used instead)
+        
+        Raises:
+            SchedulerBusyError: If the scheduler queue is full
+        """
+        toolset = self._toolset(context)
+        agent = self._tool_calling_agent(toolset)
+        if agent is None:
+            return None
+        started = time.perf_counter()
+        try:
+            response = LLMResponse.from_agent_result(agent(query), model_id=self.model_id, latency_ms=(time.perf_counter() - started) * 1000)
+        except Exception as e:
+            response = LLMResponse.from_error(f"Error calling LLM: {str(e)}", model_id=self.model_id)
+        if toolset.error is not None:
+            raise toolset.error
+        record_tool_calling(toolset, (time.perf_counter() - started) * 1000)
+        return self._tool_calling_result(query, context, toolset, response)
+    
+    async def _stream_tool_calling(self, query: str, context: Optional[Dict[str, Any]], toolset: SpecialistToolset, agent: Agent) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a query answered in tool-calling mode.
+        
+        Text the model writes before calling tools is streamed as well;
+        the answer in the ``done`` event is the text after the last tool
+        call, i.e. the synthesis.
+        """
+        yield {"event": "route", "tools": [], "tool_calling": True}
+        started = time.perf_counter()
+        called = set()
+        parts: List[str] = []
+        try:
+            stream = agent.stream_async(query)
+            try:
+                async for event in stream:
+                    if not isinstance(event, dict):
+                        continue
+                    tool_use = event.get("current_tool_use")
+                    if isinstance(tool_use, dict) and tool_use.get("toolUseId") and tool_use["toolUseId"] not in called:
+                        called.add(tool_use["toolUseId"])
+                        parts = []
+                        yield {"event": "tool_call", "tool": tool_use.get("name")}
+                    elif isinstance(event.get("data"), str) and event["data"]:
+                        parts.append(event["data"])
+                        yield {"event": "delta", "tool": "orchestrator", "text": event["data"]}
+            finally:
+                if hasattr(stream, "aclose"):
+                    await stream.aclose()
+            response = LLMResponse(blocks=("".join(parts),), model_id=self.model_id)
+        except Exception as e:
+            response = LLMResponse.from_error(f"Error calling LLM: {str(e)}", model_id=self.model_id)
+        if toolset.error is not None:
+            yield {"event": "done", **self._busy_response(toolset.error)}
+            return
+        record_tool_calling(toolset, (time.perf_counter() - started) * 1000)
+        result = self._tool_calling_result(query, context, toolset, response)
+        # Like the other done events, without the response objects
+        result.pop("llm_responses", None)
+        yield {"event": "done", **result}
+    
+    def _followup_lookup(self, query: str, context: Optional[Dict[str, Any]], selected_tools: List[str]) -> Optional[Tuple[Optional[Dict[str, Any]], str, str]]:
+        """Decide whether a query asks about the earlier answers of its session.
+        
+        A question such as "2日目は何だっけ？" or "what was the price of the
+        second laptop?" is a lookup when the session has earlier answers,
+        the query routes to no specialist or only to ones that gave them,
+        :func:`parse_lookup` recognizes it and some part of the earlier
+        answers matches it. Anything else ("ホテルは？") goes on to the
+        edit, sticky and keyword routing.
+        
+        Returns:
+            The outcome of :meth:`_local_lookup`, or None
+        """
+        session_id = (context or {}).get("session_id")
+        if not Config.LOOKUP_ENABLED or not session_id:
+            return None
+        turns = self.sessions.turns(session_id)
+        if not turns or not set(selected_tools) <= {tool_name for turn in turns for tool_name in turn.tools}:
+            return None
+        question = parse_lookup(query, Config.FOLLOWUP_MAX_CHARS)
+        if question is None:
+            return None
+        return self._local_lookup(query, turns, question)
+    
+    def _local_lookup(self, query: str, turns: List[Turn], question: Question) -> Optional[Tuple[Optional[Dict[str, Any]], str, str]]:
+        """Answer a lookup from the indexed earlier answers.
+        
+        Returns:
+            Tuple of (the result, or None when the best match is below
+            ``Config.LOOKUP_MIN_CONFIDENCE``, the tool and the previous
+            answer to ask the LLM with otherwise), or None when nothing
+            in the earlier answers matches
+        """
+        METRICS.incr("lookup.queries")
+        started = time.perf_counter()
+        text, tool_name, confidence = lookup(
+            ((tool_name, index) for turn in reversed(turns) for tool_name, index in turn_indexes(turn)),
+            question
+        )
+        if text is not None and confidence >= Config.LOOKUP_MIN_CONFIDENCE:
+            METRICS.incr("lookup.hits")
+            METRICS.observe("lookup.latency_ms", (time.perf_counter() - started) * 1000)
+            return {
+                "response": f"## 回答: {query}\n\n{text}",
+                "agent_used": tool_name.replace("_", " ").title(),
+                "query_class": "lookup",
+                "lookup": "index"
+            }, tool_name, ""
+        if text is None:
+            METRICS.incr("lookup.misses")
+            return None
+        METRICS.incr("lookup.fallbacks")
+        # Ask the specialist of the closest match
+        for turn in reversed(turns):
+            if tool_name in turn.texts:
+                return None, tool_name, turn.texts[tool_name]
+        return None
+    
+    def _process_lookup(self, query: str, context: Optional[Dict[str, Any]], result: Optional[Dict[str, Any]], tool_name: str, previous: str) -> Dict[str, Any]:
+        """Answer a lookup follow-up, locally when confident and with the LLM otherwise.
+        
+        The LLM fallback asks the specialist that wrote the closest
+        earlier answer, with that answer in the prompt, on the tier of the
+        "lookup" query class.
+        
+        Raises:
+            SchedulerBusyError: If the scheduler queue is full
+        """
+        if result is not None:
+            return result
+        tier = Config.QUERY_CLASS_TIERS.get("lookup")
+        run = functools.partial(self._lookup_tool, previous)
+        if Config.SCHEDULER_ENABLED:
+            response = self._future_response(tool_name, self._schedule_tools(query, [tool_name], context, tier, run)[tool_name])
+        else:
+            try:
+                response = run(tool_name, query, context, tier)
+            except Exception as e:
+                response = LLMResponse.from_error(f"Error using {tool_name}: {str(e)}")
+        return {
+            "response": self._synthesize_responses(query, {tool_name: response}),
+            "agent_used": tool_name.replace("_", " ").title(),
+            "query_class": "lookup",
+            "llm_responses": {tool_name: response},
+            "lookup": "llm"
+        }
+    
+    def _lookup_tool(self, previous: str, tool_name: str, query: str, context: Optional[Dict[str, Any]], tier: Optional[str]) -> LLMResponse:
+        """Ask a specialist about its previous answer (scheduler job signature)."""
+        return run_lookup(tool_name, previous, query, tier)
+    
+    async def _stream_lookup(self, query: str, result: Optional[Dict[str, Any]], tool_name: str, previous: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a lookup follow-up as events (see :meth:`stream_query_async`)."""
+        if result is not None:
+            yield {"event": "route", "tools": [], "lookup": "index"}
+            yield {"event": "done", **result}
+            return
+        yield {"event": "route", "tools": [tool_name], "lookup": "llm"}
+        parts: List[str] = []
+        try:
+            async for chunk in stream_lookup_async(tool_name, previous, query, Config.QUERY_CLASS_TIERS.get("lookup")):
+                parts.append(chunk)
+                yield {"event": "delta", "tool": tool_name, "text": chunk}
+        except Exception as e:
+            parts.append(f"Error using {tool_name}: {str(e)}")
+        yield {
+            "event": "done",
+            "response": self._synthesize_responses(query, {tool_name: LLMResponse(blocks=("".join(parts),))}),
+            "agent_used": tool_name.replace("_", " ").title(),
+            "query_class": "lookup",
+            "lookup": "llm"
+        }
+    
+    def _followup_edit(self, query: str, context: Optional[Dict[str, Any]], selected_tools: List[str]) -> Optional[Tuple[Turn, str, List[str]]]:
+        """Decide whether a query edits the previous answer of its session.
+        
+        A follow-up such as "make it 3 days" or "cheaper options only" is
+        an edit when the session has a previous answer, the query routes
+        to no specialist or only to ones that answered it, and
+        :func:`detect_edit` recognizes the kind of change.
+        
+        Args:
+            query: The user's query
+            context: Optional context information (``session_id``)
+            selected_tools: Tools the router picked for the query
+            
+        Returns:
+            Tuple of (previous turn, kind of edit, tools to edit), or None
+        """
+        if not Config.FOLLOWUP_EDITS_ENABLED:
+            return None
+        turn = self.sessions.last_turn((context or {}).get("session_id")) if (context or {}).get("session_id") else None
+        if turn is None or not set(selected_tools) <= set(turn.tools):
+            return None
+        kind = detect_edit(query, bool(selected_tools), Config.FOLLOWUP_MAX_CHARS)
+        if kind is None:
+            return None
+        return turn, kind, list(selected_tools or turn.tools)
+    
+    def _edit_tool(self, turn: Turn, kind: str, tool_name: str, query: str, context: Optional[Dict[str, Any]], tier: Optional[str]) -> LLMResponse:
+        """Apply a follow-up edit to one specialist's previous answer.
+        
+        Falls back to regenerating the answer for the edited request when
+        the specialist's patch matched none of its sections.
+        """
+        response = run_edit(tool_name, turn.request, turn.texts[tool_name], query, kind, tier)
+        if response is None:
+            METRICS.incr("followup.fallbacks")
+            request = Turn(turn.query, turn.tools, turn.texts, edits=turn.edits + [query]).request
+            return self._run_tool_tiered(tool_name, request, context, tier)
+        if response.ok:
+            record_edit(turn.output_tokens.get(tool_name, 0), response)
+        return response
+    
+    async def _stream_edit(self, turn: Turn, kind: str, tool_name: str, query: str, context: Optional[Dict[str, Any]], tier: Optional[str]) -> AsyncIterator[str]:
+        """Streaming variant of :meth:`_edit_tool`."""
+        started = time.perf_counter()
+        streamed = False
+        async for chunk in stream_edit_async(tool_name, turn.request, turn.texts[tool_name], query, kind, tier):
+            streamed = True
+            yield chunk
+        if streamed:
+            record_edit(turn.output_tokens.get(tool_name, 0), LLMResponse(latency_ms=(time.perf_counter() - started) * 1000))
+            return
+        METRICS.incr("followup.fallbacks")
+        request = Turn(turn.query, turn.tools, turn.texts, edits=turn.edits + [query]).request
+        async for chunk in stream_tool_async(tool_name, request, context, tier):
+            yield chunk
+    
+    def _edit_result(self, query: str, context: Optional[Dict[str, Any]], turn: Turn, kind: str, tool_names: List[str], query_class: str, responses: Dict[str, LLMResponse]) -> Dict[str, Any]:
+        """Build the result of a follow-up edit and remember the updated answer."""
+        self._record_turn(context, query, responses, turn)
+        return {
+            "response": self._synthesize_responses(query, responses),
+            "agent_used": "Multiple Agents" if len(tool_names) > 1 else tool_names[0].replace("_", " ").title(),
+            "query_class": query_class,
+            "llm_responses": responses,
+            "edit": kind
+        }
+    
+    def _process_edit(self, query: str, context: Optional[Dict[str, Any]], turn: Turn, kind: str, tool_names: List[str]) -> Dict[str, Any]:
+        """Answer a follow-up edit by patching the previous answer of each tool.
+        
+        Args:
+            query: The follow-up query
+            context: Optional context information
+            turn: The session's previous turn
+            kind: Kind of edit
+            tool_names: Tools whose answers to edit
+            
+        Returns:
+            A result like :meth:`_process_query`'s, with ``edit`` set
+            
+        Raises:
+            SchedulerBusyError: If the scheduler queue is full
+        """
+        query_class = self._classify_query(turn.query, tool_names)
+        tier = Config.QUERY_CLASS_TIERS.get(query_class)
+        run = functools.partial(self._edit_tool, turn, kind)
+        responses = {}
+        if Config.SCHEDULER_ENABLED:
+            for tool_name, future in self._schedule_tools(query, tool_names, context, tier, run).items():
+                responses[tool_name] = self._future_response(tool_name, future)
+        else:
+            for tool_name in tool_names:
+                try:
+                    responses[tool_name] = run(tool_name, query, context, tier)
+                except Exception as e:
+                    responses[tool_name] = LLMResponse.from_error(f"Error using {tool_name}: {str(e)}")
+        return self._edit_result(query, context, turn, kind, tool_names, query_class, responses)
+    
+    async def _process_edit_async(self, query: str, context: Optional[Dict[str, Any]], turn: Turn, kind: str, tool_names: List[str]) -> Dict[str, Any]:
+        """Async variant of :meth:`_process_edit` editing the tools concurrently."""
+        query_class = self._classify_query(turn.query, tool_names)
+        tier = Config.QUERY_CLASS_TIERS.get(query_class)
+        run = functools.partial(self._edit_tool, turn, kind)
+        if Config.SCHEDULER_ENABLED:
+            futures = self._schedule_tools(query, tool_names, context, tier, run)
+            results = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures.values()), return_exceptions=True)
+        else:
+            results = await asyncio.gather(
+                *(asyncio.to_thread(run, tool_name, query, context, tier) for tool_name in tool_names),
+                return_exceptions=True
+            )
+        responses = {}
+        for tool_name, result in zip(tool_names, results):
+            if isinstance(result, Exception):
+                responses[tool_name] = LLMResponse.from_error(f"Error using {tool_name}: {str(result)}")
+            else:
+                responses[tool_name] = result
+        return self._edit_result(query, context, turn, kind, tool_names, query_class, responses)
+    
+    def _synthesize_responses(self, query: str, responses: Dict[str, LLMResponse]) -> str:
         """Synthesize responses from multiple tools into a coherent answer.
         
         Args:
@@ -136,7 +1202,7 @@ class OrchestratorAgent(BaseAgent):
         if len(responses) == 1:
             # Single tool response
             tool_name, response = next(iter(responses.items()))
-            return f"## 回答: {query}\n\n{response}"
+            return f"## 回答: {query}\n\n{response.text}"
         
         elif len(responses) > 1:
             # Multiple tool responses - combine them
@@ -145,7 +1211,7 @@ class OrchestratorAgent(BaseAgent):
             
             for i, (tool_name, response) in enumerate(responses.items(), 1):
                 tool_display_name = tool_name.replace("_", " ").title()
-                synthesized += f"### {i}. {tool_display_name}\n\n{response}\n\n"
+                synthesized += f"### {i}. {tool_display_name}\n\n{response.text}\n\n"
             
             synthesized += "---\n*オーケストレーターエージェントによって調整された回答*"
             return synthesized
@@ -167,13 +1233,11 @@ class OrchestratorAgent(BaseAgent):
         query_lower = query.lower()
         
         # Check if this should be handled by a specialized agent
-        for tool_name, tool_info in self.tools.items():
-            keywords = tool_info["keywords"]
-            if any(keyword in query_lower for keyword in keywords):
-                # This should have been handled by specialized agent
-                return f"申し訳ございません。システムの設定に問題があるようです。クエリ: '{query}' は {tool_name} で処理されるべきでした。"
+        for tool_name in self.router.match(query):
+            # This should have been handled by specialized agent
+            return f"申し訳ございません。システムの設定に問題があるようです。クエリ: '{query}' は {tool_name} で処理されるべきでした。"
         
-        if any(greeting in query_lower for greeting in ["hello", "hi", "hey", "good morning", "good afternoon", "こんにちは", "おはよう", "こんばんは"]):
+        if any(greeting in query_lower for greeting in GREETING_WORDS):
             return """こんにちは！私はあなたのAIアシスタントオーケストレーターです。以下のようなお手伝いができます：
 
 - **研究に関する質問** - 研究スペシャリストにおつなぎします
@@ -182,7 +1246,7 @@ class OrchestratorAgent(BaseAgent):
 
 本日はどのようなお手伝いをご希望でしょうか？"""
         
-        elif any(help_word in query_lower for help_word in ["help", "what can you do", "capabilities", "ヘルプ", "できること", "機能"]):
+        elif any(help_word in query_lower for help_word in HELP_WORDS):
             return """私はさまざまなタスクであなたを助けるために、専門的なAIアシスタントを調整するオーケストレーターエージェントです：
 
 ## 利用可能なスペシャリスト:
@@ -212,9 +1276,7 @@ class OrchestratorAgent(BaseAgent):
 4. 包括的でよく整理された応答を提供する
 
 以下のような質問を試してみてください：
-- "機械学習アルゴリズムについて教えて" (研究)
-- "プログラミング用の良いラップトップを推奨して" (製品)
-- "東京への5日間の旅行を計画して" (旅行)"""
+""" + "\n".join(f'- "{example}" ({label})' for example, label in EXAMPLE_QUERIES)
         
         else:
             return f"""あなたの質問を理解しました: "{query}"
@@ -0,0 +1,139 @@
+"""Batch job that precomputes answers for the most frequent queries.
+
+Reads the query log (``QUERY_LOG_PATH``), picks the most frequent
+normalized queries plus the help text's example queries, and writes
+their answers to the precomputed answer store
+(``PRECOMPUTED_ANSWERS_PATH``). Entries that are still current (same
+version, younger than ``--max-age-hours``) are kept as they are; stale
+ones are regenerated and queries that dropped out of the top list are
+removed.
+
+Run once (e.g. from cron) or keep it running on a schedule:
+
+    uv run python -m src.multi_agent_system.precompute --top 50
+    uv run python -m src.multi_agent_system.precompute --every 3600
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+
+from .orchestrator import EXAMPLE_QUERIES, OrchestratorAgent
+from .utils.answer_store import AnswerStore, normalize_query, read_query_log
+from .utils.config import Config
+
+
+def select_queries(log_path: Optional[str], top: int, min_count: int, examples: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Pick the queries to precompute.
+
+    Args:
+        log_path: Query log to count (skipped when unset or missing)
+        top: Maximum number of logged queries
+        min_count: Minimum occurrences of a logged query
+        examples: Whether to include the help text's example queries
+
+    Returns:
+        Mapping of normalized query to ``{"query": ..., "count": ...}``
+    """
+    counts: Dict[str, Dict[str, Any]] = {}
+    if log_path:
+        try:
+            counts = read_query_log(log_path)
+        except FileNotFoundError:
+            pass
+    ranked = sorted(counts.items(), key=lambda item: item[1]["count"], reverse=True)
+    selected = {key: value for key, value in ranked[:top] if value["count"] >= min_count}
+    if examples:
+        for example, _ in EXAMPLE_QUERIES:
+            selected.setdefault(normalize_query(example), {"query": example, "count": 0})
+    return selected
+
+
+def refresh(store: AnswerStore, queries: Dict[str, Dict[str, Any]], max_age_seconds: float, prune: bool = True, dry_run: bool = False) -> Dict[str, List[str]]:
+    """Bring the store up to date for the selected queries.
+
+    Args:
+        store: Store to update
+        queries: Output of :func:`select_queries`
+        max_age_seconds: Regenerate current entries older than this (0 = never)
+        prune: Remove entries for queries that are no longer selected
+        dry_run: Only report what would change
+
+    Returns:
+        Normalized queries by outcome: ``kept``, ``generated``,
+        ``skipped`` (routed to no specialist or failed) and ``removed``
+    """
+    orchestrator = OrchestratorAgent()
+    existing = {entry["key"]: entry for entry in store.entries()}
+    outcome: Dict[str, List[str]] = {"kept": [], "generated": [], "skipped": [], "removed": []}
+    now = time.time()
+
+    for key, selected in queries.items():
+        query = selected["query"]
+        tools = orchestrator._analyze_query_and_select_tools(query, record=False)
+        if not tools:
+            # Direct answers need no model call
+            outcome["skipped"].append(key)
+            continue
+        version, models = orchestrator.answer_version(query, tools)
+        entry = existing.get(key)
+        # Entries without per-tool texts predate follow-ups on precomputed answers
+        if entry and entry["tools"] == tools and entry["version"] == version and "texts" in entry["result"] and (
+                not max_age_seconds or now - entry["updated_at"] < max_age_seconds):
+            outcome["kept"].append(key)
+            continue
+        if dry_run:
+            outcome["generated"].append(key)
+            continue
+
+        result = orchestrator.process_query(query, {"precomputed": False, "priority": "background"})
+        result = orchestrator.complete_pending(query, result)
+        responses = result.get("llm_responses") or {}
+        if result.get("busy") or not responses or not all(response.ok for response in responses.values()):
+            outcome["skipped"].append(key)
+            continue
+        store.put(query, tools, version, models, {
+            "response": result["response"],
+            "agent_used": result["agent_used"],
+            "query_class": result.get("query_class"),
+            # Per-tool answers, so follow-ups can edit or look up a precomputed answer
+            "texts": {tool_name: response.text for tool_name, response in responses.items()},
+            "output_tokens": {tool_name: response.output_tokens for tool_name, response in responses.items()},
+        }, selected["count"])
+        outcome["generated"].append(key)
+
+    if prune:
+        outcome["removed"] = [key for key in existing if key not in queries]
+        if outcome["removed"] and not dry_run:
+            store.delete(outcome["removed"])
+    return outcome
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the precompute job once or on a schedule."""
+    parser = argparse.ArgumentParser(description="Precompute answers for frequent queries")
+    parser.add_argument("--log", default=Config.QUERY_LOG_PATH, help="query log (JSON lines)")
+    parser.add_argument("--store", default=Config.PRECOMPUTED_ANSWERS_PATH, help="precomputed answer store (SQLite)")
+    parser.add_argument("--top", type=int, default=50, help="number of most frequent queries to precompute")
+    parser.add_argument("--min-count", type=int, default=3, help="minimum occurrences in the log")
+    parser.add_argument("--max-age-hours", type=float, default=24, help="regenerate answers older than this (0 = never)")
+    parser.add_argument("--no-examples", action="store_true", help="do not include the help text's example queries")
+    parser.add_argument("--keep-old", action="store_true", help="keep entries for queries no longer selected")
+    parser.add_argument("--every", type=float, default=0, help="repeat every N seconds (0 = run once)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+    if not args.store:
+        parser.error("--store or PRECOMPUTED_ANSWERS_PATH is required")
+
+    store = AnswerStore(args.store)
+    while True:
+        queries = select_queries(args.log, args.top, args.min_count, not args.no_examples)
+        outcome = refresh(store, queries, args.max_age_hours * 3600, not args.keep_old, args.dry_run)
+        print(time.strftime("%Y-%m-%d %H:%M:%S"), " ".join(f"{name}={len(keys)}" for name, keys in outcome.items()), flush=True)
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""Headless ASGI API server for the orchestrator.
+
+Endpoints:
+    GET  /healthz    liveness probe
+    GET  /readyz     readiness probe (warm-up finished and not draining)
+    POST /v1/query   JSON request/response around ``process_query``
+    POST /v1/stream  Server-Sent Events stream of orchestrator events
+    POST /v1/batch   several queries processed concurrently
+    WS   /v1/ws      WebSocket stream of orchestrator events
+
+Run with ``uv run python -m src.multi_agent_system.server`` (requires the
+optional ``uvicorn`` dependency) or any ASGI server pointed at ``app``.
+"""
+
+import asyncio
+import hmac
+import json
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .orchestrator import OrchestratorAgent
+from .utils.answer_store import get_answer_store
+from .utils.config import Config
+from .utils.profiling import get_profiler
+from .utils.scheduler import get_scheduler
+from .warmup import get_warmup, start_warmup
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Request bodies larger than this are rejected
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class HTTPError(Exception):
+    """Error mapped to an HTTP status code and JSON error body."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def serialize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an orchestrator result dict into JSON-serializable form."""
+    payload = dict(result)
+    if "llm_responses" in payload:
+        payload["llm_responses"] = {
+            tool_name: response.to_dict() for tool_name, response in payload["llm_responses"].items()
+        }
+    if "pending" in payload:
+        payload["pending"] = list(payload["pending"])
+    return payload
+
+
+class OrchestratorServer:
+    """ASGI application exposing a shared ``OrchestratorAgent`` over HTTP.
+
+    A single orchestrator instance serves every connection; specialist
+    agents come from the shared pool and identical in-flight calls are
+    coalesced, so one worker process multiplexes many concurrent users.
+    On shutdown the server stops accepting work and waits for in-flight
+    requests to drain.
+    """
+
+    def __init__(self, orchestrator: Optional[OrchestratorAgent] = None, drain_timeout: Optional[float] = None):
+        """Initialize the server.
+
+        Args:
+            orchestrator: Orchestrator to serve (created at startup if omitted)
+            drain_timeout: Seconds to wait for in-flight requests on shutdown
+        """
+        self.orchestrator = orchestrator
+        self.drain_timeout = Config.SERVER_DRAIN_TIMEOUT if drain_timeout is None else drain_timeout
+        self.draining = False
+        self.in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._routes: Dict[Tuple[str, str], Callable[..., Awaitable[None]]] = {
+            ("GET", "/healthz"): self._healthz,
+            ("GET", "/readyz"): self._readyz,
+            ("POST", "/v1/query"): self._query,
+            ("POST", "/v1/stream"): self._stream,
+            ("POST", "/v1/batch"): self._batch,
+            ("GET", "/admin/profile"): self._profile_status,
+            ("POST", "/admin/profile"): self._profile_start,
+            ("DELETE", "/admin/profile"): self._profile_stop,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """ASGI entry point."""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+
+    async def startup(self) -> None:
+        """Start warm-up and create the orchestrator if needed."""
+        self._idle = asyncio.Event()
+        self._idle.set()
+        if Config.WARMUP_ON_STARTUP:
+            start_warmup()
+        if self.orchestrator is None:
+            self.orchestrator = await asyncio.to_thread(OrchestratorAgent)
+
+    async def shutdown(self) -> bool:
+        """Stop accepting work and wait for in-flight requests to finish.
+
+        Returns:
+            Whether all in-flight requests finished within the drain timeout
+        """
+        self.draining = True
+        drained = True
+        if self._idle is not None:
+            try:
+                await asyncio.wait_for(self._idle.wait(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                drained = False
+        # Worker pools (see workers.py) own processes that must be stopped
+        close = getattr(self.orchestrator, "close", None)
+        if close is not None:
+            await asyncio.to_thread(close, self.drain_timeout)
+        return drained
+
+    @property
+    def ready(self) -> bool:
+        """Whether the server should receive traffic."""
+        warmup = get_warmup()
+        warm = warmup is None or warmup.ready
+        return warm and self.orchestrator is not None and not self.draining
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @asynccontextmanager
+    async def _track(self):
+        """Count a request as in flight; reject it while draining."""
+        if self.draining:
+            raise HTTPError(503, "server is shutting down")
+        if self.orchestrator is None:
+            raise HTTPError(503, "server is starting")
+        self.in_flight += 1
+        if self._idle is not None:
+            self._idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0 and self._idle is not None:
+                self._idle.set()
+
+    # ------------------------------------------------------------------
+    # HTTP
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        handler = self._routes.get((scope["method"], scope["path"]))
+        try:
+            if handler is None:
+                raise HTTPError(404, f"no route for {scope['method']} {scope['path']}")
+            await handler(scope, receive, send)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {"error": e.message})
+
+    @staticmethod
+    async def _read_json(receive: Receive) -> Dict[str, Any]:
+        body = b""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "client disconnected")
+            body += message.get("body", b"")
+            if len(body) > MAX_BODY_BYTES:
+                raise HTTPError(413, "request body too large")
+            if not message.get("more_body", False):
+                break
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "invalid JSON body")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "JSON body must be an object")
+        return payload
+
+    @staticmethod
+    def _query_args(payload: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        query = payload.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise HTTPError(400, "'query' must be a non-empty string")
+        context = payload.get("context")
+        if context is not None and not isinstance(context, dict):
+            raise HTTPError(400, "'context' must be an object")
+        return query, context
+
+    @staticmethod
+    async def _send_json(send: Send, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json; charset=utf-8"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _healthz(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self._send_json(send, 200, {"status": "ok"})
+
+    async def _readyz(self, scope: Scope, receive: Receive, send: Send) -> None:
+        warmup = get_warmup()
+        answers = get_answer_store()
+        await self._send_json(send, 200 if self.ready else 503, {
+            "ready": self.ready,
+            "draining": self.draining,
+            "in_flight": self.in_flight,
+            "warmup": warmup.status() if warmup else None,
+            "scheduler": get_scheduler().stats() if Config.SCHEDULER_ENABLED else None,
+            "precomputed": answers.stats() if answers else None,
+        })
+
+    async def _query(self, scope: Scope, receive: Receive, send: Send) -> None:
+        query, context = self._query_args(await self._read_json(receive))
+        async with self._track():
+            result = await self.orchestrator.process_query_async(query, context)
+        # Scheduler backpressure: tell the client to retry later
+        await self._send_json(send, 503 if result.get("busy") else 200, serialize_result(result))
+
+    async def _batch(self, scope: Scope, receive: Receive, send: Send) -> None:
+        payload = await self._read_json(receive)
+        items = payload.get("queries")
+        if not isinstance(items, list) or not items:
+            raise HTTPError(400, "'queries' must be a non-empty list")
+        if len(items) > Config.SERVER_MAX_BATCH:
+            raise HTTPError(413, f"at most {Config.SERVER_MAX_BATCH} queries per batch")
+        args = [self._query_args(item if isinstance(item, dict) else {"query": item}) for item in items]
+        # Batch queries yield to interactive ones unless the caller says otherwise
+        args = [(query, {"priority": "batch", **(context or {})}) for query, context in args]
+        semaphore = asyncio.Semaphore(Config.SERVER_BATCH_CONCURRENCY)
+
+        async def run(query: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            async with semaphore:
+                return serialize_result(await self.orchestrator.process_query_async(query, context))
+
+        async with self._track():
+            results = await asyncio.gather(*(run(query, context) for query, context in args))
+        await self._send_json(send, 200, {"results": results})
+
+    @staticmethod
+    def _check_admin(scope: Scope) -> None:
+        """Require the ``x-admin-token`` header; admin routes do not exist without ``ADMIN_TOKEN``."""
+        if not Config.ADMIN_TOKEN:
+            raise HTTPError(404, f"no route for {scope['method']} {scope['path']}")
+        token = dict(scope.get("headers") or []).get(b"x-admin-token", b"")
+        if not hmac.compare_digest(token, Config.ADMIN_TOKEN.encode("utf-8")):
+            raise HTTPError(403, "invalid admin token")
+
+    async def _profile_status(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._check_admin(scope)
+        await self._send_json(send, 200, get_profiler().status())
+
+    async def _profile_start(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._check_admin(scope)
+        payload = await self._read_json(receive)
+        try:
+            requests = payload.get("requests")
+            seconds = payload.get("seconds")
+            status = get_profiler().enable(
+                payload.get("mode", "sampling"),
+                requests=int(requests) if requests is not None else None,
+                seconds=float(seconds) if seconds is not None else None,
+            )
+        except (TypeError, ValueError) as e:
+            raise HTTPError(400, str(e))
+        await self._send_json(send, 200, status)
+
+    async def _profile_stop(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._check_admin(scope)
+        path = await asyncio.to_thread(get_profiler().disable)
+        await self._send_json(send, 200, {"written": path, **get_profiler().status()})
+
+    async def _stream(self, scope: Scope, receive: Receive, send: Send) -> None:
+        query, context = self._query_args(await self._read_json(receive))
+        async with self._track():
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            })
+
+            async def produce() -> None:
+                async for event in self.orchestrator.stream_query_async(query, context):
+                    data = json.dumps(serialize_result(event), ensure_ascii=False)
+                    await send({
+                        "type": "http.response.body",
+                        "body": f"event: {event['event']}\ndata: {data}\n\n".encode("utf-8"),
+                        "more_body": True,
+                    })
+
+            await self._run_until_disconnect(produce(), receive)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    @staticmethod
+    async def _run_until_disconnect(work: Awaitable[None], receive: Receive) -> None:
+        """Run ``work`` but cancel it if the client disconnects first."""
+        async def watch() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        work_task = asyncio.ensure_future(work)
+        watch_task = asyncio.ensure_future(watch())
+        done, _ = await asyncio.wait({work_task, watch_task}, return_when=asyncio.FIRST_COMPLETED)
+        watch_task.cancel()
+        if work_task not in done:
+            work_task.cancel()
+        else:
+            work_task.result()
+
+    # ------------------------------------------------------------------
+    # WebSocket
+
+    async def _websocket(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["path"] != "/v1/ws":
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        if self.draining or self.orchestrator is None:
+            await send({"type": "websocket.close", "code": 1013})
+            return
+        await send({"type": "websocket.accept"})
+
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            try:
+                payload = json.loads(message.get("text") or message.get("bytes") or b"{}")
+                if not isinstance(payload, dict):
+                    raise HTTPError(400, "message must be a JSON object")
+                query, context = self._query_args(payload)
+                async with self._track():
+                    async for event in self.orchestrator.stream_query_async(query, context):
+                        await send({"type": "websocket.send", "text": json.dumps(serialize_result(event), ensure_ascii=False)})
+            except HTTPError as e:
+                await send({"type": "websocket.send", "text": json.dumps({"event": "error", "error": e.message}, ensure_ascii=False)})
+            except ValueError:
+                await send({"type": "websocket.send", "text": json.dumps({"event": "error", "error": "invalid JSON"})})
+
+
+app = OrchestratorServer()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the server with uvicorn."""
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Multi-agent orchestrator API server")
+    parser.add_argument("--host", default=Config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=Config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="dispatch queries to N orchestrator worker processes (0 = one per CPU core)")
+    args = parser.parse_args(argv)
+
+    server = app
+    if args.workers is not None:
+        from .workers import WorkerPool
+        server = OrchestratorServer(orchestrator=WorkerPool(args.workers or None))
+    uvicorn.run(server, host=args.host, port=args.port, timeout_graceful_shutdown=int(Config.SERVER_DRAIN_TIMEOUT))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Pool of reusable specialist agents."""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, List, Tuple, Type
+
+from ..agents.base_agent import BaseAgent
+from ..utils.metrics import METRICS
+
+
+class AgentPool:
+    """Keeps constructed specialist agents around for reuse.
+
+    Constructing an agent builds its model client and Strands ``Agent``;
+    pooling avoids paying that on every request. An agent is handed to one
+    caller at a time and its conversation is cleared when it is returned,
+    so pooled agents stay stateless between requests.
+    """
+
+    def __init__(self, max_idle: int = 4):
+        """Initialize the pool.
+
+        Args:
+            max_idle: Maximum idle agents kept per agent class and options
+        """
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: Dict[Hashable, List[BaseAgent]] = {}
+        self._templates: Dict[Hashable, BaseAgent] = {}
+
+    @staticmethod
+    def _key(agent_class: Type[BaseAgent], options: Dict[str, Any]) -> Tuple:
+        return (agent_class, tuple(sorted(options.items())))
+
+    @contextmanager
+    def acquire(self, agent_class: Type[BaseAgent], **options) -> Iterator[BaseAgent]:
+        """Borrow an agent, creating one if none is idle.
+
+        Args:
+            agent_class: Specialist class to borrow
+            **options: Constructor options (tier, cascade, ...)
+
+        Yields:
+            An agent reserved for the caller
+        """
+        key = self._key(agent_class, options)
+        with self._lock:
+            idle = self._idle.get(key)
+            agent = idle.pop() if idle else None
+        METRICS.incr("agent_pool.hits" if agent is not None else "agent_pool.misses")
+        if agent is None:
+            agent = agent_class(**options)
+        try:
+            yield agent
+        finally:
+            agent.reset_conversation()
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(agent)
+
+    def template(self, agent_class: Type[BaseAgent], **options) -> BaseAgent:
+        """Return a shared agent for read-only use such as rendering prompts.
+
+        Template agents are never handed out by :meth:`acquire`, so callers
+        that only need a prompt or a model id do not take an agent away
+        from requests calling the LLM. Callers must not call the LLM or
+        change the agent's conversation.
+
+        Args:
+            agent_class: Specialist class
+            **options: Constructor options (tier, cascade, ...)
+
+        Returns:
+            The shared agent for this class and options
+        """
+        key = self._key(agent_class, options)
+        with self._lock:
+            agent = self._templates.get(key)
+        if agent is None:
+            agent = agent_class(**options)
+            with self._lock:
+                agent = self._templates.setdefault(key, agent)
+        return agent
+
+    def prewarm(self, agent_class: Type[BaseAgent], count: int = 1, **options) -> int:
+        """Construct agents ahead of time until ``count`` are idle.
+
+        Args:
+            agent_class: Specialist class to construct
+            count: Target number of idle agents
+            **options: Constructor options
+
+        Returns:
+            Number of agents constructed
+        """
+        key = self._key(agent_class, options)
+        with self._lock:
+            missing = min(count, self.max_idle) - len(self._idle.get(key, []))
+        created = [agent_class(**options) for _ in range(max(0, missing))]
+        with self._lock:
+            self._idle.setdefault(key, []).extend(created)
+        return len(created)
+
+    def idle_agents(self) -> List[BaseAgent]:
+        """Return a snapshot of the idle agents."""
+        with self._lock:
+            return [agent for agents in self._idle.values() for agent in agents]
+
+    def stats(self) -> Dict[str, float]:
+        """Return pool hit/miss counters and the idle agent count."""
+        with self._lock:
+            idle = sum(len(agents) for agents in self._idle.values())
+        return {
+            "hits": METRICS.counter("agent_pool.hits"),
+            "misses": METRICS.counter("agent_pool.misses"),
+            "idle": idle,
+        }
@@ -1,9 +1,290 @@
 """Agent tools for the multi-agent system."""
 
-from typing import Any, Dict, Optional
+import asyncio
+import functools
+import hashlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from ..agents.research_assistant import ResearchAssistant
 from ..agents.product_recommendation_assistant import ProductRecommendationAssistant
 from ..agents.trip_planning_assistant import TripPlanningAssistant
+from ..agents.llm_response import LLMResponse
+from ..utils.coalescing import SingleFlight, normalize_prompt
+from ..utils.config import Config
+from ..utils.response_cache import ResponseCache
+from .agent_pool import AgentPool
+
+
+# Identical in-flight specialist calls share a single LLM call
+_single_flight = SingleFlight("coalescing")
+
+# Constructed specialists are reused across requests
+agent_pool = AgentPool(Config.AGENT_POOL_SIZE)
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the shared response cache, or ``None`` when it is disabled."""
+    global _response_cache
+    if Config.RESPONSE_CACHE_PATH and (_response_cache is None or _response_cache.path != Config.RESPONSE_CACHE_PATH):
+        _response_cache = ResponseCache(Config.RESPONSE_CACHE_PATH, Config.RESPONSE_CACHE_TTL)
+    return _response_cache if Config.RESPONSE_CACHE_PATH else None
+
+
+def _agent_options(tier: Optional[str] = None, cascade: Optional[bool] = None) -> Dict[str, Any]:
+    """Build specialist constructor options from the call overrides.
+    
+    The cascade mode is always spelled out so every request path asks the
+    pool for the same options the warm-up prebuilt (see ``warmup.py``).
+    """
+    options: Dict[str, Any] = {"cascade": Config.CASCADE_ENABLED if cascade is None else cascade}
+    if tier:
+        options["tier"] = tier
+    return options
+
+
+def _render(tool_name: str, query: str, context: Optional[Dict[str, Any]], options: Dict[str, Any]):
+    """Render a specialist's prompt and its coalescing key.
+    
+    Returns:
+        Tuple of (rendered prompt, coalescing key)
+    """
+    agent = agent_pool.template(AVAILABLE_TOOLS[tool_name]["agent_class"], **options)
+    prompt = agent.build_prompt(query, context)
+    return prompt, (tool_name, agent.model_id, agent.cascade, normalize_prompt(prompt))
+
+
+def _from_stream(key, chunks: List[str]) -> LLMResponse:
+    """Response for a call that joined an in-flight stream of the same prompt."""
+    return LLMResponse(blocks=("".join(chunks),), model_id=key[1])
+
+
+def _from_response(response: LLMResponse) -> List[str]:
+    """Chunks for a stream that joined an in-flight call of the same prompt."""
+    return [response.text]
+
+
+def _invoke(tool_name: str, options: Dict[str, Any], prompt: str, query: str, context: Optional[Dict[str, Any]]) -> LLMResponse:
+    """Call a pooled specialist with an already rendered prompt.
+    
+    The agent is borrowed for the duration of the call only, so callers
+    waiting on a coalesced call do not hold pooled agents. The query is
+    passed along for specialists that do not answer with a single call
+    (see ``TripPlanningAssistant.respond``).
+    """
+    with agent_pool.acquire(AVAILABLE_TOOLS[tool_name]["agent_class"], **options) as agent:
+        return agent.respond(query, context, prompt)
+
+
+def _invoke_cached(tool_name: str, options: Dict[str, Any], prompt: str, key, query: str, context: Optional[Dict[str, Any]]) -> LLMResponse:
+    """Serve a call from the shared response cache, falling back to the LLM."""
+    cache = get_response_cache()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return LLMResponse.from_dict(cached)
+    response = _invoke(tool_name, options, prompt, query, context)
+    if cache is not None and response.ok:
+        cache.set(key, response.to_dict())
+    return response
+
+
+async def _stream(tool_name: str, options: Dict[str, Any], prompt: str) -> AsyncIterator[str]:
+    """Stream a pooled specialist's response to an already rendered prompt."""
+    with agent_pool.acquire(AVAILABLE_TOOLS[tool_name]["agent_class"], **options) as agent:
+        async for chunk in agent.stream_llm_async(prompt):
+            yield chunk
+
+
+def run_tool(tool_name: str, query: str, context: Optional[Dict[str, Any]] = None, tier: Optional[str] = None, cascade: Optional[bool] = None) -> LLMResponse:
+    """
+    Run a registered specialist agent and return its structured response.
+    
+    Concurrent calls that render to the same normalized prompt are
+    coalesced into one LLM call when ``Config.COALESCE_REQUESTS`` is set,
+    and successful responses are shared through the response cache when
+    ``Config.RESPONSE_CACHE_PATH`` is set.
+    
+    Args:
+        tool_name: Name of the tool in ``AVAILABLE_TOOLS``
+        query: The query to send to the specialist
+        context: Optional context information
+        tier: Optional model tier overriding the specialist's default
+        cascade: Optional override of the specialist's cascade mode
+    
+    Returns:
+        The specialist's ``LLMResponse``
+    """
+    options = _agent_options(tier, cascade)
+    prompt, key = _render(tool_name, query, context, options)
+    if not Config.COALESCE_REQUESTS:
+        return _invoke_cached(tool_name, options, prompt, key, query, context)
+    return _single_flight.do(
+        key,
+        lambda: _invoke_cached(tool_name, options, prompt, key, query, context),
+        from_stream=functools.partial(_from_stream, key)
+    )
+
+
+async def run_tool_async(tool_name: str, query: str, context: Optional[Dict[str, Any]] = None, tier: Optional[str] = None, cascade: Optional[bool] = None) -> LLMResponse:
+    """
+    Async variant of :func:`run_tool`.
+    
+    The blocking LLM call runs in a worker thread so the event loop stays
+    free; identical in-flight calls on the loop are coalesced.
+    """
+    options = _agent_options(tier, cascade)
+    prompt, key = _render(tool_name, query, context, options)
+    if not Config.COALESCE_REQUESTS:
+        return await asyncio.to_thread(_invoke_cached, tool_name, options, prompt, key, query, context)
+    return await _single_flight.do_async(
+        key,
+        lambda: asyncio.to_thread(_invoke_cached, tool_name, options, prompt, key, query, context),
+        from_stream=functools.partial(_from_stream, key)
+    )
+
+
+async def stream_tool_async(tool_name: str, query: str, context: Optional[Dict[str, Any]] = None, tier: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Stream a specialist's response text.
+    
+    Identical in-flight streams are shared: late subscribers replay the
+    chunks produced so far and then follow the live stream.
+    
+    Yields:
+        Text deltas of the specialist's response
+    """
+    options = _agent_options(tier)
+    prompt, key = _render(tool_name, query, context, options)
+    if not Config.COALESCE_REQUESTS:
+        async for chunk in _stream(tool_name, options, prompt):
+            yield chunk
+        return
+    async for chunk in _single_flight.stream_async(key, lambda: _stream(tool_name, options, prompt), from_result=_from_response):
+        yield chunk
+
+
+def run_edit(tool_name: str, request: str, previous: str, instruction: str, kind: Optional[str] = None, tier: Optional[str] = None) -> Optional[LLMResponse]:
+    """
+    Apply a follow-up edit to a specialist's previous answer.
+    
+    Edits are specific to one conversation, so they bypass request
+    coalescing and the response cache.
+    
+    Args:
+        tool_name: Name of the tool in ``AVAILABLE_TOOLS``
+        request: The request the previous answer was written for
+        previous: The specialist's previous answer
+        instruction: The follow-up asking for the change
+        kind: Kind of edit (see ``tools/followups.py``)
+        tier: Optional model tier overriding the specialist's default
+    
+    Returns:
+        The updated answer, or ``None`` when the specialist's patch
+        matched no section (see ``BaseAgent.respond_edit``)
+    """
+    with agent_pool.acquire(AVAILABLE_TOOLS[tool_name]["agent_class"], **_agent_options(tier)) as agent:
+        return agent.respond_edit(request, previous, instruction, kind)
+
+
+async def stream_edit_async(tool_name: str, request: str, previous: str, instruction: str, kind: Optional[str] = None, tier: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Stream the updated answer of a follow-up edit (see :func:`run_edit`).
+    
+    Yields:
+        Text deltas of the full updated answer
+    """
+    with agent_pool.acquire(AVAILABLE_TOOLS[tool_name]["agent_class"], **_agent_options(tier)) as agent:
+        async for chunk in agent.stream_edit_async(request, previous, instruction, kind):
+            yield chunk
+
+
+def run_lookup(tool_name: str, previous: str, question: str, tier: Optional[str] = None) -> LLMResponse:
+    """
+    Answer a question about a specialist's previous answer with the LLM.
+    
+    Used for lookup follow-ups the local answer index could not answer
+    confidently (see ``tools/lookups.py``).
+    
+    Args:
+        tool_name: Name of the tool in ``AVAILABLE_TOOLS``
+        previous: The specialist's previous answer
+        question: The follow-up question
+        tier: Optional model tier overriding the specialist's default
+    
+    Returns:
+        The specialist's ``LLMResponse``
+    """
+    with agent_pool.acquire(AVAILABLE_TOOLS[tool_name]["agent_class"], **_agent_options(tier)) as agent:
+        return agent.invoke_llm(agent.build_lookup_prompt(previous, question))
+
+
+async def stream_lookup_async(tool_name: str, previous: str, question: str, tier: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Stream the answer of :func:`run_lookup`.
+    
+    Yields:
+        Text deltas of the answer
+    """
+    with agent_pool.acquire(AVAILABLE_TOOLS[tool_name]["agent_class"], **_agent_options(tier)) as agent:
+        async for chunk in agent.stream_llm_async(agent.build_lookup_prompt(previous, question)):
+            yield chunk
+
+
+def run_followup(tool_name: str, query: str, history: List[Tuple[str, str]], tier: Optional[str] = None) -> LLMResponse:
+    """
+    Answer a follow-up on a pooled specialist with the session's conversation restored.
+    
+    Follow-ups depend on their conversation, so they bypass request
+    coalescing and the response cache.
+    
+    Args:
+        tool_name: Name of the tool in ``AVAILABLE_TOOLS``
+        query: The follow-up query
+        history: The session's recent (request, answer) pairs with this specialist
+        tier: Optional model tier overriding the specialist's default
+    
+    Returns:
+        The specialist's ``LLMResponse``
+    """
+    with agent_pool.acquire(AVAILABLE_TOOLS[tool_name]["agent_class"], **_agent_options(tier)) as agent:
+        return agent.respond_followup(query, history)
+
+
+async def stream_followup_async(tool_name: str, query: str, history: List[Tuple[str, str]], tier: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Stream the answer of :func:`run_followup`.
+    
+    Yields:
+        Text deltas of the answer
+    """
+    with agent_pool.acquire(AVAILABLE_TOOLS[tool_name]["agent_class"], **_agent_options(tier)) as agent:
+        async for chunk in agent.stream_followup_async(query, history):
+            yield chunk
+
+
+def prompt_version(tool_name: str, query: str, context: Optional[Dict[str, Any]] = None, tier: Optional[str] = None, cascade: Optional[bool] = None) -> Tuple[str, str]:
+    """
+    Describe what a specialist call for this query would currently use.
+    
+    Returns:
+        Tuple of (model id, hash of the system prompt and rendered prompt)
+    """
+    agent = agent_pool.template(AVAILABLE_TOOLS[tool_name]["agent_class"], **_agent_options(tier, cascade))
+    prompt = agent.build_prompt(query, context)
+    digest = hashlib.sha256(f"{agent.system_prompt}\0{prompt}".encode("utf-8")).hexdigest()[:16]
+    return agent.model_id, digest
+
+
+def get_coalescing_stats() -> Dict[str, float]:
+    """
+    Return request coalescing statistics.
+    
+    Returns:
+        Leader/follower counts, in-flight keys and the coalescing ratio
+    """
+    return _single_flight.stats()
 
 
 def research_assistant_tool(query: str, context: Optional[Dict[str, Any]] = None) -> str:
@@ -21,9 +302,7 @@ def research_assistant_tool(query: str, context: Optional[Dict[str, Any]] = None
         A detailed research answer with citations and sources
     """
     try:
-        agent = ResearchAssistant()
-        response = agent.process_query(query, context)
-        return response
+        return run_tool("research_assistant", query, context).text
     except Exception as e:
         return f"Error in research assistant tool: {str(e)}"
 
@@ -43,9 +322,7 @@ def product_recommendation_tool(query: str, context: Optional[Dict[str, Any]] =
         Detailed product recommendations with analysis and comparisons
     """
     try:
-        agent = ProductRecommendationAssistant()
-        response = agent.process_query(query, context)
-        return response
+        return run_tool("product_recommendation", query, context).text
     except Exception as e:
         return f"Error in product recommendation tool: {str(e)}"
 
@@ -65,9 +342,7 @@ def trip_planning_tool(query: str, context: Optional[Dict[str, Any]] = None) ->
         A comprehensive travel itinerary with recommendations and practical information
     """
     try:
-        agent = TripPlanningAssistant()
-        response = agent.process_query(query, context)
-        return response
+        return run_tool("trip_planning", query, context).text
     except Exception as e:
         return f"Error in trip planning tool: {str(e)}"
 
@@ -76,21 +351,28 @@ def trip_planning_tool(query: str, context: Optional[Dict[str, Any]] = None) ->
 AVAILABLE_TOOLS = {
     "research_assistant": {
         "function": research_assistant_tool,
+        "agent_class": ResearchAssistant,
         "description": "Process research-related queries and provide factual information",
         "keywords": ["research", "facts", "information", "study", "analysis", "documentation",
-                     "研究", "調査", "情報", "調べ", "分析", "資料", "について", "とは"]
+                     "研究", "調査", "情報", "調べ", "分析", "資料", "について", "とは"],
+        # Generic words that also appear in requests for other specialists
+        "generic_keywords": ["information", "情報", "について", "とは"]
     },
     "product_recommendation": {
         "function": product_recommendation_tool,
+        "agent_class": ProductRecommendationAssistant,
         "description": "Provide product recommendations and shopping advice",
         "keywords": ["product", "recommendation", "shopping", "buy", "purchase", "compare",
-                     "製品", "商品", "推薦", "推奨", "買い", "購入", "比較", "おすすめ"]
+                     "製品", "商品", "推薦", "推奨", "買い", "購入", "比較", "おすすめ"],
+        "generic_keywords": ["compare", "比較"]
     },
     "trip_planning": {
         "function": trip_planning_tool,
+        "agent_class": TripPlanningAssistant,
         "description": "Create travel itineraries and provide trip planning advice",
         "keywords": ["travel", "trip", "vacation", "itinerary", "destination", "plan",
-                     "旅行", "旅", "観光", "旅程", "行き先", "計画", "休暇", "バケーション"]
+                     "旅行", "旅", "観光", "旅程", "行き先", "計画", "休暇", "バケーション"],
+        "generic_keywords": ["plan", "計画"]
     }
 }
 
@@ -0,0 +1,93 @@
+"""Detection of follow-up edits to the previous answer.
+
+A short follow-up such as "make it 3 days", "3泊にして" or "cheaper
+options only" asks to change the answer just given, not for a new one.
+``detect_edit`` classifies such queries by the kind of change, which the
+specialists map to the outline sections it most likely affects.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Optional
+
+from ..utils.metrics import METRICS
+
+# Kinds of edits, checked in order
+EDIT_PATTERNS = (
+    ("budget", r"安[いくめ]|安価|格安|低価格|節約|予算|円(?:以下|以内|まで)|cheap|less expensive|budget|under\s*[$¥]?\d"),
+    ("duration", r"\d+\s*(?:日間|日|泊|days?\b|nights?\b)|日数|短く|長く|shorter|longer"),
+    ("filter", r"のみ|だけ|以外|除いて|抜きで|なしで|\bonly\b|\bwithout\b|\bexcept\b"),
+    ("change", r"追加|加えて|入れて|含めて|増やして|減らして|削除|外して|差し替え|入れ替え|\badd\b|\bremove\b|\bdrop\b|\breplace\b|\binstead\b|\bmore\b|\bfewer\b|\bless\b|もっと"),
+)
+_EDIT_PATTERNS = tuple((kind, re.compile(pattern)) for kind, pattern in EDIT_PATTERNS)
+
+# Phrasings that ask for a change of the answer in hand
+_EDIT_VERB = re.compile(
+    r"にして|に変更|に変えて|にしたい|に短縮|に延長|に減らして|に増やして|でお願い|で作り直して|"
+    r"\bmake (?:it|this|them)\b|\bchange\b|\bswitch\b|\binstead\b|\bonly\b"
+)
+
+# A follow-up that restates a full request is a new query
+_NEW_REQUEST = re.compile(
+    r"計画して|計画を立て|プランを作|教えて|について|とは|推薦して|推奨して|探して|"
+    r"\bplan (?:a|my)\b|\brecommend\b|\btell me\b|\bwhat (?:is|are)\b|\bexplain\b"
+)
+
+
+def detect_edit(query: str, routed: bool = False, max_chars: int = 80) -> Optional[str]:
+    """Return the kind of edit a follow-up asks for, or None for a new query.
+
+    Args:
+        query: The follow-up query
+        routed: Whether the keyword router matched a specialist for it
+            (such queries only count as edits when they do not restate a
+            full request)
+        max_chars: Longer queries are never edits
+
+    Returns:
+        "budget", "duration", "filter" or "change", or None
+    """
+    text = unicodedata.normalize("NFKC", query).strip().casefold()
+    if not text or len(text) > max_chars:
+        return None
+    if routed and _NEW_REQUEST.search(text):
+        return None
+    for kind, pattern in _EDIT_PATTERNS:
+        if pattern.search(text):
+            # A bare "5日間" or "予算10万円" is not a change request on its own
+            if kind in ("duration", "budget") and not (_EDIT_VERB.search(text) or len(text) <= 12):
+                continue
+            return kind
+    return "change" if _EDIT_VERB.search(text) else None
+
+
+def record_edit(previous_tokens: int, response) -> None:
+    """Record a follow-up answered with a section patch.
+
+    The tokens saved are estimated as the output tokens of the previous
+    answer minus those of the patch, i.e. against regenerating the
+    answer at its previous length.
+    """
+    METRICS.incr("followup.edits")
+    METRICS.observe("followup.patch_latency_ms", response.latency_ms)
+    if response.output_tokens:
+        # Streamed patches carry no usage
+        METRICS.observe("followup.patch_output_tokens", response.output_tokens)
+    if previous_tokens and response.output_tokens:
+        METRICS.incr("followup.tokens_saved", max(0, previous_tokens - response.output_tokens))
+
+
+def followup_report() -> Dict[str, float]:
+    """Return follow-up edit counts, fallbacks to full regeneration, patch size and estimated tokens saved."""
+    edits = METRICS.counter("followup.edits")
+    fallbacks = METRICS.counter("followup.fallbacks")
+    tokens = METRICS.summary("followup.patch_output_tokens")
+    latency = METRICS.summary("followup.patch_latency_ms")
+    return {
+        "edits": edits,
+        "fallbacks": fallbacks,
+        "fallback_rate": fallbacks / (edits + fallbacks) if edits + fallbacks else 0.0,
+        "mean_patch_output_tokens": tokens["mean"],
+        "mean_patch_latency_ms": latency["mean"],
+        "tokens_saved": METRICS.counter("followup.tokens_saved"),
+    }
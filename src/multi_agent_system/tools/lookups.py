@@ -0,0 +1,298 @@
+"""Lookup follow-ups answered from the session's earlier answers.
+
+Questions such as "2日目は何だっけ？", "what was day 2 again?" or "2番目の
+ラップトップの価格は？" ask for something the assistant has already
+written. ``parse_lookup`` recognizes them, ``AnswerIndex`` indexes an
+answer by heading, list item and entity (day numbers, positions, prices)
+and ``lookup`` finds the passage with a confidence score, so the
+orchestrator can answer without an LLM call and fall back to one only
+when the score is low.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..utils.metrics import METRICS
+
+# Phrasings that ask for something already said
+_LOOKUP = re.compile(
+    r"\b(?:again|remind me|what (?:was|were)|which (?:was|were|one was)|how much was)\b|"
+    r"だっけ|でしたっけ|何だった|なんだった|どれだった|どこだった|いくらだった|もう一度|"
+    r"何でしたか|どれでしたか|どこでしたか|いくらでしたか"
+)
+# A short "…は？" only refers back with a recall marker ("さっきのホテルは？")
+# or a day or position of the answer ("2日目は？"); "ホテルは？" is a new question
+_SHORT_QUESTION = re.compile(r"^.{1,20}は[?？]$")
+_RECALL = re.compile(r"さっき|先ほど|前の|前回|その|あの|\b(?:earlier|previous|that)\b")
+
+_NUMBERS = {"一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9, "十": 10}
+_ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7, "last": -1}
+_NUMBER = r"(\d+|[一二三四五六七八九十])"
+
+_DAY = re.compile(rf"{_NUMBER}\s*日目|day\s*(\d+)|({'|'.join(_ORDINALS)})\s+day")
+_POSITION = re.compile(rf"{_NUMBER}\s*(?:番目|つ目|個目|件目|位)|(?:オプション|option|候補)\s*{_NUMBER}|\b({'|'.join(_ORDINALS)})\b|(最初|最後)")
+_PRICE = re.compile(r"価格|値段|いくら|料金|費用|price|cost|how much")
+_PRICE_TEXT = re.compile(r"[¥￥$＄]\s*[\d,]+|[\d,]+(?:\.\d+)?\s*(?:万?円|ドル)|価格|料金|費用")
+
+# Words of the question that say nothing about where the answer is
+_FILLER = re.compile(
+    r"\b(?:again|remind me|what|which|how much|was|were|the|of|is|it|one|please)\b|"
+    r"だっけ|でしたっけ|だった|でした|何|なん|どれ|どこ|いくら|もう一度|教えて|について|か|は|の|を|[?？。、!！]"
+)
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_BOLD_HEADING = re.compile(r"^\*\*(.+?)\*\*\s*[:：]?\s*$")
+_ITEM = re.compile(r"^(?:\d+\s*[.)．）]|[-*・])\s+(.*)")
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def _number(groups: Iterable[Optional[str]]) -> Optional[int]:
+    for group in groups:
+        if not group:
+            continue
+        if group.isdigit():
+            return int(group)
+        if group in _NUMBERS:
+            return _NUMBERS[group]
+        if group in _ORDINALS:
+            return _ORDINALS[group]
+        return 1 if group == "最初" else -1
+    return None
+
+
+def _terms(text: str) -> Set[str]:
+    """Words and character bigrams used to match a question against headings."""
+    text = _normalize(text)
+    terms = set(re.findall(r"[a-z][a-z0-9]+", text))
+    for run in re.findall(r"[^\x00-\x7f]+", text):
+        terms.update(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+class Question:
+    """A lookup follow-up and what it asks for."""
+
+    __slots__ = ("query", "day", "position", "price", "terms")
+
+    def __init__(self, query: str, day: Optional[int], position: Optional[int], price: bool, terms: Set[str]):
+        """Initialize the question.
+
+        Args:
+            query: The follow-up query
+            day: Day of an itinerary asked about
+            position: Position of a listed option asked about (-1 = last)
+            price: Whether the question asks for a price
+            terms: Remaining words describing the passage
+        """
+        self.query = query
+        self.day = day
+        self.position = position
+        self.price = price
+        self.terms = terms
+
+
+def parse_lookup(query: str, max_chars: int = 80) -> Optional[Question]:
+    """Return what a lookup follow-up asks for, or None for other queries.
+
+    Args:
+        query: The follow-up query
+        max_chars: Longer queries are never lookups
+    """
+    text = _normalize(query).strip()
+    if not text or len(text) > max_chars:
+        return None
+    day = _DAY.search(text)
+    position = None if day else _POSITION.search(text)
+    if not _LOOKUP.search(text) and not (_SHORT_QUESTION.match(text) and (day or position or _RECALL.search(text))):
+        return None
+    rest = _FILLER.sub(" ", _PRICE.sub(" ", _POSITION.sub(" ", _DAY.sub(" ", text))))
+    return Question(
+        query,
+        _number(day.groups()) if day else None,
+        _number(position.groups()) if position else None,
+        bool(_PRICE.search(text)),
+        _terms(rest),
+    )
+
+
+class Entry:
+    """A heading or list item of an answer."""
+
+    __slots__ = ("title", "kind", "parent", "lines", "day")
+
+    def __init__(self, title: str, kind: str, parent: Optional["Entry"]):
+        self.title = title
+        self.kind = kind
+        self.parent = parent
+        self.lines: List[str] = []
+        day = _DAY.search(_normalize(title))
+        self.day = _number(day.groups()) if day else None
+
+    @property
+    def text(self) -> str:
+        """The entry's line and the lines under it."""
+        return "\n".join(self.lines).strip()
+
+    @property
+    def section(self) -> str:
+        """Title of the top-level heading the entry belongs to."""
+        entry = self
+        while entry.parent is not None:
+            entry = entry.parent
+        return entry.title
+
+
+class AnswerIndex:
+    """Headings and list items of one answer, with their entities."""
+
+    def __init__(self, text: str):
+        """Index an answer.
+
+        Args:
+            text: The answer text (markdown)
+        """
+        self.entries: List[Entry] = []
+        # (parent, kind, level) -> entries in order, for positional lookups
+        self.groups: Dict[Tuple[int, str, int], List[Entry]] = {}
+        self._parse(text)
+
+    def _add(self, title: str, kind: str, parent: Optional[Entry], level: int) -> Entry:
+        group = self.groups.setdefault((id(parent), kind, level), [])
+        entry = Entry(re.sub(r"\*\*", "", title).strip(), kind, parent)
+        group.append(entry)
+        self.entries.append(entry)
+        return entry
+
+    def _parse(self, text: str) -> None:
+        headings: List[Tuple[int, Entry]] = []
+        item: Optional[Entry] = None
+        for line in text.splitlines():
+            heading = _HEADING.match(line)
+            level = len(heading.group(1)) if heading else 7
+            if heading is None:
+                heading = _BOLD_HEADING.match(line.strip()) if not line.startswith(" ") else None
+            if heading is not None:
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                entry = self._add(heading.groups()[-1], "heading", headings[-1][1] if headings else None, level)
+                headings.append((level, entry))
+                item = None
+            else:
+                match = _ITEM.match(line)
+                if match and headings:
+                    item = self._add(match.group(1), "item", headings[-1][1], 0)
+                elif item is not None and line.strip() and not line.startswith((" ", "\t")):
+                    item = None
+            for _, entry in headings:
+                entry.lines.append(line)
+            if item is not None:
+                item.lines.append(line)
+
+    def find(self, question: Question) -> Tuple[Optional[Entry], float, Optional[str]]:
+        """Find the passage a question asks for.
+
+        Returns:
+            Tuple of (entry, confidence between 0 and 1, the matching
+            price line when a price was asked for)
+        """
+        if question.day is not None:
+            for entry in self.entries:
+                if entry.day == question.day:
+                    return entry, 1.0, None
+            return None, 0.0, None
+        if question.position is not None:
+            return self._find_position(question)
+        return self._find_heading(question)
+
+    def _find_position(self, question: Question) -> Tuple[Optional[Entry], float, Optional[str]]:
+        best, best_score = None, 0.0
+        for group in self.groups.values():
+            # Positions refer to listed options, not to the outline sections
+            if len(group) < 2 or question.position > len(group) or group[0].parent is None:
+                continue
+            entry = group[question.position - 1 if question.position > 0 else -1]
+            topic = _terms(" ".join(member.title for member in group) + " " + (entry.parent.title if entry.parent else ""))
+            score = 0.7
+            if question.terms and question.terms & topic:
+                score += 0.2
+            if question.price:
+                score += 0.1 if any(_PRICE_TEXT.search(member.text) for member in group) else -0.3
+            if score > best_score:
+                best, best_score = entry, score
+        if best is None:
+            return None, 0.0, None
+        return best, min(best_score, 1.0), self._price_line(best) if question.price else None
+
+    def _find_heading(self, question: Question) -> Tuple[Optional[Entry], float, Optional[str]]:
+        if not question.terms:
+            return None, 0.0, None
+        best, best_score = None, 0.0
+        for entry in self.entries:
+            score = len(question.terms & _terms(entry.title)) / len(question.terms)
+            if score > best_score:
+                best, best_score = entry, score
+        price = self._price_line(best) if best is not None and question.price else None
+        if question.price and price is None:
+            best_score /= 2
+        return best, best_score, price
+
+    @staticmethod
+    def _price_line(entry: Entry) -> Optional[str]:
+        for line in entry.lines:
+            if _PRICE_TEXT.search(line):
+                return line.strip()
+        return None
+
+
+def turn_indexes(turn) -> List[Tuple[str, AnswerIndex]]:
+    """Return (tool name, index) pairs of a session turn's answers, indexing them on first use."""
+    if turn.indexes is None:
+        turn.indexes = [(tool_name, AnswerIndex(text)) for tool_name, text in turn.texts.items()]
+    return turn.indexes
+
+
+def lookup(indexes: Iterable[Tuple[str, AnswerIndex]], question: Question) -> Tuple[Optional[str], Optional[str], float]:
+    """Answer a lookup question from indexed answers, most recent first.
+
+    Args:
+        indexes: (tool name, index) pairs, most recent answer first
+        question: The parsed question
+
+    Returns:
+        Tuple of (answer text, tool name, confidence); the text is None
+        when nothing matched
+    """
+    best: Tuple[Optional[str], Optional[str], float] = (None, None, 0.0)
+    for tool_name, index in indexes:
+        entry, score, price = index.find(question)
+        if entry is None or score <= best[2]:
+            continue
+        if price is not None:
+            title = entry.title if entry.kind == "heading" else entry.title.split("\n")[0]
+            text = price if title in price else f"**{title}**\n{price}"
+        else:
+            text = entry.text
+        best = (f"{text}\n\n*（前回の回答「{entry.section}」より）*", tool_name, score)
+    return best
+
+
+def lookup_report() -> Dict[str, float]:
+    """Return lookup follow-up counts, the share answered locally, LLM fallbacks and misses.
+
+    ``misses`` matched nothing in the earlier answers and were routed as
+    new queries.
+    """
+    queries = METRICS.counter("lookup.queries")
+    hits = METRICS.counter("lookup.hits")
+    return {
+        "queries": queries,
+        "hits": hits,
+        "fallbacks": METRICS.counter("lookup.fallbacks"),
+        "misses": METRICS.counter("lookup.misses"),
+        "hit_rate": hits / queries if queries else 0.0,
+        "mean_latency_ms": METRICS.summary("lookup.latency_ms")["mean"],
+    }
@@ -0,0 +1,177 @@
+"""Keyword router for selecting specialist tools.
+
+``KeywordRouter.match`` returns every tool with a keyword in the query.
+Generic words such as "情報", "について", "plan" or "compare" make many
+queries match two or three tools, so ``KeywordRouter.rank`` scores the
+matches (generic keywords count less than specific ones) and keeps only
+the tools that are close to the best one, up to a maximum fan-out width.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.metrics import METRICS
+
+
+class KeywordRouter:
+    """Precompiled keyword matcher over the tool registry.
+
+    Each tool's keywords are compiled into a single alternation regex so a
+    query is scanned once per tool instead of once per keyword.
+    """
+
+    def __init__(self, tools: Dict[str, Dict[str, Any]], generic_weight: float = 0.25):
+        """Compile the router.
+
+        Args:
+            tools: Tool registry mapping tool names to info with ``keywords``
+                and optionally ``generic_keywords`` (a subset of them)
+            generic_weight: Score of a generic keyword match; other
+                keywords score 1
+        """
+        self.generic_weight = generic_weight
+        self._generic = {tool_name: set(tool_info.get("generic_keywords", ())) for tool_name, tool_info in tools.items()}
+        self._patterns = {
+            tool_name: re.compile(
+                "|".join(re.escape(keyword) for keyword in sorted(tool_info["keywords"], key=len, reverse=True))
+            )
+            for tool_name, tool_info in tools.items()
+        }
+
+    def match(self, query: str) -> List[str]:
+        """Return the tools whose keywords appear in the query, in registry order.
+
+        Args:
+            query: The user's query
+
+        Returns:
+            List of matching tool names
+        """
+        query_lower = query.lower()
+        return [tool_name for tool_name, pattern in self._patterns.items() if pattern.search(query_lower)]
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """Score the matching tools by the distinct keywords found in the query.
+
+        Args:
+            query: The user's query
+
+        Returns:
+            Mapping of matching tool name to score, in registry order
+        """
+        query_lower = query.lower()
+        scores = {}
+        for tool_name, pattern in self._patterns.items():
+            found = set(pattern.findall(query_lower))
+            if found:
+                generic = self._generic[tool_name]
+                scores[tool_name] = sum(self.generic_weight if keyword in generic else 1.0 for keyword in found)
+        return scores
+
+    def rank(self, query: str, max_width: int = 0, min_margin: float = 0.0) -> List[str]:
+        """Return the best matching tool and the ones close to it, best first.
+
+        Args:
+            query: The user's query
+            max_width: Maximum number of tools (0 = no limit)
+            min_margin: A further tool is only kept while the best tool
+                leads it by less than this score (0 = best tool only,
+                ties included)
+
+        Returns:
+            List of selected tool names
+        """
+        ranked = sorted(self.scores(query).items(), key=lambda item: -item[1])
+        if not ranked:
+            return []
+        top = ranked[0][1]
+        selected = [tool_name for tool_name, score in ranked if top - score < min_margin or score == top]
+        return selected[:max_width] if max_width > 0 else selected
+
+
+_router: Optional[KeywordRouter] = None
+
+
+def get_router() -> KeywordRouter:
+    """Return the process-wide router compiled from ``AVAILABLE_TOOLS``."""
+    global _router
+    if _router is None:
+        from .agent_tools import AVAILABLE_TOOLS
+        from ..utils.config import Config
+        _router = KeywordRouter(AVAILABLE_TOOLS, Config.ROUTING_GENERIC_WEIGHT)
+    return _router
+
+
+def record_fanout(matched: int, selected: int) -> None:
+    """Record the fan-out width of a routed query and how many matches ranking dropped."""
+    if not matched:
+        return
+    METRICS.observe("routing.fanout_width", selected)
+    METRICS.incr(f"routing.fanout.{selected}")
+    METRICS.incr("routing.trimmed", matched - selected)
+
+
+def fanout_report() -> Dict[str, Any]:
+    """Return the fan-out width of routed queries in this process.
+
+    ``widths`` maps the number of specialists a query was sent to onto
+    the number of such queries; ``trimmed`` counts keyword matches that
+    ranking dropped.
+    """
+    summary = METRICS.summary("routing.fanout_width")
+    widths = {}
+    for width in range(1, int(summary["max"]) + 1):
+        count = METRICS.counter(f"routing.fanout.{width}")
+        if count:
+            widths[width] = count
+    return {
+        "queries": summary["count"],
+        "mean_width": summary["mean"],
+        "widths": widths,
+        "trimmed": METRICS.counter("routing.trimmed"),
+    }
+
+
+def fanout_distribution(
+    queries: Iterable[Tuple[str, int]],
+    router: Optional[KeywordRouter] = None,
+    max_width: int = 0,
+    min_margin: float = 0.0
+) -> Dict[str, Dict[int, int]]:
+    """Compare fan-out widths of logged queries without and with ranking.
+
+    Args:
+        queries: (query, count) pairs, e.g. from ``read_query_log``
+        router: Router to replay them through (defaults to :func:`get_router`)
+        max_width: Maximum fan-out width for the ranked routing
+        min_margin: Score margin for the ranked routing
+
+    Returns:
+        ``{"before": {width: queries}, "after": {width: queries}}``, where
+        "before" sends a query to every matching tool; unrouted queries
+        count as width 0
+    """
+    router = router or get_router()
+    before: Counter = Counter()
+    after: Counter = Counter()
+    for query, count in queries:
+        before[len(router.match(query))] += count
+        after[len(router.rank(query, max_width, min_margin))] += count
+    return {"before": dict(sorted(before.items())), "after": dict(sorted(after.items()))}
+
+
+def routing_report() -> Dict[str, float]:
+    """Return how queries without keyword matches were handled.
+
+    ``sticky`` queries went to the specialist the session was talking to
+    (see ``OrchestratorAgent._sticky_tool``), ``direct`` ones got the
+    orchestrator's own answer.
+    """
+    sticky = METRICS.counter("routing.sticky")
+    direct = METRICS.counter("routing.direct")
+    return {
+        "sticky": sticky,
+        "direct": direct,
+        "sticky_rate": sticky / (sticky + direct) if sticky + direct else 0.0,
+    }
@@ -0,0 +1,126 @@
+"""Specialists exposed as Strands tools for model-driven routing.
+
+With ``ROUTING_MODE=llm`` the orchestrator's own model decides which
+specialists to consult instead of the keyword router. ``SpecialistToolset``
+registers each entry of ``AVAILABLE_TOOLS`` as a Strands tool that takes
+the request for that specialist, runs it through the orchestrator's usual
+specialist path (scheduler, tiers, pooling, caching) and keeps the
+responses. Strands executes the tool uses of one model turn concurrently,
+so consulting two specialists takes as long as the slower one.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from strands import tool
+
+from ..agents.llm_response import LLMResponse
+from ..utils.metrics import METRICS
+from ..utils.scheduler import SchedulerBusyError
+
+
+def _merge(first: LLMResponse, second: LLMResponse) -> LLMResponse:
+    """Combine two answers of the same specialist within one query."""
+    return LLMResponse(
+        blocks=first.blocks + second.blocks,
+        input_tokens=first.input_tokens + second.input_tokens,
+        output_tokens=first.output_tokens + second.output_tokens,
+        latency_ms=max(first.latency_ms, second.latency_ms),
+        model_id=second.model_id or first.model_id,
+        finish_reason=second.finish_reason,
+        error=first.error or second.error,
+        tier=second.tier or first.tier,
+    )
+
+
+class SpecialistToolset:
+    """Strands tools for the specialists of one query, with their responses.
+
+    A toolset belongs to a single query: the tools close over it, so the
+    responses of concurrent queries never mix.
+    """
+
+    def __init__(self, run: Callable[[str, str], LLMResponse], tools: Dict[str, Dict[str, Any]]):
+        """Build the tools.
+
+        Args:
+            run: Called as ``run(tool_name, query)`` to answer a tool use
+            tools: Tool registry mapping tool names to info with ``description``
+        """
+        self._run = run
+        self._lock = threading.Lock()
+        self._active = 0
+        self.responses: Dict[str, LLMResponse] = {}
+        self.calls: List[str] = []
+        self.max_parallel = 0
+        self.error: Optional[SchedulerBusyError] = None
+        self.tools = [self._tool(tool_name, tool_info) for tool_name, tool_info in tools.items()]
+
+    def _tool(self, tool_name: str, tool_info: Dict[str, Any]):
+        def call(query: str) -> str:
+            """Ask the specialist.
+
+            Args:
+                query: The part of the user's request this specialist should
+                    answer, in the user's language
+            """
+            return self.call(tool_name, query).text
+
+        description = f"{tool_info['description']}. Call it together with other specialists when the request spans several areas."
+        return tool(name=tool_name, description=description)(call)
+
+    def call(self, tool_name: str, query: str) -> LLMResponse:
+        """Answer one tool use and keep the response.
+
+        A full scheduler queue is remembered in ``error`` (the model only
+        sees an error message), so the orchestrator can answer "busy".
+        """
+        with self._lock:
+            self._active += 1
+            self.max_parallel = max(self.max_parallel, self._active)
+            self.calls.append(tool_name)
+        try:
+            response = self._run(tool_name, query)
+        except SchedulerBusyError as e:
+            self.error = e
+            response = LLMResponse.from_error(f"{tool_name} is busy")
+        except Exception as e:
+            response = LLMResponse.from_error(f"Error using {tool_name}: {str(e)}")
+        finally:
+            with self._lock:
+                self._active -= 1
+        with self._lock:
+            previous = self.responses.get(tool_name)
+            self.responses[tool_name] = response if previous is None else _merge(previous, response)
+        return response
+
+
+def record_tool_calling(toolset: SpecialistToolset, latency_ms: float) -> None:
+    """Record a query answered in tool-calling mode."""
+    METRICS.incr("tool_calling.queries")
+    METRICS.observe("tool_calling.latency_ms", latency_ms)
+    METRICS.incr("tool_calling.calls", len(toolset.calls))
+    if not toolset.calls:
+        METRICS.incr("tool_calling.direct")
+    elif toolset.max_parallel > 1:
+        METRICS.incr("tool_calling.parallel")
+
+
+def tool_calling_report() -> Dict[str, float]:
+    """Return tool-calling query counts, tool uses per query and the share run in parallel.
+
+    ``direct`` queries were answered by the orchestrator's model without
+    a specialist; ``parallel`` ones had specialists running at the same
+    time.
+    """
+    queries = METRICS.counter("tool_calling.queries")
+    calls = METRICS.counter("tool_calling.calls")
+    parallel = METRICS.counter("tool_calling.parallel")
+    return {
+        "queries": queries,
+        "direct": METRICS.counter("tool_calling.direct"),
+        "calls_per_query": calls / queries if queries else 0.0,
+        "parallel": parallel,
+        "parallel_rate": parallel / queries if queries else 0.0,
+        "mean_latency_ms": METRICS.summary("tool_calling.latency_ms")["mean"],
+    }
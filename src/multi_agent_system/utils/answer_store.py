@@ -0,0 +1,256 @@
+"""Precomputed answers for frequent queries, built offline from query logs.
+
+``python -m src.multi_agent_system.precompute`` reads the query log,
+answers the most frequent queries and writes them to a SQLite file. The
+orchestrator looks a query up here (after ``normalize_query``) before
+routing, so those queries are answered without any model call.
+
+Every entry records the version it was generated with: the model ids
+and a hash of the system and rendered prompts of the specialists that
+answered it. An entry whose version no longer matches what the current
+configuration would use is treated as a miss, so switching models or
+editing a prompt invalidates old answers without a manual purge.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .coalescing import normalize_prompt
+from .metrics import METRICS
+
+# Trailing characters that do not change the meaning of a short query
+_TRAILING = " 。.．!！?？、,，"
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a user query for precomputed answer lookup.
+
+    Applies :func:`normalize_prompt` (NFKC, case folding, whitespace
+    collapsing) and drops trailing punctuation.
+    """
+    return normalize_prompt(query).rstrip(_TRAILING)
+
+
+class AnswerStore:
+    """SQLite-backed store of precomputed answers.
+
+    Lookups are served from an in-memory copy of the table, which is
+    reloaded at most every ``reload_seconds`` so a refresh written by the
+    batch job is picked up by running processes.
+    """
+
+    def __init__(self, path: str, reload_seconds: float = 30):
+        """Open (and create if needed) the store.
+
+        Args:
+            path: SQLite database file
+            reload_seconds: Minimum interval between reloads of the table
+        """
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # (key, stored version) -> whether it matches the current version
+        self._checked: Dict[Tuple[str, str], bool] = {}
+        self._loaded_at = 0.0
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key TEXT PRIMARY KEY, query TEXT NOT NULL, tools TEXT NOT NULL, version TEXT NOT NULL, "
+            "models TEXT NOT NULL, result TEXT NOT NULL, count INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            self._local.connection = connection
+        return connection
+
+    def reload(self) -> int:
+        """Reload the table into memory and return the number of entries."""
+        rows = self._connection().execute(
+            "SELECT key, query, tools, version, models, result, count, updated_at FROM answers"
+        ).fetchall()
+        entries = {
+            row[0]: {
+                "key": row[0],
+                "query": row[1],
+                "tools": json.loads(row[2]),
+                "version": row[3],
+                "models": json.loads(row[4]),
+                "result": json.loads(row[5]),
+                "count": row[6],
+                "updated_at": row[7],
+            }
+            for row in rows
+        }
+        live = {(key, entry["version"]) for key, entry in entries.items()}
+        with self._lock:
+            self._entries = entries
+            self._checked = {checked: fresh for checked, fresh in self._checked.items() if checked in live}
+            self._loaded_at = time.monotonic()
+        METRICS.set_gauge("precomputed.entries", len(entries))
+        return len(entries)
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() - self._loaded_at >= self.reload_seconds:
+            self.reload()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for a query without checking its version."""
+        self._maybe_reload()
+        return self._entries.get(normalize_query(query))
+
+    def lookup(self, query: str, current_version: Callable[[str, List[str]], str]) -> Optional[Dict[str, Any]]:
+        """Return the precomputed result for a query if it is still current.
+
+        Args:
+            query: The user's query
+            current_version: Returns the version an answer to the stored
+                query produced now with the given tools would have; it is
+                called once per stored version, not on every lookup
+
+        Returns:
+            A copy of the stored result, or ``None`` on a miss or stale entry
+        """
+        entry = self.get(query)
+        if entry is None:
+            METRICS.incr("precomputed.misses")
+            return None
+        key = (entry["key"], entry["version"])
+        fresh = self._checked.get(key)
+        if fresh is None:
+            try:
+                fresh = current_version(entry["query"], entry["tools"]) == entry["version"]
+            except Exception:
+                fresh = False
+            self._checked[key] = fresh
+        if not fresh:
+            METRICS.incr("precomputed.stale")
+            return None
+        METRICS.incr("precomputed.hits")
+        return dict(entry["result"])
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return every stored entry (freshly read from the database)."""
+        self.reload()
+        return list(self._entries.values())
+
+    def put(self, query: str, tools: List[str], version: str, models: List[str], result: Dict[str, Any], count: int = 0) -> None:
+        """Store (or replace) the answer for a query.
+
+        Args:
+            query: The query as users typed it
+            tools: Tools that produced the answer
+            version: Version of the models and prompts used
+            models: Model ids used, for inspection
+            result: JSON-serializable result (``response``, ``agent_used``, ...)
+            count: How often the query appeared in the logs
+        """
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO answers (key, query, tools, version, models, result, count, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                normalize_query(query), query, json.dumps(tools), version, json.dumps(models),
+                json.dumps(result, ensure_ascii=False), count, time.time(),
+            ),
+        )
+        connection.commit()
+        self._loaded_at = 0.0
+
+    def delete(self, keys: Iterable[str]) -> int:
+        """Delete entries by normalized key and return how many were removed."""
+        connection = self._connection()
+        cursor = connection.executemany("DELETE FROM answers WHERE key = ?", [(key,) for key in keys])
+        connection.commit()
+        self._loaded_at = 0.0
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, float]:
+        """Return lookup counters for this process and the hit rate."""
+        hits = METRICS.counter("precomputed.hits")
+        misses = METRICS.counter("precomputed.misses")
+        stale = METRICS.counter("precomputed.stale")
+        total = hits + misses + stale
+        return {
+            "entries": len(self._entries),
+            "hits": hits,
+            "misses": misses,
+            "stale": stale,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+def read_query_log(path: str) -> Dict[str, Dict[str, Any]]:
+    """Count logged queries by normalized form.
+
+    The log holds one JSON object per line with a ``query`` field (see
+    :func:`log_query`); plain text lines are read as queries too.
+
+    Returns:
+        Mapping of normalized query to ``{"query": most common spelling, "count": n}``
+    """
+    spellings: Dict[str, Counter] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                query = json.loads(line)["query"] if line.startswith("{") else line
+            except (ValueError, KeyError, TypeError):
+                continue
+            spellings.setdefault(normalize_query(query), Counter())[query] += 1
+    return {
+        key: {"query": counter.most_common(1)[0][0], "count": sum(counter.values())}
+        for key, counter in spellings.items()
+    }
+
+
+_log_lock = threading.Lock()
+
+
+def log_query(path: str, query: str, result: Dict[str, Any]) -> None:
+    """Append a processed query to the query log (one JSON line)."""
+    record = {
+        "ts": round(time.time(), 3),
+        "query": query,
+        "agent_used": result.get("agent_used"),
+        "tools": list(result.get("llm_responses") or ()),
+        "precomputed": bool(result.get("precomputed")),
+    }
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _log_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+_store: Optional[AnswerStore] = None
+_store_lock = threading.Lock()
+
+
+def get_answer_store() -> Optional[AnswerStore]:
+    """Return the shared store, or ``None`` when ``PRECOMPUTED_ANSWERS_PATH`` is unset or missing."""
+    global _store
+    from .config import Config
+    path = Config.PRECOMPUTED_ANSWERS_PATH
+    if not path:
+        return None
+    if _store is None or _store.path != path:
+        # Serving processes only read the file the batch job wrote
+        if not os.path.exists(path):
+            return None
+        with _store_lock:
+            if _store is None or _store.path != path:
+                _store = AnswerStore(path, Config.PRECOMPUTED_RELOAD_SECONDS)
+    return _store
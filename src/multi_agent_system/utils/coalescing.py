@@ -0,0 +1,280 @@
+"""Single-flight request coalescing for identical in-flight LLM calls."""
+
+import asyncio
+import re
+import threading
+import unicodedata
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .metrics import METRICS, MetricsRegistry
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a rendered prompt for use as a coalescing key.
+
+    Applies NFKC normalization (full-width/half-width unification),
+    case folding and whitespace collapsing so trivially different
+    submissions of the same query share one key.
+
+    Args:
+        prompt: The rendered prompt
+
+    Returns:
+        The normalized prompt
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", prompt)).strip().casefold()
+
+
+class _Flight:
+    """One in-flight call or async stream shared through the in-flight map.
+
+    ``future`` resolves to the call's result, or to the list of chunks
+    once a stream has finished, so callers of any path can wait for it.
+    """
+
+    __slots__ = ("future", "stream")
+
+    def __init__(self, stream: Optional["_AsyncSharedStream"] = None):
+        self.future: Future = Future()
+        self.stream = stream
+
+    def resolve(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(result)
+
+
+class _AsyncSharedStream:
+    """Chunk buffer that lets several consumers replay one producer's stream.
+
+    Consumers may run on other event loops than the producer (a follower
+    in another thread), so waiting goes through per-consumer futures that
+    the producer wakes with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def publish(self, chunk: Any = None, done: bool = False) -> None:
+        """Append a chunk (or mark the stream done) and wake every waiting consumer."""
+        with self._lock:
+            if done:
+                self.done = True
+            else:
+                self.chunks.append(chunk)
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The consumer's loop has closed; nobody is waiting any more
+                pass
+
+    async def wait(self, index: int) -> None:
+        """Wait until there is a chunk at ``index`` or the stream is done."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if index < len(self.chunks) or self.done:
+                return
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        await waiter
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into a single execution.
+
+    The first caller for a key (the leader) runs the work; callers that
+    arrive while it is still in flight (followers) wait for and share its
+    result, exception or stream. Nothing is cached once the call finishes.
+
+    :meth:`do`, :meth:`do_async` and :meth:`stream_async` share one
+    in-flight map, so a thread and a coroutine asking for the same key
+    share one execution too. A caller that needs a result while a stream
+    is in flight converts the finished chunks with ``from_stream``; a
+    stream consumer following a call converts its result with
+    ``from_result``. Without a converter the caller runs on its own.
+    """
+
+    def __init__(self, name: str = "coalescing", metrics: Optional[MetricsRegistry] = None):
+        """Initialize the coalescer.
+
+        Args:
+            name: Metric name prefix
+            metrics: Metrics registry to report to (defaults to the global one)
+        """
+        self.name = name
+        self.metrics = metrics or METRICS
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def _record(self, leader: bool) -> None:
+        self.metrics.incr(f"{self.name}.{'leaders' if leader else 'followers'}")
+
+    def _join(self, key: Hashable, stream: Optional["_AsyncSharedStream"], converts: bool) -> Tuple[Optional[_Flight], bool]:
+        """Find the flight to follow, or register a new one (``stream`` for streams).
+
+        Returns:
+            Tuple of (flight, leader); the flight is None when an
+            in-flight execution of the other kind cannot be converted
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(stream)
+                leader = True
+            elif (flight.stream is None) != (stream is None) and not converts:
+                flight, leader = None, True
+            else:
+                leader = False
+        self._record(leader)
+        return flight, leader
+
+    def _finish(self, key: Hashable, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any], from_stream: Optional[Callable[[List[Any]], Any]] = None) -> Any:
+        """Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument callable doing the actual work
+            from_stream: Builds the result from the chunks of an in-flight
+                stream with the same key
+
+        Returns:
+            The leader's result
+        """
+        flight, leader = self._join(key, None, from_stream is not None)
+        if flight is None:
+            return fn()
+        if not leader:
+            result = flight.future.result()
+            return from_stream(result) if flight.stream is not None else result
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, flight)
+            flight.resolve(error=e)
+            raise
+        self._finish(key, flight)
+        flight.resolve(result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]], from_stream: Optional[Callable[[List[Any]], Any]] = None) -> Any:
+        """Asyncio variant of :meth:`do`.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument callable returning an awaitable
+            from_stream: Builds the result from the chunks of an in-flight
+                stream with the same key
+
+        Returns:
+            The leader's result
+        """
+        flight, leader = self._join(key, None, from_stream is not None)
+        if flight is None:
+            return await fn()
+        if not leader:
+            # shield so a cancelled follower does not cancel the shared call
+            result = await asyncio.shield(asyncio.wrap_future(flight.future))
+            return from_stream(result) if flight.stream is not None else result
+
+        task = asyncio.ensure_future(fn())
+
+        def done(task: asyncio.Future) -> None:
+            self._finish(key, flight)
+            if task.cancelled():
+                flight.future.cancel()
+            else:
+                flight.resolve(task.result() if task.exception() is None else None, task.exception())
+
+        task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    async def stream_async(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]], from_result: Optional[Callable[[Any], List[Any]]] = None) -> AsyncIterator[Any]:
+        """Share one producer async iterator among concurrent consumers.
+
+        Followers first replay the chunks already produced, then receive
+        new chunks as the leader's task produces them. The producer runs in its own task so it keeps going even if the
+        consumer that started it disconnects.
+
+        Args:
+            key: Coalescing key
+            factory: Zero-argument callable returning an async iterator
+            from_result: Turns the result of an in-flight call with the
+                same key into the chunks to yield
+
+        Yields:
+            Chunks of the shared stream
+        """
+        flight, leader = self._join(key, _AsyncSharedStream(), from_result is not None)
+        if flight is None:
+            async for chunk in factory():
+                yield chunk
+            return
+        if flight.stream is None:
+            for chunk in from_result(await asyncio.shield(asyncio.wrap_future(flight.future))):
+                yield chunk
+            return
+        shared = flight.stream
+        if leader:
+            async def produce():
+                try:
+                    async for chunk in factory():
+                        shared.publish(chunk)
+                except BaseException as e:
+                    shared.error = e
+                finally:
+                    self._finish(key, flight)
+                    flight.resolve(list(shared.chunks), shared.error)
+                    shared.publish(done=True)
+
+            shared.task = asyncio.ensure_future(produce())
+
+        index = 0
+        while True:
+            if index < len(shared.chunks):
+                chunk = shared.chunks[index]
+                index += 1
+                yield chunk
+                continue
+            if shared.done:
+                if shared.error is not None:
+                    raise shared.error
+                return
+            await shared.wait(index)
+
+    def stats(self) -> Dict[str, float]:
+        """Return leader/follower counts and the coalescing ratio.
+
+        The ratio is the fraction of calls that were served by another
+        caller's in-flight execution.
+        """
+        leaders = self.metrics.counter(f"{self.name}.leaders")
+        followers = self.metrics.counter(f"{self.name}.followers")
+        total = leaders + followers
+        return {
+            "leaders": leaders,
+            "followers": followers,
+            "in_flight": len(self._flights),
+            "coalescing_ratio": followers / total if total else 0.0,
+        }
@@ -1,13 +1,23 @@
 """Configuration utilities for the multi-agent system."""
 
 import os
-from typing import Optional
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """Parse a ``key=value,key=value`` environment string into a dict."""
+    mapping = {}
+    for item in value.split(","):
+        if "=" in item:
+            key, _, val = item.partition("=")
+            mapping[key.strip()] = val.strip()
+    return mapping
+
+
 class Config:
     """Configuration class for the multi-agent system."""
     
@@ -16,9 +26,148 @@ class Config:
     DEFAULT_TEMPERATURE: float = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
     DEFAULT_MAX_TOKENS: int = int(os.getenv("DEFAULT_MAX_TOKENS", "16384"))
     
+    # Model tiers (backend: openai / bedrock / local)
+    LARGE_MODEL: str = os.getenv("LARGE_MODEL", DEFAULT_MODEL)
+    LARGE_MODEL_BACKEND: str = os.getenv("LARGE_MODEL_BACKEND", "openai")
+    SMALL_MODEL: str = os.getenv("SMALL_MODEL", "gpt-4o-mini")
+    SMALL_MODEL_BACKEND: str = os.getenv("SMALL_MODEL_BACKEND", "openai")
+    
+    # Per-agent tiers by class name, e.g. "ResearchAssistant=small"
+    AGENT_MODEL_TIERS: Dict[str, str] = _parse_mapping(os.getenv("AGENT_MODEL_TIERS", ""))
+    
+    # Per-query-class tiers used by the orchestrator, e.g. "short_research=small"
+    QUERY_CLASS_TIERS: Dict[str, str] = _parse_mapping(os.getenv("QUERY_CLASS_TIERS", "short_research=small,lookup=small"))
+    SHORT_QUERY_CHARS: int = int(os.getenv("SHORT_QUERY_CHARS", "40"))
+    
+    # Cascade: answer with the small tier first, escalate to the large tier on a failed self-check
+    CASCADE_ENABLED: bool = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+    CASCADE_MIN_SECTION_RATIO: float = float(os.getenv("CASCADE_MIN_SECTION_RATIO", "0.8"))
+    
+    # Local OpenAI-compatible endpoint (vLLM, Ollama, LM Studio, ...)
+    LOCAL_MODEL_BASE_URL: Optional[str] = os.getenv("LOCAL_MODEL_BASE_URL")
+    LOCAL_MODEL_API_KEY: str = os.getenv("LOCAL_MODEL_API_KEY", "local")
+    
     # Language configuration
     DEFAULT_LANGUAGE: str = os.getenv("DEFAULT_LANGUAGE", "ja")  # 日本語をデフォルトに設定
     
+    # Request coalescing (identical in-flight specialist calls share one LLM call)
+    COALESCE_REQUESTS: bool = os.getenv("COALESCE_REQUESTS", "true").lower() == "true"
+    
+    # Response cache shared by worker processes (SQLite file; disabled when unset)
+    RESPONSE_CACHE_PATH: Optional[str] = os.getenv("RESPONSE_CACHE_PATH")
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    
+    # Section cache: outline sections reused across different queries (SQLite file; disabled when unset)
+    SECTION_CACHE_PATH: Optional[str] = os.getenv("SECTION_CACHE_PATH")
+    SECTION_CACHE_TTL: float = float(os.getenv("SECTION_CACHE_TTL", "86400"))
+    SECTION_CACHE_MIN_CHARS: int = int(os.getenv("SECTION_CACHE_MIN_CHARS", "80"))
+    
+    # Follow-up edits ("3日間にして") patch the previous answer of the session
+    FOLLOWUP_EDITS_ENABLED: bool = os.getenv("FOLLOWUP_EDITS_ENABLED", "true").lower() == "true"
+    FOLLOWUP_MAX_CHARS: int = int(os.getenv("FOLLOWUP_MAX_CHARS", "80"))
+    
+    # Lookup follow-ups ("2日目は何だっけ？") answered from earlier answers without an LLM call
+    LOOKUP_ENABLED: bool = os.getenv("LOOKUP_ENABLED", "true").lower() == "true"
+    LOOKUP_MIN_CONFIDENCE: float = float(os.getenv("LOOKUP_MIN_CONFIDENCE", "0.6"))
+    
+    # Per-session conversation state kept by the orchestrator
+    SESSION_MAX_SESSIONS: int = int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+    SESSION_MAX_TURNS: int = int(os.getenv("SESSION_MAX_TURNS", "10"))
+    SESSION_TTL_SECONDS: float = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    
+    # Routing mode: "keywords" (keyword router) or "llm" (the orchestrator's model calls the specialists as tools)
+    ROUTING_MODE: str = os.getenv("ROUTING_MODE", "keywords").lower()
+    
+    # Ranked routing: generic keyword weight, maximum fan-out width (0 = no limit) and
+    # the score lead over the best specialist below which further specialists are added
+    ROUTING_GENERIC_WEIGHT: float = float(os.getenv("ROUTING_GENERIC_WEIGHT", "0.25"))
+    ROUTING_MAX_FANOUT: int = int(os.getenv("ROUTING_MAX_FANOUT", "2"))
+    ROUTING_MIN_MARGIN: float = float(os.getenv("ROUTING_MIN_MARGIN", "0.5"))
+    
+    # Sticky routing: follow-ups without keywords go to the specialist the session was talking to
+    STICKY_ROUTING_ENABLED: bool = os.getenv("STICKY_ROUTING_ENABLED", "true").lower() == "true"
+    STICKY_DECAY: float = float(os.getenv("STICKY_DECAY", "0.5"))
+    STICKY_MIN_AFFINITY: float = float(os.getenv("STICKY_MIN_AFFINITY", "0.5"))
+    SESSION_HISTORY_TURNS: int = int(os.getenv("SESSION_HISTORY_TURNS", "3"))
+    
+    # Multi-process worker pool (0 = one worker per CPU core)
+    WORKER_PROCESSES: int = int(os.getenv("WORKER_PROCESSES", "0"))
+    
+    # Agent pooling and background warm-up
+    AGENT_POOL_SIZE: int = int(os.getenv("AGENT_POOL_SIZE", "4"))
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+    WARMUP_PRIME_MODELS: bool = os.getenv("WARMUP_PRIME_MODELS", "false").lower() == "true"
+    
+    # Headless API server
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "127.0.0.1")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_DRAIN_TIMEOUT: float = float(os.getenv("SERVER_DRAIN_TIMEOUT", "60"))
+    SERVER_MAX_BATCH: int = int(os.getenv("SERVER_MAX_BATCH", "32"))
+    SERVER_BATCH_CONCURRENCY: int = int(os.getenv("SERVER_BATCH_CONCURRENCY", "8"))
+    
+    # Job scheduler in front of specialist calls
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_WORKERS: int = int(os.getenv("SCHEDULER_WORKERS", "8"))
+    SCHEDULER_INTERACTIVE_CAPACITY: int = int(os.getenv("SCHEDULER_INTERACTIVE_CAPACITY", "64"))
+    SCHEDULER_BATCH_CAPACITY: int = int(os.getenv("SCHEDULER_BATCH_CAPACITY", "256"))
+    SCHEDULER_BACKGROUND_CAPACITY: int = int(os.getenv("SCHEDULER_BACKGROUND_CAPACITY", "256"))
+    # Seconds to wait for multi-agent fan-out before answering with finished sections (0 = wait for all)
+    FANOUT_DEADLINE_SECONDS: float = float(os.getenv("FANOUT_DEADLINE_SECONDS", "0"))
+    
+    # Record/replay of model calls ("off", "record" or "replay")
+    LLM_REPLAY_MODE: str = os.getenv("LLM_REPLAY_MODE", "off")
+    LLM_REPLAY_DIR: str = os.getenv("LLM_REPLAY_DIR", "benchmarks/fixtures/llm")
+    # Scale recorded timings when replaying (1.0 = real speed, 0 = instant)
+    LLM_REPLAY_SPEED: float = float(os.getenv("LLM_REPLAY_SPEED", "1.0"))
+    
+    # Memory instrumentation: trace allocations with tracemalloc (adds overhead)
+    MEMORY_TRACEMALLOC: bool = os.getenv("MEMORY_TRACEMALLOC", "false").lower() == "true"
+    
+    # Profiling window opened at startup ("off", "sampling" or "deterministic")
+    PROFILE_MODE: str = os.getenv("PROFILE_MODE", "off")
+    PROFILE_REQUESTS: int = int(os.getenv("PROFILE_REQUESTS", "0"))
+    PROFILE_SECONDS: float = float(os.getenv("PROFILE_SECONDS", "0"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    # Stop generation once a specialist's required outline is complete
+    EARLY_STOP_ENABLED: bool = os.getenv("EARLY_STOP_ENABLED", "false").lower() == "true"
+    # Share of calls left to run to completion to keep measuring the overrun
+    EARLY_STOP_SHADOW_RATE: float = float(os.getenv("EARLY_STOP_SHADOW_RATE", "0.05"))
+    
+    # Local document index for the research assistant (built with the knowledge.bm25 CLI; disabled when unset)
+    RESEARCH_INDEX_DIR: Optional[str] = os.getenv("RESEARCH_INDEX_DIR")
+    RESEARCH_TOP_K: int = int(os.getenv("RESEARCH_TOP_K", "4"))
+    RESEARCH_PASSAGE_CHARS: int = int(os.getenv("RESEARCH_PASSAGE_CHARS", "600"))
+    # Characters quoted per retrieved passage in the prompt
+    RESEARCH_CITATION_CHARS: int = int(os.getenv("RESEARCH_CITATION_CHARS", "300"))
+    
+    # Product catalog for the recommendation assistant (CSV or Parquet; disabled when unset)
+    PRODUCT_CATALOG_PATH: Optional[str] = os.getenv("PRODUCT_CATALOG_PATH")
+    PRODUCT_CATALOG_CURRENCY: str = os.getenv("PRODUCT_CATALOG_CURRENCY", "JPY")
+    # Catalog products passed to the model per query
+    PRODUCT_SHORTLIST_SIZE: int = int(os.getenv("PRODUCT_SHORTLIST_SIZE", "5"))
+    
+    # Destination knowledge base for the trip assistant (built with the knowledge.destinations CLI; disabled when unset)
+    DESTINATION_KB_PATH: Optional[str] = os.getenv("DESTINATION_KB_PATH")
+    # Sights passed to the model per request
+    DESTINATION_MAX_SIGHTS: int = int(os.getenv("DESTINATION_MAX_SIGHTS", "8"))
+    
+    # Long trips: outline call, then days and sections generated in parallel
+    TRIP_SEGMENTED_ENABLED: bool = os.getenv("TRIP_SEGMENTED_ENABLED", "false").lower() == "true"
+    TRIP_SEGMENTED_MIN_DAYS: int = int(os.getenv("TRIP_SEGMENTED_MIN_DAYS", "4"))
+    TRIP_SEGMENTED_MAX_DAYS: int = int(os.getenv("TRIP_SEGMENTED_MAX_DAYS", "14"))
+    # Concurrent segment calls per process
+    SEGMENT_CONCURRENCY: int = int(os.getenv("SEGMENT_CONCURRENCY", "8"))
+    
+    # Precomputed answers for frequent queries (SQLite file written by the precompute job; disabled when unset)
+    PRECOMPUTED_ANSWERS_PATH: Optional[str] = os.getenv("PRECOMPUTED_ANSWERS_PATH")
+    PRECOMPUTED_RELOAD_SECONDS: float = float(os.getenv("PRECOMPUTED_RELOAD_SECONDS", "30"))
+    # Query log read by the precompute job (JSON lines; disabled when unset)
+    QUERY_LOG_PATH: Optional[str] = os.getenv("QUERY_LOG_PATH")
+    
+    # Token required by the server's /admin endpoints (admin endpoints are disabled when unset)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    
     # API Keys
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     
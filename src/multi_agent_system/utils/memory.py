@@ -0,0 +1,242 @@
+"""Memory instrumentation: retained bytes per session and agent, allocation snapshots."""
+
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+import weakref
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from .metrics import METRICS
+
+# Objects shared by every agent (modules, classes, model clients) are not
+# counted towards an individual agent's retained size
+_SKIP_TYPES = (type, type(sys), type(len), type(lambda: None))
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None, max_objects: int = 200_000) -> int:
+    """Estimate the bytes retained by an object graph.
+
+    Follows ``gc.get_referents`` breadth-first, counting each object once
+    and skipping modules, classes and functions. ``max_objects`` bounds
+    the walk for very large graphs.
+
+    Args:
+        obj: Root object
+        seen: Ids already counted (shared across calls to avoid double counting)
+        max_objects: Maximum objects to visit
+
+    Returns:
+        Approximate retained size in bytes
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    pending = [obj]
+    visited = 0
+    while pending and visited < max_objects:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        visited += 1
+        total += sys.getsizeof(current, 0)
+        pending.extend(gc.get_referents(current))
+    return total
+
+
+def process_rss_bytes() -> int:
+    """Return the current resident set size of this process (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Peak RSS; ru_maxrss is in bytes on macOS and kilobytes on Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def agent_memory(agent: Any, seen: Optional[set] = None) -> Dict[str, Any]:
+    """Report the conversation state an agent keeps alive.
+
+    Args:
+        agent: A ``BaseAgent`` (duck-typed: ``.agent.messages``, ``._small_agent``)
+        seen: Ids already counted
+
+    Returns:
+        Dictionary with the agent name, message count and retained bytes
+    """
+    seen = set() if seen is None else seen
+    strands_agent = getattr(agent, "agent", None)
+    messages = getattr(strands_agent, "messages", None) or []
+    retained = deep_sizeof(messages, seen) + deep_sizeof(getattr(agent, "system_prompt", ""), seen)
+    small = getattr(agent, "_small_agent", None)
+    if small is not None:
+        retained += agent_memory(small, seen)["bytes"]
+    return {"agent": type(agent).__name__, "messages": len(messages), "bytes": retained}
+
+
+def session_state_memory(orchestrator: Any, session_id: str, seen: Optional[set] = None) -> Dict[str, Any]:
+    """Report the turns an orchestrator keeps for a session.
+
+    Args:
+        orchestrator: An ``OrchestratorAgent`` (duck-typed: ``.sessions.peek``)
+        session_id: Session whose turns to measure
+        seen: Ids already counted
+
+    Returns:
+        Dictionary with the turn count and the bytes retained by the
+        turns' answers and lookup indexes
+    """
+    store = getattr(orchestrator, "sessions", None)
+    turns = store.peek(session_id) if store is not None else []
+    return {"turns": len(turns), "bytes": deep_sizeof(turns, seen)}
+
+
+def object_counts(limit: int = 20, types: Optional[Iterable[type]] = None) -> Dict[str, int]:
+    """Count live objects tracked by the garbage collector.
+
+    Args:
+        limit: Number of most common type names to return
+        types: When given, count instances of these classes (and
+            subclasses) by class name instead
+
+    Returns:
+        Mapping of type name to instance count
+    """
+    objects = gc.get_objects()
+    if types is not None:
+        types = tuple(types)
+        return dict(Counter(type(obj).__name__ for obj in objects if isinstance(obj, types)))
+    return dict(Counter(type(obj).__name__ for obj in objects).most_common(limit))
+
+
+class MemoryAccountant:
+    """Tracks sessions and reports their retained memory.
+
+    Sessions are registered with their orchestrator (held weakly, so a
+    closed session disappears from the report once it is collected).
+    tracemalloc is started on demand for allocation-site snapshots.
+    """
+
+    def __init__(self):
+        """Initialize an empty accountant."""
+        self._sessions: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def track(self, session_id: str, orchestrator: Any) -> None:
+        """Register a session's orchestrator."""
+        self._sessions[session_id] = orchestrator
+
+    @property
+    def live_sessions(self) -> int:
+        return len(self._sessions)
+
+    def session_report(self, session_id: str, messages: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Retained bytes of one session: its chat history, orchestrator conversation and turns.
+
+        Args:
+            session_id: Session to report
+            messages: The UI's chat history for the session (e.g. ``app.py``'s ``messages``)
+        """
+        seen: set = set()
+        orchestrator = self._sessions.get(session_id)
+        history_bytes = deep_sizeof(messages or [], seen)
+        agent = agent_memory(orchestrator, seen) if orchestrator is not None else None
+        state = session_state_memory(orchestrator, session_id, seen) if orchestrator is not None else {"turns": 0, "bytes": 0}
+        return {
+            "session_id": session_id,
+            "history_messages": len(messages or []),
+            "history_bytes": history_bytes,
+            "orchestrator": agent,
+            "turns": state["turns"],
+            "turns_bytes": state["bytes"],
+            "bytes": history_bytes + (agent["bytes"] if agent else 0) + state["bytes"],
+        }
+
+    def start_tracing(self, frames: int = 1) -> None:
+        """Start tracemalloc (if needed) and take the baseline snapshot."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._baseline = tracemalloc.take_snapshot()
+
+    def top_allocations(self, limit: int = 10, since_baseline: bool = True) -> List[Dict[str, Any]]:
+        """Return the largest allocation sites (or growth since the baseline).
+
+        Returns an empty list when tracemalloc is not running.
+        """
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if since_baseline and self._baseline is not None:
+            stats = snapshot.compare_to(self._baseline, "lineno")
+            return [
+                {"site": str(stat.traceback[0]), "bytes": stat.size, "growth_bytes": stat.size_diff, "count": stat.count}
+                for stat in stats[:limit]
+            ]
+        return [
+            {"site": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+    def report(self, agents: Iterable[Any] = (), agent_types: Optional[Iterable[type]] = None) -> Dict[str, Any]:
+        """Process-wide memory report; also updates the ``memory.*`` gauges.
+
+        Args:
+            agents: Additional agents to account for (e.g. idle pooled specialists)
+            agent_types: Agent base classes whose live instances are counted
+
+        Returns:
+            Dictionary with RSS, tracemalloc totals, per-session (agent
+            conversation and turns) and per-agent retained bytes, and live
+            agent counts by class
+        """
+        seen: set = set()
+        sessions = {
+            session_id: agent_memory(orchestrator, seen)["bytes"] + session_state_memory(orchestrator, session_id, seen)["bytes"]
+            for session_id, orchestrator in list(self._sessions.items())
+        }
+        pooled = [agent_memory(agent, seen) for agent in agents]
+        report: Dict[str, Any] = {
+            "rss_bytes": process_rss_bytes(),
+            "sessions": sessions,
+            "session_bytes": sum(sessions.values()),
+            "pooled_agents": pooled,
+            "pooled_bytes": sum(agent["bytes"] for agent in pooled),
+        }
+        if tracemalloc.is_tracing():
+            report["tracemalloc_current_bytes"], report["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()
+        if agent_types is not None:
+            report["live_agents"] = object_counts(types=agent_types)
+
+        METRICS.set_gauge("memory.rss_bytes", report["rss_bytes"])
+        METRICS.set_gauge("memory.sessions.live", len(sessions))
+        METRICS.set_gauge("memory.sessions.bytes", report["session_bytes"])
+        METRICS.set_gauge("memory.pooled_agents.bytes", report["pooled_bytes"])
+        if "tracemalloc_current_bytes" in report:
+            METRICS.set_gauge("memory.tracemalloc.current_bytes", report["tracemalloc_current_bytes"])
+        if "live_agents" in report:
+            METRICS.set_gauge("memory.agents.live", sum(report["live_agents"].values()))
+        return report
+
+
+_accountant = MemoryAccountant()
+
+
+def get_memory_accountant() -> MemoryAccountant:
+    """Return the process-wide accountant (starting tracemalloc if ``MEMORY_TRACEMALLOC`` is set)."""
+    from .config import Config
+    if Config.MEMORY_TRACEMALLOC and not tracemalloc.is_tracing():
+        _accountant.start_tracing()
+    return _accountant
@@ -0,0 +1,97 @@
+"""In-process metrics registry for the multi-agent system."""
+
+import threading
+from typing import Any, Dict
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, gauges and summaries.
+
+    Metric names are dotted strings such as ``"coalescing.leaders"``.
+    Summaries keep count, sum, min and max so averages can be derived
+    without storing individual samples.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, Dict[str, float]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Increment a counter.
+
+        Args:
+            name: Counter name
+            value: Amount to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to the given value.
+
+        Args:
+            name: Gauge name
+            value: Current value
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample in a summary.
+
+        Args:
+            name: Summary name
+            value: Observed value
+        """
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = {"count": 1, "sum": value, "min": value, "max": value}
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["min"] = min(summary["min"], value)
+                summary["max"] = max(summary["max"], value)
+
+    def counter(self, name: str) -> float:
+        """Return the current value of a counter (0 when unset)."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def summary(self, name: str) -> Dict[str, float]:
+        """Return a copy of a summary including its mean."""
+        with self._lock:
+            summary = dict(self._summaries.get(name, {"count": 0, "sum": 0.0, "min": 0.0, "max": 0.0}))
+        summary["mean"] = summary["sum"] / summary["count"] if summary["count"] else 0.0
+        return summary
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Any]:
+        """Return all metrics whose names start with ``prefix``.
+
+        Args:
+            prefix: Optional name prefix to filter by
+
+        Returns:
+            Dictionary with ``counters``, ``gauges`` and ``summaries``
+        """
+        with self._lock:
+            counters = {k: v for k, v in self._counters.items() if k.startswith(prefix)}
+            gauges = {k: v for k, v in self._gauges.items() if k.startswith(prefix)}
+            summaries = {k: dict(v) for k, v in self._summaries.items() if k.startswith(prefix)}
+        for summary in summaries.values():
+            summary["mean"] = summary["sum"] / summary["count"] if summary["count"] else 0.0
+        return {"counters": counters, "gauges": gauges, "summaries": summaries}
+
+    def reset(self) -> None:
+        """Clear every metric."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+# Process-wide registry shared by all components
+METRICS = MetricsRegistry()
@@ -0,0 +1,311 @@
+"""Profiling hooks that can be switched on in a running process.
+
+Two modes are available:
+
+* ``sampling``: a background thread samples the stacks of every thread at
+  a fixed interval and writes a speedscope file when the window ends.
+* ``deterministic``: each request is run under ``cProfile`` and written to
+  ``<request_id>.pstats``. cProfile only sees the thread that handles the
+  request (routing, waiting and synthesis); specialist calls running on
+  scheduler threads show up in the sampling mode. Only one request is
+  profiled at a time (the interpreter allows a single active profiler);
+  requests arriving meanwhile run unprofiled and do not count against
+  the window.
+
+A window covers the next N requests and/or N seconds, whichever ends first.
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .metrics import METRICS
+
+MODES = ("sampling", "deterministic")
+
+# Request ids name profile files, so only plain file-name characters are allowed
+_REQUEST_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def new_request_id() -> str:
+    """Return a short random request id."""
+    return uuid.uuid4().hex[:12]
+
+
+def request_id_for(context: Optional[Dict[str, Any]]) -> str:
+    """Return the client's ``context["request_id"]`` if it is a safe id, else a new one."""
+    request_id = (context or {}).get("request_id")
+    if isinstance(request_id, str) and _REQUEST_ID.fullmatch(request_id):
+        return request_id
+    return new_request_id()
+
+
+class StackSampler:
+    """Samples the stacks of all threads into speedscope's sampled format."""
+
+    def __init__(self, interval_ms: float = 5.0):
+        """Initialize the sampler.
+
+        Args:
+            interval_ms: Sampling interval in milliseconds
+        """
+        self.interval_ms = interval_ms
+        self._frames: List[Dict[str, Any]] = []
+        self._frame_ids: Dict[Tuple[str, str, int], int] = {}
+        # thread name -> (stacks, weights)
+        self._samples: Dict[str, Tuple[List[List[int]], List[float]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        frame_id = self._frame_ids.get(key)
+        if frame_id is None:
+            frame_id = self._frame_ids[key] = len(self._frames)
+            self._frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        return frame_id
+
+    def _sample(self, weight_ms: float) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            stacks, weights = self._samples.setdefault(names.get(ident, str(ident)), ([], []))
+            stacks.append(stack)
+            weights.append(weight_ms)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval_ms / 1000):
+            now = time.perf_counter()
+            self._sample((now - last) * 1000)
+            last = now
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.stopped_at = time.perf_counter()
+
+    def to_speedscope(self, name: str) -> Dict[str, Any]:
+        """Return the samples as a speedscope document (one profile per thread)."""
+        profiles = []
+        for thread_name, (stacks, weights) in sorted(self._samples.items()):
+            profiles.append({
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "multi_agent_system.utils.profiling",
+            "shared": {"frames": self._frames},
+            "profiles": profiles,
+        }
+
+
+class Profiler:
+    """Process-wide switch for profiling windows."""
+
+    def __init__(self, output_dir: str = "profiles", interval_ms: float = 5.0):
+        """Initialize an inactive profiler.
+
+        Args:
+            output_dir: Directory profile files are written to
+            interval_ms: Sampling interval for the sampling mode
+        """
+        self.output_dir = output_dir
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+        # Held while a request runs under cProfile
+        self._deterministic = threading.Lock()
+        self.mode: Optional[str] = None
+        self._remaining: Optional[int] = None
+        self._deadline: Optional[float] = None
+        self._sampler: Optional[StackSampler] = None
+        self._timer: Optional[threading.Timer] = None
+        self._request_ids: List[str] = []
+        self.files: List[str] = []
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    def enable(self, mode: str, requests: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Open a profiling window.
+
+        Args:
+            mode: "sampling" or "deterministic"
+            requests: Stop after this many requests
+            seconds: Stop after this many seconds
+
+        Returns:
+            The profiler status
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if not requests and not seconds:
+            raise ValueError("a profiling window needs a request count or a duration")
+        self.disable()
+        with self._lock:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.mode = mode
+            self._remaining = requests or None
+            self._deadline = time.monotonic() + seconds if seconds else None
+            self._request_ids = []
+            if mode == "sampling":
+                self._sampler = StackSampler(self.interval_ms)
+                self._sampler.start()
+            if seconds:
+                self._timer = threading.Timer(seconds, self.disable)
+                self._timer.daemon = True
+                self._timer.start()
+        METRICS.incr(f"profiling.{mode}.windows")
+        return self.status()
+
+    def disable(self) -> Optional[str]:
+        """Close the current window and write the sampling profile.
+
+        Returns:
+            Path of the speedscope file written, if any
+        """
+        with self._lock:
+            if self.mode is None:
+                return None
+            sampler, request_ids = self._sampler, self._request_ids
+            self.mode = None
+            self._sampler = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if sampler is None:
+            return None
+        sampler.stop()
+        path = os.path.join(self.output_dir, f"sampling-{time.strftime('%Y%m%d-%H%M%S')}-{new_request_id()[:6]}.speedscope.json")
+        document = sampler.to_speedscope(f"requests: {', '.join(request_ids) or '-'}")
+        document["requestIds"] = request_ids
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f)
+        with self._lock:
+            self.files.append(path)
+        return path
+
+    def _claim(self, request_id: str) -> Optional[str]:
+        """Count a request against the window; return the mode if it is profiled."""
+        with self._lock:
+            if self.mode is None:
+                return None
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                return None
+            if self._remaining is not None and self._remaining <= 0:
+                return None
+            if self.mode == "deterministic" and not self._deterministic.acquire(blocking=False):
+                METRICS.incr("profiling.deterministic.skipped")
+                return None
+            if self._remaining is not None:
+                self._remaining -= 1
+            self._request_ids.append(request_id)
+            return self.mode
+
+    def _finish(self) -> None:
+        with self._lock:
+            exhausted = self._remaining == 0
+        if exhausted:
+            self.disable()
+
+    @contextlib.contextmanager
+    def profile_request(self, request_id: str) -> Iterator[None]:
+        """Profile one request if a window is open (a cheap no-op otherwise)."""
+        mode = self._claim(request_id) if self.mode is not None else None
+        if mode is None:
+            yield
+            return
+        profile = None
+        if mode == "deterministic":
+            try:
+                profile = cProfile.Profile()
+                profile.enable()
+            except Exception:
+                # Another profiler is active in this process (e.g. a debugger
+                # or coverage); the request runs unprofiled
+                profile = None
+                METRICS.incr("profiling.deterministic.failed")
+        try:
+            yield
+        finally:
+            try:
+                if profile is not None:
+                    profile.disable()
+                    name = request_id if _REQUEST_ID.fullmatch(request_id) else new_request_id()
+                    path = os.path.join(self.output_dir, f"{name}.pstats")
+                    profile.dump_stats(path)
+                    with self._lock:
+                        self.files.append(path)
+            finally:
+                if mode == "deterministic":
+                    self._deterministic.release()
+            METRICS.incr(f"profiling.{mode}.requests")
+            self._finish()
+
+    def status(self) -> Dict[str, Any]:
+        """Return the current window and the files written so far."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "remaining_requests": self._remaining,
+                "remaining_seconds": max(0.0, self._deadline - time.monotonic()) if self._deadline and self.mode else None,
+                "request_ids": list(self._request_ids),
+                "output_dir": self.output_dir,
+                "files": list(self.files[-20:]),
+            }
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    """Return the process-wide profiler.
+
+    On first use a window is opened if ``PROFILE_MODE`` is set, using
+    ``PROFILE_REQUESTS`` / ``PROFILE_SECONDS``.
+    """
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            from .config import Config
+            profiler = Profiler(Config.PROFILE_DIR, Config.PROFILE_SAMPLE_INTERVAL_MS)
+            if Config.PROFILE_MODE in MODES:
+                requests = Config.PROFILE_REQUESTS or (None if Config.PROFILE_SECONDS else 10)
+                profiler.enable(Config.PROFILE_MODE, requests, Config.PROFILE_SECONDS or None)
+            _profiler = profiler
+    return _profiler
@@ -0,0 +1,89 @@
+"""SQLite-backed response cache shared between processes."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional
+
+from .metrics import METRICS
+
+
+class ResponseCache:
+    """Cache of specialist responses keyed by the coalescing key.
+
+    The cache lives in a SQLite database in WAL mode, so every worker
+    process pointing at the same file shares hits. Each thread uses its
+    own connection. Values are JSON dictionaries (``LLMResponse.to_dict``).
+    Subclasses keep their entries in another table (``TABLE``) and count
+    hits under another metric prefix (``METRIC``).
+    """
+
+    TABLE = "responses"
+    METRIC = "response_cache"
+
+    def __init__(self, path: str, ttl_seconds: float = 3600):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Entry lifetime in seconds
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def make_key(key: Hashable) -> str:
+        """Hash an arbitrary coalescing key into a fixed-size cache key."""
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Return the cached value for a key, or ``None`` on miss/expiry."""
+        row = self._connection().execute(
+            f"SELECT value, expires_at FROM {self.TABLE} WHERE key = ?", (self.make_key(key),)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            METRICS.incr(f"{self.METRIC}.misses")
+            return None
+        METRICS.incr(f"{self.METRIC}.hits")
+        return json.loads(row[0])
+
+    def set(self, key: Hashable, value: Dict[str, Any]) -> None:
+        """Store a value under a key."""
+        connection = self._connection()
+        connection.execute(
+            f"INSERT OR REPLACE INTO {self.TABLE} (key, value, expires_at) VALUES (?, ?, ?)",
+            (self.make_key(key), json.dumps(value, ensure_ascii=False), time.time() + self.ttl_seconds),
+        )
+        connection.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        connection = self._connection()
+        cursor = connection.execute(f"DELETE FROM {self.TABLE} WHERE expires_at < ?", (time.time(),))
+        connection.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for this process and the hit rate."""
+        hits = METRICS.counter(f"{self.METRIC}.hits")
+        misses = METRICS.counter(f"{self.METRIC}.misses")
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
@@ -0,0 +1,191 @@
+"""In-process job scheduler with priorities, backpressure and fair sharing."""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .metrics import METRICS, MetricsRegistry
+
+# Priority classes, highest first
+PRIORITIES = ("interactive", "batch", "background")
+
+
+class SchedulerBusyError(Exception):
+    """Raised when a job is rejected because its priority queue is full."""
+
+    def __init__(self, priority: str, depth: int):
+        super().__init__(f"{priority} queue is full ({depth} jobs waiting)")
+        self.priority = priority
+        self.depth = depth
+
+
+class _Job:
+    __slots__ = ("fn", "future", "priority", "session_id", "enqueued_at")
+
+    def __init__(self, fn: Callable[[], Any], priority: str, session_id: Optional[str]):
+        self.fn = fn
+        self.future: Future = Future()
+        self.priority = priority
+        self.session_id = session_id
+        self.enqueued_at = time.perf_counter()
+
+
+class JobScheduler:
+    """Runs jobs on a fixed set of worker threads.
+
+    Jobs are taken strictly by priority class. Within a class, sessions
+    are served round-robin so one session's burst (e.g. several 16k-token
+    itineraries) cannot starve the others. Each class has a bounded queue;
+    submissions beyond it are rejected with ``SchedulerBusyError``.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        capacities: Optional[Dict[str, int]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        """Start the worker threads.
+
+        Args:
+            workers: Number of concurrently running jobs
+            capacities: Maximum queued jobs per priority class
+            metrics: Metrics registry to report to (defaults to the global one)
+        """
+        self.metrics = metrics or METRICS
+        self.capacities = {"interactive": 64, "batch": 256, "background": 256}
+        if capacities:
+            self.capacities.update(capacities)
+        # priority -> session -> queued jobs (sessions in round-robin order)
+        self._queues: Dict[str, "OrderedDict[Optional[str], Deque[_Job]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._depth = {p: 0 for p in PRIORITIES}
+        self._condition = threading.Condition()
+        self._running = 0
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"scheduler-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable[[], Any], priority: str = "interactive", session_id: Optional[str] = None) -> Future:
+        """Queue a job.
+
+        Args:
+            fn: Zero-argument callable to run
+            priority: One of ``PRIORITIES``
+            session_id: Session the job belongs to (for fair sharing)
+
+        Returns:
+            Future resolving to the job's return value
+
+        Raises:
+            SchedulerBusyError: If the priority class queue is full
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        job = _Job(fn, priority, session_id)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("scheduler is shut down")
+            depth = self._depth[priority]
+            if depth >= self.capacities[priority]:
+                self.metrics.incr(f"scheduler.{priority}.rejected")
+                raise SchedulerBusyError(priority, depth)
+            self._queues[priority].setdefault(session_id, deque()).append(job)
+            self._depth[priority] = depth + 1
+            self.metrics.set_gauge(f"scheduler.{priority}.depth", depth + 1)
+            self.metrics.incr(f"scheduler.{priority}.submitted")
+            self._condition.notify()
+        return job.future
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pop the next job (caller holds the condition)."""
+        for priority in PRIORITIES:
+            sessions = self._queues[priority]
+            if not sessions:
+                continue
+            session_id, jobs = next(iter(sessions.items()))
+            job = jobs.popleft()
+            # Rotate the session to the back so other sessions go next
+            del sessions[session_id]
+            if jobs:
+                sessions[session_id] = jobs
+            self._depth[priority] -= 1
+            self.metrics.set_gauge(f"scheduler.{priority}.depth", self._depth[priority])
+            return job
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    job = self._next_job()
+                self._running += 1
+                self.metrics.set_gauge("scheduler.running", self._running)
+            self.metrics.observe(f"scheduler.{job.priority}.wait_ms", (time.perf_counter() - job.enqueued_at) * 1000)
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.fn())
+                except BaseException as e:
+                    job.future.set_exception(e)
+            with self._condition:
+                self._running -= 1
+                self.metrics.set_gauge("scheduler.running", self._running)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; workers exit once the queues are empty."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, running jobs, rejections and wait times per class."""
+        with self._condition:
+            depth = dict(self._depth)
+            running = self._running
+            sessions = {p: len(q) for p, q in self._queues.items()}
+        report: Dict[str, Any] = {"running": running}
+        for priority in PRIORITIES:
+            wait = self.metrics.summary(f"scheduler.{priority}.wait_ms")
+            report[priority] = {
+                "depth": depth[priority],
+                "capacity": self.capacities[priority],
+                "waiting_sessions": sessions[priority],
+                "submitted": self.metrics.counter(f"scheduler.{priority}.submitted"),
+                "rejected": self.metrics.counter(f"scheduler.{priority}.rejected"),
+                "mean_wait_ms": wait["mean"],
+                "max_wait_ms": wait["max"],
+            }
+        return report
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """Return the process-wide scheduler, creating it from ``Config`` on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from .config import Config
+            _scheduler = JobScheduler(
+                workers=Config.SCHEDULER_WORKERS,
+                capacities={
+                    "interactive": Config.SCHEDULER_INTERACTIVE_CAPACITY,
+                    "batch": Config.SCHEDULER_BATCH_CAPACITY,
+                    "background": Config.SCHEDULER_BACKGROUND_CAPACITY,
+                },
+            )
+    return _scheduler
@@ -0,0 +1,47 @@
+"""SQLite-backed cache of answer sections shared across different queries."""
+
+import threading
+from typing import Dict, Optional
+
+from .metrics import METRICS
+from .response_cache import ResponseCache
+
+
+class SectionCache(ResponseCache):
+    """Cache of single outline sections keyed by the request entities they depend on.
+
+    The response cache only serves exact repeats of a rendered prompt.
+    Entries here are individual sections of a specialist answer (e.g. the
+    accommodation section of a trip plan), keyed by the agent, the
+    section and the extracted entities that section depends on (e.g.
+    destination and travel style), so "5 days in Kyoto" and "Kyoto with
+    kids" share them. Values are ``{"text": ..., "tokens": ...}`` where
+    ``tokens`` estimates the output tokens a reuse saves. The table can
+    live in the same SQLite file as the response cache.
+    """
+
+    TABLE = "sections"
+    METRIC = "section_cache"
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters, the hit rate and the estimated output tokens saved."""
+        stats = super().stats()
+        stats["tokens_saved"] = METRICS.counter(f"{self.METRIC}.tokens_saved")
+        return stats
+
+
+_cache: Optional[SectionCache] = None
+_lock = threading.Lock()
+
+
+def get_section_cache() -> Optional[SectionCache]:
+    """Return the shared section cache, or ``None`` when ``SECTION_CACHE_PATH`` is unset."""
+    global _cache
+    from .config import Config
+    path = Config.SECTION_CACHE_PATH
+    if not path:
+        return None
+    with _lock:
+        if _cache is None or _cache.path != path:
+            _cache = SectionCache(path, Config.SECTION_CACHE_TTL)
+        return _cache
@@ -0,0 +1,142 @@
+"""Per-session conversation state kept by the orchestrator.
+
+The orchestrator remembers the last turns of each session (the query,
+the specialists that answered and their answer texts) so follow-ups can
+build on them instead of starting over. Sessions are identified by
+``context["session_id"]``; the store is bounded in sessions (least
+recently used first out), turns per session and idle time.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+
+from .metrics import METRICS
+
+
+class Turn:
+    """One answered query of a session."""
+
+    __slots__ = ("query", "tools", "texts", "output_tokens", "edits", "created", "indexes")
+
+    def __init__(
+        self,
+        query: str,
+        tools: List[str],
+        texts: Dict[str, str],
+        output_tokens: Optional[Dict[str, int]] = None,
+        edits: Optional[List[str]] = None,
+    ):
+        """Initialize the turn.
+
+        Args:
+            query: The query that started the answer
+            tools: Specialists that answered, in order
+            texts: Tool name -> the specialist's answer text
+            output_tokens: Tool name -> output tokens of the answer
+            edits: Follow-up edits applied since ``query``, in order
+        """
+        self.query = query
+        self.tools = list(tools)
+        self.texts = dict(texts)
+        self.output_tokens = dict(output_tokens or {})
+        self.edits = list(edits or [])
+        self.created = time.time()
+        # Lookup index of the answers, built on first use (see tools/lookups.py)
+        self.indexes = None
+
+    @property
+    def request(self) -> str:
+        """The original query with the follow-up edits applied since."""
+        if not self.edits:
+            return self.query
+        return f"{self.query}（変更: {'、'.join(self.edits)}）"
+
+
+class SessionStore:
+    """Bounded, thread-safe store of recent turns per session."""
+
+    def __init__(self, max_sessions: int = 1000, max_turns: int = 10, ttl_seconds: float = 3600):
+        """Initialize the store.
+
+        Args:
+            max_sessions: Sessions kept; the least recently used is dropped first
+            max_turns: Turns kept per session
+            ttl_seconds: Sessions idle for longer are forgotten
+        """
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Deque[Turn]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _expired(self, session_id: str, now: float) -> bool:
+        return now - self._touched.get(session_id, now) > self.ttl_seconds
+
+    def turns(self, session_id: Optional[str]) -> List[Turn]:
+        """Return a session's turns, oldest first (empty for unknown or expired sessions)."""
+        key = session_id or ""
+        now = time.time()
+        with self._lock:
+            turns = self._sessions.get(key)
+            if turns is None:
+                return []
+            if self._expired(key, now):
+                del self._sessions[key]
+                del self._touched[key]
+                METRICS.incr("sessions.expired")
+                return []
+            self._sessions.move_to_end(key)
+            return list(turns)
+
+    def peek(self, session_id: Optional[str]) -> List[Turn]:
+        """Return a session's turns without refreshing its recency or expiring it (for reporting)."""
+        with self._lock:
+            return list(self._sessions.get(session_id or "", ()))
+
+    def last_turn(self, session_id: Optional[str]) -> Optional[Turn]:
+        """Return a session's most recent turn, or None."""
+        turns = self.turns(session_id)
+        return turns[-1] if turns else None
+
+    def affinity(self, session_id: Optional[str], decay: float) -> Dict[str, float]:
+        """Return the routing affinity of the tools that answered a session.
+
+        Each turn adds ``decay ** age`` to its tools, where ``age`` is 0
+        for the most recent turn, so a specialist's pull fades as the
+        conversation moves on. Tools are ordered most recent first.
+        """
+        scores: Dict[str, float] = {}
+        for age, turn in enumerate(reversed(self.turns(session_id))):
+            for tool_name in turn.tools:
+                scores[tool_name] = scores.get(tool_name, 0.0) + decay ** age
+        return scores
+
+    def record(self, session_id: Optional[str], turn: Turn) -> None:
+        """Append a turn to a session, evicting old turns and sessions as needed."""
+        key = session_id or ""
+        now = time.time()
+        with self._lock:
+            turns = self._sessions.get(key)
+            if turns is None or self._expired(key, now):
+                turns = self._sessions[key] = deque(maxlen=self.max_turns)
+            turns.append(turn)
+            self._touched[key] = now
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                del self._touched[evicted]
+                METRICS.incr("sessions.evicted")
+
+    def reset(self, session_id: Optional[str]) -> None:
+        """Forget a session (e.g. when the user clears the conversation)."""
+        key = session_id or ""
+        with self._lock:
+            self._sessions.pop(key, None)
+            self._touched.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
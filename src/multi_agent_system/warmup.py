@@ -0,0 +1,195 @@
+"""Background warm-up of specialists and model endpoints."""
+
+import importlib
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from .utils.config import Config
+
+# Tiny prompt used to prime each model (and its HTTP connection)
+PRIMING_PROMPT = "「OK」とだけ返答してください。"
+
+
+class WarmupManager:
+    """Runs warm-up steps in a daemon thread and tracks readiness.
+
+    Steps: import the heavy libraries, compile the router, load the
+    product catalog (if configured), construct the pooled specialists,
+    resolve the model endpoints' host names and, optionally, send one tiny
+    priming request per model. Only the priming request opens the model
+    clients' own (TLS) connections; the DNS step just fills the resolver
+    cache. A failing step is recorded and the remaining steps still run.
+    """
+
+    STEPS = ("imports", "router", "catalog", "agents", "dns", "prime")
+
+    def __init__(self, prime: Optional[bool] = None):
+        """Initialize the manager.
+
+        Args:
+            prime: Whether to send priming requests (defaults to
+                ``Config.WARMUP_PRIME_MODELS``)
+        """
+        self.prime = Config.WARMUP_PRIME_MODELS if prime is None else prime
+        self.state = "idle"
+        self.steps: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in self.STEPS}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+
+    def start(self) -> "WarmupManager":
+        """Start the warm-up in the background (no-op if already started)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self.state = "running"
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the warm-up finishes.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Whether the warm-up finished
+        """
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        """Whether the warm-up has finished."""
+        return self.state in ("ready", "degraded")
+
+    def status(self) -> Dict[str, Any]:
+        """Return the readiness state and per-step results."""
+        with self._lock:
+            steps = {name: dict(step) for name, step in self.steps.items()}
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {"state": self.state, "ready": self.ready, "elapsed_s": elapsed, "steps": steps}
+
+    def _run(self) -> None:
+        errors = False
+        for name in self.STEPS:
+            if name == "prime" and not self.prime:
+                self._set_step(name, status="skipped")
+                continue
+            self._set_step(name, status="running")
+            started = time.perf_counter()
+            try:
+                detail = getattr(self, f"_step_{name}")()
+                self._set_step(name, status="done", duration_ms=(time.perf_counter() - started) * 1000, detail=detail)
+            except Exception as e:
+                errors = True
+                self._set_step(name, status="failed", duration_ms=(time.perf_counter() - started) * 1000, error=str(e))
+        self.finished_at = time.time()
+        self.state = "degraded" if errors else "ready"
+        self._done.set()
+
+    def _set_step(self, name: str, **values: Any) -> None:
+        with self._lock:
+            self.steps[name] = values
+
+    def _step_imports(self) -> List[str]:
+        modules = ["strands", "openai"]
+        for module in modules:
+            importlib.import_module(module)
+        return modules
+
+    def _step_router(self) -> List[str]:
+        from .tools.routing import get_router
+        return get_router().match("warm up")
+
+    def _step_catalog(self) -> Optional[int]:
+        from .knowledge.catalog import get_product_catalog
+        catalog = get_product_catalog()
+        return len(catalog) if catalog is not None else None
+
+    def _pool_options(self) -> List[Dict[str, Any]]:
+        """Constructor options the request paths acquire from the pool (see ``_agent_options``)."""
+        options = [{"cascade": Config.CASCADE_ENABLED}]
+        for tier in sorted(set(Config.QUERY_CLASS_TIERS.values())):
+            options.append({"tier": tier, "cascade": Config.CASCADE_ENABLED})
+        return options
+
+    def _step_agents(self) -> int:
+        from .tools.agent_tools import AVAILABLE_TOOLS, agent_pool
+        created = 0
+        for tool_info in AVAILABLE_TOOLS.values():
+            for options in self._pool_options():
+                created += agent_pool.prewarm(tool_info["agent_class"], 1, **options)
+                # Prompts are rendered on a template agent outside the pool
+                agent_pool.template(tool_info["agent_class"], **options)
+                if options.get("cascade") and options.get("tier") != "small":
+                    with agent_pool.acquire(tool_info["agent_class"], **options) as agent:
+                        agent._get_small_agent()
+        return created
+
+    def _endpoint_hosts(self) -> Set[Tuple[str, int]]:
+        hosts = set()
+        for backend in {Config.LARGE_MODEL_BACKEND, Config.SMALL_MODEL_BACKEND}:
+            if backend == "openai":
+                hosts.add(("api.openai.com", 443))
+            elif backend == "bedrock":
+                hosts.add((f"bedrock-runtime.{Config.AWS_DEFAULT_REGION}.amazonaws.com", 443))
+            elif backend == "local" and Config.LOCAL_MODEL_BASE_URL:
+                url = urlparse(Config.LOCAL_MODEL_BASE_URL)
+                hosts.add((url.hostname, url.port or (443 if url.scheme == "https" else 80)))
+        return hosts
+
+    def _step_dns(self) -> List[str]:
+        resolved = []
+        for host, port in sorted(self._endpoint_hosts()):
+            socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            resolved.append(f"{host}:{port}")
+        return resolved
+
+    def _step_prime(self) -> List[str]:
+        from .tools.agent_tools import AVAILABLE_TOOLS, agent_pool
+        primed = []
+        seen = set()
+        for tool_info in AVAILABLE_TOOLS.values():
+            for options in self._pool_options():
+                with agent_pool.acquire(tool_info["agent_class"], **options) as agent:
+                    key = (agent.backend, agent.model_id)
+                    if agent.agent is None or key in seen:
+                        continue
+                    seen.add(key)
+                    if agent.invoke_llm(PRIMING_PROMPT).ok:
+                        primed.append(f"{agent.backend}:{agent.model_id}")
+        return primed
+
+
+_manager: Optional[WarmupManager] = None
+_manager_lock = threading.Lock()
+
+
+def start_warmup(prime: Optional[bool] = None) -> WarmupManager:
+    """Start the process-wide warm-up once and return its manager.
+
+    Args:
+        prime: Whether to send priming requests
+
+    Returns:
+        The shared ``WarmupManager``
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = WarmupManager(prime=prime)
+    return _manager.start()
+
+
+def get_warmup() -> Optional[WarmupManager]:
+    """Return the process-wide warm-up manager, if warm-up was started."""
+    return _manager
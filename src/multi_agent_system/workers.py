@@ -0,0 +1,178 @@
+"""Multi-process worker pool running ``OrchestratorAgent`` instances.
+
+A dispatcher in the parent process hands queries to N worker processes
+over a ``multiprocessing`` queue and resolves futures as results come
+back. Each worker owns its own orchestrator, agent pool and GIL; workers
+share successful specialist responses through the SQLite response cache
+(``RESPONSE_CACHE_PATH``).
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from .utils.config import Config
+
+# Sentinel telling a worker to exit
+_STOP = None
+
+
+def _worker_main(jobs, results, config_overrides: Dict[str, Any], initializer: Optional[Callable[[], None]]) -> None:
+    """Worker process loop: process queries until the stop sentinel arrives."""
+    for name, value in config_overrides.items():
+        setattr(Config, name, value)
+    if initializer is not None:
+        initializer()
+
+    from .orchestrator import OrchestratorAgent
+    orchestrator = OrchestratorAgent()
+    results.put(("ready", os.getpid(), None))
+
+    while True:
+        job = jobs.get()
+        if job is _STOP:
+            break
+        job_id, query, context = job
+        try:
+            results.put((job_id, orchestrator.process_query(query, context), None))
+        except Exception as e:
+            results.put((job_id, None, f"{type(e).__name__}: {e}"))
+
+
+class WorkerPool:
+    """Dispatcher for a pool of orchestrator worker processes."""
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        cache_path: Optional[str] = None,
+        initializer: Optional[Callable[[], None]] = None,
+        queue_size: int = 0,
+    ):
+        """Start the worker processes.
+
+        Args:
+            processes: Number of workers (defaults to ``Config.WORKER_PROCESSES``,
+                or the CPU count when that is 0)
+            cache_path: SQLite response cache shared by the workers
+                (defaults to ``Config.RESPONSE_CACHE_PATH``)
+            initializer: Picklable callable run in each worker before the
+                orchestrator is created
+            queue_size: Maximum pending jobs (0 = unbounded)
+        """
+        self.processes = processes or Config.WORKER_PROCESSES or os.cpu_count() or 1
+        overrides = {}
+        cache_path = cache_path or Config.RESPONSE_CACHE_PATH
+        if cache_path:
+            overrides["RESPONSE_CACHE_PATH"] = cache_path
+        # Each worker warms its own pool lazily; the parent does not need agents
+        overrides["WARMUP_ON_STARTUP"] = False
+        # Results must be complete: pending-section futures cannot cross processes
+        overrides["FANOUT_DEADLINE_SECONDS"] = 0
+
+        context = multiprocessing.get_context("spawn")
+        self._jobs = context.Queue(queue_size)
+        self._results = context.Queue()
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._ready = threading.Semaphore(0)
+        self._workers = [
+            context.Process(
+                target=_worker_main,
+                args=(self._jobs, self._results, overrides, initializer),
+                name=f"orchestrator-worker-{index}",
+                daemon=True,
+            )
+            for index in range(self.processes)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._closed = False
+        self._collector = threading.Thread(target=self._collect, name="worker-results", daemon=True)
+        self._collector.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until every worker has created its orchestrator."""
+        return all(self._ready.acquire(timeout=timeout) for _ in range(self.processes))
+
+    def _collect(self) -> None:
+        while True:
+            message = self._results.get()
+            if message is _STOP:
+                return
+            job_id, result, error = message
+            if job_id == "ready":
+                self._ready.release()
+                continue
+            with self._lock:
+                future = self._futures.pop(job_id, None)
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+
+    def submit(self, query: str, context: Optional[Dict[str, Any]] = None) -> Future:
+        """Queue a query for the next free worker.
+
+        Args:
+            query: The user's query
+            context: Optional context information (must be picklable)
+
+        Returns:
+            A future resolving to the orchestrator result dict
+        """
+        if self._closed:
+            raise RuntimeError("worker pool is closed")
+        future: Future = Future()
+        job_id = next(self._ids)
+        with self._lock:
+            self._futures[job_id] = future
+        self._jobs.put((job_id, query, context))
+        return future
+
+    def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Process a query on a worker and wait for the result."""
+        return self.submit(query, context).result()
+
+    async def process_query_async(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of :meth:`process_query`."""
+        return await asyncio.wrap_future(self.submit(query, context))
+
+    async def stream_query_async(self, query: str, context: Optional[Dict[str, Any]] = None):
+        """Event-stream interface for the API server.
+
+        Workers return complete answers, so the stream consists of the
+        final ``done`` event only.
+        """
+        result = await self.process_query_async(query, context)
+        yield {"event": "done", **result}
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Let workers finish queued jobs, then stop them."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._jobs.put(_STOP)
+        for worker in self._workers:
+            worker.join(timeout)
+        self._results.put(_STOP)
+        self._collector.join(timeout)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def pids(self) -> List[int]:
+        """Process ids of the workers."""
+        return [worker.pid for worker in self._workers]
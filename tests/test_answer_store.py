@@ -0,0 +1,75 @@
+"""Unit tests for the precomputed answer store."""
+
+import json
+import os
+import tempfile
+import unittest
+import sys
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.utils.answer_store import AnswerStore, log_query, normalize_query, read_query_log
+
+
+class TestAnswerStore(unittest.TestCase):
+    """Test cases for AnswerStore."""
+    
+    def setUp(self):
+        """Create a store in a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.store = AnswerStore(os.path.join(self.directory, "answers.sqlite3"), reload_seconds=0)
+        self.store.put("東京への5日間の旅行を計画して", ["trip_planning"], "v1", ["gpt-4o"], {"response": "旅程", "agent_used": "Trip Planning"}, 12)
+    
+    def test_normalized_match(self):
+        """Width, case, spacing and trailing punctuation do not matter."""
+        self.assertEqual(normalize_query(" 東京への５日間の旅行を計画して。"), normalize_query("東京への5日間の旅行を計画して"))
+        
+        result = self.store.lookup("東京への５日間の旅行を計画して！", lambda query, tools: "v1")
+        
+        self.assertEqual(result["response"], "旅程")
+        self.assertIsNone(self.store.lookup("大阪への旅行を計画して", lambda query, tools: "v1"))
+    
+    def test_stale_version_is_a_miss(self):
+        """An entry generated with another model or prompt is not served."""
+        calls = []
+        
+        def current_version(query, tools):
+            calls.append((query, tools))
+            return "v2"
+        
+        self.assertIsNone(self.store.lookup("東京への5日間の旅行を計画して", current_version))
+        self.assertIsNone(self.store.lookup("東京への5日間の旅行を計画して", current_version))
+        # The version is checked once per stored version
+        self.assertEqual(calls, [("東京への5日間の旅行を計画して", ["trip_planning"])])
+    
+    def test_refresh_is_picked_up(self):
+        """A rewritten entry is served after the next reload."""
+        self.store.put("東京への5日間の旅行を計画して", ["trip_planning"], "v2", ["gpt-4o"], {"response": "新しい旅程"})
+        
+        self.assertEqual(self.store.lookup("東京への5日間の旅行を計画して", lambda query, tools: "v2")["response"], "新しい旅程")
+        self.assertEqual(self.store.delete([normalize_query("東京への5日間の旅行を計画して")]), 1)
+        self.assertEqual(self.store.entries(), [])
+
+
+class TestQueryLog(unittest.TestCase):
+    """Test cases for the query log."""
+    
+    def test_counts_by_normalized_query(self):
+        """Spellings of the same query are counted together under the most common one."""
+        path = os.path.join(tempfile.mkdtemp(), "queries.jsonl")
+        for query in ["Hello", "hello!", "Hello", "旅行を計画して"]:
+            log_query(path, query, {"agent_used": "Orchestrator"})
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("旅行を計画して\n")
+        
+        counts = read_query_log(path)
+        
+        self.assertEqual(counts["hello"], {"query": "Hello", "count": 3})
+        self.assertEqual(counts[normalize_query("旅行を計画して")]["count"], 2)
+        with open(path, encoding="utf-8") as f:
+            self.assertFalse(json.loads(f.readline())["precomputed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Unit tests for model backends and tiers."""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.research_assistant import ResearchAssistant
+from multi_agent_system.models.backends import backend_available, estimate_cost, get_tier, register_backend, tier_report
+from multi_agent_system.orchestrator import OrchestratorAgent
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+
+
+class FakeModel:
+    """Model that answers with a fixed text or raises."""
+    
+    def __init__(self, model_id, temperature, max_tokens):
+        self.model_id = model_id
+    
+    def __call__(self, prompt):
+        if self.model_id == "broken":
+            raise ConnectionError("connection refused")
+        return f"{self.model_id}: 回答です。"
+
+
+class FakeAgent:
+    """Strands Agent stand-in that calls its model directly."""
+    
+    def __init__(self, model=None, system_prompt=None):
+        self.model = model
+        self.messages = []
+    
+    def __call__(self, prompt):
+        return self.model(prompt)
+
+
+register_backend("test-fake")(FakeModel)
+register_backend("test-offline", available=lambda: False)(FakeModel)
+
+
+def run_tool(tool_name, query, context=None, tier=None, cascade=None):
+    """Run the research assistant on the given tier without the agent pool."""
+    return ResearchAssistant(tier=tier, cascade=False).respond(query, context)
+
+
+class TestModelTiers(unittest.TestCase):
+    """Test cases for tier resolution and tier selection."""
+    
+    def setUp(self):
+        METRICS.reset()
+        self.config = patch.multiple(
+            Config,
+            SMALL_MODEL_BACKEND="test-fake",
+            SMALL_MODEL="broken",
+            LARGE_MODEL_BACKEND="test-fake",
+            LARGE_MODEL="large-model",
+            AGENT_MODEL_TIERS={},
+            LLM_REPLAY_MODE="off",
+            EARLY_STOP_ENABLED=False
+        )
+        self.config.start()
+        self.agent = patch("multi_agent_system.agents.base_agent.Agent", FakeAgent)
+        self.agent.start()
+    
+    def tearDown(self):
+        self.agent.stop()
+        self.config.stop()
+    
+    def test_get_tier(self):
+        """Tiers resolve to the configured backend and model; unknown names mean large."""
+        self.assertEqual((get_tier("small").backend, get_tier("small").model_id), ("test-fake", "broken"))
+        self.assertEqual(get_tier("medium").name, "large")
+        self.assertEqual(get_tier("medium").model_id, "large-model")
+    
+    def test_agent_tiers(self):
+        """Agents use their class tier unless a tier is given."""
+        self.assertEqual(ResearchAssistant().model_id, "large-model")
+        self.assertEqual(ResearchAssistant(tier="small").model_id, "broken")
+        with patch.object(Config, "AGENT_MODEL_TIERS", {"ResearchAssistant": "small"}):
+            self.assertEqual(ResearchAssistant().tier, "small")
+    
+    def test_failing_backend_escalates(self):
+        """A failing small-tier call is retried on the large tier and both are recorded."""
+        orchestrator = OrchestratorAgent()
+        with patch("multi_agent_system.orchestrator.run_tool", side_effect=run_tool):
+            response = orchestrator._run_tool_tiered("research_assistant", "量子コンピュータとは", None, "small")
+        
+        self.assertTrue(response.ok)
+        self.assertEqual(response.tier, "large")
+        self.assertEqual(response.text, "large-model: 回答です。")
+        report = tier_report()
+        self.assertEqual((report["small"]["calls"], report["small"]["errors"]), (1, 1))
+        self.assertEqual((report["large"]["calls"], report["large"]["errors"]), (1, 0))
+        self.assertEqual(report["escalations"]["count"], 1)
+    
+    def test_large_tier_is_not_escalated(self):
+        """A failing large-tier call is returned as it is."""
+        orchestrator = OrchestratorAgent()
+        with patch.object(Config, "LARGE_MODEL", "broken"), \
+                patch("multi_agent_system.orchestrator.run_tool", side_effect=run_tool) as tool:
+            response = orchestrator._run_tool_tiered("research_assistant", "量子コンピュータとは", None, "large")
+        
+        self.assertFalse(response.ok)
+        self.assertIn("connection refused", response.error)
+        self.assertEqual(tool.call_count, 1)
+    
+    def test_unconfigured_backend(self):
+        """Agents on an unconfigured backend answer with an error instead of calling a model."""
+        self.assertFalse(backend_available("test-offline"))
+        self.assertFalse(backend_available("missing"))
+        agent = ResearchAssistant(backend="test-offline")
+        
+        self.assertIsNone(agent.agent)
+        self.assertFalse(agent.invoke_llm("量子コンピュータとは").ok)
+    
+    def test_estimate_cost(self):
+        """Costs come from the price table; unknown models cost nothing."""
+        self.assertAlmostEqual(estimate_cost("gpt-4o-mini", 1_000_000, 1_000_000), 0.75)
+        self.assertEqual(estimate_cost("unknown", 1000, 1000), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
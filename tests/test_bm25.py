@@ -0,0 +1,118 @@
+"""Unit tests for the local BM25 document index."""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import sys
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.knowledge.bm25 import DocumentIndex, Passage, format_passages
+from multi_agent_system.knowledge.text import html_to_text, split_passages, tokenize
+
+
+class TestText(unittest.TestCase):
+    """Test cases for tokenization and passage splitting."""
+    
+    def test_tokenize(self):
+        """Latin words are kept whole; Japanese becomes bigrams without hiragana-only pairs."""
+        self.assertEqual(tokenize("Ｍａｃｈｉｎｅ Learning"), ["machine", "learning"])
+        self.assertEqual(tokenize("機械学習について"), ["機械", "械学", "学習", "習に"])
+    
+    def test_split_passages(self):
+        """Headings start new passages and long paragraphs are split at sentence ends."""
+        text = "# 概要\n\n短い段落。\n\n## 詳細\n\n" + "長い文です。" * 30
+        
+        passages = split_passages(text, max_chars=60)
+        
+        self.assertEqual(passages[0], ("概要", "短い段落。"))
+        self.assertTrue(all(title == "詳細" for title, _ in passages[1:]))
+        self.assertTrue(all(len(body) <= 60 for _, body in passages))
+    
+    def test_html_to_text(self):
+        """Headings become Markdown headings and scripts are dropped."""
+        text = html_to_text("<html><title>T</title><script>x()</script><h2>見出し</h2><p>本文</p></html>")
+        
+        self.assertIn("## 見出し", text)
+        self.assertIn("本文", text)
+        self.assertNotIn("x()", text)
+        self.assertEqual(split_passages(text)[-1], ("見出し", "本文"))
+
+
+class TestDocumentIndex(unittest.TestCase):
+    """Test cases for DocumentIndex ingestion and search."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.docs = os.path.join(self.directory, "docs")
+        os.makedirs(self.docs)
+        self._write("ml.md", "# 機械学習\n\n機械学習はデータから学習する手法です。\n\n# 深層学習\n\nニューラルネットワークを多層にした手法です。")
+        self._write("cloud.html", "<h1>クラウド</h1><p>クラウドコンピューティングは計算資源をネットワーク経由で提供します。</p>")
+        self._write("notes.bin", "対象外のファイル")
+        self.index = DocumentIndex(os.path.join(self.directory, "index"))
+    
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+    
+    def _write(self, name, content):
+        path = os.path.join(self.docs, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        # Make the change visible to the mtime/size check
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + time.time() % 1 + 1))
+    
+    def test_ingest_and_search(self):
+        """Supported files are indexed and the best passage ranks first."""
+        stats = self.index.ingest([self.docs])
+        
+        self.assertEqual((stats["added"], stats["passages"]), (2, 3))
+        results = self.index.search("ニューラルネットワークとは", k=2)
+        self.assertEqual(results[0].title, "深層学習")
+        self.assertEqual(results[0].citation, "docs/ml.md — 深層学習")
+        self.assertGreater(results[0].score, 0)
+        self.assertEqual(self.index.search("量子"), [])
+    
+    def test_incremental_update_and_prune(self):
+        """Unchanged files are skipped, changed files replace their passages, removed files are pruned."""
+        self.index.ingest([self.docs])
+        self._write("ml.md", "# 機械学習\n\n強化学習は報酬から学習します。")
+        os.remove(os.path.join(self.docs, "cloud.html"))
+        
+        stats = self.index.ingest([self.docs], prune=True)
+        
+        self.assertEqual((stats["updated"], stats["unchanged"], stats["removed"]), (1, 0, 1))
+        self.assertEqual(self.index.passages, 1)
+        self.assertEqual(self.index.search("ニューラルネットワーク"), [])
+        self.assertEqual(self.index.search("クラウド"), [])
+        self.assertIn("強化学習", self.index.search("強化学習")[0].text)
+        self.assertEqual(self.index.ingest([self.docs])["unchanged"], 1)
+    
+    def test_compact_and_reopen(self):
+        """Compaction drops deleted passages and a new instance reads the same index."""
+        self.index.ingest([self.docs])
+        self._write("ml.md", "# 機械学習\n\n強化学習は報酬から学習します。")
+        self.index.ingest([self.docs])
+        
+        result = self.index.compact()
+        reopened = DocumentIndex(self.index.directory)
+        
+        self.assertEqual((result["segments"], result["passages"]), (1, 2))
+        self.assertEqual(reopened.stats()["deleted"], 0)
+        self.assertEqual(reopened.search("クラウドコンピューティング")[0].source, "docs/cloud.html")
+        reopened.close()
+    
+    def test_format_passages(self):
+        """Passages are numbered with their citation and a trimmed excerpt."""
+        text = format_passages([Passage("docs/a.md", "概要", "本文" * 100)], max_chars=10)
+        
+        self.assertTrue(text.startswith("[1] docs/a.md — 概要\n"))
+        self.assertIn("本文本文本文本文本文…", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
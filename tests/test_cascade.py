@@ -0,0 +1,43 @@
+"""Unit tests for the cascade self-check."""
+
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.cascade import check_response, find_missing_sections
+
+TRIP_SECTIONS = ("旅行概要", "日程案", "宿泊施設の推薦", "交通手段と移動方法", "観光スポット", "予算の目安", "注意事項")
+
+
+class TestCascadeSelfCheck(unittest.TestCase):
+    """Test cases for the cascade self-check."""
+    
+    def test_numbered_outline_passes(self):
+        """Sections found by number or by title count as present."""
+        text = "\n".join(f"## {i}. セクション{i}\n内容" for i in range(1, 8))
+        
+        self.assertEqual(find_missing_sections(text, TRIP_SECTIONS), [])
+        self.assertIsNone(check_response(text, TRIP_SECTIONS))
+    
+    def test_missing_sections(self):
+        """Answers that stop early fail the section check."""
+        text = "1. 旅行概要\n京都\n2. 日程案\n1日目"
+        
+        self.assertEqual(check_response(text, TRIP_SECTIONS, min_section_ratio=0.8), "missing_sections")
+    
+    def test_too_short_and_empty(self):
+        """Empty and short answers are rejected."""
+        self.assertEqual(check_response("   "), "empty")
+        self.assertEqual(check_response("短い", min_chars=100), "too_short")
+    
+    def test_refusal(self):
+        """Refusals near the start are detected."""
+        self.assertEqual(check_response("I'm sorry, but I can't do that."), "refusal")
+        self.assertEqual(check_response("申し訳ありませんが、その質問にはお答えできません。"), "refusal")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,110 @@
+"""Unit tests for the product catalog."""
+
+import os
+import tempfile
+import unittest
+import sys
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.product_recommendation_assistant import ProductRecommendationAssistant
+from multi_agent_system.knowledge.catalog import Budget, ProductCatalog, extract_constraints, parse_budget
+from multi_agent_system.utils.config import Config
+
+CSV = """name,category,brand,price,rating,attributes,description
+Aero 14,laptop,Acme,"¥98,000",4.5,軽量;長時間バッテリー,1.1kgの14インチ
+Pro 16,laptop,Acme,248000,4.8,高性能;大画面,
+Budget 15,laptop,Zeta,59800,3.9,,
+Air X,laptop,Zeta,128000,4.6,軽量,
+Buds,headphones,Sono,19800,4.2,ワイヤレス;ノイズキャンセリング,
+Unpriced,laptop,Zeta,,5.0,,
+"""
+
+
+class TestConstraints(unittest.TestCase):
+    """Test cases for budget and constraint extraction."""
+    
+    def test_parse_budget(self):
+        """Bounds, ranges, bands, approximate amounts and currencies are recognized."""
+        self.assertEqual(parse_budget("10万円以下のノートパソコン"), Budget(None, 100000))
+        self.assertEqual(parse_budget("予算は5から10万円"), Budget(50000, 100000))
+        self.assertEqual(parse_budget("3万円台のイヤホン"), Budget(30000, 40000))
+        self.assertEqual(parse_budget("15万円以上"), Budget(150000, None))
+        self.assertEqual(parse_budget("¥50,000程度"), Budget(40000, 60000))
+        self.assertEqual(parse_budget("laptop under $1000"), Budget(None, 1000, "USD"))
+        self.assertIsNone(parse_budget("東京への5日間の旅行"))
+        # "k" is a price scale only next to a currency; specs are not budgets
+        self.assertIsNone(parse_budget("recommend a 4k monitor"))
+        self.assertIsNone(parse_budget("8k tv"))
+        self.assertEqual(parse_budget("4K monitor under $300"), Budget(None, 300, "USD"))
+        self.assertEqual(parse_budget("$1.5k laptop"), Budget(None, 1500, "USD"))
+        # Amounts with a currency win over bare scaled amounts
+        self.assertEqual(parse_budget("2万くらいのモニター、$150以下で"), Budget(None, 150, "USD"))
+    
+    def test_extract_constraints(self):
+        """Categories and attributes match by synonym; cheap requests sort by price."""
+        constraints = extract_constraints("プログラミング用の安くて軽いラップトップ")
+        
+        self.assertEqual(constraints["categories"], ["ノートパソコン"])
+        self.assertEqual(constraints["attributes"], ["軽量"])
+        self.assertEqual(constraints["use_case"], "プログラミング")
+        self.assertEqual(constraints["sort"], "price")
+        # Latin synonyms match whole words only
+        self.assertEqual(extract_constraints("balance")["attributes"], [])
+
+
+class TestProductCatalog(unittest.TestCase):
+    """Test cases for ProductCatalog loading and shortlisting."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "catalog.csv")
+        with open(cls.path, "w", encoding="utf-8") as f:
+            f.write(CSV)
+        cls.catalog = ProductCatalog.from_csv(cls.path)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+    
+    def test_columns(self):
+        """Columns are loaded as arrays with coded categories and attributes."""
+        self.assertEqual(len(self.catalog), 6)
+        self.assertEqual(self.catalog.categories, ["headphones", "laptop"])
+        self.assertEqual(self.catalog.product(0).attributes, ["軽量", "長時間バッテリー"])
+        self.assertEqual(self.catalog.product(0).price, 98000)
+    
+    def test_shortlist_filters_and_ranks(self):
+        """Budget and category filter; attributes rank first, then rating."""
+        shortlist = self.catalog.shortlist(3, Budget(None, 150000), ["laptop"], ["軽量"])
+        
+        self.assertEqual([product.name for product in shortlist.products], ["Air X", "Aero 14", "Budget 15"])
+        self.assertEqual((shortlist.matches, shortlist.complete), (3, 2))
+    
+    def test_shortlist_price_sort_and_currency(self):
+        """Price sorting puts the cheapest first; budgets in another currency are not applied."""
+        shortlist = self.catalog.shortlist(2, Budget(None, 1000, "USD"), ["laptop"], sort="price")
+        
+        self.assertEqual([product.name for product in shortlist.products], ["Budget 15", "Aero 14"])
+        # The row without a price never matches
+        self.assertEqual(shortlist.matches, 4)
+    
+    def test_prompt_uses_shortlist(self):
+        """The assistant recommends from the shortlist and falls back without a category."""
+        agent = ProductRecommendationAssistant()
+        with patch.object(Config, "PRODUCT_CATALOG_PATH", self.path):
+            prompt = agent.build_prompt("10万円以下の軽いノートパソコン")
+            fallback = agent.build_prompt("ゲーミングチェア")
+        
+        self.assertIn("予算: ¥100,000以下", prompt)
+        self.assertIn("1. Aero 14（Acme）／¥98,000／評価4.5", prompt)
+        self.assertNotIn("Air X", prompt)
+        self.assertNotIn("候補製品", fallback)
+        self.assertIn("価格帯", fallback)
+
+
+if __name__ == '__main__':
+    unittest.main()
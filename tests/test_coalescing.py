@@ -0,0 +1,202 @@
+"""Unit tests for single-flight request coalescing."""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.utils.coalescing import SingleFlight, normalize_prompt
+from multi_agent_system.utils.metrics import MetricsRegistry
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for SingleFlight."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.flight = SingleFlight("test", metrics=MetricsRegistry())
+    
+    def test_normalize_prompt(self):
+        """Whitespace, width and case differences share one key."""
+        self.assertEqual(normalize_prompt("Plan a  trip\nto KYOTO"), normalize_prompt("plan a trip to kyoto"))
+        self.assertEqual(normalize_prompt("ＡＢＣ　京都"), normalize_prompt("abc 京都"))
+    
+    def test_concurrent_calls_share_one_execution(self):
+        """Concurrent identical calls run the work once."""
+        calls = []
+        results = []
+        
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return "answer"
+        
+        threads = [threading.Thread(target=lambda: results.append(self.flight.do("k", work))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["answer"] * 5)
+        self.assertAlmostEqual(self.flight.stats()["coalescing_ratio"], 0.8)
+    
+    def test_sequential_calls_are_not_cached(self):
+        """Completed calls are not reused."""
+        self.assertEqual(self.flight.do("k", lambda: 1), 1)
+        self.assertEqual(self.flight.do("k", lambda: 2), 2)
+    
+    def test_async_calls_share_one_execution(self):
+        """Concurrent identical coroutines run the work once."""
+        calls = []
+        
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+        
+        async def main():
+            return await asyncio.gather(*(self.flight.do_async("k", work) for _ in range(3)))
+        
+        self.assertEqual(asyncio.run(main()), ["answer"] * 3)
+        self.assertEqual(len(calls), 1)
+    
+    def test_async_stream_is_shared(self):
+        """Late stream subscribers replay earlier chunks."""
+        produced = []
+        
+        async def source():
+            for chunk in ["a", "b", "c"]:
+                produced.append(chunk)
+                await asyncio.sleep(0.01)
+                yield chunk
+        
+        async def consume():
+            return [chunk async for chunk in self.flight.stream_async("k", source)]
+        
+        async def main():
+            first = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.015)
+            second = asyncio.ensure_future(consume())
+            return await asyncio.gather(first, second)
+        
+        self.assertEqual(asyncio.run(main()), [["a", "b", "c"], ["a", "b", "c"]])
+        self.assertEqual(produced, ["a", "b", "c"])
+    
+    def test_stream_followed_from_another_thread(self):
+        """A consumer on another thread's event loop follows the stream."""
+        started = threading.Event()
+        release = threading.Event()
+        
+        async def source():
+            yield "a"
+            started.set()
+            await asyncio.to_thread(release.wait, 5)
+            yield "b"
+        
+        async def consume():
+            return [chunk async for chunk in self.flight.stream_async("k", source)]
+        
+        follower = []
+        
+        def follow():
+            started.wait(5)
+            follower.append(asyncio.run(consume()))
+        
+        async def lead():
+            stream = asyncio.ensure_future(consume())
+            await asyncio.to_thread(started.wait, 5)
+            # Let the follower join and block on the next chunk
+            await asyncio.sleep(0.05)
+            release.set()
+            return await stream
+        
+        thread = threading.Thread(target=follow)
+        thread.start()
+        leader = asyncio.run(lead())
+        thread.join(5)
+        
+        self.assertEqual((leader, follower), (["a", "b"], [["a", "b"]]))
+        self.assertEqual(self.flight.stats()["followers"], 1)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+    
+    def test_sync_and_async_calls_share_one_execution(self):
+        """A coroutine joins a call already running in a thread."""
+        calls = []
+        started = threading.Event()
+        
+        def work():
+            calls.append("sync")
+            started.set()
+            time.sleep(0.1)
+            return "answer"
+        
+        async def work_async():
+            calls.append("async")
+            return "other"
+        
+        thread_results = []
+        thread = threading.Thread(target=lambda: thread_results.append(self.flight.do("k", work)))
+        thread.start()
+        started.wait(5)
+        result = asyncio.run(self.flight.do_async("k", work_async))
+        thread.join()
+        
+        self.assertEqual((result, thread_results), ("answer", ["answer"]))
+        self.assertEqual(calls, ["sync"])
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+    
+    def test_calls_and_streams_share_one_execution(self):
+        """Calls join in-flight streams and streams join in-flight calls through the converters."""
+        async def source():
+            for chunk in ["a", "b", "c"]:
+                await asyncio.sleep(0.01)
+                yield chunk
+        
+        async def call():
+            await asyncio.sleep(0.03)
+            return "abc"
+        
+        async def stream(from_result=None):
+            return [chunk async for chunk in self.flight.stream_async("k", source, from_result=from_result)]
+        
+        async def main():
+            streamed = asyncio.ensure_future(stream())
+            await asyncio.sleep(0.015)
+            joined = await self.flight.do_async("k", call, from_stream="".join)
+            called = asyncio.ensure_future(self.flight.do_async("k", call))
+            await asyncio.sleep(0.01)
+            return await streamed, joined, await stream(from_result=list), await called
+        
+        self.assertEqual(asyncio.run(main()), (["a", "b", "c"], "abc", ["a", "b", "c"], "abc"))
+        self.assertEqual(self.flight.stats()["leaders"], 2)
+        self.assertEqual(self.flight.stats()["followers"], 2)
+    
+    def test_call_without_converter_runs_alone(self):
+        """Without a converter a call does not wait for a stream of the same key."""
+        async def source():
+            await asyncio.sleep(0.05)
+            yield "a"
+        
+        async def call():
+            return "own"
+        
+        async def stream():
+            return [chunk async for chunk in self.flight.stream_async("k", source)]
+        
+        async def main():
+            streamed = asyncio.ensure_future(stream())
+            await asyncio.sleep(0.01)
+            result = await self.flight.do_async("k", call)
+            return result, await streamed
+        
+        self.assertEqual(asyncio.run(main()), ("own", ["a"]))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
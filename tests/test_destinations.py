@@ -0,0 +1,131 @@
+"""Unit tests for the destination knowledge base."""
+
+import os
+import tempfile
+import unittest
+import sys
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.trip_planning_assistant import TripPlanningAssistant
+from multi_agent_system.knowledge.destinations import DestinationStore, build_store, extract_trip_fields, format_blocks, select_blocks
+from multi_agent_system.utils.config import Config
+
+KYOTO = {
+    "name": "京都",
+    "country": "日本",
+    "aliases": ["Kyoto", "京都府"],
+    "sights": [
+        {"name": "錦市場", "tags": ["food"], "hours": 1},
+        {"name": "清水寺", "tags": ["history"], "seasons": ["spring", "autumn"]},
+        {"name": "祇園祭の山鉾", "tags": ["history"], "seasons": ["summer"]},
+    ],
+    "stays": [{"area": "京都駅周辺", "style": "budget"}, {"area": "東山", "style": "luxury", "note": "旅館が多い"}],
+    "seasons": {"spring": "桜", "autumn": "紅葉"},
+    "budget": {"standard": {"lodging": 15000, "food": 6000}, "luxury": {"lodging": 60000, "food": 15000}},
+}
+TOKYO = {"name": "東京", "aliases": ["東京都", "tokyo"], "sights": [{"name": "浅草寺"}]}
+
+
+class TestDestinationStore(unittest.TestCase):
+    """Test cases for building and reading the store."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "destinations.kb")
+        cls.built = build_store([KYOTO, TOKYO], cls.path)
+        cls.store = DestinationStore(cls.path)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.store.close()
+        cls.directory.cleanup()
+    
+    def test_lookup_by_name_and_alias(self):
+        """Names and aliases are normalized and share one record."""
+        self.assertEqual((self.built["destinations"], self.built["keys"]), (2, 6))
+        self.assertEqual(self.store.get("ＫＹＯＴＯ")["name"], "京都")
+        self.assertIs(self.store.get("京都府"), self.store.get("京都"))
+        self.assertIsNone(self.store.get("札幌"))
+    
+    def test_duplicate_alias_rejected(self):
+        """Two destinations cannot claim the same alias."""
+        with self.assertRaises(ValueError):
+            build_store([KYOTO, dict(TOKYO, aliases=["kyoto"])], os.path.join(self.directory.name, "bad.kb"))
+    
+    def test_match_prefers_leftmost_longest(self):
+        """The earliest, longest key wins; latin keys need word boundaries."""
+        self.assertEqual(self.store.match("東京都から京都へ"), "東京都")
+        self.assertEqual(self.store.match("plan a trip to kyoto"), "kyoto")
+        self.assertIsNone(self.store.match("tokyoites"))
+
+
+class TestTripFields(unittest.TestCase):
+    """Test cases for field extraction and block selection."""
+    
+    def test_extract_trip_fields(self):
+        """Month, group, style and interests are recognized; unknown destinations are guessed."""
+        fields = extract_trip_fields("11月に夫婦で札幌へ行く旅行。高級な宿でグルメと温泉を楽しみたい")
+        
+        self.assertEqual(fields["destination"], "札幌")
+        self.assertEqual((fields["month"], fields["season"]), (11, "autumn"))
+        self.assertEqual(fields["group_size"], 2)
+        self.assertEqual(fields["travel_style"], "luxury")
+        self.assertEqual(fields["interests"], ["food", "onsen"])
+    
+    def test_fallbacks_reject_words_that_are_not_places(self):
+        """Guesses skip 家族/一人, verbs and seasons; seasons are not found inside place names."""
+        cases = {
+            "家族旅行で沖縄に行きたい": ("沖縄", None),
+            "家族旅行でハワイに行きたい": ("ハワイ", None),
+            "北海道で一人旅行したい": ("北海道", None),
+            "大阪と京都を3日間で回る旅行": (None, None),
+            "hokkaido trip in Winter": (None, "winter"),
+            "秋葉原でお土産を買いたい": (None, None),
+            "秋田への旅行": ("秋田", None),
+            "今度の夏休みに京都へ行く": ("京都", "summer"),
+        }
+        for text, expected in cases.items():
+            fields = extract_trip_fields(text)
+            self.assertEqual((fields["destination"], fields["season"]), expected, text)
+    
+    def test_select_blocks(self):
+        """Sights follow interests then season; lodging and budget follow style, days and group size."""
+        trip = {"interests": ["history"], "season": "autumn", "travel_style": "luxury", "days": 3, "group_size": 2}
+        
+        blocks = select_blocks(KYOTO, trip, max_sights=2)
+        
+        self.assertEqual([sight["name"] for sight in blocks["sights"]], ["清水寺", "祇園祭の山鉾"])
+        self.assertEqual([stay["area"] for stay in blocks["stays"]], ["東山"])
+        self.assertEqual(blocks["seasons"], {"autumn": "紅葉"})
+        self.assertEqual(blocks["budget"]["total"], 75000 * 3 * 2)
+        self.assertIn("計¥75,000（3日間・2人で約¥450,000）", format_blocks(blocks))
+
+
+class TestTripPrompt(unittest.TestCase):
+    """Test cases for the knowledge base in TripPlanningAssistant prompts."""
+    
+    def test_prompt_includes_knowledge(self):
+        """Known destinations add the blocks; unknown ones keep the plain prompt."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "destinations.kb")
+            build_store([KYOTO, TOKYO], path)
+            agent = TripPlanningAssistant()
+            with patch.object(Config, "DESTINATION_KB_PATH", path):
+                prompt = agent.build_prompt("京都に3泊で歴史を巡る旅行")
+                plain = agent.build_prompt("札幌に3泊で行きたい")
+                info = agent._analyze_trip_request("Plan a trip to Kyoto", {"duration": "3 days"})
+        
+        self.assertIn("目的地の基本情報（ナレッジベースより）", prompt)
+        self.assertIn("- 清水寺", prompt)
+        self.assertIn("4日間・1人", prompt)
+        self.assertNotIn("ナレッジベース", plain)
+        self.assertIn("クエリ: 札幌に3泊で行きたい\n\n以下の形式", plain)
+        self.assertEqual((info["destination"], info["days"]), ("kyoto", 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Unit tests for outline-aware early termination."""
+
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.early_stop import OutlineTracker, outline_end
+
+SECTIONS = ("概要", "主要なポイント", "詳細情報")
+
+
+def _stream(tracker, text, size=5):
+    out = "".join(tracker.feed(text[i:i + size]) for i in range(0, len(text), size))
+    return out + tracker.flush()
+
+
+class TestOutlineTracker(unittest.TestCase):
+    """Test cases for OutlineTracker."""
+    
+    def test_stops_at_next_outline_number(self):
+        """The next number in the headers' style ends the outline; sub-headings do not."""
+        text = "## 1. 概要\nA\n## 2. 主要なポイント\nB\n## 3. 詳細情報\nC\n### 補足\nD\n## まとめ\nE\n## 4. おまけ\nF\n"
+        tracker = OutlineTracker(SECTIONS)
+        
+        self.assertEqual(_stream(tracker, text), "## 1. 概要\nA\n## 2. 主要なポイント\nB\n## 3. 詳細情報\nC\n### 補足\nD\n## まとめ\nE\n")
+        self.assertTrue(tracker.done)
+    
+    def test_numbered_outline(self):
+        """Sub-lists restart numbering; only the next outline number ends it."""
+        text = "1. 概要\nA\n2. 主要なポイント\nB\n3. 詳細情報\n1. one\n2. two\n4. おまけ\nX\n"
+        
+        self.assertEqual(outline_end(text, SECTIONS), len("1. 概要\nA\n2. 主要なポイント\nB\n3. 詳細情報\n1. one\n2. two\n"))
+    
+    def test_numbered_list_in_final_section(self):
+        """A long numbered list inside the final section is kept whole."""
+        items = "".join(f"{number}. 持ち物{number}\n" for number in range(1, 10))
+        text = "## 1. 概要\nA\n## 2. 主要なポイント\nB\n## 3. 詳細情報\n" + items + "   4. 補足\n"
+        tracker = OutlineTracker(SECTIONS)
+        
+        self.assertEqual(_stream(tracker, text), text)
+        self.assertFalse(tracker.done)
+        self.assertEqual(outline_end(text + "## 4. おまけ\nX\n", SECTIONS), len(text))
+    
+    def test_rule_and_other_styles_are_kept(self):
+        """Rules and numbers in another style than the headers do not end the outline."""
+        text = "**1. 概要**\nA\n**2. 主要なポイント**\nB\n**3. 詳細情報**\nC\n---\n## 4. 以上\n"
+        
+        self.assertIsNone(outline_end(text, SECTIONS))
+        self.assertEqual(outline_end(text + "**4. おまけ**\n", SECTIONS), len(text))
+    
+    def test_incomplete_outline_passes_everything(self):
+        """Responses that never reach the final section are not cut."""
+        text = "## 1. 概要\nA\n## まとめ\nB"
+        tracker = OutlineTracker(SECTIONS)
+        
+        self.assertEqual(_stream(tracker, text), text)
+        self.assertFalse(tracker.done)
+        self.assertIsNone(outline_end(text, SECTIONS))
+
+
+if __name__ == '__main__':
+    unittest.main()
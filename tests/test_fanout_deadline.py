@@ -0,0 +1,135 @@
+"""Unit tests for partial answers at the fan-out deadline."""
+
+import asyncio
+import threading
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.orchestrator import PENDING_MESSAGE, OrchestratorAgent
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS, MetricsRegistry
+from multi_agent_system.utils.scheduler import JobScheduler
+
+QUERY = "旅行用のおすすめのスーツケースを比較して"
+TRIP_ANSWER = "京都までは新幹線で約2時間15分です。"
+PRODUCT_ANSWER = "軽量なハードケースがおすすめです。"
+
+
+class TestFanoutDeadline(unittest.TestCase):
+    """Test cases for the fan-out deadline and complete_pending."""
+    
+    def setUp(self):
+        METRICS.reset()
+        self.gate = threading.Event()
+        self.scheduler = JobScheduler(workers=2, metrics=MetricsRegistry())
+        self.config = patch.multiple(
+            Config,
+            SCHEDULER_ENABLED=True,
+            FANOUT_DEADLINE_SECONDS=0.05,
+            ROUTING_MAX_FANOUT=2,
+            ROUTING_MIN_MARGIN=0.5,
+            PRECOMPUTED_ANSWERS_PATH=None,
+            QUERY_LOG_PATH=None,
+            RESPONSE_CACHE_PATH=None
+        )
+        self.config.start()
+        self.patches = [
+            patch("multi_agent_system.orchestrator.get_scheduler", return_value=self.scheduler),
+            patch("multi_agent_system.orchestrator.run_tool", side_effect=self._run_tool),
+            patch("multi_agent_system.orchestrator.stream_tool_async", side_effect=self._stream_tool),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+        self.orchestrator = OrchestratorAgent()
+        self.context = {"session_id": "s1"}
+    
+    def tearDown(self):
+        self.gate.set()
+        for patcher in self.patches:
+            patcher.stop()
+        self.config.stop()
+        self.scheduler.shutdown()
+    
+    def _run_tool(self, tool_name, query, context=None, tier=None, cascade=None):
+        """Trip planning waits for the gate; product recommendation answers at once."""
+        if tool_name == "trip_planning":
+            self.gate.wait(5)
+            return LLMResponse(blocks=(TRIP_ANSWER,))
+        return LLMResponse(blocks=(PRODUCT_ANSWER,))
+    
+    async def _stream_tool(self, tool_name, query, context=None, tier=None):
+        if tool_name == "trip_planning":
+            await asyncio.to_thread(self.gate.wait, 5)
+            yield TRIP_ANSWER
+            return
+        yield PRODUCT_ANSWER
+    
+    def test_partial_answer_at_deadline(self):
+        """Late sections are placeholders and their futures are returned in pending."""
+        result = self.orchestrator.process_query(QUERY, self.context)
+        
+        self.assertEqual(list(result["pending"]), ["trip_planning"])
+        self.assertEqual(result["llm_responses"]["product_recommendation"].text, PRODUCT_ANSWER)
+        self.assertEqual(result["llm_responses"]["trip_planning"].finish_reason, "pending")
+        self.assertIn(PENDING_MESSAGE, result["response"])
+        self.assertEqual(METRICS.counter("fanout.partial_answers"), 1)
+        self.assertEqual(METRICS.counter("fanout.pending_sections"), 1)
+        # Partial answers are not remembered for follow-ups
+        self.assertIsNone(self.orchestrator.sessions.last_turn("s1"))
+    
+    def test_complete_pending(self):
+        """The late sections are filled in and the completed turn is recorded."""
+        result = self.orchestrator.process_query(QUERY, self.context)
+        self.gate.set()
+        completed = self.orchestrator.complete_pending(QUERY, result, timeout=5, context=self.context)
+        
+        self.assertNotIn("pending", completed)
+        self.assertNotIn(PENDING_MESSAGE, completed["response"])
+        self.assertIn(TRIP_ANSWER, completed["response"])
+        self.assertIn(PRODUCT_ANSWER, completed["response"])
+        self.assertEqual(completed["llm_responses"]["trip_planning"].text, TRIP_ANSWER)
+        self.assertEqual(self.orchestrator.sessions.last_turn("s1").texts["trip_planning"], TRIP_ANSWER)
+        self.assertIs(self.orchestrator.complete_pending(QUERY, completed), completed)
+    
+    def test_no_deadline_for_a_single_tool(self):
+        """A single specialist is always awaited."""
+        with patch.object(self.orchestrator, "_process_with_deadline") as process_with_deadline:
+            self.gate.set()
+            result = self.orchestrator.process_query("東京への5日間の旅行を計画して", self.context)
+        
+        process_with_deadline.assert_not_called()
+        self.assertNotIn("pending", result)
+    
+    def test_stream_partial_and_section_events(self):
+        """The stream sends a partial answer at the deadline and a section event per late tool."""
+        async def collect():
+            events = []
+            async for event in self.orchestrator.stream_query_async(QUERY, self.context):
+                events.append(event)
+                if event["event"] == "partial":
+                    self.gate.set()
+            return events
+        
+        events = asyncio.run(collect())
+        kinds = [event["event"] for event in events]
+        
+        self.assertEqual(kinds, ["route", "delta", "partial", "delta", "section", "done"])
+        partial = events[2]
+        self.assertEqual(partial["pending"], ["trip_planning"])
+        self.assertIn(PENDING_MESSAGE, partial["response"])
+        self.assertIn(PRODUCT_ANSWER, partial["response"])
+        section = events[4]
+        self.assertEqual((section["tool"], section["pending"]), ("trip_planning", []))
+        self.assertIn(TRIP_ANSWER, section["response"])
+        self.assertEqual(events[-1]["response"], section["response"])
+        self.assertEqual(self.orchestrator.sessions.last_turn("s1").texts["trip_planning"], TRIP_ANSWER)
+
+
+if __name__ == '__main__':
+    unittest.main()
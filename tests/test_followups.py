@@ -0,0 +1,227 @@
+"""Unit tests for follow-up edits of the previous answer."""
+
+import asyncio
+import tempfile
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.edits import PatchStream, apply_patch
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.agents.trip_planning_assistant import TripPlanningAssistant
+from multi_agent_system.orchestrator import OrchestratorAgent
+from multi_agent_system.tools.followups import detect_edit, followup_report
+from multi_agent_system.utils.answer_store import AnswerStore
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+from multi_agent_system.utils.sessions import SessionStore, Turn
+
+SECTIONS = TripPlanningAssistant.REQUIRED_SECTIONS
+
+
+def answer(days=5, closing="以上、素敵な旅を！"):
+    """Render a complete trip plan for the given number of days."""
+    bodies = {title: f"{title}の内容。" for title in SECTIONS}
+    bodies["旅行概要"] = f"京都を{days}日間で巡る旅です。"
+    bodies["日程案"] = "\n".join(f"{day}. {day}日目: 観光" for day in range(1, days + 1))
+    parts = [f"## {number}. {title}\n{bodies[title]}" for number, title in enumerate(SECTIONS, 1)]
+    return "京都旅行のプランです。\n\n" + "\n\n".join(parts) + f"\n\n---\n{closing}"
+
+
+PATCH = "修正版です。\n\n## 1. 旅行概要\n京都を3日間で巡る旅です。\n\n## 2. 日程案\n1. 1日目: 清水寺\n2. 2日目: 嵐山\n3. 3日目: 伏見\n\n---\nいかがでしょうか。"
+
+
+class TestDetectEdit(unittest.TestCase):
+    """Test cases for recognizing follow-up edits."""
+    
+    def test_kinds(self):
+        """Short change requests are classified by kind."""
+        self.assertEqual(detect_edit("make it 3 days"), "duration")
+        self.assertEqual(detect_edit("3泊にして"), "duration")
+        self.assertEqual(detect_edit("cheaper options only"), "budget")
+        self.assertEqual(detect_edit("もっと安く"), "budget")
+        self.assertEqual(detect_edit("国内メーカーだけ"), "filter")
+        self.assertEqual(detect_edit("美術館も入れて"), "change")
+    
+    def test_new_requests(self):
+        """Full requests and unrelated questions are not edits."""
+        self.assertIsNone(detect_edit("東京への5日間の旅行を計画して", routed=True))
+        self.assertIsNone(detect_edit("ありがとう"))
+        self.assertIsNone(detect_edit("3日間にして", max_chars=4))
+
+
+class TestPatch(unittest.TestCase):
+    """Test cases for merging section patches into a previous answer."""
+    
+    def test_apply_patch(self):
+        """Patched sections replace their counterparts; the rest and the closing are kept."""
+        text, changed = apply_patch(answer(), PATCH, SECTIONS)
+        
+        self.assertEqual(changed, ["旅行概要", "日程案"])
+        self.assertTrue(text.startswith("京都旅行のプランです。\n\n## 1. 旅行概要\n京都を3日間で巡る旅です。"))
+        self.assertIn("3. 3日目: 伏見\n\n## 3. 宿泊施設の推薦\n\n宿泊施設の推薦の内容。", text)
+        self.assertNotIn("5日目", text)
+        self.assertNotIn("修正版です", text)
+        self.assertNotIn("いかがでしょうか", text)
+        self.assertTrue(text.endswith("---\n以上、素敵な旅を！"))
+    
+    def test_stream_matches_apply_patch(self):
+        """Merging chunk by chunk gives the same answer."""
+        stream = PatchStream(answer(), SECTIONS)
+        merged = "".join(stream.feed(PATCH[i:i + 7]) for i in range(0, len(PATCH), 7)) + stream.flush()
+        
+        self.assertEqual(merged.strip(), apply_patch(answer(), PATCH, SECTIONS)[0])
+    
+    def test_unrecognized_patch(self):
+        """A patch without sections changes nothing."""
+        text, changed = apply_patch(answer(), "すみません、よくわかりません。", SECTIONS)
+        
+        self.assertEqual(changed, [])
+        self.assertEqual(text, "すみません、よくわかりません。")
+
+
+class TestSessionStore(unittest.TestCase):
+    """Test cases for the bounded per-session turn store."""
+    
+    def test_bounds(self):
+        """Old turns, least recently used sessions and idle sessions are dropped."""
+        store = SessionStore(max_sessions=2, max_turns=2, ttl_seconds=60)
+        for number in range(3):
+            store.record("a", Turn(f"q{number}", ["trip_planning"], {"trip_planning": "text"}))
+        store.record("b", Turn("q", [], {}))
+        store.turns("a")
+        store.record("c", Turn("q", [], {}))
+        
+        self.assertEqual([turn.query for turn in store.turns("a")], ["q1", "q2"])
+        self.assertEqual(store.turns("b"), [])
+        self.assertEqual(len(store), 2)
+        
+        with patch("multi_agent_system.utils.sessions.time.time", return_value=10 ** 12):
+            self.assertIsNone(store.last_turn("a"))
+    
+    def test_request_includes_edits(self):
+        """Edits are appended to the original query."""
+        turn = Turn("京都に5日間の旅行", ["trip_planning"], {}, edits=["3日間にして", "もっと安く"])
+        
+        self.assertEqual(turn.request, "京都に5日間の旅行（変更: 3日間にして、もっと安く）")
+
+
+class TestOrchestratorEdits(unittest.TestCase):
+    """Test cases for the orchestrator's follow-up edit path."""
+    
+    def setUp(self):
+        METRICS.reset()
+        self.config = patch.multiple(
+            Config,
+            SCHEDULER_ENABLED=False,
+            PRECOMPUTED_ANSWERS_PATH=None,
+            QUERY_LOG_PATH=None,
+            RESPONSE_CACHE_PATH=None,
+            SECTION_CACHE_PATH=None,
+            TRIP_SEGMENTED_ENABLED=False
+        )
+        self.config.start()
+        self.orchestrator = OrchestratorAgent()
+        self.context = {"session_id": "s1"}
+    
+    def tearDown(self):
+        self.config.stop()
+    
+    def _first_answer(self):
+        with patch("multi_agent_system.orchestrator.run_tool", return_value=LLMResponse(blocks=(answer(),), output_tokens=900)):
+            return self.orchestrator.process_query("京都に5日間の旅行を計画して", self.context)
+    
+    def test_edit_patches_previous_answer(self):
+        """Only the patch is generated; the full updated answer is returned and remembered."""
+        self._first_answer()
+        
+        with patch.object(TripPlanningAssistant, "invoke_llm", return_value=LLMResponse(blocks=(PATCH,), output_tokens=120)) as invoke, \
+                patch("multi_agent_system.orchestrator.run_tool") as run_tool:
+            result = self.orchestrator.process_query("3日間にして", self.context)
+        
+        run_tool.assert_not_called()
+        prompt = invoke.call_args[0][0]
+        self.assertIn("京都に5日間の旅行を計画して", prompt)
+        self.assertIn("「旅行概要」「日程案」「予算の目安」", prompt)
+        self.assertEqual(result["edit"], "duration")
+        self.assertIn("3. 3日目: 伏見", result["response"])
+        self.assertIn("## 7. 注意事項\n\n注意事項の内容。", result["response"])
+        turn = self.orchestrator.sessions.last_turn("s1")
+        self.assertEqual(turn.request, "京都に5日間の旅行を計画して（変更: 3日間にして）")
+        self.assertIn("伏見", turn.texts["trip_planning"])
+        report = followup_report()
+        self.assertEqual(report["edits"], 1)
+        self.assertEqual(report["tokens_saved"], 780)
+    
+    def test_edit_after_precomputed_answer(self):
+        """A precomputed answer is remembered, so the follow-up edits it."""
+        query = "京都に5日間の旅行を計画して"
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "answers.sqlite3")
+            version, models = self.orchestrator.answer_version(query, ["trip_planning"])
+            AnswerStore(path).put(query, ["trip_planning"], version, models, {
+                "response": answer(), "agent_used": "Trip Planning", "query_class": "complex",
+                "texts": {"trip_planning": answer()}, "output_tokens": {"trip_planning": 900},
+            })
+            with patch.object(Config, "PRECOMPUTED_ANSWERS_PATH", path), \
+                    patch.object(TripPlanningAssistant, "invoke_llm", return_value=LLMResponse(blocks=(PATCH,), output_tokens=120)), \
+                    patch("multi_agent_system.orchestrator.run_tool") as run_tool:
+                first = self.orchestrator.process_query(query, self.context)
+                result = self.orchestrator.process_query("3日間にして", self.context)
+        
+        run_tool.assert_not_called()
+        self.assertTrue(first["precomputed"])
+        self.assertNotIn("texts", first)
+        self.assertEqual(result["edit"], "duration")
+        self.assertIn("3. 3日目: 伏見", result["response"])
+        self.assertEqual(followup_report()["tokens_saved"], 780)
+    
+    def test_fallback_regenerates(self):
+        """When the patch has no sections, the edited request is answered in full."""
+        self._first_answer()
+        
+        with patch.object(TripPlanningAssistant, "invoke_llm", return_value=LLMResponse(blocks=("了解しました。",))), \
+                patch("multi_agent_system.orchestrator.run_tool", return_value=LLMResponse(blocks=(answer(3),))) as run_tool:
+            result = self.orchestrator.process_query("3日間にして", self.context)
+        
+        self.assertEqual(run_tool.call_args[0][1], "京都に5日間の旅行を計画して（変更: 3日間にして）")
+        self.assertIn("3. 3日目: 観光", result["response"])
+        self.assertEqual(followup_report()["fallbacks"], 1)
+    
+    def test_other_sessions_are_not_edits(self):
+        """Follow-ups only edit answers of their own session."""
+        self._first_answer()
+        
+        result = self.orchestrator.process_query("3日間にして", {"session_id": "s2"})
+        self.orchestrator.reset_session("s1")
+        after_reset = self.orchestrator.process_query("3日間にして", self.context)
+        
+        self.assertNotIn("edit", result)
+        self.assertNotIn("edit", after_reset)
+    
+    def test_stream_edit(self):
+        """Streamed deltas add up to the full updated answer."""
+        self._first_answer()
+        
+        async def stream(agent, prompt):
+            for i in range(0, len(PATCH), 7):
+                yield PATCH[i:i + 7]
+        
+        async def collect():
+            return [event async for event in self.orchestrator.stream_query_async("3日間にして", self.context)]
+        
+        with patch.object(TripPlanningAssistant, "stream_llm_async", stream):
+            events = asyncio.run(collect())
+        
+        self.assertEqual(events[0], {"event": "route", "tools": ["trip_planning"], "edit": "duration"})
+        streamed = "".join(event["text"] for event in events if event["event"] == "delta")
+        self.assertEqual(streamed.strip(), apply_patch(answer(), PATCH, SECTIONS)[0])
+        self.assertEqual(events[-1]["edit"], "duration")
+
+
+if __name__ == '__main__':
+    unittest.main()
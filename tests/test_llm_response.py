@@ -0,0 +1,64 @@
+"""Unit tests for the structured LLM response type."""
+
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+
+
+class _FakeMetrics:
+    accumulated_usage = {"inputTokens": 12, "outputTokens": 34, "totalTokens": 46}
+
+
+class _FakeResult:
+    stop_reason = "end_turn"
+    metrics = _FakeMetrics()
+    message = {
+        "role": "assistant",
+        "content": [{"text": "first"}, {"toolUse": {}}, {"text": "second"}],
+    }
+
+
+class TestLLMResponse(unittest.TestCase):
+    """Test cases for LLMResponse."""
+    
+    def test_from_agent_result_keeps_all_text_blocks(self):
+        """All text blocks are kept, not just the first one."""
+        response = LLMResponse.from_agent_result(_FakeResult(), model_id="gpt-4o", latency_ms=5.0)
+        
+        self.assertEqual(response.blocks, ("first", "second"))
+        self.assertEqual(response.text, "first\nsecond")
+        self.assertEqual(str(response), "first\nsecond")
+    
+    def test_usage_and_finish_reason(self):
+        """Usage, model id and finish reason are carried over."""
+        response = LLMResponse.from_agent_result(_FakeResult(), model_id="gpt-4o")
+        
+        self.assertEqual(response.input_tokens, 12)
+        self.assertEqual(response.output_tokens, 34)
+        self.assertEqual(response.total_tokens, 46)
+        self.assertEqual(response.model_id, "gpt-4o")
+        self.assertEqual(response.finish_reason, "end_turn")
+        self.assertTrue(response.ok)
+    
+    def test_from_error(self):
+        """Error responses expose the message as text."""
+        response = LLMResponse.from_error("Error calling LLM: boom")
+        
+        self.assertFalse(response.ok)
+        self.assertEqual(response.text, "Error calling LLM: boom")
+        self.assertEqual(response.finish_reason, "error")
+    
+    def test_slots(self):
+        """The response type does not carry a per-instance dict."""
+        response = LLMResponse(blocks=("x",))
+        
+        self.assertFalse(hasattr(response, "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
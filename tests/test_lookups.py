@@ -0,0 +1,170 @@
+"""Unit tests for lookup follow-ups answered from earlier answers."""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.orchestrator import OrchestratorAgent
+from multi_agent_system.tools.lookups import AnswerIndex, lookup, lookup_report, parse_lookup
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+
+TRIP = """京都旅行のプランです。
+
+### 1. 旅行概要
+京都を3日間で巡る旅です。
+
+### 2. 日程案
+
+#### 1日目: 東山
+- 午前: 清水寺
+- 午後: 祇園
+
+#### 2日目: 嵐山
+- 午前: 竹林の小径
+- 午後: 天龍寺
+
+### 6. 予算の目安
+- 合計: 約8万円
+"""
+
+PRODUCTS = """## 1. ニーズの理解
+プログラミング用の軽いラップトップ。
+
+## 2. おすすめ製品
+1. **MacBook Air M3** - ¥164,800
+   - 軽量で長時間駆動
+2. **ThinkPad X1 Carbon**
+   - 価格: ¥220,000
+   - キーボードが優秀
+3. **Dell XPS 13** - ¥180,000
+
+## 3. 代替案
+- 中古の上位モデル
+"""
+
+
+def find(text, query):
+    """Look a query up in one indexed answer."""
+    return lookup([("tool", AnswerIndex(text))], parse_lookup(query))
+
+
+class TestParseLookup(unittest.TestCase):
+    """Test cases for recognizing lookup follow-ups."""
+    
+    def test_questions(self):
+        """Days, positions and prices are extracted."""
+        self.assertEqual(parse_lookup("what was day 2 again?").day, 2)
+        self.assertEqual(parse_lookup("2日目は？").day, 2)
+        question = parse_lookup("what was the price of the second laptop?")
+        self.assertEqual((question.position, question.price), (2, True))
+        self.assertEqual(parse_lookup("最後の候補は何だっけ").position, -1)
+    
+    def test_other_queries(self):
+        """Requests, edits and new short questions are not lookups."""
+        self.assertIsNone(parse_lookup("東京への5日間の旅行を計画して"))
+        self.assertIsNone(parse_lookup("3日間にして"))
+        self.assertIsNone(parse_lookup("ホテルは？"))
+        self.assertIsNone(parse_lookup("is it safe to travel against the advice?"))
+        self.assertIsNotNone(parse_lookup("さっきのホテルは？"))
+
+
+class TestAnswerIndex(unittest.TestCase):
+    """Test cases for answering from an indexed answer."""
+    
+    def test_day(self):
+        """A day is found by its heading, with the lines under it."""
+        text, _, confidence = find(TRIP, "2日目は何だっけ？")
+        
+        self.assertTrue(text.startswith("#### 2日目: 嵐山\n- 午前: 竹林の小径\n- 午後: 天龍寺"))
+        self.assertIn("「2. 日程案」", text)
+        self.assertEqual(confidence, 1.0)
+    
+    def test_position_and_price(self):
+        """Positions refer to listed options; the price line is picked from the option."""
+        text, _, confidence = find(PRODUCTS, "what was the price of the second laptop?")
+        
+        self.assertTrue(text.startswith("**ThinkPad X1 Carbon**\n- 価格: ¥220,000"))
+        self.assertGreaterEqual(confidence, Config.LOOKUP_MIN_CONFIDENCE)
+    
+    def test_section(self):
+        """Other questions are matched against headings."""
+        text, _, confidence = find(TRIP, "予算の目安はいくらだった？")
+        
+        self.assertIn("約8万円", text)
+        self.assertGreaterEqual(confidence, Config.LOOKUP_MIN_CONFIDENCE)
+        self.assertLess(find(TRIP, "what were the hotels again?")[2], Config.LOOKUP_MIN_CONFIDENCE)
+
+
+class TestOrchestratorLookups(unittest.TestCase):
+    """Test cases for the orchestrator's lookup path."""
+    
+    def setUp(self):
+        METRICS.reset()
+        self.config = patch.multiple(
+            Config,
+            SCHEDULER_ENABLED=False,
+            PRECOMPUTED_ANSWERS_PATH=None,
+            QUERY_LOG_PATH=None,
+            RESPONSE_CACHE_PATH=None
+        )
+        self.config.start()
+        self.orchestrator = OrchestratorAgent()
+        self.context = {"session_id": "s1"}
+        with patch("multi_agent_system.orchestrator.run_tool", return_value=LLMResponse(blocks=(TRIP,))):
+            self.orchestrator.process_query("京都に3日間の旅行を計画して", self.context)
+    
+    def tearDown(self):
+        self.config.stop()
+    
+    def test_answered_without_llm(self):
+        """A confident match is answered from the index."""
+        with patch("multi_agent_system.orchestrator.run_tool") as run_tool, \
+                patch("multi_agent_system.orchestrator.run_lookup") as run_lookup:
+            result = self.orchestrator.process_query("what was day 2 again?", self.context)
+        
+        run_tool.assert_not_called()
+        run_lookup.assert_not_called()
+        self.assertEqual(result["lookup"], "index")
+        self.assertIn("竹林の小径", result["response"])
+        self.assertEqual(lookup_report()["hit_rate"], 1.0)
+    
+    def test_low_confidence_falls_back_to_llm(self):
+        """A weakly matched question is sent to the specialist with its previous answer."""
+        with patch("multi_agent_system.orchestrator.run_lookup", return_value=LLMResponse(blocks=("宿泊費は約3万円です。",))) as run_lookup:
+            result = self.orchestrator.process_query("宿泊の予算はいくらだった？", self.context)
+        
+        self.assertEqual(result["lookup"], "llm")
+        self.assertEqual(run_lookup.call_args[0][:3], ("trip_planning", TRIP, "宿泊の予算はいくらだった？"))
+        self.assertIn("宿泊費は約3万円です。", result["response"])
+        report = lookup_report()
+        self.assertEqual((report["queries"], report["hits"], report["fallbacks"]), (1, 0, 1))
+    
+    def test_unmatched_questions_are_routed(self):
+        """Questions matching nothing in the earlier answers go to the specialist as follow-ups."""
+        with patch("multi_agent_system.orchestrator.run_lookup") as run_lookup, \
+                patch("multi_agent_system.orchestrator.run_followup", return_value=LLMResponse(blocks=("祇園の旅館がおすすめです。",))) as run_followup:
+            unmatched = self.orchestrator.process_query("what were the hotels again?", self.context)
+            topic = self.orchestrator.process_query("ホテルは？", self.context)
+        
+        run_lookup.assert_not_called()
+        self.assertEqual(run_followup.call_count, 2)
+        for result in (unmatched, topic):
+            self.assertNotIn("lookup", result)
+            self.assertTrue(result["sticky"])
+        self.assertEqual(lookup_report()["misses"], 1)
+    
+    def test_lookups_need_the_session(self):
+        """Questions in other sessions are not lookups."""
+        result = self.orchestrator.process_query("what was day 2 again?", {"session_id": "s2"})
+        
+        self.assertNotIn("lookup", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Unit tests for memory instrumentation."""
+
+import gc
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.utils.memory import MemoryAccountant, agent_memory, deep_sizeof
+from multi_agent_system.utils.sessions import SessionStore, Turn
+
+
+class _Conversation:
+    def __init__(self, messages):
+        self.messages = messages
+
+
+class _Agent:
+    """Agent stand-in with a Strands-like conversation."""
+    
+    def __init__(self, messages):
+        self.agent = _Conversation(messages)
+        self.system_prompt = "system"
+        self._small_agent = None
+        self.sessions = SessionStore()
+
+
+class TestMemoryAccounting(unittest.TestCase):
+    """Test cases for the memory helpers."""
+    
+    def test_deep_sizeof_counts_contents(self):
+        """Retained size includes nested containers and is counted once."""
+        text = "x" * 10000
+        small = deep_sizeof([{"content": [{"text": "x"}]}])
+        large = deep_sizeof([{"content": [{"text": text}]}])
+        
+        self.assertGreater(large - small, 9000)
+        self.assertLess(deep_sizeof([text, text]) - deep_sizeof([text]), 100)
+    
+    def test_agent_memory(self):
+        """Agent reports include the conversation history."""
+        report = agent_memory(_Agent([{"role": "user", "content": [{"text": "y" * 5000}]}]))
+        
+        self.assertEqual(report["agent"], "_Agent")
+        self.assertEqual(report["messages"], 1)
+        self.assertGreater(report["bytes"], 5000)
+    
+    def test_sessions_are_held_weakly(self):
+        """Closed sessions disappear from the report once collected."""
+        accountant = MemoryAccountant()
+        orchestrator = _Agent([])
+        accountant.track("s1", orchestrator)
+        
+        history = [{"role": "assistant", "content": "z" * 3000}]
+        self.assertGreater(accountant.session_report("s1", history)["bytes"], 3000)
+        self.assertIn("s1", accountant.report()["sessions"])
+        
+        del orchestrator
+        gc.collect()
+        self.assertEqual(accountant.live_sessions, 0)
+    
+    def test_session_turns_are_counted(self):
+        """The orchestrator's remembered answers count towards their own session only."""
+        accountant = MemoryAccountant()
+        orchestrator = _Agent([])
+        accountant.track("s1", orchestrator)
+        accountant.track("s2", orchestrator)
+        empty = accountant.session_report("s1")["bytes"]
+        for number in range(10):
+            orchestrator.sessions.record("s1", Turn(f"q{number}", ["trip_planning"], {"trip_planning": f"{number}" * 50_000}))
+        
+        report = accountant.session_report("s1")
+        
+        self.assertEqual(report["turns"], 10)
+        self.assertGreater(report["bytes"] - empty, 500_000)
+        self.assertEqual(accountant.session_report("s2")["turns"], 0)
+        self.assertGreater(accountant.report()["sessions"]["s1"], 500_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
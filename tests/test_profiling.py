@@ -0,0 +1,123 @@
+"""Unit tests for the profiling hooks."""
+
+import asyncio
+import json
+import os
+import pstats
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.utils.metrics import METRICS
+from multi_agent_system.utils.profiling import Profiler, request_id_for
+
+
+def _work():
+    return sum(i * i for i in range(20000))
+
+
+class TestProfiler(unittest.TestCase):
+    """Test cases for Profiler."""
+    
+    def setUp(self):
+        """Set up a profiler writing to a temporary directory."""
+        self.profiler = Profiler(tempfile.mkdtemp(), interval_ms=1)
+    
+    def test_inactive_is_noop(self):
+        """Requests outside a window are not profiled."""
+        with self.profiler.profile_request("r0"):
+            _work()
+        
+        self.assertEqual(os.listdir(self.profiler.output_dir), [])
+    
+    def test_deterministic_window_covers_n_requests(self):
+        """cProfile output is written per request id and the window closes after N."""
+        self.profiler.enable("deterministic", requests=2)
+        for request_id in ("r1", "r2", "r3"):
+            with self.profiler.profile_request(request_id):
+                _work()
+        
+        self.assertFalse(self.profiler.active)
+        self.assertEqual(sorted(os.listdir(self.profiler.output_dir)), ["r1.pstats", "r2.pstats"])
+        stats = pstats.Stats(os.path.join(self.profiler.output_dir, "r1.pstats"))
+        self.assertTrue(any(name == "_work" for _, _, name in stats.stats))
+    
+    def test_unsafe_request_ids_stay_in_the_output_dir(self):
+        """Client request ids that are not plain names never become file paths."""
+        self.assertEqual(request_id_for({"request_id": "req-1_a"}), "req-1_a")
+        for unsafe in ("../escaped", "a/b", "", "x" * 65, 42):
+            self.assertRegex(request_id_for({"request_id": unsafe}), r"^[0-9a-f]{12}$")
+        self.assertRegex(request_id_for(None), r"^[0-9a-f]{12}$")
+        
+        self.profiler.enable("deterministic", requests=1)
+        with self.profiler.profile_request("../escaped"):
+            _work()
+        
+        parent = os.path.dirname(self.profiler.output_dir)
+        self.assertNotIn("escaped.pstats", os.listdir(parent))
+        self.assertEqual(len(os.listdir(self.profiler.output_dir)), 1)
+    
+    def test_concurrent_requests_profile_one_at_a_time(self):
+        """A request arriving while another is profiled runs unprofiled and is not counted."""
+        METRICS.reset()
+        self.profiler.enable("deterministic", requests=2)
+        
+        async def request(request_id):
+            with self.profiler.profile_request(request_id):
+                await asyncio.sleep(0.01)
+                _work()
+        
+        async def both():
+            await asyncio.gather(request("r1"), request("r2"))
+        
+        asyncio.run(both())
+        
+        self.assertEqual(os.listdir(self.profiler.output_dir), ["r1.pstats"])
+        self.assertEqual(self.profiler.status()["remaining_requests"], 1)
+        self.assertEqual(METRICS.counter("profiling.deterministic.skipped"), 1)
+        with self.profiler.profile_request("r3"):
+            _work()
+        self.assertEqual(sorted(os.listdir(self.profiler.output_dir)), ["r1.pstats", "r3.pstats"])
+    
+    def test_profiler_failure_does_not_fail_the_request(self):
+        """If cProfile cannot be enabled the request still runs."""
+        self.profiler.enable("deterministic", requests=2)
+        with patch("multi_agent_system.utils.profiling.cProfile.Profile") as profile:
+            profile.return_value.enable.side_effect = ValueError("Another profiling tool is already active")
+            with self.profiler.profile_request("r1"):
+                result = _work()
+        
+        self.assertEqual(result, _work())
+        self.assertEqual(os.listdir(self.profiler.output_dir), [])
+        with self.profiler.profile_request("r2"):
+            _work()
+        self.assertEqual(os.listdir(self.profiler.output_dir), ["r2.pstats"])
+    
+    def test_sampling_writes_speedscope(self):
+        """The sampling window writes one speedscope file listing its request ids."""
+        self.profiler.enable("sampling", seconds=60)
+        with self.profiler.profile_request("r1"):
+            time.sleep(0.05)
+        path = self.profiler.disable()
+        
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        self.assertEqual(document["requestIds"], ["r1"])
+        self.assertTrue(document["profiles"])
+        self.assertTrue(document["shared"]["frames"])
+    
+    def test_window_requires_a_limit(self):
+        """Windows need a request count or a duration."""
+        with self.assertRaises(ValueError):
+            self.profiler.enable("sampling")
+        with self.assertRaises(ValueError):
+            self.profiler.enable("tracing", requests=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
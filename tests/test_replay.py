@@ -0,0 +1,60 @@
+"""Unit tests for record/replay of model calls."""
+
+import asyncio
+import tempfile
+import time
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.agents.replay import ReplayStore
+
+
+class TestReplayStore(unittest.TestCase):
+    """Test cases for ReplayStore."""
+    
+    def setUp(self):
+        """Set up a temporary fixture directory."""
+        self.directory = tempfile.mkdtemp()
+        self.recorder = ReplayStore(self.directory, "record")
+    
+    def test_round_trip(self):
+        """Recorded responses replay with their text, usage and scaled latency."""
+        response = LLMResponse(blocks=("回答",), input_tokens=10, output_tokens=20, latency_ms=40, model_id="m")
+        self.recorder.record("ResearchAssistant", "large", "Plan  a trip", response)
+        
+        replayer = ReplayStore(self.directory, "replay", speed=0.5)
+        started = time.perf_counter()
+        replayed = replayer.replay("ResearchAssistant", "large", "plan a trip")
+        
+        self.assertGreaterEqual((time.perf_counter() - started) * 1000, 19)
+        self.assertEqual(replayed.text, "回答")
+        self.assertEqual(replayed.output_tokens, 20)
+        self.assertEqual(replayed.latency_ms, 20)
+        self.assertEqual(len(replayer.drain_intervals()), 1)
+        self.assertEqual(replayer.drain_intervals(), [])
+    
+    def test_miss_is_an_error(self):
+        """Unrecorded calls fail instead of reaching the model."""
+        replayer = ReplayStore(self.directory, "replay", speed=0)
+        
+        self.assertFalse(replayer.replay("ResearchAssistant", "small", "unknown").ok)
+    
+    def test_stream_replay(self):
+        """Streamed fixtures replay chunk by chunk and also answer plain calls."""
+        self.recorder.record_stream("TripPlanningAssistant", "large", "q", [(5.0, "a"), (10.0, "b")])
+        replayer = ReplayStore(self.directory, "replay", speed=0)
+        
+        async def collect():
+            return [chunk async for chunk in replayer.replay_stream("TripPlanningAssistant", "large", "q")]
+        
+        self.assertEqual(asyncio.run(collect()), ["a", "b"])
+        self.assertEqual(replayer.replay("TripPlanningAssistant", "large", "q").text, "ab")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Unit tests for ranked keyword routing."""
+
+import json
+import tempfile
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.orchestrator import OrchestratorAgent
+from multi_agent_system.tools.agent_tools import AVAILABLE_TOOLS
+from multi_agent_system.tools.routing import KeywordRouter, fanout_distribution, fanout_report
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+
+
+class TestKeywordRouter(unittest.TestCase):
+    """Test cases for keyword scores and ranking."""
+    
+    def setUp(self):
+        self.router = KeywordRouter(AVAILABLE_TOOLS, generic_weight=0.25)
+    
+    def test_generic_keywords_score_less(self):
+        """Generic words count less than specific ones; each keyword counts once."""
+        self.assertEqual(
+            self.router.scores("京都の観光情報について教えて"),
+            {"research_assistant": 0.5, "trip_planning": 1.0}
+        )
+        self.assertEqual(self.router.scores("旅行の旅行"), {"trip_planning": 1.0})
+    
+    def test_rank_drops_distant_matches(self):
+        """Only tools close to the best one are kept, best first."""
+        self.assertEqual(self.router.match("京都の観光情報について教えて"), ["research_assistant", "trip_planning"])
+        self.assertEqual(self.router.rank("京都の観光情報について教えて", 2, 0.5), ["trip_planning"])
+        self.assertEqual(
+            self.router.rank("旅行用のおすすめのスーツケースを比較して", 2, 0.5),
+            ["product_recommendation", "trip_planning"]
+        )
+        self.assertEqual(self.router.rank("機械学習について教えて", 2, 0.5), ["research_assistant"])
+        self.assertEqual(self.router.rank("こんにちは", 2, 0.5), [])
+    
+    def test_max_width(self):
+        """The fan-out width is capped; 0 means no limit."""
+        query = "information about travel insurance products"
+        
+        self.assertEqual(self.router.rank(query, 0, 1.0), ["product_recommendation", "trip_planning", "research_assistant"])
+        self.assertEqual(self.router.rank(query, 1, 1.0), ["product_recommendation"])
+    
+    def test_fanout_distribution(self):
+        """Logged queries are replayed without and with ranking, weighted by count."""
+        queries = [("京都の観光情報について教えて", 3), ("機械学習について教えて", 1), ("こんにちは", 2)]
+        
+        self.assertEqual(fanout_distribution(queries, self.router, 2, 0.5), {
+            "before": {0: 2, 1: 1, 2: 3},
+            "after": {0: 2, 1: 4},
+        })
+
+
+class TestOrchestratorFanout(unittest.TestCase):
+    """Test cases for the orchestrator's ranked fan-out."""
+    
+    def setUp(self):
+        METRICS.reset()
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.directory.name, "queries.jsonl")
+        self.config = patch.multiple(
+            Config,
+            SCHEDULER_ENABLED=False,
+            PRECOMPUTED_ANSWERS_PATH=None,
+            QUERY_LOG_PATH=self.log_path,
+            RESPONSE_CACHE_PATH=None,
+            ROUTING_MAX_FANOUT=2,
+            ROUTING_MIN_MARGIN=0.5
+        )
+        self.config.start()
+        self.orchestrator = OrchestratorAgent()
+    
+    def tearDown(self):
+        self.config.stop()
+        self.directory.cleanup()
+    
+    def test_generic_match_is_not_fanned_out(self):
+        """Only the best specialist answers; the fan-out is recorded and logged."""
+        with patch("multi_agent_system.orchestrator.run_tool", return_value=LLMResponse(blocks=("ok",))) as run_tool:
+            result = self.orchestrator.process_query("京都の観光情報について教えて")
+        
+        self.assertEqual([call[0][0] for call in run_tool.call_args_list], ["trip_planning"])
+        self.assertEqual(result["agent_used"], "Trip Planning")
+        self.assertEqual(fanout_report(), {"queries": 1, "mean_width": 1.0, "widths": {1: 1}, "trimmed": 1})
+        with open(self.log_path, encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline())["tools"], ["trip_planning"])
+
+
+if __name__ == '__main__':
+    unittest.main()
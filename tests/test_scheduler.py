@@ -0,0 +1,89 @@
+"""Unit tests for the job scheduler."""
+
+import threading
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.utils.metrics import MetricsRegistry
+from multi_agent_system.utils.scheduler import JobScheduler, SchedulerBusyError
+
+
+class TestJobScheduler(unittest.TestCase):
+    """Test cases for JobScheduler."""
+    
+    def setUp(self):
+        """Set up a single-worker scheduler blocked on a gate job."""
+        self.scheduler = JobScheduler(workers=1, capacities={"interactive": 3, "batch": 8}, metrics=MetricsRegistry())
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.order = []
+        
+        def block():
+            self.started.set()
+            self.gate.wait(5)
+        
+        self.blocker = self.scheduler.submit(block, "background")
+        self.started.wait(5)
+    
+    def tearDown(self):
+        """Release the worker and stop the scheduler."""
+        self.gate.set()
+        self.scheduler.shutdown()
+    
+    def _record(self, label):
+        return lambda: self.order.append(label) or label
+    
+    def test_interactive_runs_before_batch(self):
+        """Higher priority classes are served first."""
+        self.scheduler.submit(self._record("batch"), "batch")
+        last = self.scheduler.submit(self._record("interactive"), "interactive")
+        self.gate.set()
+        last.result(5)
+        self.scheduler.shutdown()
+        
+        self.assertEqual(self.order, ["interactive", "batch"])
+    
+    def test_sessions_share_fairly(self):
+        """A burst from one session does not delay other sessions."""
+        for index in range(3):
+            self.scheduler.submit(self._record(f"a{index}"), "batch", session_id="a")
+        self.scheduler.submit(self._record("b0"), "batch", session_id="b")
+        self.gate.set()
+        self.scheduler.shutdown()
+        
+        self.assertEqual(self.order, ["a0", "b0", "a1", "a2"])
+    
+    def test_full_queue_is_rejected(self):
+        """Submissions beyond the class capacity raise SchedulerBusyError."""
+        for _ in range(3):
+            self.scheduler.submit(lambda: None, "interactive")
+        
+        with self.assertRaises(SchedulerBusyError) as raised:
+            self.scheduler.submit(lambda: None, "interactive")
+        self.assertEqual(raised.exception.priority, "interactive")
+        
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["interactive"]["depth"], 3)
+        self.assertEqual(stats["interactive"]["rejected"], 1)
+        # Other classes are unaffected
+        self.scheduler.submit(lambda: None, "batch")
+    
+    def test_exceptions_propagate(self):
+        """Job exceptions are raised from the future."""
+        def fail():
+            raise ValueError("boom")
+        
+        future = self.scheduler.submit(fail)
+        self.gate.set()
+        
+        with self.assertRaises(ValueError):
+            future.result(5)
+        self.assertGreater(self.scheduler.stats()["interactive"]["max_wait_ms"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
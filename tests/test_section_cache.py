@@ -0,0 +1,139 @@
+"""Unit tests for section reuse across queries."""
+
+import os
+import tempfile
+import unittest
+import sys
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.agents.sections import section_cache_report, section_keys, split_sections, stitch
+from multi_agent_system.agents.trip_planning_assistant import TripPlanningAssistant
+from multi_agent_system.knowledge.destinations import build_store
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.response_cache import ResponseCache
+from multi_agent_system.utils.section_cache import SectionCache
+
+SECTIONS = TripPlanningAssistant.REQUIRED_SECTIONS
+BODIES = {
+    "旅行概要": "京都を巡る旅です。",
+    "日程案": "1. 午前: 清水寺\n2. 午後: 祇園\n3. 夕方: 先斗町",
+    "宿泊施設の推薦": "- 東山エリアの旅館：落ち着いた雰囲気で観光地に近い。" * 4,
+    "交通手段と移動方法": "- 京都駅から市バスと地下鉄を使い分ける。一日乗車券が便利。" * 4,
+    "観光スポット": "- 清水寺、伏見稲荷大社、嵐山の竹林。" * 4,
+    "予算の目安": "- 合計約10万円",
+    "注意事項": "- 寺社の拝観時間に注意。歩きやすい靴を持参。" * 4,
+}
+
+
+def answer(titles, closing="以上、素敵な旅を！"):
+    """Render an outline answer containing the given sections."""
+    parts = [f"## {SECTIONS.index(title) + 1}. {title}\n{BODIES[title]}" for title in titles]
+    return "京都旅行のプランです。\n\n" + "\n\n".join(parts) + f"\n\n---\n{closing}"
+
+
+class TestSections(unittest.TestCase):
+    """Test cases for splitting, stitching and keying sections."""
+    
+    def test_split_sections(self):
+        """Numbered list items are not headers; closing remarks are dropped."""
+        bodies = split_sections(answer(SECTIONS), SECTIONS)
+        
+        self.assertEqual(bodies, BODIES)
+    
+    def test_stitch_in_outline_order(self):
+        """Cached bodies are inserted with headers in the generated style."""
+        partial = answer([title for title in SECTIONS if title not in ("宿泊施設の推薦", "注意事項")])
+        
+        text = stitch(partial, SECTIONS, {"宿泊施設の推薦": "CACHED-STAY", "注意事項": "CACHED-NOTES"})
+        
+        self.assertLess(text.index("## 2. 日程案"), text.index("## 3. 宿泊施設の推薦\n\nCACHED-STAY"))
+        self.assertLess(text.index("CACHED-STAY"), text.index("## 4. 交通手段と移動方法"))
+        self.assertTrue(text.startswith("京都旅行のプランです。"))
+        self.assertIn("## 7. 注意事項\n\nCACHED-NOTES", text)
+        self.assertTrue(text.endswith("---\n以上、素敵な旅を！"))
+    
+    def test_section_keys(self):
+        """Sections need their first entity; values are normalized."""
+        cacheable = TripPlanningAssistant.CACHEABLE_SECTIONS
+        
+        keys = section_keys(cacheable, {"destination": "Kyoto", "interests": ["history", "food"], "season": None})
+        
+        self.assertEqual(keys["観光スポット"], (("destination", "kyoto"), ("interests", ("food", "history")), ("season", None)))
+        self.assertEqual(section_keys(cacheable, {"destination": "not specified"}), {})
+
+
+class TestSectionReuse(unittest.TestCase):
+    """Test cases for reusing cached sections in specialist answers."""
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite3")
+        self.store_path = os.path.join(self.directory.name, "destinations.kb")
+        build_store([{"name": "京都", "aliases": ["kyoto"]}], self.store_path)
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def test_tables_are_separate(self):
+        """The section cache can share the response cache's file."""
+        responses = ResponseCache(self.path)
+        sections = SectionCache(self.path)
+        responses.set("key", {"text": "response"})
+        
+        self.assertIsNone(sections.get("key"))
+        self.assertEqual(responses.get("key"), {"text": "response"})
+    
+    def test_second_query_reuses_sections(self):
+        """A different query for the same destination only generates the personalized sections."""
+        agent = TripPlanningAssistant(cascade=False)
+        prompts = []
+        outputs = [
+            LLMResponse(blocks=(answer(SECTIONS),), output_tokens=700),
+            LLMResponse(blocks=(answer(["旅行概要", "日程案", "観光スポット", "予算の目安"]),), output_tokens=300),
+        ]
+        
+        def generate(prompt, sections=None):
+            prompts.append((prompt, sections))
+            return outputs[len(prompts) - 1]
+        
+        with patch.object(Config, "SECTION_CACHE_PATH", self.path), patch.object(Config, "DESTINATION_KB_PATH", self.store_path), \
+                patch.object(agent, "_generate", side_effect=generate):
+            first = agent.respond("京都に5日間の旅行")
+            second = agent.respond("子連れでKyotoへ行く旅行")
+        
+        # Sights depend on interests, so only stays, transport and notes are shared
+        self.assertNotIn("別途用意済み", prompts[0][0])
+        self.assertIn("3. 宿泊施設の推薦、4. 交通手段と移動方法、7. 注意事項", prompts[1][0])
+        self.assertEqual(prompts[1][1], ("旅行概要", "日程案", "観光スポット", "予算の目安"))
+        self.assertEqual(split_sections(second.text, SECTIONS), split_sections(first.text, SECTIONS))
+        self.assertEqual(second.output_tokens, 300)
+        report = section_cache_report()["TripPlanningAssistant"]
+        self.assertGreaterEqual(report["hits"], 3)
+        self.assertGreater(report["tokens_saved"], 0)
+    
+    def test_guessed_destinations_are_not_cached(self):
+        """Destinations missing from the knowledge base never share sections."""
+        agent = TripPlanningAssistant(cascade=False)
+        prompts = []
+        
+        def generate(prompt, sections=None):
+            prompts.append(prompt)
+            return LLMResponse(blocks=(answer(SECTIONS),), output_tokens=700)
+        
+        with patch.object(Config, "SECTION_CACHE_PATH", self.path), patch.object(Config, "DESTINATION_KB_PATH", self.store_path), \
+                patch.object(agent, "_generate", side_effect=generate):
+            agent.respond("家族旅行で沖縄に行きたい")
+            agent.respond("家族旅行でハワイに行きたい")
+            self.assertEqual(section_keys(agent.CACHEABLE_SECTIONS, agent.section_entities("家族旅行で沖縄に行きたい")), {})
+            # A destination given by the caller is trusted
+            self.assertIn("交通手段と移動方法", section_keys(agent.CACHEABLE_SECTIONS, agent.section_entities("旅行したい", {"destination": "沖縄"})))
+        
+        self.assertNotIn("別途用意済み", prompts[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
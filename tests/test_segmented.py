@@ -0,0 +1,98 @@
+"""Unit tests for segmented trip generation."""
+
+import json
+import threading
+import time
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.cascade import find_missing_sections
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.agents.segmented import parse_outline, requested_days
+from multi_agent_system.agents.trip_planning_assistant import TripPlanningAssistant
+
+
+class _FakeTripAssistant(TripPlanningAssistant):
+    """Trip assistant whose segment calls return canned text after a delay."""
+    
+    def __init__(self, outline: str, delay: float = 0.0):
+        super().__init__()
+        self.outline = outline
+        self.delay = delay
+        self.prompts = []
+        self._prompts_lock = threading.Lock()
+    
+    def _segment_call(self, prompt, small=False):
+        with self._prompts_lock:
+            self.prompts.append((prompt, small))
+        if small:
+            return LLMResponse(blocks=(self.outline,), output_tokens=10)
+        time.sleep(self.delay)
+        label = prompt.split("この旅程の")[-1].split("（")[0] if "この旅程の" in prompt else prompt.split("「")[-1].split("」")[0]
+        return LLMResponse(blocks=(f"{label}の内容",), output_tokens=5, latency_ms=self.delay * 1000)
+
+
+class TestSegmentedHelpers(unittest.TestCase):
+    """Test cases for the segmented generation helpers."""
+    
+    def test_requested_days(self):
+        """Days, English days and nights are recognized."""
+        self.assertEqual(requested_days("東京への5日間の旅行を計画して"), 5)
+        self.assertEqual(requested_days("Plan a vacation to Japan for 10 days"), 10)
+        self.assertEqual(requested_days("京都に3泊したい"), 4)
+        self.assertIsNone(requested_days("京都旅行を計画して"))
+    
+    def test_dates_are_not_durations(self):
+        """Calendar dates and day ordinals are not trip lengths."""
+        self.assertEqual(requested_days("5月10日から京都に3泊"), 4)
+        self.assertEqual(requested_days("5/10日出発で4日間の旅行"), 4)
+        self.assertIsNone(requested_days("5月10日に京都へ行きます"))
+        self.assertIsNone(requested_days("2日目の予定を教えて"))
+    
+    def test_parse_outline(self):
+        """The JSON object is extracted from surrounding text and trimmed to the trip length."""
+        text = '骨子です:\n{"overview": "概要", "days": [{"title": "a"}, {"title": "b"}, "c"]}\n以上'
+        
+        outline = parse_outline(text, 3)
+        
+        self.assertEqual(outline["days"][2], {"title": "c"})
+        self.assertEqual(len(parse_outline(text, 2)["days"]), 2)
+        self.assertIsNone(parse_outline(text, 4))
+        self.assertIsNone(parse_outline("JSONではありません", 1))
+
+
+class TestSegmentedTripPlanning(unittest.TestCase):
+    """Test cases for TripPlanningAssistant.respond_segmented."""
+    
+    def test_stitched_in_order_and_parallel(self):
+        """Days and sections run concurrently and come back in outline order."""
+        outline = json.dumps({"overview": "東京の5日間", "days": [{"area": "東京", "title": f"テーマ{i}"} for i in range(1, 6)]}, ensure_ascii=False)
+        agent = _FakeTripAssistant(outline, delay=0.1)
+        
+        started = time.perf_counter()
+        response = agent.respond_segmented("東京への5日間の旅行を計画して", 5)
+        elapsed = time.perf_counter() - started
+        
+        # 10 segments of 0.1s each
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(response.finish_reason, "segmented")
+        self.assertEqual(response.output_tokens, 10 + 10 * 5)
+        text = response.text
+        self.assertLess(text.index("1日目の内容"), text.index("5日目の内容"))
+        self.assertLess(text.index("5日目の内容"), text.index("### 3. 宿泊施設の推薦"))
+        self.assertEqual(find_missing_sections(text, TripPlanningAssistant.REQUIRED_SECTIONS), [])
+    
+    def test_unparseable_outline_falls_back(self):
+        """Without a usable outline no segment calls are made."""
+        agent = _FakeTripAssistant("骨子を作成できませんでした")
+        
+        self.assertIsNone(agent.respond_segmented("東京への5日間の旅行を計画して", 5))
+        self.assertEqual(len(agent.prompts), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""Unit tests for the ASGI API server."""
+
+import asyncio
+import json
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.orchestrator import OrchestratorAgent
+from multi_agent_system.server import OrchestratorServer
+from multi_agent_system.utils.config import Config
+
+
+class _FakeOrchestrator:
+    """Orchestrator stand-in that answers without calling a model."""
+    
+    async def process_query_async(self, query, context=None):
+        await asyncio.sleep(0.01)
+        return {"response": f"answer: {query}", "agent_used": "Orchestrator"}
+    
+    async def stream_query_async(self, query, context=None):
+        yield {"event": "route", "tools": []}
+        yield {"event": "done", "response": f"answer: {query}", "agent_used": "Orchestrator"}
+
+
+def _request(app, method, path, body=None, headers=None):
+    """Send one HTTP request through the ASGI app and collect the response."""
+    messages = [{"type": "http.request", "body": json.dumps(body).encode() if body is not None else b"", "more_body": False}]
+    sent = []
+    
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+    
+    async def send(message):
+        sent.append(message)
+    
+    asyncio.run(app({"type": "http", "method": method, "path": path, "headers": headers or []}, receive, send))
+    body = b"".join(message.get("body", b"") for message in sent[1:]).decode("utf-8")
+    return sent[0]["status"], body
+
+
+class _ToolCallingAgent:
+    """Strands agent stand-in that calls the trip planner, then streams its answer."""
+    
+    def __init__(self, toolset):
+        self.toolset = toolset
+    
+    async def stream_async(self, query):
+        yield {"current_tool_use": {"toolUseId": "t1", "name": "trip_planning", "input": ""}}
+        await asyncio.to_thread(self.toolset.call, "trip_planning", query)
+        yield {"data": "京都の旅程です。"}
+
+
+class TestOrchestratorServer(unittest.TestCase):
+    """Test cases for OrchestratorServer."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.app = OrchestratorServer(orchestrator=_FakeOrchestrator(), drain_timeout=1)
+    
+    def test_healthz(self):
+        """Liveness probe always answers."""
+        status, body = _request(self.app, "GET", "/healthz")
+        
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {"status": "ok"})
+    
+    def test_query(self):
+        """JSON queries are answered by the orchestrator."""
+        status, body = _request(self.app, "POST", "/v1/query", {"query": "hello"})
+        
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["response"], "answer: hello")
+    
+    def test_invalid_query(self):
+        """Missing queries are rejected with 400."""
+        status, _ = _request(self.app, "POST", "/v1/query", {"context": {}})
+        
+        self.assertEqual(status, 400)
+    
+    def test_batch(self):
+        """Batches return one result per query in order."""
+        status, body = _request(self.app, "POST", "/v1/batch", {"queries": ["a", {"query": "b"}]})
+        
+        self.assertEqual(status, 200)
+        self.assertEqual([r["response"] for r in json.loads(body)["results"]], ["answer: a", "answer: b"])
+    
+    def test_stream(self):
+        """Streams are sent as Server-Sent Events."""
+        status, body = _request(self.app, "POST", "/v1/stream", {"query": "hello"})
+        
+        self.assertEqual(status, 200)
+        self.assertIn("event: route", body)
+        self.assertIn("event: done", body)
+    
+    def test_stream_tool_calling(self):
+        """Tool-calling streams reach the client as JSON, including the final answer."""
+        config = patch.multiple(
+            Config,
+            ROUTING_MODE="llm",
+            SCHEDULER_ENABLED=False,
+            PRECOMPUTED_ANSWERS_PATH=None,
+            QUERY_LOG_PATH=None,
+            RESPONSE_CACHE_PATH=None
+        )
+        with config, patch.object(OrchestratorAgent, "_tool_calling_agent", lambda orchestrator, toolset: _ToolCallingAgent(toolset)), \
+                patch("multi_agent_system.orchestrator.run_tool", return_value=LLMResponse(blocks=("旅程",))):
+            app = OrchestratorServer(orchestrator=OrchestratorAgent(), drain_timeout=1)
+            status, body = _request(app, "POST", "/v1/stream", {"query": "京都に行きたい"})
+        
+        self.assertEqual(status, 200)
+        events = [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+        self.assertEqual([event["event"] for event in events], ["route", "tool_call", "delta", "done"])
+        self.assertEqual(events[-1]["response"], "京都の旅程です。")
+        self.assertEqual(events[-1]["agent_used"], "Trip Planning")
+    
+    def test_draining_rejects_requests(self):
+        """Requests are refused once shutdown has started."""
+        asyncio.run(self.app.shutdown())
+        status, _ = _request(self.app, "POST", "/v1/query", {"query": "hello"})
+        
+        self.assertEqual(status, 503)
+        self.assertFalse(self.app.ready)
+    
+    def test_admin_profile_requires_token(self):
+        """Admin routes are hidden without ADMIN_TOKEN and check the token header."""
+        original = Config.ADMIN_TOKEN
+        try:
+            Config.ADMIN_TOKEN = ""
+            self.assertEqual(_request(self.app, "GET", "/admin/profile")[0], 404)
+            
+            Config.ADMIN_TOKEN = "secret"
+            self.assertEqual(_request(self.app, "GET", "/admin/profile", headers=[(b"x-admin-token", b"wrong")])[0], 403)
+            status, body = _request(self.app, "GET", "/admin/profile", headers=[(b"x-admin-token", b"secret")])
+            self.assertEqual(status, 200)
+            self.assertIn("mode", json.loads(body))
+        finally:
+            Config.ADMIN_TOKEN = original
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,118 @@
+"""Unit tests for sticky session routing of follow-ups."""
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.agents.trip_planning_assistant import TripPlanningAssistant
+from multi_agent_system.orchestrator import OrchestratorAgent
+from multi_agent_system.tools.routing import routing_report
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+from multi_agent_system.utils.sessions import SessionStore, Turn
+
+PLAN = "## 1. 旅行概要\n京都を3日間で巡る旅です。"
+
+
+class TestAffinity(unittest.TestCase):
+    """Test cases for session routing affinity."""
+    
+    def test_decay(self):
+        """Older turns pull less; the most recent tool comes first."""
+        store = SessionStore()
+        store.record("s", Turn("q1", ["trip_planning"], {}))
+        store.record("s", Turn("q2", ["research_assistant"], {}))
+        
+        self.assertEqual(store.affinity("s", 0.5), {"research_assistant": 1.0, "trip_planning": 0.5})
+        self.assertEqual(store.affinity("other", 0.5), {})
+
+
+class TestConversation(unittest.TestCase):
+    """Test cases for restoring a session's conversation on a pooled specialist."""
+    
+    def test_respond_followup(self):
+        """Earlier exchanges become the conversation; the query is sent as is."""
+        agent = TripPlanningAssistant()
+        agent.agent = MagicMock(messages=[])
+        
+        with patch.object(agent, "invoke_llm", return_value=LLMResponse(blocks=("ok",))) as invoke:
+            agent.respond_followup("what about hotels?", [("京都に3日間", PLAN)])
+        
+        invoke.assert_called_once_with("what about hotels?")
+        self.assertEqual(agent.agent.messages, [
+            {"role": "user", "content": [{"text": "京都に3日間"}]},
+            {"role": "assistant", "content": [{"text": PLAN}]},
+        ])
+
+
+class TestStickyRouting(unittest.TestCase):
+    """Test cases for the orchestrator's sticky routing."""
+    
+    def setUp(self):
+        METRICS.reset()
+        self.config = patch.multiple(
+            Config,
+            SCHEDULER_ENABLED=False,
+            PRECOMPUTED_ANSWERS_PATH=None,
+            QUERY_LOG_PATH=None,
+            RESPONSE_CACHE_PATH=None
+        )
+        self.config.start()
+        self.orchestrator = OrchestratorAgent()
+        self.context = {"session_id": "s1"}
+    
+    def tearDown(self):
+        self.config.stop()
+    
+    def _ask(self, query, text):
+        with patch("multi_agent_system.orchestrator.run_tool", return_value=LLMResponse(blocks=(text,))):
+            return self.orchestrator.process_query(query, self.context)
+    
+    def test_followup_goes_to_session_specialist(self):
+        """A follow-up without keywords continues with the specialist, with the conversation."""
+        self._ask("京都に3日間の旅行を計画して", PLAN)
+        
+        with patch("multi_agent_system.orchestrator.run_followup", return_value=LLMResponse(blocks=("祇園周辺の旅館がおすすめです。",))) as run_followup:
+            result = self.orchestrator.process_query("what about hotels?", self.context)
+        
+        self.assertTrue(result["sticky"])
+        self.assertEqual(result["agent_used"], "Trip Planning")
+        self.assertEqual(run_followup.call_args[0][:3], ("trip_planning", "what about hotels?", [("京都に3日間の旅行を計画して", PLAN)]))
+        self.assertIn("祇園周辺の旅館", result["response"])
+        self.assertEqual(self.orchestrator.sessions.last_turn("s1").query, "what about hotels?")
+    
+    def test_conversational_queries_stay_direct(self):
+        """Thanks and greetings are answered by the orchestrator."""
+        self._ask("京都に3日間の旅行を計画して", PLAN)
+        
+        with patch("multi_agent_system.orchestrator.run_followup") as run_followup:
+            result = self.orchestrator.process_query("ありがとう", self.context)
+            other_session = self.orchestrator.process_query("what about hotels?", {"session_id": "s2"})
+        
+        run_followup.assert_not_called()
+        self.assertNotIn("sticky", result)
+        self.assertNotIn("sticky", other_session)
+        self.assertEqual(routing_report(), {"sticky": 0, "direct": 2, "sticky_rate": 0.0})
+    
+    def test_most_recent_specialist_wins(self):
+        """The specialist with the highest decayed affinity is picked, if above the threshold."""
+        self._ask("京都に3日間の旅行を計画して", PLAN)
+        self._ask("機械学習について教えて", "## 1. 概要\n機械学習とは")
+        
+        with patch("multi_agent_system.orchestrator.run_followup", return_value=LLMResponse(blocks=("ok",))) as run_followup:
+            self.orchestrator.process_query("具体例を見せて", self.context)
+            with patch.object(Config, "STICKY_MIN_AFFINITY", 2.0):
+                result = self.orchestrator.process_query("具体例を見せて", self.context)
+        
+        self.assertEqual(run_followup.call_count, 1)
+        self.assertEqual(run_followup.call_args[0][0], "research_assistant")
+        self.assertNotIn("sticky", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
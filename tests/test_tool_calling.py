@@ -0,0 +1,164 @@
+"""Unit tests for orchestrator-driven tool calling."""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.agents.llm_response import LLMResponse
+from multi_agent_system.orchestrator import OrchestratorAgent
+from multi_agent_system.tools.agent_tools import AVAILABLE_TOOLS
+from multi_agent_system.tools.tool_calling import SpecialistToolset, tool_calling_report
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+from multi_agent_system.utils.scheduler import SchedulerBusyError
+
+SYNTHESIS = "京都旅行とスーツケースについての統合された回答です。"
+
+
+class FakeAgent:
+    """Calls the given tools in one turn, concurrently like Strands, then answers."""
+    
+    def __init__(self, toolset, calls):
+        self.toolset = toolset
+        self.calls = calls
+    
+    def _call_tools(self):
+        threads = [threading.Thread(target=self.toolset.call, args=call) for call in self.calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    def __call__(self, query):
+        self._call_tools()
+        return SYNTHESIS
+    
+    async def stream_async(self, query):
+        yield {"data": "確認します。"}
+        for number, (tool_name, _) in enumerate(self.calls):
+            yield {"current_tool_use": {"toolUseId": f"t{number}", "name": tool_name, "input": ""}}
+            yield {"current_tool_use": {"toolUseId": f"t{number}", "name": tool_name, "input": "{}"}}
+        await asyncio.to_thread(self._call_tools)
+        for i in range(0, len(SYNTHESIS), 8):
+            yield {"data": SYNTHESIS[i:i + 8]}
+
+
+def slow_tool(tool_name, query, context=None, tier=None, cascade=None):
+    """A specialist that takes a while to answer."""
+    time.sleep(0.05)
+    return LLMResponse(blocks=(f"{tool_name}: {query}",))
+
+
+class TestSpecialistToolset(unittest.TestCase):
+    """Test cases for the per-query specialist tools."""
+    
+    def test_tools_and_responses(self):
+        """Every specialist is a tool; repeated calls to one specialist are merged."""
+        toolset = SpecialistToolset(lambda tool_name, query: LLMResponse(blocks=(query,), output_tokens=10), AVAILABLE_TOOLS)
+        
+        self.assertEqual(len(toolset.tools), len(AVAILABLE_TOOLS))
+        toolset.call("research_assistant", "京都の歴史")
+        toolset.call("research_assistant", "京都の文化")
+        
+        self.assertEqual(toolset.responses["research_assistant"].text, "京都の歴史\n京都の文化")
+        self.assertEqual(toolset.responses["research_assistant"].output_tokens, 20)
+        self.assertEqual(toolset.calls, ["research_assistant", "research_assistant"])
+    
+    def test_busy_is_remembered(self):
+        """A full scheduler queue is kept for the orchestrator; the model sees an error."""
+        def busy(tool_name, query):
+            raise SchedulerBusyError("interactive", 64)
+        
+        toolset = SpecialistToolset(busy, AVAILABLE_TOOLS)
+        response = toolset.call("trip_planning", "京都")
+        
+        self.assertFalse(response.ok)
+        self.assertIsInstance(toolset.error, SchedulerBusyError)
+
+
+class TestOrchestratorToolCalling(unittest.TestCase):
+    """Test cases for the orchestrator's tool-calling mode."""
+    
+    def setUp(self):
+        METRICS.reset()
+        self.config = patch.multiple(
+            Config,
+            ROUTING_MODE="llm",
+            SCHEDULER_ENABLED=False,
+            PRECOMPUTED_ANSWERS_PATH=None,
+            QUERY_LOG_PATH=None,
+            RESPONSE_CACHE_PATH=None
+        )
+        self.config.start()
+        self.orchestrator = OrchestratorAgent()
+        self.context = {"session_id": "s1"}
+    
+    def tearDown(self):
+        self.config.stop()
+    
+    def _agent(self, *calls):
+        return patch.object(OrchestratorAgent, "_tool_calling_agent", lambda orchestrator, toolset: FakeAgent(toolset, calls))
+    
+    def test_model_calls_specialists_in_parallel(self):
+        """The tools the model calls run concurrently; its synthesis is the answer."""
+        calls = (("trip_planning", "京都3日間の旅行"), ("product_recommendation", "旅行用スーツケース"))
+        with self._agent(*calls), patch("multi_agent_system.orchestrator.run_tool", side_effect=slow_tool) as run_tool:
+            started = time.perf_counter()
+            result = self.orchestrator.process_query("京都旅行の計画と、持っていくスーツケースのおすすめを教えて", self.context)
+            elapsed = time.perf_counter() - started
+        
+        self.assertEqual(run_tool.call_count, 2)
+        self.assertLess(elapsed, 0.1)
+        self.assertTrue(result["tool_calling"])
+        self.assertEqual(result["response"], SYNTHESIS)
+        self.assertEqual(result["agent_used"], "Multiple Agents")
+        self.assertEqual(set(result["llm_responses"]), {"trip_planning", "product_recommendation"})
+        self.assertEqual(self.orchestrator.sessions.last_turn("s1").texts["trip_planning"], "trip_planning: 京都3日間の旅行")
+        report = tool_calling_report()
+        self.assertEqual((report["queries"], report["calls_per_query"], report["parallel"]), (1, 2.0, 1))
+    
+    def test_model_answers_directly(self):
+        """Without tool calls the model's answer is returned by the orchestrator."""
+        with self._agent(), patch("multi_agent_system.orchestrator.run_tool") as run_tool:
+            result = self.orchestrator.process_query("こんにちは")
+        
+        run_tool.assert_not_called()
+        self.assertEqual(result["agent_used"], "Orchestrator")
+        self.assertEqual(tool_calling_report()["direct"], 1)
+    
+    def test_keyword_path_without_backend(self):
+        """Without a configured backend the keyword router is used."""
+        with patch.object(self.orchestrator, "model", None), \
+                patch("multi_agent_system.orchestrator.run_tool", return_value=LLMResponse(blocks=("ok",))) as run_tool:
+            result = self.orchestrator.process_query("京都に3日間の旅行を計画して")
+        
+        self.assertEqual(run_tool.call_args[0][0], "trip_planning")
+        self.assertNotIn("tool_calling", result)
+    
+    def test_stream(self):
+        """Tool calls are announced and the synthesis is streamed."""
+        calls = (("trip_planning", "京都3日間の旅行"), ("product_recommendation", "旅行用スーツケース"))
+        
+        async def collect():
+            return [event async for event in self.orchestrator.stream_query_async("京都旅行とスーツケース", self.context)]
+        
+        with self._agent(*calls), patch("multi_agent_system.orchestrator.run_tool", side_effect=slow_tool):
+            events = asyncio.run(collect())
+        
+        self.assertEqual(events[0], {"event": "route", "tools": [], "tool_calling": True})
+        self.assertEqual([event["tool"] for event in events if event["event"] == "tool_call"], ["trip_planning", "product_recommendation"])
+        streamed = "".join(event["text"] for event in events if event["event"] == "delta")
+        self.assertEqual(streamed, "確認します。" + SYNTHESIS)
+        self.assertEqual(events[-1]["response"], SYNTHESIS)
+        self.assertEqual(events[-1]["agent_used"], "Multiple Agents")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""Unit tests for the agent pool and the background warm-up."""
+
+import threading
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.tools.agent_pool import AgentPool
+from multi_agent_system.tools.agent_tools import _agent_options
+from multi_agent_system.utils.config import Config
+from multi_agent_system.utils.metrics import METRICS
+from multi_agent_system.warmup import WarmupManager
+
+
+class FakeSpecialist:
+    """Specialist stand-in that counts constructions and resets."""
+    
+    created = 0
+    
+    def __init__(self, **options):
+        FakeSpecialist.created += 1
+        self.options = options
+        self.messages = []
+    
+    def reset_conversation(self):
+        self.messages = []
+
+
+class TestAgentPool(unittest.TestCase):
+    """Test cases for AgentPool."""
+    
+    def setUp(self):
+        METRICS.reset()
+        FakeSpecialist.created = 0
+        self.pool = AgentPool(max_idle=2)
+    
+    def test_acquire_reuses_released_agents(self):
+        """A returned agent is reset and handed to the next caller."""
+        with self.pool.acquire(FakeSpecialist, tier="small") as first:
+            first.messages.append("こんにちは")
+        with self.pool.acquire(FakeSpecialist, tier="small") as second:
+            self.assertIs(second, first)
+            self.assertEqual(second.messages, [])
+        
+        self.assertEqual(self.pool.stats(), {"hits": 1, "misses": 1, "idle": 1})
+    
+    def test_concurrent_callers_get_separate_agents(self):
+        """An agent is reserved for one caller; options select separate agents."""
+        with self.pool.acquire(FakeSpecialist) as first, self.pool.acquire(FakeSpecialist) as second:
+            self.assertIsNot(first, second)
+        with self.pool.acquire(FakeSpecialist, tier="small") as small:
+            self.assertNotIn(small, (first, second))
+        
+        self.assertEqual(FakeSpecialist.created, 3)
+        self.assertEqual(self.pool.stats()["idle"], 3)
+    
+    def test_idle_agents_are_capped(self):
+        """At most max_idle agents per key are kept."""
+        def borrow(barrier):
+            with self.pool.acquire(FakeSpecialist):
+                barrier.wait(5)
+        
+        barrier = threading.Barrier(3)
+        threads = [threading.Thread(target=borrow, args=(barrier,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(FakeSpecialist.created, 3)
+        self.assertEqual(len(self.pool.idle_agents()), 2)
+    
+    def test_template_is_not_lent_out(self):
+        """Template agents are shared for rendering and never handed out by acquire."""
+        template = self.pool.template(FakeSpecialist, tier="small")
+        
+        self.assertIs(self.pool.template(FakeSpecialist, tier="small"), template)
+        with self.pool.acquire(FakeSpecialist, tier="small") as agent:
+            self.assertIsNot(agent, template)
+        self.assertNotIn(template, self.pool.idle_agents())
+    
+    def test_prewarm(self):
+        """Prewarming tops up the idle agents to the requested count."""
+        self.assertEqual(self.pool.prewarm(FakeSpecialist, 1, cascade=False), 1)
+        self.assertEqual(self.pool.prewarm(FakeSpecialist, 1, cascade=False), 0)
+        self.assertEqual(self.pool.prewarm(FakeSpecialist, 5, cascade=False), 1)
+        with self.pool.acquire(FakeSpecialist, cascade=False):
+            pass
+        
+        self.assertEqual(FakeSpecialist.created, 2)
+        self.assertEqual(self.pool.stats(), {"hits": 1, "misses": 0, "idle": 2})
+
+
+class TestWarmupManager(unittest.TestCase):
+    """Test cases for WarmupManager."""
+    
+    def setUp(self):
+        FakeSpecialist.created = 0
+        self.pool = AgentPool(max_idle=2)
+        self.config = patch.multiple(Config, CASCADE_ENABLED=False, QUERY_CLASS_TIERS={"simple": "small", "complex": "large"})
+        self.config.start()
+        self.patches = [
+            patch("multi_agent_system.tools.agent_tools.agent_pool", self.pool),
+            patch("multi_agent_system.tools.agent_tools.AVAILABLE_TOOLS", {"fake": {"agent_class": FakeSpecialist}}),
+            patch.object(WarmupManager, "_step_imports", return_value=["strands"]),
+            patch.object(WarmupManager, "_step_router", return_value=[]),
+            patch.object(WarmupManager, "_step_catalog", return_value=None),
+            patch.object(WarmupManager, "_step_dns", return_value=["api.openai.com:443"]),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+    
+    def tearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        self.config.stop()
+    
+    def test_ready_after_all_steps(self):
+        """Every step runs in the background; agents and templates are prewarmed per pool option."""
+        manager = WarmupManager(prime=False).start()
+        
+        self.assertTrue(manager.wait(5))
+        status = manager.status()
+        self.assertEqual(status["state"], "ready")
+        self.assertTrue(status["ready"])
+        self.assertEqual(status["steps"]["agents"]["detail"], 3)
+        self.assertEqual(status["steps"]["prime"], {"status": "skipped"})
+        self.assertEqual(self.pool.stats()["idle"], 3)
+        self.assertEqual(FakeSpecialist.created, 6)
+    
+    def test_request_paths_use_prewarmed_agents(self):
+        """Every request path acquires with the options the warm-up prebuilt."""
+        WarmupManager(prime=False).start().wait(5)
+        created = FakeSpecialist.created
+        for tier in (None, "small", "large"):
+            with self.pool.acquire(FakeSpecialist, **_agent_options(tier)):
+                pass
+        
+        self.assertEqual(FakeSpecialist.created, created)
+    
+    def test_failing_step_degrades(self):
+        """A failing step is recorded, the other steps still run and the state is degraded."""
+        with patch.object(WarmupManager, "_step_dns", side_effect=OSError("name resolution failed")):
+            manager = WarmupManager(prime=False).start()
+            self.assertTrue(manager.wait(5))
+        
+        status = manager.status()
+        self.assertEqual(status["state"], "degraded")
+        self.assertTrue(manager.ready)
+        self.assertEqual(status["steps"]["dns"]["status"], "failed")
+        self.assertEqual(status["steps"]["dns"]["error"], "name resolution failed")
+        self.assertEqual(status["steps"]["agents"]["status"], "done")
+        self.assertEqual(FakeSpecialist.created, 6)
+    
+    def test_start_is_idempotent(self):
+        """Starting twice runs the warm-up once."""
+        manager = WarmupManager(prime=False)
+        manager.start().start()
+        manager.wait(5)
+        
+        self.assertEqual(FakeSpecialist.created, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
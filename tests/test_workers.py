@@ -0,0 +1,97 @@
+"""Unit tests for the multi-process worker pool and the shared response cache."""
+
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from multi_agent_system.utils.metrics import METRICS
+from multi_agent_system.utils.response_cache import ResponseCache
+from multi_agent_system.workers import WorkerPool
+
+
+def fake_initializer():
+    """Replace the specialist LLM call in the worker with a numbered fake answer."""
+    from multi_agent_system.agents.llm_response import LLMResponse
+    from multi_agent_system.tools import agent_tools
+    calls = []
+    
+    def invoke(tool_name, options, prompt, query, context):
+        calls.append(query)
+        return LLMResponse(blocks=(f"{tool_name} call {len(calls)} in {os.getpid()}",))
+    
+    agent_tools._invoke = invoke
+
+
+class TestWorkerPool(unittest.TestCase):
+    """Test cases for WorkerPool."""
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.directory.name, "responses.db")
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def test_round_trip(self):
+        """Queries are answered by the worker; its responses go to the shared cache."""
+        with WorkerPool(processes=1, cache_path=self.cache_path, initializer=fake_initializer) as pool:
+            self.assertTrue(pool.wait_ready(60))
+            first = pool.process_query("機械学習について教えて")
+            second = asyncio.run(pool.process_query_async("機械学習について教えて"))
+            pid = pool.pids[0]
+        
+        self.assertNotEqual(pid, os.getpid())
+        self.assertEqual(first["agent_used"], "Research Assistant")
+        self.assertIn(f"research_assistant call 1 in {pid}", first["response"])
+        # The repeated query is served from the cache, not a second call
+        self.assertEqual(second["response"], first["response"])
+        with sqlite3.connect(self.cache_path) as connection:
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0], 1)
+    
+    def test_closed_pool_rejects_queries(self):
+        """Submitting after close raises."""
+        pool = WorkerPool(processes=1, cache_path=self.cache_path, initializer=fake_initializer)
+        pool.close(30)
+        
+        with self.assertRaises(RuntimeError):
+            pool.submit("機械学習について教えて")
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for ResponseCache."""
+    
+    def setUp(self):
+        METRICS.reset()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "responses.db")
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def test_shared_between_instances(self):
+        """Entries written through one connection are seen by another."""
+        key = ("research_assistant", "gpt-4o", False, "機械学習について教えて")
+        ResponseCache(self.path).set(key, {"blocks": ["回答"]})
+        cache = ResponseCache(self.path)
+        
+        self.assertEqual(cache.get(key), {"blocks": ["回答"]})
+        self.assertIsNone(cache.get(("research_assistant", "gpt-4o", False, "別の質問")))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+    
+    def test_expired_entries(self):
+        """Expired entries are misses and are purged."""
+        cache = ResponseCache(self.path, ttl_seconds=-1)
+        cache.set("key", {"blocks": ["古い回答"]})
+        
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.purge_expired(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()